@@ -43,6 +43,8 @@ if os.getenv("GITHUB_ACTIONS") == "true":
 else:
     DATABASE_PATH = os.path.join(user_data_dir("PictoPy"), "database", "PictoPy.db")
 THUMBNAIL_IMAGES_PATH = os.path.join(user_data_dir("PictoPy"), "thumbnails")
+# Face cluster cover crops, next to the image thumbnails
+CLUSTER_COVERS_PATH = os.path.join(THUMBNAIL_IMAGES_PATH, "faces")
 VIDEO_FRAMES_PATH = os.path.join(user_data_dir("PictoPy"), "video_frames")
 IMAGES_PATH = "./images"
 
@@ -159,11 +161,63 @@ def _get_env_int(
 
 
 SIGLIP2_EMBED_BATCH_SIZE = _get_env_int("SIGLIP2_EMBED_BATCH_SIZE", 8, min_value=1)
+# Images per YOLO detection run during tagging. Each batch holds its decoded
+# full-resolution images in memory until face detection is done with them.
+YOLO_DETECT_BATCH_SIZE = _get_env_int("YOLO_DETECT_BATCH_SIZE", 4, min_value=1)
+# The analysis pass (image_util_process_pending_images) decodes each image
+# once, on this many threads, and hands it to the detectors and the SigLIP2
+# embedder through queues of IMAGE_PIPELINE_QUEUE_SIZE images each. Queued
+# images are held decoded at full resolution, so the queues bound memory.
+IMAGE_PIPELINE_DECODE_WORKERS = _get_env_int(
+    "IMAGE_PIPELINE_DECODE_WORKERS", 2, min_value=1
+)
+IMAGE_PIPELINE_QUEUE_SIZE = _get_env_int("IMAGE_PIPELINE_QUEUE_SIZE", 4, min_value=1)
+# Images whose tags, faces and embeddings are written per transaction
+IMAGE_PIPELINE_WRITE_BATCH = _get_env_int("IMAGE_PIPELINE_WRITE_BATCH", 64, min_value=1)
+# ONNX Runtime session tuning, mainly for CPU-only deployments. 0 threads
+# keeps ONNX Runtime's default (one per physical core); optimization is one
+# of "disabled", "basic", "extended" or "all".
+ONNX_INTRA_OP_THREADS = _get_env_int("ONNX_INTRA_OP_THREADS", 0, min_value=0)
+ONNX_INTER_OP_THREADS = _get_env_int("ONNX_INTER_OP_THREADS", 0, min_value=0)
+ONNX_GRAPH_OPTIMIZATION = _get_env_str("ONNX_GRAPH_OPTIMIZATION", "all")
+# Loaded models stay warm in each process for reuse by later passes. One
+# unused for this many seconds is closed; 0 closes models as soon as they
+# are released, as before the pool.
+MODEL_POOL_IDLE_SECONDS = _get_env_int("MODEL_POOL_IDLE_SECONDS", 300, min_value=0)
+# Idle models are closed, least recently used first, while the pool's
+# model files add up to more than this
+MODEL_POOL_MAX_MB = _get_env_int("MODEL_POOL_MAX_MB", 2048, min_value=0)
+# SQLite tuning for the pooled connections in app.database.connection.
+# WAL lets readers run alongside the indexing writer; synchronous=NORMAL is
+# crash-safe under WAL and only risks the last commits on power loss.
+DATABASE_SYNCHRONOUS = _get_env_str("DATABASE_SYNCHRONOUS", "NORMAL")
+DATABASE_CACHE_SIZE_MB = _get_env_int("DATABASE_CACHE_SIZE_MB", 64, min_value=0)
+DATABASE_MMAP_SIZE_MB = _get_env_int("DATABASE_MMAP_SIZE_MB", 256, min_value=0)
+DATABASE_BUSY_TIMEOUT_MS = _get_env_int("DATABASE_BUSY_TIMEOUT_MS", 5000, min_value=0)
+# Prepared statements cached per connection
+DATABASE_STATEMENT_CACHE_SIZE = _get_env_int(
+    "DATABASE_STATEMENT_CACHE_SIZE", 256, min_value=0
+)
+# Idle connections kept per database and set of connection PRAGMAs; the
+# pool is shared by every thread of a process
+DATABASE_POOL_SIZE = _get_env_int("DATABASE_POOL_SIZE", 4, min_value=0)
 SIGLIP2_TEXT_MAX_LENGTH = 64
 SIGLIP2_TOKENIZER_PAD_ID = 0
 SIGLIP2_TOKENIZER_PAD_TOKEN = "<pad>"
+# Text-query embeddings kept per (text model, templated query); repeated
+# and paged searches skip tokenizing and the text tower.
+SIGLIP2_QUERY_CACHE_SIZE = _get_env_int("SIGLIP2_QUERY_CACHE_SIZE", 256, min_value=0)
 # bare-noun queries score low in absolute terms; 0.02 measured to cut true positives.
 SIGLIP2_MATCH_THRESHOLD = _get_env_float("SIGLIP2_MATCH_THRESHOLD", 0.01, min_value=0.0)
+# Approximate search. Below SIGLIP2_ANN_MIN_IMAGES every embedding is scored
+# exactly; above it an IVF index (app/utils/ann_index.py) narrows scoring to
+# the NPROBE lists nearest the query. The index is retrained once the
+# library grows by REBUILD_GROWTH (0.5 = 50%) since the last build.
+SIGLIP2_ANN_MIN_IMAGES = _get_env_int("SIGLIP2_ANN_MIN_IMAGES", 100_000, min_value=1)
+SIGLIP2_ANN_NPROBE = _get_env_int("SIGLIP2_ANN_NPROBE", 32, min_value=1)
+SIGLIP2_ANN_REBUILD_GROWTH = _get_env_float(
+    "SIGLIP2_ANN_REBUILD_GROWTH", 0.5, min_value=0.0
+)
 
 # Curated-vocabulary pre-scoring. Ensembled label vectors score ~2 orders of
 # magnitude below live queries, so these floors are NOT comparable to
@@ -207,6 +261,28 @@ VIDEO_TAG_MIN_FRAME_SUPPORT = _get_env_int(
 )
 VIDEO_TAG_TOP_K = _get_env_int("VIDEO_TAG_TOP_K", 15, min_value=1)
 
+# Folder indexing. Thumbnail + metadata work is spread over a process pool of
+# this many workers (1 = in-process, the old serial path). Capped at 8 by
+# default: past that the pass is disk-bound and more workers only add RAM.
+IMAGE_INDEXING_WORKERS = _get_env_int(
+    "IMAGE_INDEXING_WORKERS", max(1, min(os.cpu_count() or 1, 8)), min_value=1
+)
+# Files handed to the pool per round and rows per db_bulk_insert_images call.
+# Bounds the work in flight and commits progress as the walk goes.
+IMAGE_INDEXING_BATCH_SIZE = _get_env_int("IMAGE_INDEXING_BATCH_SIZE", 500, min_value=1)
+# Images per page of GET /images/ when the client asks for paging without a
+# limit, and per database read while streaming it as NDJSON
+IMAGES_PAGE_SIZE = _get_env_int("IMAGES_PAGE_SIZE", 500, min_value=1)
+# Background job queue (app/utils/jobs.py). Stages of different jobs run on
+# up to JOB_WORKERS threads of the worker process. Folder indexing is scoped
+# to its job's folders, so up to JOB_INDEX_CONCURRENCY jobs may index at
+# once, sharing one pool of IMAGE_INDEXING_WORKERS processes; the
+# library-wide stages run one job at a time. Finished jobs beyond
+# JOB_HISTORY_SIZE are pruned, which also bounds the throughput window.
+JOB_WORKERS = _get_env_int("JOB_WORKERS", 2, min_value=1)
+JOB_INDEX_CONCURRENCY = _get_env_int("JOB_INDEX_CONCURRENCY", 2, min_value=1)
+JOB_HISTORY_SIZE = _get_env_int("JOB_HISTORY_SIZE", 100, min_value=1)
+
 # Clustering Configuration
 PICTO_CLUSTERING_EPS = _get_env_float("PICTO_CLUSTERING_EPS", 0.75, min_value=0.0)
 PICTO_CLUSTERING_MIN_SAMPLES = _get_env_int(
@@ -224,6 +300,18 @@ PICTO_CLUSTERING_SIMILARITY_THRESHOLD = _get_env_float(
 PICTO_CLUSTERING_MERGE_THRESHOLD = _get_env_float(
     "PICTO_CLUSTERING_MERGE_THRESHOLD", 0.7, min_value=0.0, max_value=1.0
 )
+# From this many faces, DBSCAN runs on a sparse radius-neighbour graph
+# instead of the dense N x N distance matrix (4 * N^2 bytes and more).
+PICTO_CLUSTERING_SPARSE_MIN_FACES = _get_env_int(
+    "PICTO_CLUSTERING_SPARSE_MIN_FACES", 5000, min_value=1
+)
+# Hours between full DBSCAN rebuilds of every cluster. 0 (the default)
+# keeps to incremental passes, which never renumber or rename clusters; a
+# full rebuild then runs only for the first clusters or when requested.
+# Cover crops of clusters an incremental pass drops are pruned by that pass.
+PICTO_CLUSTERING_FULL_REBUILD_HOURS = _get_env_float(
+    "PICTO_CLUSTERING_FULL_REBUILD_HOURS", 0.0, min_value=0.0
+)
 PICTO_CLUSTERING_CONF_THRESHOLD = _get_env_float(
     "PICTO_CLUSTERING_CONF_THRESHOLD", 0.45, min_value=0.0, max_value=1.0
 )
@@ -3,7 +3,7 @@ from typing import Any, List, Optional, Tuple, TypedDict
 
 import bcrypt
 from app.config.settings import DATABASE_PATH
-from app.database.connection import get_db_connection
+from app.database.connection import db_connect, get_db_connection
 
 
 class AlbumRow(TypedDict):
@@ -20,10 +20,8 @@ class AlbumRow(TypedDict):
 
 
 def _connect() -> sqlite3.Connection:
-    conn = sqlite3.connect(DATABASE_PATH)
     # Ensure ON DELETE CASCADE and other FKs are enforced
-    conn.execute("PRAGMA foreign_keys = ON")
-    return conn
+    return db_connect(DATABASE_PATH, foreign_keys=True)
 
 
 # Named once so the SELECTs and the mapper below cannot drift apart.
@@ -1,11 +1,254 @@
+"""
+Pooled SQLite connections shared by every app.database module.
+
+db_connect hands out a connection on loan and close() returns it to a
+per-database pool, so a db_* call reuses an open connection, its page
+cache and its prepared statements instead of reconnecting. Connections
+are opened in WAL mode with the DATABASE_* settings and configured once:
+each set of per-connection PRAGMAs (foreign keys, the strict set used by
+get_db_connection) has its own pool, so a loan never inherits another
+caller's settings.
+
+A returned connection has any open transaction rolled back, exactly as
+closing it would, and its cursors closed. A connection whose database
+file was deleted or replaced is dropped rather than reused.
+"""
+
+import os
 import sqlite3
+import threading
+import weakref
 from contextlib import contextmanager
-from typing import Generator
+from typing import Dict, Generator, List, Optional, Tuple
+
 from app.config.settings import DATABASE_PATH
 from app.logging.setup_logging import get_logger
 
 logger = get_logger(__name__)
 
+_FOREIGN_KEYS_PRAGMAS = ("PRAGMA foreign_keys = ON;",)
+_STRICT_PRAGMAS = (
+    "PRAGMA foreign_keys = ON;",  # Enforce FK constraints
+    "PRAGMA ignore_check_constraints = OFF;",  # Enforce CHECK constraints
+    "PRAGMA recursive_triggers = ON;",  # Allow nested triggers
+    "PRAGMA defer_foreign_keys = OFF;",  # Immediate FK checking
+    "PRAGMA case_sensitive_like = ON;",  # Make LIKE case-sensitive
+)
+
+_PoolKey = Tuple[str, Tuple[str, ...]]
+
+
+class _Pooled:
+    def __init__(self, conn: sqlite3.Connection, file_id: Optional[Tuple[int, int]]):
+        self.conn = conn
+        self.file_id = file_id
+
+
+_pool: Dict[_PoolKey, List[_Pooled]] = {}
+_pool_lock = threading.Lock()
+# Connections a forked child inherited from its parent
+_inherited: List[Dict[_PoolKey, List[_Pooled]]] = []
+
+
+def _file_id(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+def _close_quietly(conn: sqlite3.Connection) -> None:
+    try:
+        conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"Failed to close pooled database connection: {e}")
+
+
+def _open(path: str, pragmas: Tuple[str, ...]) -> sqlite3.Connection:
+    from app.config.settings import (
+        DATABASE_BUSY_TIMEOUT_MS,
+        DATABASE_CACHE_SIZE_MB,
+        DATABASE_MMAP_SIZE_MB,
+        DATABASE_STATEMENT_CACHE_SIZE,
+        DATABASE_SYNCHRONOUS,
+    )
+
+    # Loans are exclusive, so a connection is only ever used by one thread
+    # at a time even though it may move between threads
+    conn = sqlite3.connect(
+        path,
+        timeout=DATABASE_BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=False,
+        cached_statements=DATABASE_STATEMENT_CACHE_SIZE,
+    )
+    try:
+        mode = conn.execute("PRAGMA journal_mode = WAL;").fetchone()[0]
+        if mode.lower() != "wal":
+            logger.warning(f"SQLite kept journal_mode={mode} for {path}")
+        conn.execute(f"PRAGMA synchronous = {DATABASE_SYNCHRONOUS};")
+        # Negative cache_size is in KiB rather than pages
+        conn.execute(f"PRAGMA cache_size = -{DATABASE_CACHE_SIZE_MB * 1024};")
+        conn.execute(f"PRAGMA mmap_size = {DATABASE_MMAP_SIZE_MB * 1024 * 1024};")
+        conn.execute("PRAGMA temp_store = MEMORY;")
+        for pragma in pragmas:
+            conn.execute(pragma)
+    except Exception:
+        conn.close()
+        raise
+    return conn
+
+
+def _acquire(path: str, pragmas: Tuple[str, ...]) -> "_Lease":
+    key = (path, pragmas)
+    current = _file_id(path)
+    stale: List[_Pooled] = []
+    pooled = None
+    with _pool_lock:
+        idle = _pool.get(key, [])
+        while idle:
+            candidate = idle.pop()
+            if candidate.file_id == current:
+                pooled = candidate
+                break
+            stale.append(candidate)
+    for entry in stale:
+        _close_quietly(entry.conn)
+
+    if pooled is None:
+        conn = _open(path, pragmas)
+        # The file may only exist now that the connection created it
+        pooled = _Pooled(conn, _file_id(path))
+    return _Lease(pooled, key)
+
+
+def _release(pooled: _Pooled, key: _PoolKey) -> None:
+    from app.config.settings import DATABASE_POOL_SIZE
+
+    conn = pooled.conn
+    try:
+        if conn.in_transaction:
+            # What closing the connection without a commit would have done
+            conn.rollback()
+        conn.row_factory = None
+        conn.text_factory = str
+        conn.isolation_level = ""
+    except sqlite3.Error as e:
+        logger.warning(f"Discarding database connection that failed to reset: {e}")
+        _close_quietly(conn)
+        return
+
+    with _pool_lock:
+        idle = _pool.setdefault(key, [])
+        if len(idle) < DATABASE_POOL_SIZE:
+            idle.append(pooled)
+            return
+    _close_quietly(conn)
+
+
+class _Lease:
+    """
+    A pooled connection on loan, usable like the sqlite3.Connection.
+
+    close() returns the connection to the pool; afterwards the lease
+    raises sqlite3.ProgrammingError like a closed connection would.
+    """
+
+    __slots__ = ("_pooled", "_key", "_cursors", "__weakref__")
+
+    def __init__(self, pooled: _Pooled, key: _PoolKey):
+        object.__setattr__(self, "_pooled", pooled)
+        object.__setattr__(self, "_key", key)
+        object.__setattr__(self, "_cursors", weakref.WeakSet())
+
+    def _conn(self) -> sqlite3.Connection:
+        pooled = object.__getattribute__(self, "_pooled")
+        if pooled is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return pooled.conn
+
+    def __getattr__(self, name: str):
+        return getattr(self._conn(), name)
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(self._conn(), name, value)
+
+    def _track(self, cursor: sqlite3.Cursor) -> sqlite3.Cursor:
+        self._cursors.add(cursor)
+        return cursor
+
+    # Cursors are closed on release: an unfinished SELECT would otherwise
+    # keep a read snapshot open on the idle connection
+    def cursor(self, *args, **kwargs) -> sqlite3.Cursor:
+        return self._track(self._conn().cursor(*args, **kwargs))
+
+    def execute(self, *args, **kwargs) -> sqlite3.Cursor:
+        return self._track(self._conn().execute(*args, **kwargs))
+
+    def executemany(self, *args, **kwargs) -> sqlite3.Cursor:
+        return self._track(self._conn().executemany(*args, **kwargs))
+
+    def executescript(self, *args, **kwargs) -> sqlite3.Cursor:
+        return self._track(self._conn().executescript(*args, **kwargs))
+
+    def __enter__(self) -> "_Lease":
+        self._conn().__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._conn().__exit__(exc_type, exc, tb)
+
+    def close(self) -> None:
+        pooled = self._pooled
+        if pooled is None:
+            return
+        object.__setattr__(self, "_pooled", None)
+        for cursor in list(self._cursors):
+            try:
+                cursor.close()
+            except sqlite3.Error:
+                pass
+        _release(pooled, self._key)
+
+
+def db_connect(path: str, foreign_keys: bool = False) -> sqlite3.Connection:
+    """
+    A pooled connection to `path`; close() gives it back to the pool.
+
+    Callers pass their module's DATABASE_PATH. foreign_keys=True hands out
+    a connection with `PRAGMA foreign_keys = ON` already applied.
+    """
+    return _acquire(path, _FOREIGN_KEYS_PRAGMAS if foreign_keys else ())
+
+
+def db_close_idle_connections(path: Optional[str] = None) -> int:
+    """
+    Close pooled connections not on loan, for one database or all of them.
+
+    Call before deleting or replacing a database file. Returns the number
+    closed.
+    """
+    with _pool_lock:
+        keys = [key for key in _pool if path is None or key[0] == path]
+        closing = [entry for key in keys for entry in _pool.pop(key)]
+    for entry in closing:
+        _close_quietly(entry.conn)
+    return len(closing)
+
+
+def _reset_after_fork() -> None:
+    # SQLite connections must not be used across fork(). The child starts
+    # with an empty pool and keeps the inherited handles referenced, since
+    # closing one could checkpoint and remove the WAL the parent still uses
+    global _pool, _pool_lock
+    _inherited.append(_pool)
+    _pool = {}
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
 
 @contextmanager
 def get_db_connection() -> Generator[sqlite3.Connection, None, None]:
@@ -16,14 +259,7 @@ def get_db_connection() -> Generator[sqlite3.Connection, None, None]:
     - Works for both single and multi-step transactions
     - Automatically commits on success or rolls back on failure
     """
-    conn = sqlite3.connect(DATABASE_PATH)
-
-    # --- Strict enforcement of all relational and logical rules ---
-    conn.execute("PRAGMA foreign_keys = ON;")  # Enforce FK constraints
-    conn.execute("PRAGMA ignore_check_constraints = OFF;")  # Enforce CHECK constraints
-    conn.execute("PRAGMA recursive_triggers = ON;")  # Allow nested triggers
-    conn.execute("PRAGMA defer_foreign_keys = OFF;")  # Immediate FK checking
-    conn.execute("PRAGMA case_sensitive_like = ON;")  # Make LIKE case-sensitive
+    conn = _acquire(DATABASE_PATH, _STRICT_PRAGMAS)
 
     try:
         yield conn
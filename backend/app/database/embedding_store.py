@@ -0,0 +1,168 @@
+"""
+Memory-mapped copy of image_embeddings, one file pair per model_version.
+
+The matrix is a plain .npy (N x D float32) opened with mmap_mode="r", so
+every process reading it shares the OS page cache instead of parsing BLOBs
+into its own heap. Row i belongs to ids[i]. SQLite stays the source of
+truth: each file name carries a hash of the table signature it was built
+from, and a store whose signature no longer matches the table is rebuilt.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from app.database.images import _connect
+from app.logging.setup_logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class EmbeddingStore(NamedTuple):
+    ids: np.ndarray
+    matrix: np.ndarray
+    rows: Dict[str, int]
+    signature: Tuple[int, int, str]
+
+
+_open_stores: Dict[str, EmbeddingStore] = {}
+_store_lock = threading.Lock()
+
+
+def _store_prefix(model_version: str) -> str:
+    # Next to the database it mirrors, so every database gets its own store
+    from app.database import images
+
+    directory = os.path.join(os.path.dirname(images.DATABASE_PATH), "embeddings")
+    return os.path.join(directory, re.sub(r"[^A-Za-z0-9._-]", "_", model_version))
+
+
+def _store_paths(prefix: str, signature: Tuple[int, int, str]) -> Tuple[str, str]:
+    digest = hashlib.sha1(repr(signature).encode()).hexdigest()[:16]
+    return f"{prefix}.{digest}.ids.npy", f"{prefix}.{digest}.npy"
+
+
+def db_get_embedding_signature(cursor, model_version: str) -> Tuple[int, int, str]:
+    """
+    (COUNT, MAX(rowid), id of that row) for one model_version.
+
+    Answered from ix_image_embeddings_model_version, so it stays cheap on a
+    large table. An upsert of an existing image keeps its rowid, so new rows
+    always raise MAX(rowid) and deletions always lower the count. The id
+    tells a rebuilt database apart from the one a store was built from.
+    """
+    cursor.execute(
+        """
+        SELECT COUNT(*), IFNULL(MAX(rowid), 0) FROM image_embeddings
+        WHERE model_version = ?
+        """,
+        (model_version,),
+    )
+    count, max_rowid = cursor.fetchone()
+    last_id = ""
+    if count:
+        cursor.execute(
+            "SELECT image_id FROM image_embeddings WHERE rowid = ?", (max_rowid,)
+        )
+        last_id = cursor.fetchone()[0]
+    return count, max_rowid, last_id
+
+
+def _build_store(cursor, model_version: str, count: int, ids_path: str, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+    cursor.execute(
+        """
+        SELECT image_id, embedding FROM image_embeddings
+        WHERE model_version = ?
+        ORDER BY rowid
+        """,
+        (model_version,),
+    )
+    ids: List[str] = []
+    matrix = None
+    for row, (image_id, blob) in enumerate(cursor):
+        vector = np.frombuffer(blob, dtype=np.float32)
+        if matrix is None:
+            matrix = np.lib.format.open_memmap(
+                path + suffix, mode="w+", dtype=np.float32, shape=(count, len(vector))
+            )
+        matrix[row] = vector
+        ids.append(image_id)
+    matrix.flush()
+    del matrix
+
+    with open(ids_path + suffix, "wb") as f:
+        np.save(f, np.array(ids))
+    # ids first: a reader that finds the matrix can rely on its ids
+    os.replace(ids_path + suffix, ids_path)
+    os.replace(path + suffix, path)
+    logger.info(f"Built embedding store for {model_version}: {count} row(s)")
+
+
+def _remove_other_generations(prefix: str, keep: Tuple[str, str]):
+    directory, name = os.path.split(prefix)
+    pattern = re.compile(re.escape(name) + r"\.[0-9a-f]{16}(\.ids)?\.npy")
+    for entry in os.listdir(directory):
+        path = os.path.join(directory, entry)
+        if pattern.fullmatch(entry) and path not in keep:
+            try:
+                os.remove(path)
+            except OSError:
+                # Still mapped by another process on Windows; next pass
+                pass
+
+
+def _load_store(ids_path: str, path: str, signature) -> Optional[EmbeddingStore]:
+    try:
+        ids = np.load(ids_path, mmap_mode="r")
+        matrix = np.asarray(np.load(path, mmap_mode="r"))
+    except (OSError, ValueError):
+        return None
+    if len(ids) != signature[0] or matrix.shape[0] != signature[0]:
+        return None
+    rows = {image_id: row for row, image_id in enumerate(ids.tolist())}
+    return EmbeddingStore(ids, matrix, rows, signature)
+
+
+def db_open_embedding_store(model_version: str) -> Optional[EmbeddingStore]:
+    """
+    The memory-mapped embeddings for model_version, rebuilt first if the
+    table has changed since the store was written. None when nothing is
+    embedded under that version.
+    """
+    prefix = _store_prefix(model_version)
+    with _store_lock:
+        conn = None
+        try:
+            conn = _connect()
+            cursor = conn.cursor()
+            # One read transaction, so a rebuild matches its signature
+            cursor.execute("BEGIN")
+            signature = db_get_embedding_signature(cursor, model_version)
+            if signature[0] == 0:
+                _open_stores.pop(prefix, None)
+                return None
+
+            store = _open_stores.get(prefix)
+            if store is not None and store.signature == signature:
+                return store
+
+            ids_path, path = _store_paths(prefix, signature)
+            store = _load_store(ids_path, path, signature)
+            if store is None:
+                _build_store(cursor, model_version, signature[0], ids_path, path)
+                store = _load_store(ids_path, path, signature)
+        finally:
+            if conn:
+                conn.close()
+
+        if store is None:
+            raise RuntimeError(f"Embedding store for {model_version} is unreadable")
+        _open_stores[prefix] = store
+        _remove_other_generations(prefix, (ids_path, path))
+        return store
@@ -1,7 +1,11 @@
+import base64
+import binascii
 import math
+import os
 import sqlite3
-from typing import Optional, List, Dict, TypedDict, Union
-from app.config.settings import DATABASE_PATH
+from typing import Optional, List, Dict, Set, TypedDict, Union
+from app.config.settings import CLUSTER_COVERS_PATH, DATABASE_PATH
+from app.database.connection import db_connect
 from app.logging.setup_logging import get_logger
 
 logger = get_logger(__name__)
@@ -16,7 +20,7 @@ class ClusterData(TypedDict):
 
     cluster_id: ClusterId
     cluster_name: Optional[ClusterName]
-    face_image_base64: Optional[str]
+    face_image_path: Optional[str]
 
 
 ClusterMap = Dict[ClusterId, ClusterData]
@@ -26,23 +30,75 @@ def db_create_clusters_table() -> None:
     """Create the face_clusters table if it doesn't exist."""
     conn = None
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_connect(DATABASE_PATH)
         cursor = conn.cursor()
         cursor.execute(
             """
             CREATE TABLE IF NOT EXISTS face_clusters (
                 cluster_id TEXT PRIMARY KEY,
                 cluster_name TEXT,
-                face_image_base64 TEXT
+                face_image_path TEXT,
+                centroid BLOB,
+                face_count INTEGER NOT NULL DEFAULT 0
             )
         """
         )
+        # centroid/face_count: the running mean embedding of the cluster's
+        # faces (see db_get_cluster_mean_embeddings). A NULL centroid means
+        # it must be recomputed, which is what older rows get here.
+        cursor.execute("PRAGMA table_info(face_clusters)")
+        columns = {row[1] for row in cursor.fetchall()}
+        if "centroid" not in columns:
+            cursor.execute("ALTER TABLE face_clusters ADD COLUMN centroid BLOB")
+        if "face_count" not in columns:
+            cursor.execute(
+                "ALTER TABLE face_clusters ADD COLUMN face_count INTEGER NOT NULL DEFAULT 0"
+            )
+        # Cover crops used to be stored inline as base64; they are JPEG
+        # files now and the row keeps only the path
+        if "face_image_path" not in columns:
+            cursor.execute("ALTER TABLE face_clusters ADD COLUMN face_image_path TEXT")
+        if "face_image_base64" in columns:
+            _migrate_base64_covers(cursor)
         conn.commit()
     finally:
         if conn is not None:
             conn.close()
 
 
+def _migrate_base64_covers(cursor: sqlite3.Cursor) -> None:
+    """Write inline base64 covers out as files and clear the inline copies."""
+    rows = cursor.execute(
+        """
+        SELECT cluster_id, face_image_base64 FROM face_clusters
+        WHERE face_image_base64 IS NOT NULL
+        """
+    ).fetchall()
+    if not rows:
+        return
+
+    os.makedirs(CLUSTER_COVERS_PATH, exist_ok=True)
+    updates = []
+    for cluster_id, encoded in rows:
+        try:
+            path = os.path.join(CLUSTER_COVERS_PATH, f"cluster_{cluster_id}.jpg")
+            with open(path, "wb") as f:
+                f.write(base64.b64decode(encoded))
+        except (OSError, binascii.Error, ValueError) as e:
+            # The next full recluster crops a fresh cover
+            logger.warning(f"Dropping stored cover for cluster {cluster_id}: {e}")
+            path = None
+        updates.append((path, cluster_id))
+    cursor.executemany(
+        """
+        UPDATE face_clusters SET face_image_path = ?, face_image_base64 = NULL
+        WHERE cluster_id = ?
+        """,
+        updates,
+    )
+    logger.info(f"Moved {len(updates)} cluster cover(s) out of the database")
+
+
 def db_delete_all_clusters(cursor: Optional[sqlite3.Cursor] = None) -> int:
     """
     Delete all clusters from the database.
@@ -55,7 +111,7 @@ def db_delete_all_clusters(cursor: Optional[sqlite3.Cursor] = None) -> int:
     """
     own_connection = cursor is None
     if own_connection:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_connect(DATABASE_PATH)
         cursor = conn.cursor()
 
     try:
@@ -74,6 +130,49 @@ def db_delete_all_clusters(cursor: Optional[sqlite3.Cursor] = None) -> int:
             conn.close()
 
 
+def db_merge_clusters(
+    source_id: ClusterId, target_id: ClusterId, cursor: sqlite3.Cursor
+) -> None:
+    """
+    Fold one cluster into another: move its faces, carry its name over if
+    the target has none, and delete it. The target's centroid is marked
+    for recomputation.
+
+    Args:
+        source_id: The cluster to merge away
+        target_id: The cluster that keeps its id
+        cursor: Database cursor of the caller's transaction
+    """
+    cursor.execute(
+        "UPDATE faces SET cluster_id = ? WHERE cluster_id = ?", (target_id, source_id)
+    )
+    cursor.execute(
+        """
+        UPDATE face_clusters
+        SET centroid = NULL,
+            cluster_name = COALESCE(
+                cluster_name,
+                (SELECT cluster_name FROM face_clusters WHERE cluster_id = ?)
+            )
+        WHERE cluster_id = ?
+        """,
+        (source_id, target_id),
+    )
+    cursor.execute("DELETE FROM face_clusters WHERE cluster_id = ?", (source_id,))
+
+
+def db_get_cluster_sizes() -> Dict[ClusterId, int]:
+    """Stored face count of every cluster that has faces, keyed by cluster_id."""
+    conn = db_connect(DATABASE_PATH)
+    try:
+        rows = conn.execute(
+            "SELECT cluster_id, face_count FROM face_clusters WHERE face_count > 0"
+        ).fetchall()
+        return dict(rows)
+    finally:
+        conn.close()
+
+
 def db_insert_clusters_batch(
     clusters: List[ClusterData], cursor: Optional[sqlite3.Cursor] = None
 ) -> List[ClusterId]:
@@ -92,7 +191,7 @@ def db_insert_clusters_batch(
 
     own_connection = cursor is None
     if own_connection:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_connect(DATABASE_PATH)
         cursor = conn.cursor()
 
     try:
@@ -102,15 +201,18 @@ def db_insert_clusters_batch(
         for cluster in clusters:
             cluster_id = cluster.get("cluster_id")
             cluster_name = cluster.get("cluster_name")
-            face_image_base64 = cluster.get("face_image_base64")
+            face_image_path = cluster.get("face_image_path")
 
-            insert_data.append((cluster_id, cluster_name, face_image_base64))
+            insert_data.append((cluster_id, cluster_name, face_image_path))
             cluster_ids.append(cluster_id)
 
+        # New clusters start with a known-empty centroid, so assigning faces
+        # to them folds into it instead of forcing a recompute
         cursor.executemany(
             """
-            INSERT INTO face_clusters (cluster_id, cluster_name, face_image_base64)
-            VALUES (?, ?, ?)
+            INSERT INTO face_clusters
+                (cluster_id, cluster_name, face_image_path, centroid, face_count)
+            VALUES (?, ?, ?, X'', 0)
             """,
             insert_data,
         )
@@ -138,12 +240,12 @@ def db_get_cluster_by_id(cluster_id: ClusterId) -> Optional[ClusterData]:
     Returns:
         ClusterData if found, None otherwise
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
 
     try:
         cursor.execute(
-            "SELECT cluster_id, cluster_name, face_image_base64 FROM face_clusters WHERE cluster_id = ?",
+            "SELECT cluster_id, cluster_name, face_image_path FROM face_clusters WHERE cluster_id = ?",
             (cluster_id,),
         )
 
@@ -151,7 +253,7 @@ def db_get_cluster_by_id(cluster_id: ClusterId) -> Optional[ClusterData]:
 
         if row:
             return ClusterData(
-                cluster_id=row[0], cluster_name=row[1], face_image_base64=row[2]
+                cluster_id=row[0], cluster_name=row[1], face_image_path=row[2]
             )
         return None
     finally:
@@ -165,12 +267,12 @@ def db_get_all_clusters() -> List[ClusterData]:
     Returns:
         List of ClusterData objects
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
 
     try:
         cursor.execute(
-            "SELECT cluster_id, cluster_name, face_image_base64 FROM face_clusters ORDER BY cluster_id"
+            "SELECT cluster_id, cluster_name, face_image_path FROM face_clusters ORDER BY cluster_id"
         )
 
         rows = cursor.fetchall()
@@ -179,7 +281,7 @@ def db_get_all_clusters() -> List[ClusterData]:
         for row in rows:
             clusters.append(
                 ClusterData(
-                    cluster_id=row[0], cluster_name=row[1], face_image_base64=row[2]
+                    cluster_id=row[0], cluster_name=row[1], face_image_path=row[2]
                 )
             )
 
@@ -188,6 +290,23 @@ def db_get_all_clusters() -> List[ClusterData]:
         conn.close()
 
 
+def db_get_cluster_cover_paths() -> Set[str]:
+    """
+    The cover crop files clusters currently point at.
+
+    Returns:
+        Set of face_image_path values, without NULLs
+    """
+    conn = db_connect(DATABASE_PATH)
+    try:
+        rows = conn.execute(
+            "SELECT face_image_path FROM face_clusters WHERE face_image_path IS NOT NULL"
+        ).fetchall()
+        return {path for (path,) in rows}
+    finally:
+        conn.close()
+
+
 def db_get_clusters_count() -> int:
     """
     Count the clusters that still have at least one face attached.
@@ -201,7 +320,7 @@ def db_get_clusters_count() -> int:
     Returns:
         Number of clusters with one or more faces
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
 
     try:
@@ -236,7 +355,7 @@ def db_update_cluster(
     # Use provided connection or create a new one
     own_connection = conn is None
     if own_connection:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_connect(DATABASE_PATH)
 
     cursor = conn.cursor()
 
@@ -270,15 +389,15 @@ def db_get_all_clusters_with_face_counts() -> (
     List[Dict[str, Union[str, Optional[str], int]]]
 ):
     """
-    Retrieve all clusters with their face counts and stored face images.
+    Retrieve all clusters with their face counts and cover image paths.
     Ordered by prominence: avg detection confidence weighted by log of face count,
     so frequently-photographed people (likely the device owner) rank first
     without letting large low-quality clusters outrank clean ones.
 
     Returns:
-        List of dictionaries containing cluster_id, cluster_name, face_count, and face_image_base64
+        List of dictionaries containing cluster_id, cluster_name, face_count, and face_image_path
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
 
     try:
@@ -288,11 +407,11 @@ def db_get_all_clusters_with_face_counts() -> (
                 fc.cluster_id,
                 fc.cluster_name,
                 COUNT(f.face_id) as face_count,
-                fc.face_image_base64,
+                fc.face_image_path,
                 COALESCE(AVG(f.confidence), 0) as avg_confidence
             FROM face_clusters fc
             INNER JOIN faces f ON fc.cluster_id = f.cluster_id
-            GROUP BY fc.cluster_id, fc.cluster_name, fc.face_image_base64
+            GROUP BY fc.cluster_id, fc.cluster_name, fc.face_image_path
             """
         )
 
@@ -300,13 +419,13 @@ def db_get_all_clusters_with_face_counts() -> (
 
         clusters = []
         for row in rows:
-            cluster_id, cluster_name, face_count, face_image_base64, avg_conf = row
+            cluster_id, cluster_name, face_count, face_image_path, avg_conf = row
             clusters.append(
                 {
                     "cluster_id": cluster_id,
                     "cluster_name": cluster_name,
                     "face_count": face_count,
-                    "face_image_base64": face_image_base64,
+                    "face_image_path": face_image_path,
                     "_score": avg_conf * math.log2(1 + face_count),
                 }
             )
@@ -331,7 +450,7 @@ def db_get_images_by_cluster_id(
     Returns:
         List of dictionaries containing image data with face information
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
 
     try:
@@ -437,7 +556,7 @@ def db_get_images_by_face_clusters(
 
     import json
 
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     try:
         cursor = conn.cursor()
         cursor.execute(sql, params)
@@ -1,8 +1,10 @@
 import sqlite3
 import json
+import threading
 import numpy as np
-from typing import Optional, List, Dict, Union, TypedDict
+from typing import Optional, List, Dict, Tuple, Union, TypedDict
 from app.config.settings import DATABASE_PATH
+from app.database.connection import db_connect
 from app.logging.setup_logging import get_logger
 
 logger = get_logger(__name__)
@@ -21,19 +23,89 @@ class FaceData(TypedDict):
     face_id: FaceId
     image_id: ImageId
     cluster_id: Optional[ClusterId]
-    embeddings: FaceEmbedding  # Numpy array in application, stored as JSON string in DB
+    embeddings: FaceEmbedding  # Numpy array in application, float32 BLOB in DB
     confidence: Optional[float]
     bbox: Optional[BoundingBox]
 
 
 FaceClusterMapping = Dict[FaceId, Optional[ClusterId]]
 
+# Rows converted per transaction when upgrading JSON embeddings in place
+_MIGRATION_BATCH_SIZE = 2000
+
+
+def _encode_embedding(embedding: FaceEmbedding) -> bytes:
+    return np.asarray(embedding, dtype=np.float32).tobytes()
+
+
+def _decode_embedding(value: Union[bytes, str]) -> FaceEmbedding:
+    # Text means a JSON row the startup migration hasn't reached yet
+    if isinstance(value, str):
+        return np.asarray(json.loads(value), dtype=np.float32).ravel()
+    return np.frombuffer(value, dtype=np.float32)
+
+
+def _embedding_matrix(values: List[Union[bytes, str]]) -> np.ndarray:
+    """
+    Stack stored embeddings into one contiguous read-only [N, D] float32
+    matrix. All-BLOB input (the normal case) is a single join and a
+    reshape, with no per-row Python objects.
+    """
+    if not values:
+        return np.empty((0, 0), dtype=np.float32)
+    if all(isinstance(value, bytes) for value in values):
+        matrix = np.frombuffer(b"".join(values), dtype=np.float32)
+        return matrix.reshape(len(values), -1)
+    matrix = np.vstack([_decode_embedding(value) for value in values])
+    matrix.setflags(write=False)
+    return matrix
+
+
+def _migrate_json_embeddings(conn: sqlite3.Connection) -> None:
+    """
+    Rewrite JSON-text embeddings as float32 BLOBs, in place.
+
+    Each batch commits on its own and only text rows are selected, so an
+    interrupted upgrade picks up where it stopped on the next start. Rows
+    whose JSON doesn't parse could never have been loaded; they are set to
+    NULL (and skipped by the loaders) rather than retried forever.
+    """
+    cursor = conn.cursor()
+    converted = 0
+    # Walk face_id forward so no batch rescans rows already converted
+    last_face_id = -1
+    while True:
+        cursor.execute(
+            """
+            SELECT face_id, embeddings FROM faces
+            WHERE face_id > ? AND typeof(embeddings) = 'text'
+            ORDER BY face_id
+            LIMIT ?
+            """,
+            (last_face_id, _MIGRATION_BATCH_SIZE),
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        last_face_id = rows[-1][0]
+        updates = []
+        for face_id, value in rows:
+            try:
+                updates.append((_encode_embedding(_decode_embedding(value)), face_id))
+            except (ValueError, TypeError):
+                logger.warning(f"Dropping unreadable embedding for face_id {face_id}")
+                updates.append((None, face_id))
+        cursor.executemany("UPDATE faces SET embeddings = ? WHERE face_id = ?", updates)
+        conn.commit()
+        converted += len(updates)
+    if converted:
+        logger.info(f"Converted {converted} face embedding(s) from JSON to float32")
+
 
 def db_create_faces_table() -> None:
     conn = None
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.execute("PRAGMA foreign_keys = ON")
+        conn = db_connect(DATABASE_PATH, foreign_keys=True)
         cursor = conn.cursor()
         cursor.execute(
             """
@@ -41,7 +113,7 @@ def db_create_faces_table() -> None:
                 face_id INTEGER PRIMARY KEY AUTOINCREMENT,
                 image_id TEXT,
                 cluster_id INTEGER,
-                embeddings TEXT,
+                embeddings BLOB,
                 confidence REAL,
                 bbox TEXT,
                 FOREIGN KEY (image_id) REFERENCES images(id) ON DELETE CASCADE,
@@ -53,7 +125,46 @@ def db_create_faces_table() -> None:
         cursor.execute(
             "CREATE INDEX IF NOT EXISTS ix_faces_image_id ON faces(image_id)"
         )
+        # Membership changes that don't go through the centroid fold in
+        # db_update_face_cluster_ids_batch mark the cluster's stored centroid
+        # for recomputation: faces deleted (directly or by image cascade),
+        # moved out, or inserted straight into a cluster.
+        cursor.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS faces_centroid_on_delete
+            AFTER DELETE ON faces WHEN OLD.cluster_id IS NOT NULL
+            BEGIN
+                UPDATE face_clusters SET centroid = NULL
+                WHERE cluster_id = OLD.cluster_id;
+            END
+            """
+        )
+        cursor.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS faces_centroid_on_leave
+            AFTER UPDATE OF cluster_id ON faces
+            WHEN OLD.cluster_id IS NOT NULL AND OLD.cluster_id IS NOT NEW.cluster_id
+            BEGIN
+                UPDATE face_clusters SET centroid = NULL
+                WHERE cluster_id = OLD.cluster_id;
+            END
+            """
+        )
+        cursor.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS faces_centroid_on_insert
+            AFTER INSERT ON faces WHEN NEW.cluster_id IS NOT NULL
+            BEGIN
+                UPDATE face_clusters SET centroid = NULL
+                WHERE cluster_id = NEW.cluster_id;
+            END
+            """
+        )
         conn.commit()
+        # Databases from before the BLOB format hold JSON text. The column's
+        # declared type stays TEXT there, which SQLite doesn't enforce:
+        # BLOBs are stored as-is under TEXT affinity.
+        _migrate_json_embeddings(conn)
     finally:
         if conn is not None:
             conn.close()
@@ -77,11 +188,11 @@ def db_insert_face_embeddings(
         bbox: Bounding box coordinates as dict with keys: x, y, width, height (optional)
         cluster_id: ID of the face cluster this face belongs to (optional)
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
 
     try:
-        embeddings_json = json.dumps([emb.tolist() for emb in embeddings])
+        embeddings_blob = _encode_embedding(embeddings)
 
         # Convert bbox to JSON string if provided
         bbox_json = json.dumps(bbox) if bbox is not None else None
@@ -91,7 +202,7 @@ def db_insert_face_embeddings(
             INSERT INTO faces (image_id, cluster_id, embeddings, confidence, bbox)
             VALUES (?, ?, ?, ?, ?)
         """,
-            (image_id, cluster_id, embeddings_json, confidence, bbox_json),
+            (image_id, cluster_id, embeddings_blob, confidence, bbox_json),
         )
 
         face_id = cursor.lastrowid
@@ -101,6 +212,57 @@ def db_insert_face_embeddings(
         conn.close()
 
 
+def db_insert_faces_batch(
+    faces: List[Tuple[ImageId, FaceEmbedding, Optional[float], Optional[BoundingBox]]],
+    cursor: Optional[sqlite3.Cursor] = None,
+) -> int:
+    """
+    Insert detected faces for many images in one transaction.
+
+    Args:
+        faces: (image_id, embedding, confidence, bbox) per face
+        cursor: Optional existing database cursor, to insert as part of the
+            caller's transaction. If None, creates a new connection.
+
+    Returns:
+        The number of faces inserted
+    """
+    if not faces:
+        return 0
+
+    own_connection = cursor is None
+    if own_connection:
+        conn = db_connect(DATABASE_PATH)
+        cursor = conn.cursor()
+
+    try:
+        cursor.executemany(
+            """
+            INSERT INTO faces (image_id, cluster_id, embeddings, confidence, bbox)
+            VALUES (?, NULL, ?, ?, ?)
+            """,
+            [
+                (
+                    image_id,
+                    _encode_embedding(embedding),
+                    confidence,
+                    json.dumps(bbox) if bbox is not None else None,
+                )
+                for image_id, embedding, confidence, bbox in faces
+            ],
+        )
+        if own_connection:
+            conn.commit()
+        return len(faces)
+    except sqlite3.Error:
+        if own_connection:
+            conn.rollback()
+        raise
+    finally:
+        if own_connection:
+            conn.close()
+
+
 def db_insert_face_embeddings_by_image_id(
     image_id: ImageId,
     embeddings: Union[FaceEmbedding, List[FaceEmbedding]],
@@ -148,151 +310,214 @@ def db_insert_face_embeddings_by_image_id(
         )
 
 
-def get_all_face_embeddings():
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
+class _FaceMatrix:
+    """Unit-norm embeddings of every face, as of (row count, MAX(face_id))."""
 
-    try:
-        cursor.execute(
-            """
-            SELECT
-                f.embeddings,
-                f.bbox,
-                i.id, 
-                i.path, 
-                i.folder_id, 
-                i.thumbnailPath, 
-                i.metadata, 
-                i.isTagged,
-                m.name as tag_name
-            FROM faces f
-            JOIN images i ON f.image_id=i.id
-            LEFT JOIN image_classes_display ic ON i.id = ic.image_id
-            LEFT JOIN mappings m ON ic.class_id = m.class_id
-        """
+    def __init__(self, database_path: str):
+        self.database_path = database_path
+        self.count = 0
+        self.max_face_id = 0
+        self.face_ids = np.empty(0, dtype=np.int64)
+        self.image_ids: List[ImageId] = []
+        self.matrix = np.empty((0, 0), dtype=np.float32)
+
+    def append(self, rows: list) -> None:
+        rows = [row for row in rows if row[2] is not None]
+        if not rows:
+            return
+        block = np.array(_embedding_matrix([row[2] for row in rows]))
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        block /= np.maximum(norms, 1e-12)
+        # New arrays, not in-place growth: callers may still hold the old ones
+        self.face_ids = np.concatenate(
+            [self.face_ids, np.fromiter((row[0] for row in rows), np.int64)]
         )
-        results = cursor.fetchall()
-
-        from app.utils.images import image_util_parse_metadata
-
-        images_dict = {}
-        for (
-            embeddings,
-            bbox,
-            image_id,
-            path,
-            folder_id,
-            thumbnail_path,
-            metadata,
-            is_tagged,
-            tag_name,
-        ) in results:
-            if image_id not in images_dict:
-                try:
-                    embeddings_json = json.loads(embeddings)
-                    bbox_json = json.loads(bbox)
-                except json.JSONDecodeError:
-                    continue
-                images_dict[image_id] = {
-                    "embeddings": embeddings_json,
-                    "bbox": bbox_json,
-                    "id": image_id,
-                    "path": path,
-                    "folder_id": folder_id,
-                    "thumbnailPath": thumbnail_path,
-                    "metadata": image_util_parse_metadata(metadata),
-                    "isTagged": bool(is_tagged),
-                    "tags": [],
-                }
-
-            # Add tag if it exists
-            if tag_name:
-                images_dict[image_id]["tags"].append(tag_name)
-
-        # Convert to list and set tags to None if empty
-        images = []
-        for image_data in images_dict.values():
-            if not image_data["tags"]:
-                image_data["tags"] = None
-            images.append(image_data)
-
-        # Sort by path
-        images.sort(key=lambda x: x["path"])
-        return images
+        self.image_ids = self.image_ids + [row[1] for row in rows]
+        self.matrix = block if not self.matrix.size else np.vstack([self.matrix, block])
+        self.matrix.setflags(write=False)
+
+
+_face_matrix: Optional[_FaceMatrix] = None
+_face_matrix_lock = threading.Lock()
+
+
+def db_get_face_embedding_matrix() -> Tuple[np.ndarray, List[ImageId], np.ndarray]:
+    """
+    (face_ids, image_ids, matrix) for every face with an embedding; matrix
+    rows are L2-normalized, so `matrix @ query` is cosine similarity.
+
+    Cached per process. face_id is AUTOINCREMENT and faces are never
+    rewritten, so COUNT(*) and MAX(face_id) tell whether rows were only
+    appended (read just those) or also deleted (reload). Both come from
+    indexes, so checking costs no table scan.
+    """
+    global _face_matrix
+    with _face_matrix_lock:
+        conn = db_connect(DATABASE_PATH)
+        try:
+            cursor = conn.cursor()
+            # One read transaction, so the rows read match the counts
+            cursor.execute("BEGIN")
+            count = cursor.execute("SELECT COUNT(*) FROM faces").fetchone()[0]
+            max_face_id = cursor.execute(
+                "SELECT IFNULL(MAX(face_id), 0) FROM faces"
+            ).fetchone()[0]
+
+            cache = _face_matrix
+            if cache is None or cache.database_path != DATABASE_PATH:
+                cache = _FaceMatrix(DATABASE_PATH)
+            if (cache.count, cache.max_face_id) != (count, max_face_id):
+                new_rows = cursor.execute(
+                    """
+                    SELECT face_id, image_id, embeddings FROM faces
+                    WHERE face_id > ?
+                    ORDER BY face_id
+                    """,
+                    (cache.max_face_id,),
+                ).fetchall()
+                if cache.count + len(new_rows) != count:
+                    # Faces were deleted as well; start over
+                    cache = _FaceMatrix(DATABASE_PATH)
+                    new_rows = cursor.execute(
+                        """
+                        SELECT face_id, image_id, embeddings FROM faces
+                        ORDER BY face_id
+                        """
+                    ).fetchall()
+                cache.append(new_rows)
+                cache.count, cache.max_face_id = count, max_face_id
+            _face_matrix = cache
+            return cache.face_ids, cache.image_ids, cache.matrix
+        finally:
+            conn.close()
+
+
+def db_get_face_bboxes(face_ids: List[FaceId]) -> Dict[FaceId, Optional[BoundingBox]]:
+    """Bounding boxes of the given faces, keyed by face_id."""
+    if not face_ids:
+        return {}
+    conn = db_connect(DATABASE_PATH)
+    try:
+        bboxes = {}
+        chunk_size = 500
+        for i in range(0, len(face_ids), chunk_size):
+            chunk = [int(face_id) for face_id in face_ids[i : i + chunk_size]]
+            placeholders = ",".join("?" for _ in chunk)
+            rows = conn.execute(
+                f"SELECT face_id, bbox FROM faces WHERE face_id IN ({placeholders})",
+                chunk,
+            ).fetchall()
+            for face_id, bbox in rows:
+                bboxes[face_id] = json.loads(bbox) if bbox else None
+        return bboxes
     finally:
         conn.close()
 
 
-def db_get_faces_unassigned_clusters() -> List[Dict[str, Union[FaceId, FaceEmbedding]]]:
+def db_get_faces_unassigned_clusters() -> (
+    Tuple[List[FaceId], List[ImageId], np.ndarray]
+):
     """
     Get all faces that don't have assigned clusters.
 
     Returns:
-        List of dictionaries containing face_id and embeddings (as numpy array)
+        (face_ids, image_ids, embeddings) aligned by row; embeddings is one
+        contiguous [N, D] float32 matrix
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
 
     try:
         cursor.execute(
-            "SELECT face_id, image_id, embeddings FROM faces WHERE cluster_id IS NULL"
+            """
+            SELECT face_id, image_id, embeddings FROM faces
+            WHERE cluster_id IS NULL AND embeddings IS NOT NULL
+            """
         )
 
         rows = cursor.fetchall()
 
-        faces = []
-        for row in rows:
-            face_id, image_id, embeddings_json = row
-            # Convert JSON string back to numpy array
-            embeddings = np.array(json.loads(embeddings_json))
-            faces.append(
-                {"face_id": face_id, "image_id": image_id, "embeddings": embeddings}
-            )
+        face_ids = [row[0] for row in rows]
+        image_ids = [row[1] for row in rows]
+        return face_ids, image_ids, _embedding_matrix([row[2] for row in rows])
+    finally:
+        conn.close()
+
+
+def db_get_faces_by_cluster_ids(
+    cluster_ids: List[ClusterId],
+) -> Tuple[List[FaceId], List[ImageId], List[ClusterId], np.ndarray]:
+    """
+    Get the faces of the given clusters only.
 
-        return faces
+    Returns:
+        (face_ids, image_ids, cluster_ids, embeddings) aligned by row and
+        grouped by cluster; embeddings is one contiguous [N, D] float32 matrix
+    """
+    if not cluster_ids:
+        return [], [], [], np.empty((0, 0), dtype=np.float32)
+    conn = db_connect(DATABASE_PATH)
+    try:
+        rows = []
+        chunk_size = 500
+        for i in range(0, len(cluster_ids), chunk_size):
+            chunk = list(cluster_ids[i : i + chunk_size])
+            placeholders = ",".join("?" for _ in chunk)
+            rows.extend(
+                conn.execute(
+                    f"""
+                    SELECT face_id, image_id, cluster_id, embeddings FROM faces
+                    WHERE cluster_id IN ({placeholders}) AND embeddings IS NOT NULL
+                    ORDER BY cluster_id, face_id
+                    """,
+                    chunk,
+                ).fetchall()
+            )
+        return (
+            [row[0] for row in rows],
+            [row[1] for row in rows],
+            [row[2] for row in rows],
+            _embedding_matrix([row[3] for row in rows]),
+        )
     finally:
         conn.close()
 
 
 def db_get_all_faces_with_cluster_names() -> (
-    List[Dict[str, Union[FaceId, FaceEmbedding, Optional[str]]]]
+    Tuple[List[FaceId], List[ImageId], List[Optional[str]], np.ndarray]
 ):
     """
     Get all faces with their corresponding cluster names.
 
     Returns:
-        List of dictionaries containing face_id, embeddings (as numpy array), and cluster_name
+        (face_ids, image_ids, cluster_names, embeddings) aligned by row and
+        ordered by face_id; embeddings is one contiguous [N, D] float32 matrix
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
 
     try:
         cursor.execute(
             """
-            SELECT f.face_id, f.image_id, f.embeddings, fc.cluster_name
+            SELECT f.face_id, f.image_id, fc.cluster_name, f.embeddings
             FROM faces f
             LEFT JOIN face_clusters fc ON f.cluster_id = fc.cluster_id
+            WHERE f.embeddings IS NOT NULL
             ORDER BY f.face_id
             """
         )
 
         rows = cursor.fetchall()
 
-        faces = []
-        for row in rows:
-            face_id, image_id, embeddings_json, cluster_name = row
-            # Convert JSON string back to numpy array
-            embeddings = np.array(json.loads(embeddings_json))
-            faces.append(
-                {
-                    "face_id": face_id,
-                    "image_id": image_id,
-                    "embeddings": embeddings,
-                    "cluster_name": cluster_name,
-                }
-            )
-
-        return faces
+        face_ids = [row[0] for row in rows]
+        image_ids = [row[1] for row in rows]
+        cluster_names = [row[2] for row in rows]
+        return (
+            face_ids,
+            image_ids,
+            cluster_names,
+            _embedding_matrix([row[3] for row in rows]),
+        )
     finally:
         conn.close()
 
@@ -306,9 +531,13 @@ def db_update_face_cluster_ids_batch(
 
     Args:
         face_cluster_mapping: List of dictionaries containing face_id and cluster_id pairs
-                             Each dict should have keys: 'face_id' and 'cluster_id'
+                             Each dict should have keys: 'face_id' and 'cluster_id',
+                             and optionally the face's 'embedding'
         cursor: Optional existing database cursor. If None, creates a new connection.
 
+    Faces that join a cluster with their 'embedding' are folded into its
+    stored centroid; without one the centroid is marked for recomputation.
+
     Example:
         face_cluster_mapping = [
             {'face_id': 1, 'cluster_id': 'uuid-cluster-1'},
@@ -321,7 +550,7 @@ def db_update_face_cluster_ids_batch(
 
     own_connection = cursor is None
     if own_connection:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_connect(DATABASE_PATH)
         cursor = conn.cursor()
 
     # 1. Prepare update data outside the DB transaction.
@@ -332,6 +561,7 @@ def db_update_face_cluster_ids_batch(
             (mapping.get("cluster_id"), mapping.get("face_id"))
             for mapping in face_cluster_mapping
         ]
+        embeddings = [mapping.get("embedding") for mapping in face_cluster_mapping]
     except (AttributeError, KeyError, TypeError) as e:
         if own_connection:
             conn.close()
@@ -340,14 +570,22 @@ def db_update_face_cluster_ids_batch(
 
     # 2. Database transaction — only pure DB operations here, so sqlite3.Error is safe.
     try:
-        cursor.executemany(
-            """
-            UPDATE faces 
-            SET cluster_id = ? 
-            WHERE face_id = ?
-            """,
-            update_data,
-        )
+        # Row by row, so faces already in their target cluster are not
+        # counted into its centroid twice
+        joined: Dict[ClusterId, List[Optional[FaceEmbedding]]] = {}
+        for (cluster_id, face_id), embedding in zip(update_data, embeddings):
+            cursor.execute(
+                """
+                UPDATE faces
+                SET cluster_id = ?
+                WHERE face_id = ? AND cluster_id IS NOT ?
+                """,
+                (cluster_id, face_id, cluster_id),
+            )
+            if cursor.rowcount and cluster_id is not None:
+                joined.setdefault(cluster_id, []).append(embedding)
+
+        _fold_into_centroids(cursor, joined)
 
         if own_connection:
             conn.commit()
@@ -361,9 +599,38 @@ def db_update_face_cluster_ids_batch(
             conn.close()
 
 
+def _fold_into_centroids(
+    cursor: sqlite3.Cursor, joined: Dict[ClusterId, List[Optional[FaceEmbedding]]]
+) -> None:
+    """Add newly joined faces to each cluster's stored running mean."""
+    for cluster_id, new_embeddings in joined.items():
+        row = cursor.execute(
+            "SELECT centroid, face_count FROM face_clusters WHERE cluster_id = ?",
+            (cluster_id,),
+        ).fetchone()
+        if row is None or row[0] is None:
+            continue  # Already marked for recomputation
+        if any(embedding is None for embedding in new_embeddings):
+            cursor.execute(
+                "UPDATE face_clusters SET centroid = NULL WHERE cluster_id = ?",
+                (cluster_id,),
+            )
+            continue
+
+        centroid, count = row
+        total = np.sum(np.asarray(new_embeddings, dtype=np.float64), axis=0)
+        if count:
+            total += np.frombuffer(centroid, dtype=np.float32) * count
+        count += len(new_embeddings)
+        cursor.execute(
+            "UPDATE face_clusters SET centroid = ?, face_count = ? WHERE cluster_id = ?",
+            (_encode_embedding(total / count), count, cluster_id),
+        )
+
+
 def db_get_cluster_image_pairs() -> set:
     """Distinct (cluster_id, image_id) pairs for all cluster-assigned faces."""
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     try:
         rows = conn.execute(
             "SELECT DISTINCT cluster_id, image_id FROM faces WHERE cluster_id IS NOT NULL"
@@ -373,54 +640,86 @@ def db_get_cluster_image_pairs() -> set:
         conn.close()
 
 
-def db_get_cluster_mean_embeddings() -> List[Dict[str, Union[str, FaceEmbedding]]]:
-    """
-    Get cluster IDs and their corresponding mean face embeddings.
-
-    Returns:
-        List of dictionaries containing cluster_id and mean_embedding (as numpy array)
-        Only returns clusters that have at least one face assigned
-    """
-    conn = sqlite3.connect(DATABASE_PATH)
+def _refresh_stale_centroids(conn: sqlite3.Connection) -> None:
+    """Recompute centroids marked NULL from their faces, in one transaction."""
     cursor = conn.cursor()
-
+    # Taking the write lock first keeps a concurrent fold from landing
+    # between reading the faces and writing their mean
+    cursor.execute("BEGIN IMMEDIATE")
     try:
+        stale = [
+            row[0]
+            for row in cursor.execute(
+                "SELECT cluster_id FROM face_clusters WHERE centroid IS NULL"
+            )
+        ]
+        if not stale:
+            conn.rollback()
+            return
+
+        updates = {cluster_id: (b"", 0) for cluster_id in stale}
         cursor.execute(
             """
             SELECT f.cluster_id, f.embeddings
             FROM faces f
-            WHERE f.cluster_id IS NOT NULL
+            JOIN face_clusters c ON c.cluster_id = f.cluster_id
+            WHERE c.centroid IS NULL AND f.embeddings IS NOT NULL
             ORDER BY f.cluster_id
             """
         )
-
         rows = cursor.fetchall()
+        if rows:
+            # Rows arrive grouped by cluster_id, so each cluster is one slice
+            embeddings = _embedding_matrix([row[1] for row in rows])
+            starts = [0] + [
+                i for i in range(1, len(rows)) if rows[i][0] != rows[i - 1][0]
+            ]
+            counts = np.diff(starts + [len(rows)])
+            sums = np.add.reduceat(embeddings, starts, axis=0, dtype=np.float64)
+            for start, count, total in zip(starts, counts, sums):
+                updates[rows[start][0]] = (_encode_embedding(total / count), int(count))
+
+        cursor.executemany(
+            "UPDATE face_clusters SET centroid = ?, face_count = ? WHERE cluster_id = ?",
+            [
+                (blob, count, cluster_id)
+                for cluster_id, (blob, count) in updates.items()
+            ],
+        )
+        conn.commit()
+        logger.info(f"Recomputed {len(stale)} cluster centroid(s)")
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def db_get_cluster_mean_embeddings() -> Tuple[List[ClusterId], np.ndarray]:
+    """
+    Get cluster IDs and their corresponding mean face embeddings.
+
+    Means are read from the centroids stored on face_clusters, so this
+    loads C rows rather than every clustered face. Centroids invalidated
+    since the last call are recomputed from their faces first.
+
+    Returns:
+        (cluster_ids, means) aligned by row, means as a [C, D] float32 matrix.
+        Only clusters that have at least one face assigned are included
+    """
+    conn = db_connect(DATABASE_PATH)
+
+    try:
+        _refresh_stale_centroids(conn)
+        rows = conn.execute(
+            """
+            SELECT cluster_id, centroid FROM face_clusters
+            WHERE face_count > 0
+            ORDER BY cluster_id
+            """
+        ).fetchall()
 
         if not rows:
-            return []
-
-        # Group embeddings by cluster_id
-        cluster_embeddings = {}
-        for row in rows:
-            cluster_id, embeddings_json = row
-            # Convert JSON string back to numpy array
-            embeddings = np.array(json.loads(embeddings_json))
-
-            if cluster_id not in cluster_embeddings:
-                cluster_embeddings[cluster_id] = []
-            cluster_embeddings[cluster_id].append(embeddings)
-
-        # Calculate mean embeddings for each cluster
-        cluster_means = []
-        for cluster_id, embeddings_list in cluster_embeddings.items():
-            # Stack all embeddings for this cluster and calculate mean
-            stacked_embeddings = np.stack(embeddings_list)
-            mean_embedding = np.mean(stacked_embeddings, axis=0)
-
-            cluster_means.append(
-                {"cluster_id": cluster_id, "mean_embedding": mean_embedding}
-            )
+            return [], np.empty((0, 0), dtype=np.float32)
 
-        return cluster_means
+        return [row[0] for row in rows], _embedding_matrix([row[1] for row in rows])
     finally:
         conn.close()
@@ -3,6 +3,7 @@ import os
 import uuid
 from typing import List, Tuple, Dict, Optional
 from app.config.settings import DATABASE_PATH
+from app.database.connection import db_connect
 from app.logging.setup_logging import get_logger
 
 # Initialize logger
@@ -32,7 +33,7 @@ INDEXING_STATUSES = (
 def db_create_folders_table() -> None:
     conn = None
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_connect(DATABASE_PATH)
         cursor = conn.cursor()
         cursor.execute(
             """
@@ -60,7 +61,7 @@ def db_insert_folders_batch(folders_data: List[FolderData]) -> None:
     folders_data: list of tuples (folder_id, folder_path,
     parent_folder_id,last_modified_time, AI_Tagging, taggingCompleted)
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
 
     try:
@@ -84,7 +85,7 @@ def db_insert_folder(
     taggingCompleted: Optional[bool] = None,
     folder_id: Optional[FolderId] = None,
 ) -> FolderId:
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
 
     try:
@@ -126,7 +127,7 @@ def db_insert_folder(
 
 
 def db_get_folder_id_from_path(folder_path: FolderPath) -> Optional[FolderId]:
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
     try:
         abs_folder_path = os.path.abspath(folder_path)
@@ -141,7 +142,7 @@ def db_get_folder_id_from_path(folder_path: FolderPath) -> Optional[FolderId]:
 
 
 def db_get_folder_path_from_id(folder_id: FolderId) -> Optional[FolderPath]:
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
     try:
         cursor.execute(
@@ -157,7 +158,7 @@ def db_get_folder_path_from_id(folder_id: FolderId) -> Optional[FolderPath]:
 def db_get_all_folders() -> List[FolderPath]:
     # try/finally, not `with`: sqlite3's context manager commits the
     # transaction but leaves the connection (and its file handle) open.
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     try:
         rows = conn.execute("SELECT folder_path FROM folders").fetchall()
         return [row[0] for row in rows] if rows else []
@@ -166,7 +167,7 @@ def db_get_all_folders() -> List[FolderPath]:
 
 
 def db_get_all_folder_ids() -> List[FolderId]:
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
     try:
         cursor.execute("SELECT folder_id from folders")
@@ -185,14 +186,11 @@ def db_delete_folders_batch(folder_ids: List[FolderId]) -> int:
     if not folder_ids:
         return 0
 
-    conn = sqlite3.connect(DATABASE_PATH)
+    # Foreign keys on for cascading deletes
+    conn = db_connect(DATABASE_PATH, foreign_keys=True)
     cursor = conn.cursor()
 
     try:
-        # Enable foreign keys for cascading deletes
-        cursor.execute("PRAGMA foreign_keys = ON;")
-        conn.commit()
-
         # Create placeholders for the IN clause
         placeholders = ",".join("?" * len(folder_ids))
 
@@ -213,14 +211,12 @@ def db_delete_folders_batch(folder_ids: List[FolderId]) -> int:
 
 
 def db_delete_folder(folder_path: FolderPath) -> None:
-    conn = sqlite3.connect(DATABASE_PATH)
+    # Foreign keys on: deleting the folder cascades to image_id_mapping and
+    # images, which reference its folder_id
+    conn = db_connect(DATABASE_PATH, foreign_keys=True)
     cursor = conn.cursor()
     try:
         abs_folder_path = os.path.abspath(folder_path)
-        cursor.execute(
-            "PRAGMA foreign_keys = ON;"
-        )  # Important for deleting rows in image_id_mapping and images table because they reference this folder_id
-        conn.commit()
         cursor.execute(
             "SELECT folder_id FROM folders WHERE folder_path = ?",
             (abs_folder_path,),
@@ -250,7 +246,7 @@ def db_update_parent_ids_for_subtree(
     Only updates folders whose parent_folder_id is NULL.
     folder_map: dict mapping folder_path to tuple of (folder_id, parent_id)
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
     try:
         for folder_path, (folder_id, parent_id) in folder_map.items():
@@ -273,7 +269,7 @@ def db_folder_exists(folder_path: FolderPath) -> bool:
     Check if a folder exists in the database.
     Returns True if the folder exists, False otherwise.
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
     try:
         abs_path = os.path.abspath(folder_path)
@@ -295,7 +291,7 @@ def db_find_parent_folder_id(folder_path: FolderPath) -> Optional[FolderId]:
     if not parent_path or parent_path == folder_path:  # Root directory
         return None
 
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
     try:
         cursor.execute(
@@ -319,7 +315,7 @@ def db_update_ai_tagging_batch(
     if not folder_ids:
         return 0
 
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
 
     try:
@@ -362,7 +358,7 @@ def db_disable_ai_tagging_batch(folder_ids: List[FolderId]) -> int:
 
 def db_get_folder_ids_by_path_prefix(root_path: str) -> List[FolderIdPath]:
     """Get all folder IDs and paths whose path starts with the given root path."""
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
 
     try:
@@ -395,7 +391,7 @@ def db_get_folder_ids_by_paths(
     if not folder_paths:
         return {}
 
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
 
     try:
@@ -429,7 +425,7 @@ def db_get_all_folder_details() -> (
     image_count and video_count.
     Returns list of tuples with all folder information.
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
 
     try:
@@ -464,7 +460,7 @@ def db_get_direct_child_folders(parent_folder_id: str) -> List[Tuple[str, str]]:
     Get all direct child folders (not subfolders) for a given parent folder.
     Returns list of tuples (folder_id, folder_path).
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
 
     try:
@@ -490,7 +486,7 @@ def db_set_tagging_completed(completed: bool) -> int:
     mid-tagging. The tagging sequences now clear it on entry and set it on
     exit. Returns the number of folders updated.
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
     try:
         cursor.execute(
@@ -523,7 +519,7 @@ def db_clear_stale_processing_flags() -> int:
 
     Returns the number of folders corrected.
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
     try:
         # One statement, not two: a folder that is both mid-tagging and
@@ -568,7 +564,7 @@ def db_update_folder_indexing_status(folder_id: str, status: str) -> None:
     if status not in INDEXING_STATUSES:
         raise ValueError(f"unknown indexing status: {status}")
 
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
     try:
         cursor.execute(
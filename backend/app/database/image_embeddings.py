@@ -1,4 +1,6 @@
-from typing import Dict, List, Tuple
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
 import numpy as np
 from app.database.images import SQLITE_ID_CHUNK, _connect
 
@@ -37,11 +39,26 @@ def db_create_image_embeddings_table():
             conn.close()
 
 
-def db_upsert_image_embeddings(rows: List[Tuple[str, str, np.ndarray]]):
+def db_upsert_image_embeddings(
+    rows: List[Tuple[str, str, np.ndarray]], cursor: Optional[sqlite3.Cursor] = None
+):
+    """
+    Insert or replace image embeddings.
+
+    Args:
+        rows: (image_id, model_version, embedding) per image
+        cursor: Optional existing database cursor, to write as part of the
+            caller's transaction. This process's cached matrices are then
+            left to catch up on their next sync, since they must not see
+            rows that might still roll back. If None, creates a new
+            connection.
+    """
+    own_connection = cursor is None
     conn = None
     try:
-        conn = _connect()
-        cursor = conn.cursor()
+        if own_connection:
+            conn = _connect()
+            cursor = conn.cursor()
 
         # Convert each embedding
         db_rows = [
@@ -64,10 +81,13 @@ def db_upsert_image_embeddings(rows: List[Tuple[str, str, np.ndarray]]):
             """,
             db_rows,
         )
-        conn.commit()
+        if own_connection:
+            conn.commit()
     finally:
         if conn:
             conn.close()
+    if own_connection:
+        _embedding_cache_apply_upserts(rows)
 
 
 def db_get_all_embeddings(model_version: str) -> Tuple[List[str], np.ndarray]:
@@ -108,21 +128,33 @@ def db_get_embeddings_for_image_ids(
     """
     Embeddings for an explicit id list, keyed by image id.
 
-    Memory curation only ever compares a single candidate set, so it loads
-    those rows rather than the whole table: db_get_all_embeddings on a large
-    library materializes hundreds of megabytes in the worker process.
+    Rows come from the memory-mapped embedding store as read-only views, so
+    a caller touches only the pages it needs and nothing is copied. Ids the
+    store doesn't hold (written after it was opened) are read from SQLite.
     """
     if not image_ids:
         return {}
 
+    from app.database.embedding_store import db_open_embedding_store
+
+    found: Dict[str, np.ndarray] = {}
+    store = db_open_embedding_store(model_version)
+    if store is not None:
+        for image_id in image_ids:
+            row = store.rows.get(image_id)
+            if row is not None:
+                found[image_id] = store.matrix[row]
+    missing = [image_id for image_id in image_ids if image_id not in found]
+    if not missing:
+        return found
+
     conn = None
     try:
         conn = _connect()
         cursor = conn.cursor()
-        found: Dict[str, np.ndarray] = {}
         # Chunked to stay under SQLite's variable limit, as elsewhere.
-        for start in range(0, len(image_ids), SQLITE_ID_CHUNK):
-            chunk = image_ids[start : start + SQLITE_ID_CHUNK]
+        for start in range(0, len(missing), SQLITE_ID_CHUNK):
+            chunk = missing[start : start + SQLITE_ID_CHUNK]
             placeholders = ", ".join("?" * len(chunk))
             cursor.execute(
                 f"""
@@ -169,30 +201,31 @@ def db_get_embeddings_needing_scoring(
     model_version: str, signature: str, limit: int
 ) -> Tuple[List[str], np.ndarray]:
     """Embeddings whose semantic scores are missing or from another
-    vocabulary/label state. Returns up to `limit` (image_ids, matrix)."""
+    vocabulary/label state. Returns up to `limit` (image_ids, matrix).
+    Only ids are read from SQLite; vectors come from the embedding store."""
     conn = None
     try:
         conn = _connect()
         cursor = conn.cursor()
         cursor.execute(
             """
-            SELECT image_id, embedding FROM image_embeddings
+            SELECT image_id FROM image_embeddings
             WHERE model_version = ? AND IFNULL(scored_signature, '') != ?
             LIMIT ?
             """,
             (model_version, signature, limit),
         )
-        rows = cursor.fetchall()
-        if not rows:
-            return [], np.empty((0, 0), dtype=np.float32)
-
-        image_ids = [image_id for image_id, _ in rows]
-        matrix = np.vstack([np.frombuffer(blob, dtype=np.float32) for _, blob in rows])
-        return image_ids, matrix
+        candidates = [row[0] for row in cursor.fetchall()]
     finally:
         if conn:
             conn.close()
 
+    found = db_get_embeddings_for_image_ids(candidates, model_version)
+    image_ids = [image_id for image_id in candidates if image_id in found]
+    if not image_ids:
+        return [], np.empty((0, 0), dtype=np.float32)
+    return image_ids, np.vstack([found[image_id] for image_id in image_ids])
+
 
 def db_count_embeddings(model_version: str | None = None) -> int:
     conn = None
@@ -213,3 +246,230 @@ def db_count_embeddings(model_version: str | None = None) -> int:
     finally:
         if conn:
             conn.close()
+
+
+class _CachedEmbeddings:
+    """
+    Process-local embedding matrix for one model_version.
+
+    Rows [0, count) of `matrix` are live; the tail is spare capacity so
+    appends don't copy the matrix. Readers take a snapshot view without the
+    lock: appends only write past every earlier view, and removals build new
+    arrays instead of shifting rows under a reader. Overwriting a row is the
+    one in-place write, and it only ever replaces a vector with its re-embed.
+    """
+
+    def __init__(self, dim: int):
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.matrix = np.empty((0, dim), dtype=np.float32)
+        self.count = 0
+        # db_get_embedding_signature as of the last sync
+        self.signature: Tuple[int, int, str] = (0, 0, "")
+
+    @classmethod
+    def from_store(cls, store) -> "_CachedEmbeddings":
+        """Wrap the memory-mapped store without copying it. The first write
+        moves the matrix onto the heap (see upsert and remove)."""
+        entry = cls(store.matrix.shape[1])
+        entry.ids = store.ids.tolist()
+        entry.rows = dict(store.rows)
+        entry.matrix = store.matrix
+        entry.count = len(entry.ids)
+        entry.signature = store.signature
+        return entry
+
+    @property
+    def dim(self) -> int:
+        return self.matrix.shape[1]
+
+    def upsert(self, image_ids: List[str], vectors: np.ndarray):
+        new_ids, new_rows = [], []
+        for image_id, vector in zip(image_ids, vectors):
+            row = self.rows.get(image_id)
+            if row is None:
+                new_ids.append(image_id)
+                new_rows.append(vector)
+            else:
+                if not self.matrix.flags.writeable:
+                    self.matrix = np.array(self.matrix)
+                self.matrix[row] = vector
+        if not new_ids:
+            return
+
+        needed = self.count + len(new_ids)
+        if needed > len(self.matrix):
+            grown = np.empty(
+                (max(needed, 2 * len(self.matrix)), self.dim), dtype=np.float32
+            )
+            grown[: self.count] = self.matrix[: self.count]
+            self.matrix = grown
+        self.matrix[self.count : needed] = new_rows
+        for offset, image_id in enumerate(new_ids):
+            self.rows[image_id] = self.count + offset
+        self.ids.extend(new_ids)
+        self.count = needed
+
+    def remove(self, image_ids: Iterable[str]):
+        doomed = [self.rows[i] for i in image_ids if i in self.rows]
+        if not doomed:
+            return
+        keep = np.ones(self.count, dtype=bool)
+        keep[doomed] = False
+        self.matrix = self.matrix[: self.count][keep]
+        self.ids = [i for i, kept in zip(self.ids, keep) if kept]
+        self.rows = {image_id: row for row, image_id in enumerate(self.ids)}
+        self.count = len(self.ids)
+
+    def snapshot(self) -> Tuple[List[str], np.ndarray]:
+        return self.ids[: self.count], self.matrix[: self.count]
+
+
+_embedding_cache: Dict[str, _CachedEmbeddings] = {}
+_embedding_cache_lock = threading.Lock()
+
+
+def _embedding_cache_apply_upserts(rows: List[Tuple[str, str, np.ndarray]]):
+    """Mirror freshly committed rows into any cached matrix in this process."""
+    with _embedding_cache_lock:
+        for model_version, entry in list(_embedding_cache.items()):
+            matching = [(i, e) for i, v, e in rows if v == model_version]
+            # An image re-embedded under another checkpoint left this one
+            entry.remove(i for i, v, _ in rows if v != model_version)
+            if not matching:
+                continue
+            vectors = np.vstack(
+                [np.asarray(e, dtype=np.float32).ravel() for _, e in matching]
+            )
+            if vectors.shape[1] != entry.dim:
+                del _embedding_cache[model_version]
+                continue
+            entry.upsert([i for i, _ in matching], vectors)
+
+
+def _embedding_cache_sync(
+    cursor, model_version: str, entry: _CachedEmbeddings
+) -> Optional[_CachedEmbeddings]:
+    """
+    Bring `entry` up to date with the table, reading as little as possible.
+
+    New rows are found by rowid (see db_get_embedding_signature); a count
+    mismatch after that means rows were deleted or moved to another
+    checkpoint, which costs one id-only scan. Another process re-embedding
+    an image under the same checkpoint goes unseen, but that rewrites the
+    vector with the same model output.
+    """
+    from app.database.embedding_store import db_get_embedding_signature
+
+    signature = db_get_embedding_signature(cursor, model_version)
+    if signature[0] == 0:
+        return None
+    if entry.signature == signature:
+        return entry
+
+    cursor.execute(
+        "SELECT image_id, embedding FROM image_embeddings "
+        "WHERE model_version = ? AND rowid > ?",
+        (model_version, entry.signature[1]),
+    )
+    fresh = cursor.fetchall()
+    if fresh:
+        entry.upsert(
+            [image_id for image_id, _ in fresh],
+            np.vstack([np.frombuffer(blob, dtype=np.float32) for _, blob in fresh]),
+        )
+    if entry.count != signature[0]:
+        cursor.execute(
+            "SELECT image_id FROM image_embeddings WHERE model_version = ?",
+            (model_version,),
+        )
+        live = {row[0] for row in cursor.fetchall()}
+        entry.remove([i for i in entry.ids[: entry.count] if i not in live])
+        missing = [i for i in live if i not in entry.rows]
+        for start in range(0, len(missing), SQLITE_ID_CHUNK):
+            chunk = missing[start : start + SQLITE_ID_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor.execute(
+                f"SELECT image_id, embedding FROM image_embeddings "
+                f"WHERE image_id IN ({placeholders})",
+                chunk,
+            )
+            found = cursor.fetchall()
+            if not found:
+                continue
+            entry.upsert(
+                [image_id for image_id, _ in found],
+                np.vstack([np.frombuffer(blob, dtype=np.float32) for _, blob in found]),
+            )
+
+    entry.signature = signature
+    return entry
+
+
+def db_get_cached_embeddings(model_version: str) -> Tuple[List[str], np.ndarray]:
+    """
+    Same result as db_get_all_embeddings, served from a process-wide cache.
+
+    The first call maps the on-disk embedding store; later calls run one
+    signature query and read only rows that changed since. Only the
+    requested model_version is kept, so a checkpoint switch frees the old
+    matrix. The returned matrix is a read-only view into the cache.
+    """
+    from app.database.embedding_store import db_open_embedding_store
+
+    with _embedding_cache_lock:
+        for version in list(_embedding_cache):
+            if version != model_version:
+                del _embedding_cache[version]
+
+        entry = _embedding_cache.get(model_version)
+        if entry is None:
+            store = db_open_embedding_store(model_version)
+            if store is not None:
+                entry = _CachedEmbeddings.from_store(store)
+        if entry is not None:
+            conn = None
+            try:
+                conn = _connect()
+                cursor = conn.cursor()
+                # One read transaction, so the signature matches the rows read
+                cursor.execute("BEGIN")
+                entry = _embedding_cache_sync(cursor, model_version, entry)
+            finally:
+                if conn:
+                    conn.close()
+
+        if entry is None:
+            _embedding_cache.pop(model_version, None)
+            return [], np.empty((0, 0), dtype=np.float32)
+        _embedding_cache[model_version] = entry
+        return entry.snapshot()
+
+
+def db_evict_cached_embeddings(image_ids: List[str]):
+    """Drop deleted images from the cached matrices in this process."""
+    with _embedding_cache_lock:
+        for entry in _embedding_cache.values():
+            entry.remove(image_ids)
+
+
+def db_clear_embedding_cache():
+    with _embedding_cache_lock:
+        _embedding_cache.clear()
+
+
+def db_get_embedding_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Rows, dimension, allocated rows and bytes held per cached model_version.
+    `mapped` is 1 while the matrix is still the shared embedding store map,
+    whose bytes live in the OS page cache rather than this process's heap."""
+    with _embedding_cache_lock:
+        return {
+            model_version: {
+                "rows": entry.count,
+                "dim": entry.dim,
+                "capacity": len(entry.matrix),
+                "bytes": entry.matrix.nbytes,
+                "mapped": int(not entry.matrix.flags.writeable),
+            }
+            for model_version, entry in _embedding_cache.items()
+        }
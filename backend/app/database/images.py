@@ -9,6 +9,7 @@ from datetime import datetime
 from app.config.settings import (
     DATABASE_PATH,
 )
+from app.database.connection import db_connect
 from app.logging.setup_logging import get_logger
 
 # Initialize logger
@@ -52,14 +53,21 @@ class UntaggedImageRecord(TypedDict):
     metadata: Mapping[str, Any]
 
 
+class PendingImageRecord(TypedDict):
+    """An image the analysis pass still has to tag, embed, or both."""
+
+    id: ImageId
+    path: ImagePath
+    isTagged: bool
+    isEmbedded: bool
+
+
 ImageClassPair = Tuple[ImageId, ClassId]
 
 
 def _connect() -> sqlite3.Connection:
-    conn = sqlite3.connect(DATABASE_PATH)
     # Ensure ON DELETE CASCADE and other FKs are enforced
-    conn.execute("PRAGMA foreign_keys = ON")
-    return conn
+    return db_connect(DATABASE_PATH, foreign_keys=True)
 
 
 def db_create_images_table() -> None:
@@ -272,6 +280,102 @@ def db_get_all_images(tagged: Union[bool, None] = None) -> List[dict]:
         conn.close()
 
 
+# (captured_at, id) of an image; the keyset that db_get_images_page pages on
+ImageKey = Tuple[Optional[str], ImageId]
+
+
+def db_get_images_page(
+    limit: int,
+    after: Optional[ImageKey] = None,
+    tagged: Optional[bool] = None,
+) -> List[dict]:
+    """
+    One page of images with their tags, newest first.
+
+    Pages are keyed on (captured_at, id) rather than offsets, so each page
+    is an index range read however deep into the library it is. Images
+    without a captured_at come after all dated ones, by id.
+
+    Args:
+        limit: Maximum number of images to return
+        after: (captured_at, id) of the last image of the previous page;
+               None starts from the newest image
+        tagged: Optional filter for tagged status
+
+    Returns:
+        Image dictionaries shaped like db_get_images_by_ids'
+    """
+    conn = _connect()
+    cursor = conn.cursor()
+
+    try:
+        tagged_filter = "" if tagged is None else " AND isTagged = ?"
+        tagged_params = [] if tagged is None else [tagged]
+
+        phases = []
+        if after is None:
+            phases.append(("captured_at IS NOT NULL", []))
+            phases.append(("captured_at IS NULL", []))
+        elif after[0] is not None:
+            phases.append(
+                ("captured_at IS NOT NULL AND (captured_at, id) < (?, ?)", list(after))
+            )
+            phases.append(("captured_at IS NULL", []))
+        else:
+            phases.append(("captured_at IS NULL AND id < ?", [after[1]]))
+
+        rows: List[Tuple] = []
+        for keyset, keyset_params in phases:
+            if len(rows) >= limit:
+                break
+            cursor.execute(
+                f"""
+                SELECT id, path, folder_id, thumbnailPath, metadata, isTagged,
+                       isFavourite, latitude, longitude, captured_at
+                FROM images
+                WHERE {keyset}{tagged_filter}
+                ORDER BY captured_at DESC, id DESC
+                LIMIT ?
+                """,
+                [*keyset_params, *tagged_params, limit - len(rows)],
+            )
+            rows.extend(cursor.fetchall())
+
+        # Tags in a second query: filtering image_classes_display by
+        # image_id reaches into the view, where joining it to the page
+        # would evaluate the view over every image
+        tags: Dict[str, List[str]] = {}
+        image_ids = [row[0] for row in rows]
+        for i in range(0, len(image_ids), SQLITE_ID_CHUNK):
+            chunk = image_ids[i : i + SQLITE_ID_CHUNK]
+            placeholders = ",".join("?" for _ in chunk)
+            cursor.execute(
+                f"""
+                SELECT ic.image_id, m.name
+                FROM image_classes_display ic
+                JOIN mappings m ON ic.class_id = m.class_id
+                WHERE ic.image_id IN ({placeholders})
+                ORDER BY m.name
+                """,
+                chunk,
+            )
+            for image_id, name in cursor.fetchall():
+                tags.setdefault(image_id, []).append(name)
+
+        images_dict: Dict[str, dict] = {}
+        _group_image_rows_with_tags(
+            [(*row, name) for row in rows for name in tags.get(row[0]) or [None]],
+            images_dict,
+        )
+        return _finalize_grouped_images(images_dict)
+
+    except sqlite3.Error as e:
+        logger.error(f"Error getting images page: {e}")
+        raise
+    finally:
+        conn.close()
+
+
 def db_get_untagged_images() -> List[UntaggedImageRecord]:
     """
     Find all images that need AI tagging.
@@ -286,13 +390,15 @@ def db_get_untagged_images() -> List[UntaggedImageRecord]:
     cursor = conn.cursor()
 
     try:
+        # `isTagged = 0` as spelled in ix_images_untagged's WHERE clause: SQLite only
+        # uses a partial index when the query repeats its condition
         cursor.execute(
             """
             SELECT i.id, i.path, i.folder_id, i.thumbnailPath, i.metadata
             FROM images i
             JOIN folders f ON i.folder_id = f.folder_id
             WHERE f.AI_Tagging = TRUE
-            AND i.isTagged = FALSE
+            AND i.isTagged = 0
             """
         )
 
@@ -333,13 +439,15 @@ def db_get_unembedded_images() -> List[UntaggedImageRecord]:
     cursor = conn.cursor()
 
     try:
+        # `isEmbedded = 0` as spelled in ix_images_unembedded's WHERE clause: SQLite only
+        # uses a partial index when the query repeats its condition
         cursor.execute(
             """
             SELECT i.id, i.path, i.folder_id, i.thumbnailPath, i.metadata
             FROM images i
             JOIN folders f ON i.folder_id = f.folder_id
             WHERE f.AI_Tagging = TRUE
-            AND i.isEmbedded = FALSE
+            AND i.isEmbedded = 0
             """
         )
 
@@ -366,6 +474,46 @@ def db_get_unembedded_images() -> List[UntaggedImageRecord]:
         conn.close()
 
 
+def db_get_pending_images() -> List[PendingImageRecord]:
+    """
+    Find every image in an AI-tagging folder that still needs tagging,
+    embedding, or both, so one pass can read each file once for both.
+
+    Returns:
+        One record per image, with its isTagged and isEmbedded flags
+    """
+    conn = _connect()
+    try:
+        # A UNION of the two partial-index lookups rather than one OR, which
+        # SQLite would answer with a scan of images
+        rows = conn.execute(
+            """
+            SELECT i.id, i.path, i.isTagged, i.isEmbedded
+            FROM images i
+            JOIN folders f ON i.folder_id = f.folder_id
+            WHERE f.AI_Tagging = TRUE
+            AND i.isTagged = 0
+            UNION
+            SELECT i.id, i.path, i.isTagged, i.isEmbedded
+            FROM images i
+            JOIN folders f ON i.folder_id = f.folder_id
+            WHERE f.AI_Tagging = TRUE
+            AND i.isEmbedded = 0
+            """
+        ).fetchall()
+        return [
+            {
+                "id": image_id,
+                "path": path,
+                "isTagged": bool(is_tagged),
+                "isEmbedded": bool(is_embedded),
+            }
+            for image_id, path, is_tagged, is_embedded in rows
+        ]
+    finally:
+        conn.close()
+
+
 def db_update_image_tagged_status(image_id: ImageId, is_tagged: bool = True) -> bool:
     """
     Update the isTagged status for a specific image.
@@ -395,12 +543,17 @@ def db_update_image_tagged_status(image_id: ImageId, is_tagged: bool = True) ->
         conn.close()
 
 
-def db_insert_image_classes_batch(image_class_pairs: List[ImageClassPair]) -> bool:
+def db_insert_image_classes_batch(
+    image_class_pairs: List[ImageClassPair], cursor: Optional[sqlite3.Cursor] = None
+) -> bool:
     """
     Insert multiple image-class pairs into the image_classes table.
 
     Args:
         image_class_pairs: List of tuples containing (image_id, class_id) pairs
+        cursor: Optional existing database cursor, to insert as part of the
+            caller's transaction; errors are then raised, not returned. If
+            None, creates a new connection.
 
     Returns:
         True if insertion was successful, False otherwise
@@ -408,8 +561,10 @@ def db_insert_image_classes_batch(image_class_pairs: List[ImageClassPair]) -> bo
     if not image_class_pairs:
         return True
 
-    conn = _connect()
-    cursor = conn.cursor()
+    own_connection = cursor is None
+    if own_connection:
+        conn = _connect()
+        cursor = conn.cursor()
 
     try:
         cursor.executemany(
@@ -419,14 +574,18 @@ def db_insert_image_classes_batch(image_class_pairs: List[ImageClassPair]) -> bo
             """,
             image_class_pairs,
         )
-        conn.commit()
+        if own_connection:
+            conn.commit()
         return True
     except sqlite3.Error as e:
+        if not own_connection:
+            raise
         logger.error(f"Error inserting image classes: {e}")
         conn.rollback()
         return False
     finally:
-        conn.close()
+        if own_connection:
+            conn.close()
 
 
 def db_get_images_by_folder_ids(
@@ -492,6 +651,10 @@ def db_delete_images_by_ids(image_ids: List[ImageId]) -> bool:
         )
         conn.commit()
         logger.info(f"Deleted {cursor.rowcount} obsolete image(s) from database")
+
+        from app.database.image_embeddings import db_evict_cached_embeddings
+
+        db_evict_cached_embeddings(image_ids)
         return True
     except sqlite3.Error as e:
         logger.error(f"Error deleting images: {e}")
@@ -502,7 +665,7 @@ def db_delete_images_by_ids(image_ids: List[ImageId]) -> bool:
 
 
 def db_toggle_image_favourite_status(image_id: str) -> bool:
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
     try:
         cursor.execute("SELECT id FROM images WHERE id = ?", (image_id,))
@@ -639,8 +802,10 @@ def db_search_images_by_tag(tag_name: str) -> List[dict]:
             LEFT JOIN mappings m ON ic.class_id = m.class_id
             WHERE i.id IN (
                 SELECT ic2.image_id FROM image_classes ic2
-                JOIN mappings m2 ON ic2.class_id = m2.class_id
-                WHERE LOWER(m2.name) = LOWER(?)
+                WHERE ic2.class_id IN (
+                    SELECT m2.class_id FROM mappings m2
+                    WHERE LOWER(m2.name) = LOWER(?)
+                )
             )
             ORDER BY i.path, m.name
         """
@@ -723,15 +888,68 @@ def db_get_images_by_ids(image_ids: List[str]) -> List[dict]:
         conn.close()
 
 
-def db_mark_images_embedded(image_ids: List[str]) -> bool:
-    """Mark a batch of images as embedded in the database."""
+def db_mark_images_tagged(
+    image_ids: List[ImageId], cursor: Optional[sqlite3.Cursor] = None
+) -> bool:
+    """
+    Mark a batch of images as tagged in one transaction.
+
+    Args:
+        image_ids: The images to mark
+        cursor: Optional existing database cursor, to update as part of the
+            caller's transaction; errors are then raised, not returned. If
+            None, creates a new connection.
+    """
+    if not image_ids:
+        return True
+
+    own_connection = cursor is None
+    if own_connection:
+        conn = _connect()
+        cursor = conn.cursor()
+
+    try:
+        for i in range(0, len(image_ids), SQLITE_ID_CHUNK):
+            chunk = image_ids[i : i + SQLITE_ID_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(
+                f"UPDATE images SET isTagged = 1 WHERE id IN ({placeholders})", chunk
+            )
+        if own_connection:
+            conn.commit()
+        return True
+    except sqlite3.Error as e:
+        if not own_connection:
+            raise
+        logger.error(f"Error marking images as tagged: {e}")
+        conn.rollback()
+        return False
+    finally:
+        if own_connection:
+            conn.close()
+
+
+def db_mark_images_embedded(
+    image_ids: List[str], cursor: Optional[sqlite3.Cursor] = None
+) -> bool:
+    """
+    Mark a batch of images as embedded in the database.
+
+    Args:
+        image_ids: The images to mark
+        cursor: Optional existing database cursor, to update as part of the
+            caller's transaction; errors are then raised, not returned. If
+            None, creates a new connection.
+    """
     if not image_ids:
         return True
 
+    own_connection = cursor is None
     conn = None
     try:
-        conn = _connect()
-        cursor = conn.cursor()
+        if own_connection:
+            conn = _connect()
+            cursor = conn.cursor()
 
         # Chunk by 500 to stay under SQLite's 999-variable limit per statement,
         # matching db_get_images_by_ids's convention.
@@ -742,9 +960,12 @@ def db_mark_images_embedded(image_ids: List[str]) -> bool:
             query = f"UPDATE images SET isEmbedded = 1 WHERE id IN ({placeholders})"
             cursor.execute(query, chunk)
 
-        conn.commit()
+        if own_connection:
+            conn.commit()
         return True
     except sqlite3.Error as e:
+        if not own_connection:
+            raise
         logger.error(f"Error marking images as embedded: {e}")
         if conn:
             conn.rollback()
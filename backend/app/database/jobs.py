@@ -0,0 +1,446 @@
+# This DB module stores the background job queue: indexing and tagging runs
+# split into stages, each checkpointed as it finishes so a restart resumes
+# at the stage it interrupted rather than from the top.
+import json
+import sqlite3
+import time
+from typing import Any, Dict, List, Mapping, Optional, Sequence, TypedDict
+
+from app.config.settings import DATABASE_PATH
+from app.database.connection import db_connect
+from app.logging.setup_logging import get_logger
+
+logger = get_logger(__name__)
+
+JobId = int
+
+JOB_STATUSES = ("queued", "running", "completed", "failed")
+STAGE_STATUSES = ("pending", "running", "completed", "failed")
+
+
+class JobStage(TypedDict):
+    """A stage claimed for running, with the job it belongs to."""
+
+    job_id: JobId
+    position: int
+    stage: str
+    kind: str
+    params: Dict[str, Any]
+
+
+def _connect() -> sqlite3.Connection:
+    return db_connect(DATABASE_PATH, foreign_keys=True)
+
+
+def db_create_jobs_tables() -> None:
+    """Create the jobs and job_stages tables."""
+    conn = _connect()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                params TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued'
+                    CHECK (status IN {JOB_STATUSES}),
+                error TEXT,
+                created_at REAL NOT NULL,
+                finished_at REAL
+            )
+            """
+        )
+        # started_at and finished_at are epoch seconds, so throughput is a
+        # plain subtraction. position orders the stages within a job.
+        cursor.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS job_stages (
+                job_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                stage TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending'
+                    CHECK (status IN {STAGE_STATUSES}),
+                items INTEGER,
+                error TEXT,
+                started_at REAL,
+                finished_at REAL,
+                PRIMARY KEY (job_id, position),
+                FOREIGN KEY (job_id) REFERENCES jobs(job_id) ON DELETE CASCADE
+            )
+            """
+        )
+        # The runner looks for queued work after every stage
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS ix_jobs_unfinished "
+            "ON jobs(job_id) WHERE status IN ('queued', 'running')"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS ix_job_stages_status "
+            "ON job_stages(status, stage)"
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def db_enqueue_job(kind: str, params: Dict[str, Any], stages: Sequence[str]) -> JobId:
+    """
+    Queue a job that runs the given stages in order.
+
+    Args:
+        kind: What the job is, e.g. 'sync_folder'
+        params: JSON-serialisable arguments the stages read
+        stages: Stage names, in the order they must run
+
+    Returns:
+        The new job's id
+    """
+    if not stages:
+        raise ValueError("A job needs at least one stage")
+
+    conn = _connect()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO jobs (kind, params, created_at) VALUES (?, ?, ?)",
+            (kind, json.dumps(params), time.time()),
+        )
+        job_id = cursor.lastrowid
+        cursor.executemany(
+            "INSERT INTO job_stages (job_id, position, stage) VALUES (?, ?, ?)",
+            [(job_id, position, stage) for position, stage in enumerate(stages)],
+        )
+        conn.commit()
+        return job_id
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def db_claim_next_stage(limits: Mapping[str, int]) -> Optional[JobStage]:
+    """
+    Mark the next runnable stage as running and return it.
+
+    A stage is runnable once every earlier stage of its job has completed,
+    and while fewer than limits[stage] (default 1) copies of it are running
+    across all jobs. Older jobs go first, but a job whose next stage is at
+    its limit does not hold back a later job whose next stage is not.
+
+    Returns:
+        The claimed stage, or None if nothing can start now
+    """
+    conn = _connect()
+    try:
+        # IMMEDIATE takes the write lock before reading, so two runners can
+        # never claim the same stage
+        conn.execute("BEGIN IMMEDIATE")
+        running = dict(
+            conn.execute(
+                "SELECT stage, COUNT(*) FROM job_stages "
+                "WHERE status = 'running' GROUP BY stage"
+            ).fetchall()
+        )
+        candidates = conn.execute(
+            """
+            SELECT s.job_id, s.position, s.stage, j.kind, j.params
+              FROM jobs j
+              JOIN job_stages s ON s.job_id = j.job_id
+             WHERE j.status IN ('queued', 'running')
+               AND s.status = 'pending'
+               AND s.position = (
+                       SELECT MIN(position) FROM job_stages
+                        WHERE job_id = j.job_id AND status != 'completed'
+                   )
+             ORDER BY j.job_id
+            """
+        ).fetchall()
+        for job_id, position, stage, kind, params in candidates:
+            if running.get(stage, 0) >= limits.get(stage, 1):
+                continue
+            conn.execute(
+                "UPDATE job_stages SET status = 'running', started_at = ? "
+                "WHERE job_id = ? AND position = ?",
+                (time.time(), job_id, position),
+            )
+            conn.execute(
+                "UPDATE jobs SET status = 'running' WHERE job_id = ?", (job_id,)
+            )
+            conn.commit()
+            return JobStage(
+                job_id=job_id,
+                position=position,
+                stage=stage,
+                kind=kind,
+                params=json.loads(params),
+            )
+        conn.rollback()
+        return None
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def db_complete_stage(job_id: JobId, position: int, items: Optional[int]) -> None:
+    """Checkpoint a finished stage, and its job if that was the last stage."""
+    conn = _connect()
+    try:
+        now = time.time()
+        conn.execute(
+            "UPDATE job_stages SET status = 'completed', items = ?, "
+            "finished_at = ?, error = NULL WHERE job_id = ? AND position = ?",
+            (items, now, job_id, position),
+        )
+        conn.execute(
+            """
+            UPDATE jobs SET status = 'completed', finished_at = ?
+             WHERE job_id = ?
+               AND NOT EXISTS (
+                       SELECT 1 FROM job_stages
+                        WHERE job_id = ? AND status != 'completed'
+                   )
+            """,
+            (now, job_id, job_id),
+        )
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def db_fail_stage(job_id: JobId, position: int, error: str) -> None:
+    """Record a failed stage. Its job fails with it; later stages never run."""
+    conn = _connect()
+    try:
+        now = time.time()
+        conn.execute(
+            "UPDATE job_stages SET status = 'failed', error = ?, finished_at = ? "
+            "WHERE job_id = ? AND position = ?",
+            (error, now, job_id, position),
+        )
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? "
+            "WHERE job_id = ?",
+            (error, now, job_id),
+        )
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def db_requeue_stage(job_id: JobId, position: int) -> bool:
+    """
+    Put one running stage back in the queue, for a runner that could not
+    record how it ended. Its job stays unfinished and runs it again.
+
+    Returns:
+        True if the stage was running and is pending again
+    """
+    conn = _connect()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE job_stages SET status = 'pending', started_at = NULL "
+            "WHERE job_id = ? AND position = ? AND status = 'running'",
+            (job_id, position),
+        )
+        conn.commit()
+        return cursor.rowcount == 1
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def db_requeue_interrupted_stages() -> int:
+    """
+    Put stages left 'running' by a previous session back in the queue.
+
+    Call only at startup, before the runner starts: nothing can be running
+    yet, so a running stage was cut off when the backend stopped. Its
+    completed predecessors keep their checkpoints. Every stage only works
+    through what is still left to do, so running it again is safe.
+
+    Returns the number of stages requeued.
+    """
+    conn = _connect()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE job_stages SET status = 'pending', started_at = NULL "
+            "WHERE status = 'running'"
+        )
+        conn.commit()
+        return cursor.rowcount
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def db_count_unfinished_jobs() -> int:
+    conn = _connect()
+    try:
+        return conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def db_get_job(job_id: JobId) -> Optional[Dict[str, Any]]:
+    """Get a job with its stages, in order."""
+    jobs = _get_jobs("WHERE job_id = ?", (job_id,))
+    return jobs[0] if jobs else None
+
+
+def db_get_recent_jobs(limit: int) -> List[Dict[str, Any]]:
+    """Get every unfinished job and the most recent finished ones, newest first."""
+    return _get_jobs(
+        """
+        WHERE status IN ('queued', 'running')
+           OR job_id IN (
+                  SELECT job_id FROM jobs
+                   WHERE status IN ('completed', 'failed')
+                   ORDER BY job_id DESC LIMIT ?
+              )
+        """,
+        (limit,),
+    )
+
+
+def _get_jobs(where: str, params: Sequence[Any]) -> List[Dict[str, Any]]:
+    conn = _connect()
+    try:
+        conn.row_factory = sqlite3.Row
+        jobs = [
+            {**dict(row), "params": json.loads(row["params"]), "stages": []}
+            for row in conn.execute(
+                f"SELECT * FROM jobs {where} ORDER BY job_id DESC", params
+            )
+        ]
+        by_id = {job["job_id"]: job for job in jobs}
+        if by_id:
+            placeholders = ",".join("?" * len(by_id))
+            for row in conn.execute(
+                f"SELECT * FROM job_stages WHERE job_id IN ({placeholders}) "
+                "ORDER BY job_id, position",
+                list(by_id),
+            ):
+                stage = dict(row)
+                by_id[stage.pop("job_id")]["stages"].append(stage)
+        return jobs
+    finally:
+        conn.close()
+
+
+def db_get_stage_throughput() -> List[Dict[str, Any]]:
+    """
+    Per-stage totals over the jobs still on record.
+
+    items is the sum over completed runs that counted their work; seconds
+    is the time those same runs took, so items / seconds is the stage's
+    throughput. Stages that do not count (e.g. rebuilding an index) report
+    runs and seconds only.
+    """
+    conn = _connect()
+    try:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            """
+            SELECT stage,
+                   SUM(status = 'pending') AS pending,
+                   SUM(status = 'running') AS running,
+                   SUM(status = 'completed') AS completed,
+                   SUM(status = 'failed') AS failed,
+                   SUM(CASE WHEN status = 'completed' THEN items END) AS items,
+                   SUM(CASE WHEN status = 'completed'
+                            THEN finished_at - started_at END) AS seconds,
+                   SUM(CASE WHEN status = 'completed' AND items IS NOT NULL
+                            THEN finished_at - started_at END) AS counted_seconds,
+                   MAX(finished_at) AS last_finished_at
+              FROM job_stages
+             GROUP BY stage
+             ORDER BY stage
+            """
+        ).fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
+
+
+def db_prune_finished_jobs(keep: int) -> int:
+    """
+    Delete finished jobs beyond the most recent `keep`.
+
+    Throughput is reported over what remains, so this also bounds how far
+    back the status endpoint looks. Returns the number of jobs deleted.
+    """
+    conn = _connect()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            DELETE FROM jobs
+             WHERE status IN ('completed', 'failed')
+               AND job_id NOT IN (
+                       SELECT job_id FROM jobs
+                        WHERE status IN ('completed', 'failed')
+                        ORDER BY job_id DESC LIMIT ?
+                   )
+            """,
+            (keep,),
+        )
+        conn.commit()
+        return cursor.rowcount
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def db_count_library_items() -> Dict[str, int]:
+    """
+    Running totals the stages measure their work by.
+
+    Each count only grows as its stage does work, so a stage's item count
+    is the difference across its run. Concurrent stages and deletions can
+    skew a single run; the totals are for throughput, not bookkeeping.
+    """
+    conn = _connect()
+    try:
+        # isTagged = 0 and isEmbedded = 0 exactly as the partial indexes
+        # declare them, so these count from the index
+        row = conn.execute(
+            """
+            SELECT (SELECT COUNT(*) FROM images),
+                   (SELECT COUNT(*) FROM images WHERE isTagged = 0),
+                   (SELECT COUNT(*) FROM images WHERE isEmbedded = 0),
+                   (SELECT COUNT(*) FROM videos),
+                   (SELECT COUNT(*) FROM videos WHERE isTagged = 0),
+                   (SELECT COUNT(*) FROM video_frames WHERE isEmbedded = 1)
+            """
+        ).fetchone()
+        images, untagged, unembedded, videos, untagged_videos, frames = row
+        return {
+            "images": images,
+            "tagged_images": images - untagged,
+            "embedded_images": images - unembedded,
+            "videos": videos,
+            "tagged_videos": videos - untagged_videos,
+            "embedded_frames": frames,
+        }
+    finally:
+        conn.close()
@@ -3,6 +3,7 @@ import sqlite3
 import json
 from typing import Optional, Dict, Any
 from app.config.settings import DATABASE_PATH
+from app.database.connection import db_connect
 from app.logging.setup_logging import get_logger
 
 logger = get_logger(__name__)
@@ -12,7 +13,7 @@ def db_create_metadata_table() -> None:
     """Create the metadata table if it doesn't exist."""
     conn = None
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_connect(DATABASE_PATH)
         cursor = conn.cursor()
         cursor.execute(
             """
@@ -40,7 +41,7 @@ def db_get_metadata() -> Optional[Dict[str, Any]]:
     Returns:
         Dictionary containing metadata, or None if not found
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
 
     try:
@@ -86,7 +87,7 @@ def db_update_metadata(
     # 2. Database transaction / owned connection setup.
     try:
         if own_connection:
-            conn = sqlite3.connect(DATABASE_PATH)
+            conn = db_connect(DATABASE_PATH)
             cursor = conn.cursor()
 
         # Delete all existing rows and insert new one
@@ -0,0 +1,102 @@
+"""
+Versioned schema changes, tracked in the database's PRAGMA user_version.
+
+The db_create_* functions create missing tables in their current shape.
+Changes to databases that already exist (indexes, backfills) go here as
+numbered steps instead. db_migrate_schema runs once at startup, after the
+tables exist, and applies the steps newer than the stored version. Each
+step and its version bump commit together, so an interrupted upgrade
+resumes at the step that failed.
+"""
+
+import sqlite3
+from typing import List, NamedTuple, Tuple
+
+from app.config.settings import DATABASE_PATH
+from app.database.connection import db_connect
+from app.logging.setup_logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    statements: Tuple[str, ...]
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        1,
+        "indexes for the hot library queries",
+        (
+            # Tagging and embedding passes look for the few images still
+            # to do; partial indexes hold only those rows
+            "CREATE INDEX IF NOT EXISTS ix_images_untagged "
+            "ON images(folder_id) WHERE isTagged = 0",
+            "CREATE INDEX IF NOT EXISTS ix_images_unembedded "
+            "ON images(folder_id) WHERE isEmbedded = 0",
+            # Covers db_get_images_by_folder_ids, and the folder delete
+            # cascade no longer scans images
+            "CREATE INDEX IF NOT EXISTS ix_images_folder "
+            "ON images(folder_id, id, path, thumbnailPath)",
+            # Cluster membership: faces of a cluster, images of a cluster,
+            # and unassigned faces (cluster_id IS NULL)
+            "CREATE INDEX IF NOT EXISTS ix_faces_cluster "
+            "ON faces(cluster_id, image_id)",
+            # Tag search and per-label ranking read image_classes by class
+            "CREATE INDEX IF NOT EXISTS ix_image_classes_class "
+            "ON image_classes(class_id, score, image_id)",
+        ),
+    ),
+    Migration(
+        2,
+        "keyset index for paging the gallery",
+        (
+            "CREATE INDEX IF NOT EXISTS ix_images_captured_id "
+            "ON images(captured_at, id)",
+        ),
+    ),
+]
+
+
+def db_get_schema_version() -> int:
+    conn = db_connect(DATABASE_PATH)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def db_migrate_schema() -> int:
+    """
+    Apply the migrations newer than the database's schema version.
+
+    Returns:
+        The schema version afterwards
+    """
+    conn = db_connect(DATABASE_PATH)
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for migration in MIGRATIONS:
+            if migration.version <= version:
+                continue
+            try:
+                # DDL does not open a transaction implicitly
+                conn.execute("BEGIN")
+                for statement in migration.statements:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+                conn.commit()
+            except sqlite3.Error as e:
+                conn.rollback()
+                logger.error(
+                    f"Schema migration {migration.version} "
+                    f"({migration.description}) failed: {e}"
+                )
+                raise
+            version = migration.version
+            logger.info(f"Applied schema migration {version}: {migration.description}")
+        return version
+    finally:
+        conn.close()
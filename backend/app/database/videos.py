@@ -9,6 +9,7 @@ from datetime import datetime
 from app.config.settings import (
     DATABASE_PATH,
 )
+from app.database.connection import db_connect
 from app.logging.setup_logging import get_logger
 
 # Initialize logger
@@ -34,10 +35,8 @@ class VideoRecord(TypedDict, total=False):
 
 
 def _connect() -> sqlite3.Connection:
-    conn = sqlite3.connect(DATABASE_PATH)
     # Ensure ON DELETE CASCADE and other FKs are enforced
-    conn.execute("PRAGMA foreign_keys = ON")
-    return conn
+    return db_connect(DATABASE_PATH, foreign_keys=True)
 
 
 def db_create_videos_table() -> None:
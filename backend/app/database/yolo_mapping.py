@@ -1,5 +1,5 @@
-import sqlite3
 from app.config.settings import DATABASE_PATH
+from app.database.connection import db_connect
 from app.utils.YOLO import class_names
 
 
@@ -10,7 +10,7 @@ def db_create_YOLO_classes_table():
     print(os.getcwd())
     conn = None
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_connect(DATABASE_PATH)
         cursor = conn.cursor()
         cursor.execute(
             """
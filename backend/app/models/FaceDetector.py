@@ -1,10 +1,12 @@
 # app/detectors/FaceDetector.py
 
 import cv2
+import numpy as np
 from app.models.FaceNet import FaceNet
 from app.utils.FaceNet import FaceNet_util_preprocess_image, FaceNet_util_get_model_path
 from app.utils.YOLO import YOLO_util_get_model_path
 from app.models.YOLO import YOLO
+from app.models.session_pool import acquire_model, release_model
 from app.database.faces import db_insert_face_embeddings_by_image_id
 from app.logging.setup_logging import get_logger
 from app.config.settings import (
@@ -20,12 +22,14 @@ logger = get_logger(__name__)
 
 class FaceDetector:
     def __init__(self):
-        self.yolo_detector = YOLO(
+        # Warm sessions are shared with earlier and later passes
+        self.yolo_detector = acquire_model(
+            YOLO,
             YOLO_util_get_model_path("face"),
             conf_threshold=PICTO_CLUSTERING_CONF_THRESHOLD,
             iou_threshold=0.45,
         )
-        self.facenet = FaceNet(FaceNet_util_get_model_path())
+        self.facenet = acquire_model(FaceNet, FaceNet_util_get_model_path())
         self._initialized = True
         logger.info("FaceDetector initialized with YOLO and FaceNet models.")
 
@@ -36,10 +40,40 @@ class FaceDetector:
             return None
 
         boxes, scores, class_ids = self.yolo_detector(img)
+        return self._process_faces(image_id, img, boxes, scores, class_ids, forSearch)
+
+    def detect_faces_batch(self, images, store: bool = True):
+        """
+        Detect faces in several already-decoded images with one batched
+        YOLO pass.
+
+        Args:
+            images: List of (image_id, BGR image array) pairs
+            store: Insert the faces into the database. A caller that batches
+                its own writes passes False and reads the result's
+                embeddings, confidences and bboxes instead.
+
+        Returns:
+            One detect_faces-shaped result dict per input, in order.
+        """
+        if not images:
+            return []
+
+        detections = self.yolo_detector.detect_objects_batch([img for _, img in images])
+        return [
+            self._process_faces(
+                image_id, img, boxes, scores, class_ids, forSearch=not store
+            )
+            for (image_id, img), (boxes, scores, class_ids) in zip(images, detections)
+        ]
+
+    def _process_faces(
+        self, image_id, img, boxes, scores, class_ids, forSearch: bool = False
+    ):
         logger.debug(f"Face detection boxes: {boxes}")
         logger.info(f"Detected {len(boxes)} faces in image {image_id}.")
 
-        processed_faces, embeddings, bboxes, confidences = [], [], [], []
+        processed_faces, bboxes, confidences = [], [], []
         faces_skipped = 0
 
         for box, score in zip(boxes, scores):
@@ -70,8 +104,12 @@ class FaceDetector:
             processed_face = FaceNet_util_preprocess_image(face_img)
             processed_faces.append(processed_face)
 
-            embedding = self.facenet.get_embedding(processed_face)
-            embeddings.append(embedding)
+        # Every face that passed the gate goes through FaceNet in one run
+        embeddings = []
+        if processed_faces:
+            embeddings = list(
+                self.facenet.get_embeddings(np.concatenate(processed_faces))
+            )
 
         if not forSearch and embeddings:
             db_insert_face_embeddings_by_image_id(
@@ -81,18 +119,21 @@ class FaceDetector:
         return {
             "ids": f"{class_ids}",
             "processed_faces": processed_faces,
+            "embeddings": embeddings,
+            "confidences": confidences,
+            "bboxes": bboxes,
             "num_faces": len(embeddings),
             "faces_skipped": faces_skipped,
         }
 
     def close(self):
         """
-        Close the resources held by the FaceDetector.
+        Return the FaceDetector's models to the session pool.
         """
         if self.yolo_detector is not None:
-            self.yolo_detector.close()
+            release_model(self.yolo_detector)
             self.yolo_detector = None
 
         if self.facenet is not None:
-            self.facenet.close()
+            release_model(self.facenet)
             self.facenet = None
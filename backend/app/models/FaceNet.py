@@ -2,14 +2,21 @@ from __future__ import annotations
 
 import os
 import threading
+import numpy as np
 import onnxruntime
 from app.models.model_registry import MODEL_REGISTRY, get_model_key_from_path
 from app.models.session_registry import (
     mark_model_session_active,
     mark_model_session_inactive,
 )
-from app.utils.FaceNet import FaceNet_util_normalize_embedding
-from app.utils.ONNX import ONNX_util_get_execution_providers
+from app.utils.FaceNet import (
+    FaceNet_util_normalize_embedding,
+    FaceNet_util_normalize_embeddings,
+)
+from app.utils.ONNX import (
+    ONNX_util_get_execution_providers,
+    ONNX_util_get_session_options,
+)
 from app.logging.setup_logging import get_logger
 
 logger = get_logger(__name__)
@@ -23,6 +30,7 @@ class FaceNet:
         self._session: onnxruntime.InferenceSession | None = None
         self.input_tensor_name: str | None = None
         self.output_tensor_name: str | None = None
+        self.supports_batching = False
         self._lock = threading.Lock()
 
     def get_session(self) -> tuple[onnxruntime.InferenceSession, str, str]:
@@ -54,7 +62,9 @@ class FaceNet:
                     )
 
                 self._session = onnxruntime.InferenceSession(
-                    self.model_path, providers=ONNX_util_get_execution_providers()
+                    self.model_path,
+                    sess_options=ONNX_util_get_session_options(),
+                    providers=ONNX_util_get_execution_providers(),
                 )
                 if self._model_key is not None and not self._session_registered:
                     try:
@@ -63,8 +73,12 @@ class FaceNet:
                         self._session = None
                         raise
                     self._session_registered = True
-                self.input_tensor_name = self._session.get_inputs()[0].name
+                model_input = self._session.get_inputs()[0]
+                self.input_tensor_name = model_input.name
                 self.output_tensor_name = self._session.get_outputs()[0].name
+                # A symbolic or -1 batch dimension means the export accepts N > 1
+                batch_dim = model_input.shape[0] if model_input.shape else 1
+                self.supports_batching = not isinstance(batch_dim, int) or batch_dim < 1
 
             session = self._session
             input_name = self.input_tensor_name
@@ -86,6 +100,38 @@ class FaceNet:
         embedding = result[0]
         return FaceNet_util_normalize_embedding(embedding)
 
+    def get_embeddings(self, preprocessed_images):
+        """
+        Embed a stack of preprocessed face crops.
+
+        Args:
+            preprocessed_images: [N, 3, 160, 160] float32 array, e.g. the
+                concatenated outputs of FaceNet_util_preprocess_image
+
+        Returns:
+            [N, D] array of L2-normalized embeddings. Exports with a fixed
+            batch axis of 1 are run one face at a time.
+        """
+        if len(preprocessed_images) == 0:
+            return np.empty((0, 0), dtype=np.float32)
+        session, input_tensor_name, output_tensor_name = self.get_session()
+
+        if self.supports_batching:
+            result = session.run(
+                [output_tensor_name], {input_tensor_name: preprocessed_images}
+            )[0]
+        else:
+            result = np.concatenate(
+                [
+                    session.run(
+                        [output_tensor_name],
+                        {input_tensor_name: preprocessed_images[i : i + 1]},
+                    )[0]
+                    for i in range(len(preprocessed_images))
+                ]
+            )
+        return FaceNet_util_normalize_embeddings(result)
+
     def close(self):
         with self._lock:
             if self._session is not None:
@@ -9,7 +9,10 @@ from app.models.session_registry import (
     mark_model_session_active,
     mark_model_session_inactive,
 )
-from app.utils.ONNX import ONNX_util_get_execution_providers
+from app.utils.ONNX import (
+    ONNX_util_get_execution_providers,
+    ONNX_util_get_session_options,
+)
 from app.logging.setup_logging import get_logger
 
 logger = get_logger(__name__)
@@ -56,6 +59,7 @@ class ONNXSessionBase:
         # fail at inference on Apple Silicon; run these sessions without it.
         session = onnxruntime.InferenceSession(
             self.model_path,
+            sess_options=ONNX_util_get_session_options(),
             providers=ONNX_util_get_execution_providers(
                 exclude=("CoreMLExecutionProvider",)
             ),
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import cv2
 from app.models.YOLO import YOLO
+from app.models.session_pool import acquire_model, release_model
 from app.utils.YOLO import YOLO_util_get_model_path
 from app.logging.setup_logging import get_logger
 
@@ -10,8 +11,11 @@ logger = get_logger(__name__)
 
 class ObjectClassifier:
     def __init__(self):
-        self.yolo_classifier = YOLO(
-            YOLO_util_get_model_path("object"), conf_threshold=0.4, iou_threshold=0.5
+        self.yolo_classifier = acquire_model(
+            YOLO,
+            YOLO_util_get_model_path("object"),
+            conf_threshold=0.4,
+            iou_threshold=0.5,
         )
 
     def get_classes(self, img_path) -> list[int] | None:
@@ -26,10 +30,17 @@ class ObjectClassifier:
         class_ids = [int(class_id) for class_id in class_ids]
         return class_ids
 
+    def get_classes_batch(self, images) -> list[list[int]]:
+        """Class IDs for already-decoded BGR images, one list per image."""
+        detections = self.yolo_classifier.detect_objects_batch(images)
+        return [
+            [int(class_id) for class_id in class_ids] for _, _, class_ids in detections
+        ]
+
     def close(self):
         """
-        Close and cleanup the ObjectClassifier.
+        Return the ObjectClassifier's model to the session pool.
         """
         if self.yolo_classifier is not None:
-            self.yolo_classifier.close()
+            release_model(self.yolo_classifier)
             self.yolo_classifier = None
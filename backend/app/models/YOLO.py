@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import onnxruntime
 import time
+from typing import NamedTuple
 import cv2
 import numpy as np
 from app.models.model_registry import MODEL_REGISTRY, get_model_key_from_path
@@ -15,12 +16,44 @@ from app.utils.YOLO import (
     YOLO_util_multiclass_nms,
 )
 from app.utils.memory_monitor import log_memory_usage
-from app.utils.ONNX import ONNX_util_get_execution_providers
+from app.utils.ONNX import (
+    ONNX_util_get_execution_providers,
+    ONNX_util_get_session_options,
+)
 from app.logging.setup_logging import get_logger
 
 logger = get_logger(__name__)
 
 
+class Letterbox(NamedTuple):
+    """How one image was fitted into the model input, to undo on its boxes."""
+
+    scale: float
+    pad_x: int
+    pad_y: int
+    img_width: int
+    img_height: int
+
+
+class _BatchBuffers:
+    """
+    Preallocated model input (and, when bound, outputs) for one batch size.
+
+    Images are letterboxed straight into `inputs`. With a binding, the
+    session reads `inputs` and writes `outputs` in place, so a run
+    allocates no tensors on the Python side.
+    """
+
+    def __init__(self, inputs, binding=None, outputs=None):
+        self.inputs = inputs
+        self.binding = binding
+        self.outputs = outputs
+
+
+# Batch sizes whose buffers are kept; callers use one or two sizes
+_MAX_BATCH_BUFFERS = 4
+
+
 class YOLO:
     def __init__(self, path, conf_threshold=0.7, iou_threshold=0.5):
         self.model_path = path
@@ -32,6 +65,12 @@ class YOLO:
         import threading
 
         self._lock = threading.Lock()
+        # Guards the shared buffers from preprocessing until the outputs
+        # have been read
+        self._run_lock = threading.Lock()
+        self._batch_buffers = {}
+        # Set for sessions created here; stand-in sessions use session.run
+        self._use_io_binding = False
 
     def get_session(self):
         session = self._session
@@ -57,7 +96,9 @@ class YOLO:
                     )
 
                 self._session = onnxruntime.InferenceSession(
-                    self.model_path, providers=ONNX_util_get_execution_providers()
+                    self.model_path,
+                    sess_options=ONNX_util_get_session_options(),
+                    providers=ONNX_util_get_execution_providers(),
                 )
                 if self._model_key is not None and not self._session_registered:
                     try:
@@ -69,6 +110,8 @@ class YOLO:
                 # Initialize model info once session is created
                 self.get_input_details()
                 self.get_output_details()
+                self._batch_buffers = {}
+                self._use_io_binding = True
 
             return self._session
 
@@ -79,6 +122,8 @@ class YOLO:
         with self._lock:
             if self._session is not None:
                 self._session = None
+                self._batch_buffers = {}
+                self._use_io_binding = False
                 if self._model_key is not None and self._session_registered:
                     mark_model_session_inactive(self._model_key)
                     self._session_registered = False
@@ -93,55 +138,174 @@ class YOLO:
     @log_memory_usage
     def detect_objects(self, image):
         session = self.get_session()
-        input_tensor = self.prepare_input(image)
-        outputs = self.inference(input_tensor, session=session)
-        self.boxes, self.scores, self.class_ids = self.process_output(outputs)
+        with self._run_lock:
+            input_tensor = self.prepare_input(image)
+            outputs = self.inference(input_tensor, session=session)
+            self.boxes, self.scores, self.class_ids = self.process_output(outputs)
         return self.boxes, self.scores, self.class_ids
 
+    @log_memory_usage
+    def detect_objects_batch(self, images):
+        """
+        Detect objects in several images with as few session runs as possible.
+
+        Each image is letterboxed on its own into one [N, 3, H, W] input
+        buffer. Models exported with a fixed batch axis of 1 (the default
+        ONNX export) are run one image at a time instead.
+
+        Returns:
+            One (boxes, scores, class_ids) tuple per input image, in order.
+        """
+        if not images:
+            return []
+
+        session = self.get_session()
+        step = len(images) if self.supports_batching else 1
+        results = []
+        with self._run_lock:
+            for start in range(0, len(images), step):
+                chunk = images[start : start + step]
+                input_tensor = self._get_batch_buffers(len(chunk)).inputs
+                letterboxes = [
+                    self._letterbox(image, out=input_tensor[i])[1]
+                    for i, image in enumerate(chunk)
+                ]
+                predictions = self.inference(input_tensor, session=session)[0]
+                for offset, letterbox in enumerate(letterboxes):
+                    results.append(
+                        self._process_predictions(predictions[offset], letterbox)
+                    )
+        return results
+
     def inference(self, input_tensor, session=None):
         start = time.perf_counter()
         if session is None:
             session = self.get_session()
-        outputs = session.run(self.output_names, {self.input_names[0]: input_tensor})
+        buffers = self._batch_buffers.get(len(input_tensor))
+        if (
+            self._use_io_binding
+            and buffers is not None
+            and buffers.inputs is input_tensor
+        ):
+            # Inputs and outputs are already bound to the preallocated arrays
+            session.run_with_iobinding(buffers.binding)
+            outputs = buffers.outputs or buffers.binding.copy_outputs_to_cpu()
+        else:
+            outputs = session.run(
+                self.output_names, {self.input_names[0]: input_tensor}
+            )
         logger.debug("Inference completed in %.4fs", time.perf_counter() - start)
         return outputs
 
+    def _get_batch_buffers(self, batch_size):
+        """Input buffer for `batch_size` images, bound to the session if possible."""
+        buffers = self._batch_buffers.get(batch_size)
+        if buffers is not None:
+            return buffers
+
+        inputs = np.empty(
+            (batch_size, 3, self.input_height, self.input_width), dtype=np.float32
+        )
+        buffers = _BatchBuffers(inputs)
+        if self._use_io_binding:
+            self._bind(buffers)
+        if len(self._batch_buffers) >= _MAX_BATCH_BUFFERS:
+            self._batch_buffers.pop(next(iter(self._batch_buffers)))
+        self._batch_buffers[batch_size] = buffers
+        return buffers
+
+    def _bind(self, buffers):
+        """Bind the input buffer and preallocated outputs with IOBinding."""
+        batch_size = len(buffers.inputs)
+        binding = self._session.io_binding()
+        binding.bind_input(
+            self.input_names[0],
+            "cpu",
+            0,
+            np.float32,
+            list(buffers.inputs.shape),
+            buffers.inputs.ctypes.data,
+        )
+        outputs = []
+        for name, shape in zip(self.output_names, self.output_shapes):
+            shape = [batch_size, *shape[1:]]
+            if not all(isinstance(dim, int) and dim > 0 for dim in shape):
+                outputs = None
+                break
+            output = np.empty(shape, dtype=np.float32)
+            binding.bind_output(name, "cpu", 0, np.float32, shape, output.ctypes.data)
+            outputs.append(output)
+        if outputs is None:
+            # Dynamic output shape: ORT allocates, and results are copied out
+            for name in self.output_names:
+                binding.bind_output(name, "cpu")
+        buffers.binding = binding
+        buffers.outputs = outputs
+
     def get_input_details(self):
         model_inputs = self._session.get_inputs()
         self.input_names = [inp.name for inp in model_inputs]
         self.input_shape = model_inputs[0].shape
         self.input_height = self.input_shape[2]
         self.input_width = self.input_shape[3]
+        # A symbolic or -1 batch dimension means the export accepts N > 1
+        batch_dim = self.input_shape[0]
+        self.supports_batching = not isinstance(batch_dim, int) or batch_dim < 1
 
     def get_output_details(self):
         model_outputs = self._session.get_outputs()
         self.output_names = [out.name for out in model_outputs]
+        self.output_shapes = [out.shape for out in model_outputs]
 
-    def prepare_input(self, image):
-        self.img_height, self.img_width = image.shape[:2]
-        input_img = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    def _letterbox(self, image, out=None):
+        """
+        Letterbox one BGR image into a [3, H, W] float32 RGB model input.
+
+        Writes into `out` when given; only the resized image is allocated
+        on the way, as uint8.
+        """
+        img_height, img_width = image.shape[:2]
+        if out is None:
+            out = np.empty((3, self.input_height, self.input_width), dtype=np.float32)
         # Letterbox: resize preserving aspect ratio, pad the rest with gray
-        self.scale = min(
-            self.input_width / self.img_width, self.input_height / self.img_height
-        )
-        new_w = round(self.img_width * self.scale)
-        new_h = round(self.img_height * self.scale)
-        self.pad_x = (self.input_width - new_w) // 2
-        self.pad_y = (self.input_height - new_h) // 2
-        resized = cv2.resize(input_img, (new_w, new_h))
-        padded = np.full(
-            (self.input_height, self.input_width, 3), 114, dtype=input_img.dtype
-        )
-        padded[self.pad_y : self.pad_y + new_h, self.pad_x : self.pad_x + new_w] = (
-            resized
+        scale = min(self.input_width / img_width, self.input_height / img_height)
+        new_w = round(img_width * scale)
+        new_h = round(img_height * scale)
+        pad_x = (self.input_width - new_w) // 2
+        pad_y = (self.input_height - new_h) // 2
+        resized = cv2.resize(image, (new_w, new_h))
+
+        gray = np.float32(114 / 255.0)
+        out[:, :pad_y] = gray
+        out[:, pad_y + new_h :] = gray
+        out[:, pad_y : pad_y + new_h, :pad_x] = gray
+        out[:, pad_y : pad_y + new_h, pad_x + new_w :] = gray
+        # BGR -> RGB and HWC -> CHW as views, scaled to [0, 1] in one pass
+        np.divide(
+            resized[:, :, ::-1].transpose(2, 0, 1),
+            np.float32(255.0),
+            out=out[:, pad_y : pad_y + new_h, pad_x : pad_x + new_w],
+            dtype=np.float32,
         )
-        input_img = padded / 255.0
-        input_img = input_img.transpose(2, 0, 1)
-        input_tensor = input_img[np.newaxis, :, :, :].astype(np.float32)
+        return out, Letterbox(scale, pad_x, pad_y, img_width, img_height)
+
+    def prepare_input(self, image):
+        input_tensor = self._get_batch_buffers(1).inputs
+        _, letterbox = self._letterbox(image, out=input_tensor[0])
+        self.scale, self.pad_x, self.pad_y, self.img_width, self.img_height = letterbox
         return input_tensor
 
+    def _current_letterbox(self):
+        return Letterbox(
+            self.scale, self.pad_x, self.pad_y, self.img_width, self.img_height
+        )
+
     def process_output(self, output):
-        predictions = np.squeeze(output[0]).T
+        return self._process_predictions(output[0][0], self._current_letterbox())
+
+    def _process_predictions(self, predictions, letterbox):
+        """Filter, rescale and NMS one image's raw [4 + classes, anchors] output."""
+        predictions = np.asarray(predictions).T
         scores = np.max(predictions[:, 4:], axis=1)
         predictions = predictions[scores > self.conf_threshold]
         scores = scores[scores > self.conf_threshold]
@@ -150,25 +314,29 @@ class YOLO:
             return [], [], []
 
         class_ids = np.argmax(predictions[:, 4:], axis=1)
-        boxes = self.extract_boxes(predictions)
+        boxes = self.extract_boxes(predictions, letterbox)
         indices = YOLO_util_multiclass_nms(boxes, scores, class_ids, self.iou_threshold)
 
         return boxes[indices], scores[indices], class_ids[indices]
 
-    def extract_boxes(self, predictions):
+    def extract_boxes(self, predictions, letterbox=None):
+        if letterbox is None:
+            letterbox = self._current_letterbox()
         boxes = predictions[:, :4]
-        boxes = self.rescale_boxes(boxes)
+        boxes = self.rescale_boxes(boxes, letterbox)
         boxes = YOLO_util_xywh2xyxy(boxes)
-        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, self.img_width)
-        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, self.img_height)
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, letterbox.img_width)
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, letterbox.img_height)
         return boxes
 
-    def rescale_boxes(self, boxes):
+    def rescale_boxes(self, boxes, letterbox=None):
+        if letterbox is None:
+            letterbox = self._current_letterbox()
         # Undo the letterbox: remove padding offset, then unscale (boxes are xywh)
         boxes = boxes.astype(np.float32).copy()
-        boxes[:, 0] = (boxes[:, 0] - self.pad_x) / self.scale
-        boxes[:, 1] = (boxes[:, 1] - self.pad_y) / self.scale
-        boxes[:, 2:4] /= self.scale
+        boxes[:, 0] = (boxes[:, 0] - letterbox.pad_x) / letterbox.scale
+        boxes[:, 1] = (boxes[:, 1] - letterbox.pad_y) / letterbox.scale
+        boxes[:, 2:4] /= letterbox.scale
         return boxes
 
     def draw_detections(self, image, draw_scores=True, mask_alpha=0.4):
@@ -0,0 +1,219 @@
+"""
+Process-wide pool of loaded models, so passes reuse warm ONNX sessions.
+
+Model wrappers (YOLO, FaceNet, SigLIP2Vision, ...) are pooled by class,
+model path and constructor options. acquire_model hands out the pooled
+instance, creating it on first use, and release_model returns it. The
+wrapper's session stays open in between, so it also stays registered in
+session_registry.
+
+A model nobody holds is closed after MODEL_POOL_IDLE_SECONDS. Idle models
+are also closed, least recently used first, while the pool's model files
+add up to more than MODEL_POOL_MAX_MB. A model whose file was removed or
+replaced since it was loaded is reloaded on its next acquire. Uninstalling
+in this process must call evict_model_sessions first, or the idle
+sessions would keep the model counted as in use.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.logging.setup_logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class _PoolEntry:
+    def __init__(self, key: Tuple, model: Any, model_path: str):
+        self.key = key
+        self.model = model
+        self.model_path = model_path
+        self.file_stamp = _file_stamp(model_path)
+        self.bytes = self.file_stamp[1] if self.file_stamp else 0
+        self.users = 0
+        self.last_used = time.monotonic()
+
+
+_pool: Dict[Tuple, _PoolEntry] = {}
+_pool_lock = threading.RLock()
+_sweeper: Optional[threading.Thread] = None
+
+
+def _file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of the model file, or None if it is missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _pool_key(model_class: type, model_path: str, options: Dict) -> Tuple:
+    return (model_class, model_path, tuple(sorted(options.items())))
+
+
+def _close(entry: _PoolEntry, reason: str) -> None:
+    try:
+        entry.model.close()
+    except Exception as e:
+        logger.warning(f"Failed to close pooled model {entry.model_path}: {e}")
+    logger.info(
+        f"Closed pooled {getattr(entry.key[0], '__name__', 'model')} "
+        f"({os.path.basename(entry.model_path)}): {reason}"
+    )
+
+
+def _evict(predicate, reason: str) -> int:
+    """Close the idle entries `predicate` selects; returns how many."""
+    with _pool_lock:
+        idle = [e for e in _pool.values() if e.users == 0 and predicate(e)]
+        for entry in idle:
+            del _pool[entry.key]
+    for entry in idle:
+        _close(entry, reason)
+    return len(idle)
+
+
+def _enforce_limits() -> None:
+    from app.config.settings import MODEL_POOL_IDLE_SECONDS, MODEL_POOL_MAX_MB
+
+    now = time.monotonic()
+    _evict(lambda e: now - e.last_used >= MODEL_POOL_IDLE_SECONDS, "idle timeout")
+
+    budget = MODEL_POOL_MAX_MB * 1024 * 1024
+    with _pool_lock:
+        total = sum(entry.bytes for entry in _pool.values())
+        over = []
+        for entry in sorted(_pool.values(), key=lambda e: e.last_used):
+            if total <= budget:
+                break
+            if entry.users == 0:
+                over.append(entry)
+                total -= entry.bytes
+        over_keys = {id(entry) for entry in over}
+    if over_keys:
+        _evict(lambda e: id(e) in over_keys, "memory budget")
+
+
+def _sweep_loop() -> None:
+    from app.config.settings import MODEL_POOL_IDLE_SECONDS
+
+    interval = max(1, min(MODEL_POOL_IDLE_SECONDS, 60))
+    while True:
+        time.sleep(interval)
+        try:
+            _enforce_limits()
+        except Exception as e:
+            logger.error(f"Error sweeping the model pool: {e}")
+
+
+def _ensure_sweeper() -> None:
+    global _sweeper
+    if _sweeper is None or not _sweeper.is_alive():
+        _sweeper = threading.Thread(
+            target=_sweep_loop, name="model-pool-sweeper", daemon=True
+        )
+        _sweeper.start()
+
+
+def _reset_after_fork() -> None:
+    # A forked child inherits the entries but not the sweeper thread, and
+    # must not use or close sessions created by its parent
+    global _pool, _pool_lock, _sweeper
+    _pool = {}
+    _pool_lock = threading.RLock()
+    _sweeper = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def acquire_model(model_class: type, model_path: str, **options) -> Any:
+    """
+    The pooled `model_class(model_path, **options)`, created if needed.
+
+    Every acquire must be paired with release_model. Instances are shared:
+    the model classes serialize whatever a session cannot run concurrently.
+    """
+    key = _pool_key(model_class, model_path, options)
+    stale = None
+    with _pool_lock:
+        entry = _pool.get(key)
+        if (
+            entry is not None
+            and entry.users == 0
+            and _file_stamp(model_path) != entry.file_stamp
+        ):
+            # Uninstalled or replaced since it was loaded
+            stale = _pool.pop(key)
+            entry = None
+        if entry is None:
+            entry = _PoolEntry(key, model_class(model_path, **options), model_path)
+            _pool[key] = entry
+            pool_bytes = sum(e.bytes for e in _pool.values())
+            logger.info(
+                f"Pooled {getattr(model_class, '__name__', 'model')} "
+                f"({os.path.basename(model_path)}, {entry.bytes / 2**20:.0f} MB); "
+                f"pool holds {pool_bytes / 2**20:.0f} MB"
+            )
+        entry.users += 1
+        entry.last_used = time.monotonic()
+    if stale is not None:
+        _close(stale, "model file changed")
+    return entry.model
+
+
+def release_model(model: Any) -> None:
+    """Return a model from acquire_model; it stays warm until evicted."""
+    from app.config.settings import MODEL_POOL_IDLE_SECONDS
+
+    with _pool_lock:
+        entry = next((e for e in _pool.values() if e.model is model), None)
+        if entry is not None:
+            entry.users = max(0, entry.users - 1)
+            entry.last_used = time.monotonic()
+    if entry is None:
+        # Evicted while in use (or never pooled): nothing else holds it
+        model.close()
+        return
+
+    _enforce_limits()
+    if MODEL_POOL_IDLE_SECONDS > 0:
+        _ensure_sweeper()
+
+
+def evict_model_sessions(model_key: Optional[str] = None) -> int:
+    """
+    Close idle pooled models, all of them or those of one registry key.
+
+    Models in use are left alone and still count as active sessions.
+    Returns the number closed.
+    """
+    return _evict(
+        lambda e: model_key is None
+        or getattr(e.model, "_model_key", None) == model_key,
+        "evicted",
+    )
+
+
+def get_model_pool_stats() -> Dict[str, Any]:
+    """Pooled models and the bytes of model files they hold loaded."""
+    with _pool_lock:
+        models = [
+            {
+                "model": getattr(entry.key[0], "__name__", str(entry.key[0])),
+                "path": entry.model_path,
+                "bytes": entry.bytes,
+                "users": entry.users,
+                "idle_seconds": (
+                    0.0 if entry.users else round(time.monotonic() - entry.last_used, 1)
+                ),
+            }
+            for entry in _pool.values()
+        ]
+    return {"total_bytes": sum(m["bytes"] for m in models), "models": models}
@@ -2,7 +2,7 @@ import logging
 from binascii import Error as Base64Error
 import base64
 from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
-from typing import Annotated
+from typing import Annotated, Optional
 import uuid
 import os
 from fastapi import APIRouter, Depends, HTTPException, Query, status
@@ -173,7 +173,7 @@ def get_all_clusters():
                 cluster_id=cluster["cluster_id"],
                 cluster_name=cluster["cluster_name"],
                 face_count=cluster["face_count"],
-                face_image_base64=cluster["face_image_base64"],
+                face_image_path=cluster["face_image_path"],
             )
             for cluster in clusters_data
         ]
@@ -266,6 +266,10 @@ def face_tagging(
     input_type: Annotated[
         InputType, Query(description="Choose input type: 'path' or 'base64'")
     ] = InputType.path,
+    limit: Annotated[
+        Optional[int],
+        Query(ge=1, description="Maximum number of matching images to return"),
+    ] = None,
 ):
     image_path = None
 
@@ -345,7 +349,7 @@ def face_tagging(
         image_path = local_image_path
 
     try:
-        return perform_face_search(image_path)
+        return perform_face_search(image_path, limit=limit)
     finally:
         if input_type == InputType.base64 and image_path and os.path.exists(image_path):
             os.remove(image_path)
@@ -1,5 +1,4 @@
 from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List, Tuple
 from app.database.folders import (
     db_update_parent_ids_for_subtree,
     db_folder_exists,
@@ -10,7 +9,6 @@ from app.database.folders import (
     db_get_direct_child_folders,
     db_get_folder_ids_by_path_prefix,
     db_get_all_folder_details,
-    db_set_tagging_completed,
     db_update_folder_indexing_status,
     INDEXING_COMPLETED,
     INDEXING_IN_PROGRESS,
@@ -46,23 +44,15 @@ from app.utils.folders import (
     folder_util_get_filesystem_direct_child_folders,
 )
 from concurrent.futures import ProcessPoolExecutor
-from app.utils.images import (
-    image_util_process_folder_images,
-    image_util_process_untagged_images,
-    image_util_process_unembedded_images,
-)
-from app.utils.videos import (
-    video_util_process_folder_videos,
-    video_util_process_untagged_videos,
-    video_util_process_unembedded_frames,
-)
-from app.utils.model_bootstrap import ensure_ai_tagging_models
-from app.utils.semantic_labels import (
-    semantic_util_score_images,
-    semantic_util_score_videos,
-)
-from app.utils.face_clusters import cluster_util_face_clusters_sync
+from app.utils.images import image_util_process_folder_images
+from app.utils.videos import video_util_process_folder_videos
 from app.utils.API import API_util_restart_sync_microservice_watcher
+from app.utils.jobs import (
+    job_util_curate_memories,
+    job_util_enqueue,
+    job_util_enqueue_sync_folder,
+    job_util_run_pending,
+)
 
 # Initialize logger
 logger = get_logger(__name__)
@@ -70,24 +60,6 @@ logger = get_logger(__name__)
 router = APIRouter()
 
 
-def _curate_memories(trigger: str) -> None:
-    """
-    Refresh memories after the library changed.
-
-    Imported late to keep the curator out of the module import graph, and
-    swallowed on failure: a curation problem must never fail an import.
-
-    Never forced: force is what overrides the user's memories preference, and
-    a background import is not the user asking for memories.
-    """
-    try:
-        from app.utils.memory_curator import memory_curator_run
-
-        memory_curator_run(trigger=trigger)
-    except Exception as e:
-        logger.error(f"Memory curation failed after {trigger}: {e}")
-
-
 def post_folder_add_sequence(folder_path: str, folder_id: int):
     """
     Post-addition sequence for a folder.
@@ -120,7 +92,7 @@ def post_folder_add_sequence(folder_path: str, folder_id: int):
         # No AI has run yet, so only the date-driven triggers can produce
         # anything here. Semantic events appear once tagging is enabled and
         # this runs again.
-        _curate_memories("folder_add")
+        job_util_curate_memories("folder_add")
 
     except Exception as e:
         logger.error(
@@ -134,79 +106,6 @@ def post_folder_add_sequence(folder_path: str, folder_id: int):
     return True
 
 
-def post_AI_tagging_enabled_sequence():
-    """
-    Post-enabling AI tagging sequence.
-    This function is called after AI tagging is enabled for a folder.
-    It processes untagged images in the database.
-    """
-    try:
-        db_set_tagging_completed(False)
-        ensure_ai_tagging_models()
-        image_util_process_untagged_images()
-        cluster_util_face_clusters_sync()
-        image_util_process_unembedded_images()
-        semantic_util_score_images()
-        # Curate before the video pass: semantic labels are written by now,
-        # and the video pass can run for minutes.
-        _curate_memories("ai_tagging")
-        # Videos last: photos are the primary surface, so they finish first.
-        video_util_process_untagged_videos()
-        video_util_process_unembedded_frames()
-        semantic_util_score_videos()
-    except Exception as e:
-        logger.error(f"Error in post processing after AI tagging was enabled: {e}")
-        return False
-    finally:
-        # Set even on failure. A folder that failed to tag is not still
-        # tagging, and leaving the flag clear would block memories forever.
-        db_set_tagging_completed(True)
-    return True
-
-
-def post_sync_folder_sequence(
-    folder_path: str, folder_id: int, added_folders: List[Tuple[str, str]]
-):
-    """
-    Post-sync sequence for a folder.
-    This function is called after a folder is synced.
-    It processes images in the folder and updates the database.
-    """
-    try:
-        # Create folder data array
-        folder_data = []
-
-        folder_data.append((folder_path, folder_id, False))
-
-        for added_folder_id, added_folder_path in added_folders:
-            folder_data.append((added_folder_path, added_folder_id, False))
-
-        logger.info(f"Sync folder: {folder_data}")
-        db_set_tagging_completed(False)
-        # Process images and videos in all folders
-        image_util_process_folder_images(folder_data)
-        video_util_process_folder_videos(folder_data)
-        image_util_process_untagged_images()
-        cluster_util_face_clusters_sync()
-        image_util_process_unembedded_images()
-        semantic_util_score_images()
-        _curate_memories("sync_folder")
-        video_util_process_untagged_videos()
-        video_util_process_unembedded_frames()
-        semantic_util_score_videos()
-
-        # Restart sync microservice watcher after processing images
-        API_util_restart_sync_microservice_watcher()
-    except Exception as e:
-        logger.error(
-            f"Error in post processing after folder {folder_path} was synced: {e}"
-        )
-        return False
-    finally:
-        db_set_tagging_completed(True)
-    return True
-
-
 @router.post(
     "/add-folder",
     response_model=AddFolderResponse,
@@ -314,8 +213,11 @@ def enable_ai_tagging(
 
         updated_count = db_enable_ai_tagging_batch(request.folder_ids)
 
+        # Queued before submitting, so a restart resumes it even if the
+        # executor never got to it
+        job_util_enqueue("ai_tagging", {"folder_ids": request.folder_ids})
         executor: ProcessPoolExecutor = app_state.executor
-        executor.submit(post_AI_tagging_enabled_sequence)
+        executor.submit(job_util_run_pending)
 
         return UpdateAITaggingResponse(
             data=UpdateAITaggingData(
@@ -461,13 +363,11 @@ def sync_folder(request: SyncFolderRequest, app_state: State = Depends(get_state
             folder_path for folder_id, folder_path in added_folders_with_ids
         ]
 
-        executor: ProcessPoolExecutor = app_state.executor
-        executor.submit(
-            post_sync_folder_sequence,
-            request.folder_path,
-            request.folder_id,
-            added_folders_with_ids,
+        job_util_enqueue_sync_folder(
+            request.folder_path, request.folder_id, added_folders_with_ids
         )
+        executor: ProcessPoolExecutor = app_state.executor
+        executor.submit(job_util_run_pending)
         # Step 4: Return comprehensive response
         return SyncFolderResponse(
             data=SyncFolderData(
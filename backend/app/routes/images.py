@@ -1,6 +1,10 @@
+import base64
+import json
+from typing import Dict, Iterator, List, Optional, Tuple
+
 from fastapi import APIRouter, HTTPException, Query, status
-from typing import List, Optional
-from app.database.images import db_get_all_images
+from fastapi.responses import StreamingResponse
+from app.database.images import ImageKey, db_get_all_images, db_get_images_page
 from app.schemas.images import ErrorResponse
 from app.utils.images import image_util_parse_metadata
 from pydantic import BaseModel
@@ -45,6 +49,8 @@ class GetAllImagesResponse(BaseModel):
     success: bool
     message: str
     data: List[ImageData]
+    # Set on paged responses that have more images after this page
+    next_cursor: Optional[str] = None
 
 
 class SemanticSearchImage(ImageData):
@@ -62,38 +68,135 @@ class SemanticSearchResponse(BaseModel):
     data: SemanticSearchData
 
 
+_MAX_PAGE_SIZE = 1000
+
+
+def _to_image_data(image: dict) -> ImageData:
+    return ImageData(
+        id=image["id"],
+        path=image["path"],
+        folder_id=image["folder_id"],
+        thumbnailPath=image["thumbnailPath"],
+        metadata=image_util_parse_metadata(image["metadata"]),
+        isTagged=image["isTagged"],
+        isFavourite=image.get("isFavourite", False),
+        tags=image["tags"],
+    )
+
+
+def _encode_cursor(image: dict) -> str:
+    key = json.dumps([image["captured_at"], image["id"]])
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> ImageKey:
+    """The (captured_at, id) keyset position an opaque cursor stands for."""
+    try:
+        captured_at, image_id = json.loads(base64.urlsafe_b64decode(cursor))
+    except (ValueError, TypeError):
+        raise ValueError("malformed cursor")
+    if not isinstance(image_id, str) or not isinstance(captured_at, (str, type(None))):
+        raise ValueError("malformed cursor")
+    return captured_at, image_id
+
+
+def _read_page(
+    after: Optional[ImageKey], size: int, tagged: Optional[bool]
+) -> Tuple[List[dict], Optional[str]]:
+    """Up to `size` images after `after`, and the cursor past them if more remain."""
+    images = db_get_images_page(size + 1, after=after, tagged=tagged)
+    if len(images) <= size:
+        return images, None
+    images = images[:size]
+    return images, _encode_cursor(images[-1])
+
+
+def _stream_images(
+    after: Optional[ImageKey], limit: Optional[int], tagged: Optional[bool]
+) -> Iterator[str]:
+    from app.config.settings import IMAGES_PAGE_SIZE
+
+    sent = 0
+    try:
+        while limit is None or sent < limit:
+            size = IMAGES_PAGE_SIZE
+            if limit is not None:
+                size = min(size, limit - sent)
+            images, next_cursor = _read_page(after, size, tagged)
+            for image in images:
+                yield _to_image_data(image).model_dump_json() + "\n"
+            sent += len(images)
+            if next_cursor is None:
+                return
+            after = _decode_cursor(next_cursor)
+        # Stopped at the limit with images left
+        yield json.dumps({"next_cursor": next_cursor}) + "\n"
+    except Exception as e:
+        # Headers are already sent; end with a line the client can detect
+        logger.error(f"Error streaming images: {e}")
+        yield json.dumps({"error": f"Unable to retrieve images: {e}"}) + "\n"
+
+
 @router.get(
     "/",
     response_model=GetAllImagesResponse,
-    responses={500: {"model": ErrorResponse}},
+    responses={
+        200: {"content": {"application/x-ndjson": {}}},
+        **{code: {"model": ErrorResponse} for code in [400, 500]},
+    },
 )
 def get_all_images(
-    tagged: Optional[bool] = Query(None, description="Filter images by tagged status")
+    tagged: Optional[bool] = Query(None, description="Filter images by tagged status"),
+    limit: Optional[int] = Query(
+        None,
+        ge=1,
+        le=_MAX_PAGE_SIZE,
+        description="Page size. Pages run newest first; without limit, cursor "
+        "or stream every image is returned in one response, by path",
+    ),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    stream: bool = Query(
+        False,
+        description="Stream the images as NDJSON, one image per line, while "
+        'they are read. With a limit, a final {"next_cursor": ...} line '
+        "follows when more images remain",
+    ),
 ):
-    """Get all images from the database."""
+    """Get images from the database, whole, a page at a time, or streamed."""
+    try:
+        after = _decode_cursor(cursor) if cursor is not None else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ErrorResponse(
+                success=False,
+                error="Invalid cursor",
+                message="cursor must be a next_cursor returned by this endpoint",
+            ).model_dump(),
+        )
+
+    if stream:
+        return StreamingResponse(
+            _stream_images(after, limit, tagged), media_type="application/x-ndjson"
+        )
+
     try:
-        # Get all images with tags from database (single query with optional filter)
-        images = db_get_all_images(tagged=tagged)
+        if limit is None and cursor is None:
+            # Get all images with tags from database (single query with optional filter)
+            images, next_cursor = db_get_all_images(tagged=tagged), None
+        else:
+            from app.config.settings import IMAGES_PAGE_SIZE
+
+            images, next_cursor = _read_page(after, limit or IMAGES_PAGE_SIZE, tagged)
 
         # Convert to response format
-        image_data = [
-            ImageData(
-                id=image["id"],
-                path=image["path"],
-                folder_id=image["folder_id"],
-                thumbnailPath=image["thumbnailPath"],
-                metadata=image_util_parse_metadata(image["metadata"]),
-                isTagged=image["isTagged"],
-                isFavourite=image.get("isFavourite", False),
-                tags=image["tags"],
-            )
-            for image in images
-        ]
+        image_data = [_to_image_data(image) for image in images]
 
         return GetAllImagesResponse(
             success=True,
             message=f"Successfully retrieved {len(image_data)} images",
             data=image_data,
+            next_cursor=next_cursor,
         )
 
     except Exception as e:
@@ -117,19 +220,7 @@ def search_images_by_tag(tag: str = Query(..., description="Tag name to search f
     try:
         images = db_search_images_by_tag(tag)
 
-        image_data = [
-            ImageData(
-                id=image["id"],
-                path=image["path"],
-                folder_id=image["folder_id"],
-                thumbnailPath=image["thumbnailPath"],
-                metadata=image_util_parse_metadata(image["metadata"]),
-                isTagged=image["isTagged"],
-                isFavourite=image.get("isFavourite", False),
-                tags=image["tags"],
-            )
-            for image in images
-        ]
+        image_data = [_to_image_data(image) for image in images]
 
         return GetAllImagesResponse(
             success=True,
@@ -155,7 +246,11 @@ def search_images_by_tag(tag: str = Query(..., description="Tag name to search f
     responses={code: {"model": ErrorResponse} for code in [400, 404, 500]},
 )
 def semantic_search_images(
-    query: str = Query(..., min_length=1, description="Query text to search for")
+    query: str = Query(..., min_length=1, description="Query text to search for"),
+    limit: Optional[int] = Query(
+        None, ge=1, description="Maximum number of matches to return"
+    ),
+    offset: int = Query(0, ge=0, description="Number of top matches to skip"),
 ):
     """Semantic search images by query text using SigLIP2."""
     try:
@@ -164,6 +259,8 @@ def semantic_search_images(
             SIGLIP2_SCORING_METADATA,
             SIGLIP2_MATCH_THRESHOLD,
             SIGLIP2_QUERY_TEMPLATE,
+            SIGLIP2_ANN_MIN_IMAGES,
+            SIGLIP2_ANN_NPROBE,
         )
         from app.models.model_registry import (
             get_siglip2_registry_keys,
@@ -204,9 +301,10 @@ def semantic_search_images(
         logit_scale = metadata["logit_scale"]
         logit_bias = metadata["logit_bias"]
 
-        from app.database.image_embeddings import db_get_all_embeddings
+        from app.database.image_embeddings import db_get_cached_embeddings
 
-        image_ids, matrix = db_get_all_embeddings(model_version)
+        # Served from the process-wide matrix; only changed rows are read
+        image_ids, matrix = db_get_cached_embeddings(model_version)
 
         if not image_ids:
             return SemanticSearchResponse(
@@ -215,8 +313,6 @@ def semantic_search_images(
                 data=SemanticSearchData(images=[], total=0),
             )
 
-        from app.utils.SigLIP import siglip_util_tokenize_query
-
         normalized = query.strip().lower()
         if not normalized:
             raise HTTPException(
@@ -231,44 +327,52 @@ def semantic_search_images(
         # tokenizer is case-sensitive; lowercase matches the calibration-validated regime.
         # calibration parity with validated scoring
         templated = SIGLIP2_QUERY_TEMPLATE.format(query=normalized)
-        input_ids, attention_mask = siglip_util_tokenize_query(templated)
 
-        from app.utils.SigLIP import siglip_util_get_text_model
+        from app.utils.SigLIP import siglip_util_embed_query
+
+        # Repeated queries and later pages come from the query cache; misses
+        # run the text tower, itself cached across requests (see
+        # siglip_util_get_text_model/siglip_util_invalidate_text_model for
+        # the uninstall interaction).
+        text_vec = siglip_util_embed_query(templated, text_model_path, text_key)
 
-        # Cached across requests -- the ~1GB text tower is expensive to
-        # reload on every call. See siglip_util_get_text_model/
-        # siglip_util_invalidate_text_model for the uninstall interaction.
-        text_model = siglip_util_get_text_model(text_model_path, text_key)
-        text_vec = text_model.get_embedding(input_ids, attention_mask)
-        # Flatten to 1D vector. (Report shows what shape the method actually returns below)
-        text_vec = np.array(text_vec, dtype=np.float32).flatten()
+        # Large libraries score only the rows an IVF index puts near the query
+        candidates = None
+        if len(image_ids) >= SIGLIP2_ANN_MIN_IMAGES:
+            from app.utils.ann_index import ann_util_search
+
+            candidates = ann_util_search(
+                model_version, image_ids, matrix, text_vec, SIGLIP2_ANN_NPROBE
+            )
+        if candidates is None:
+            rows = None
+            dot_products = matrix @ text_vec
+        else:
+            rows, dot_products = candidates
 
         # scores = 1/(1+np.exp(-(matrix @ text_vec * np.exp(logit_scale) + logit_bias)))
-        dot_products = matrix @ text_vec
         scaled_logits = dot_products * np.exp(logit_scale) + logit_bias
         scores = 1 / (1 + np.exp(-scaled_logits))
 
         match_threshold = SIGLIP2_MATCH_THRESHOLD
 
-        # Keep (id, score) pairs where score >= SIGLIP2_MATCH_THRESHOLD
-        matched_pairs = []
-        for i, img_id in enumerate(image_ids):
-            score = float(scores[i])
-            if score >= match_threshold:
-                matched_pairs.append((img_id, score))
+        from app.utils.SigLIP import siglip_util_rank_scores
 
-        # Sort desc by score
-        matched_pairs.sort(key=lambda x: x[1], reverse=True)
+        page, total = siglip_util_rank_scores(scores, match_threshold, limit, offset)
 
-        if not matched_pairs:
+        if total == 0:
             return SemanticSearchResponse(
                 success=True,
                 message=f"No matches found with score >= {match_threshold}.",
                 data=SemanticSearchData(images=[], total=0),
             )
 
-        matched_ids = [pair[0] for pair in matched_pairs]
-        score_lookup = {pair[0]: pair[1] for pair in matched_pairs}
+        # Only the requested page is hydrated from the database
+        page_scores = scores[page]
+        if rows is not None:
+            page = rows[page]
+        matched_ids = [image_ids[i] for i in page]
+        score_lookup = {image_ids[i]: float(s) for i, s in zip(page, page_scores)}
 
         from app.database.images import db_get_images_by_ids
 
@@ -295,8 +399,8 @@ def semantic_search_images(
 
         return SemanticSearchResponse(
             success=True,
-            message=f"Found {len(semantic_images)} image(s) matching the query.",
-            data=SemanticSearchData(images=semantic_images, total=len(semantic_images)),
+            message=f"Found {total} image(s) matching the query.",
+            data=SemanticSearchData(images=semantic_images, total=total),
         )
 
     except HTTPException:
@@ -313,6 +417,52 @@ def semantic_search_images(
         )
 
 
+class EmbeddingCacheEntry(BaseModel):
+    rows: int
+    dim: int
+    capacity: int
+    bytes: int
+    mapped: bool
+
+
+class QueryCacheStats(BaseModel):
+    entries: int
+    capacity: int
+    hits: int
+    misses: int
+
+
+class EmbeddingCacheData(BaseModel):
+    total_bytes: int
+    versions: Dict[str, EmbeddingCacheEntry]
+    queries: QueryCacheStats
+
+
+class EmbeddingCacheResponse(BaseModel):
+    success: bool
+    data: EmbeddingCacheData
+
+
+@router.get(
+    "/semantic-search/cache",
+    response_model=EmbeddingCacheResponse,
+)
+def get_embedding_cache_stats():
+    """Memory held by the semantic search caches in this process."""
+    from app.database.image_embeddings import db_get_embedding_cache_stats
+    from app.utils.SigLIP import siglip_util_get_query_cache_stats
+
+    stats = db_get_embedding_cache_stats()
+    return EmbeddingCacheResponse(
+        success=True,
+        data=EmbeddingCacheData(
+            total_bytes=sum(entry["bytes"] for entry in stats.values()),
+            versions=stats,
+            queries=siglip_util_get_query_cache_stats(),
+        ),
+    )
+
+
 # adding add to favourite and remove from favourite routes
 
 
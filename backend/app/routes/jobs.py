@@ -0,0 +1,64 @@
+"""
+Background job API routes.
+
+Reports the job queue that indexing and tagging run through
+(app/utils/jobs.py): what is queued or running, and each stage's throughput.
+"""
+
+from typing import Any, Dict
+
+from fastapi import APIRouter, HTTPException, Query, status
+
+from app.database.jobs import db_get_recent_jobs, db_get_stage_throughput
+from app.logging.setup_logging import get_logger
+from app.schemas.jobs import (
+    ErrorResponse,
+    JobItem,
+    JobStatusData,
+    JobStatusResponse,
+    StageThroughput,
+)
+
+router = APIRouter()
+logger = get_logger(__name__)
+
+
+def _to_throughput(row: Dict[str, Any]) -> StageThroughput:
+    counted_seconds = row.pop("counted_seconds")
+    items_per_second = None
+    if row["items"] is not None and counted_seconds:
+        items_per_second = row["items"] / counted_seconds
+    return StageThroughput(
+        **{**row, "seconds": row["seconds"] or 0.0},
+        items_per_second=items_per_second,
+    )
+
+
+@router.get(
+    "/status",
+    response_model=JobStatusResponse,
+    responses={code: {"model": ErrorResponse} for code in [500]},
+)
+def get_job_status(
+    limit: int = Query(20, ge=0, le=100, description="Finished jobs to include"),
+) -> JobStatusResponse:
+    """Report queued and recent jobs, and per-stage throughput."""
+    try:
+        return JobStatusResponse(
+            success=True,
+            message="Successfully retrieved job status",
+            data=JobStatusData(
+                stages=[_to_throughput(row) for row in db_get_stage_throughput()],
+                jobs=[JobItem.model_validate(job) for job in db_get_recent_jobs(limit)],
+            ),
+        )
+    except Exception as e:
+        logger.error("Error retrieving job status", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=ErrorResponse(
+                success=False,
+                error="Internal server error",
+                message=f"Unable to retrieve job status: {str(e)}",
+            ).model_dump(),
+        )
@@ -11,6 +11,7 @@ from pydantic import BaseModel
 from fastapi.responses import StreamingResponse
 from starlette.datastructures import State
 from app.models.model_registry import MODEL_REGISTRY, TIER_MODELS, get_model_path
+from app.models.session_pool import evict_model_sessions
 from app.models.session_registry import (
     try_mark_model_for_deletion,
     release_model_deletion_mark,
@@ -24,6 +25,7 @@ from app.utils.semantic_labels import (
     semantic_util_score_images,
 )
 from app.utils.model_downloader import ensure_model
+from app.utils.ann_index import ann_util_build_index
 from app.database.metadata import db_get_metadata
 import logging
 
@@ -49,10 +51,11 @@ def submit_embedding_backfill_if_semantic(
     ):
         # The executor is single-worker, so these run in order: label
         # embeddings, then image embeddings, then the scoring sweep that
-        # depends on both.
+        # depends on both, then the ANN index over the new embeddings.
         executor.submit(semantic_util_build_label_embeddings)
         executor.submit(image_util_process_unembedded_images)
         executor.submit(semantic_util_score_images)
+        executor.submit(ann_util_build_index)
 
 
 # Global dict to track download tasks
@@ -181,6 +184,10 @@ async def delete_model(model_key: str):
 
             siglip_util_invalidate_text_model(model_key)
 
+        # Idle pooled sessions (see app.models.session_pool) are likewise
+        # kept open for reuse; close them so only real use blocks deletion.
+        evict_model_sessions(model_key)
+
         # Check no sessions are active and reserve the model for deletion.
         active_session_count = try_mark_model_for_deletion(model_key)
         if active_session_count is not None:
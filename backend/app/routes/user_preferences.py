@@ -1,7 +1,9 @@
 from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
+from starlette.datastructures import State
 from app.database.metadata import db_get_metadata, db_update_metadata
+from app.routes.dependencies import get_state
 from app.logging.setup_logging import get_logger
 from app.schemas.user_preferences import (
     GetUserPreferencesResponse,
@@ -10,6 +12,7 @@ from app.schemas.user_preferences import (
     UserPreferencesData,
     ErrorResponse,
 )
+from app.utils.ONNX import ONNX_util_invalidate_execution_providers
 
 router = APIRouter()
 logger = get_logger(__name__)
@@ -71,7 +74,9 @@ def get_user_preferences():
     response_model=UpdateUserPreferencesResponse,
     responses={code: {"model": ErrorResponse} for code in [400, 500]},
 )
-def update_user_preferences(request: UpdateUserPreferencesRequest):
+def update_user_preferences(
+    request: UpdateUserPreferencesRequest, app_state: State = Depends(get_state)
+):
     """Update user preferences in metadata."""
     try:
         # exclude_unset keeps this a genuine partial update: fields the caller
@@ -99,6 +104,18 @@ def update_user_preferences(request: UpdateUserPreferencesRequest):
                 ).model_dump(),
             )
 
+        if merged.get("GPU_Acceleration", True) != current.get(
+            "GPU_Acceleration", True
+        ):
+            # Sessions pick their providers from a per-process cache: drop it
+            # here and in the background worker. The worker runs it after the
+            # task in hand; a job runner holding the worker checks the
+            # preference itself before each stage it starts.
+            ONNX_util_invalidate_execution_providers()
+            executor = getattr(app_state, "executor", None)
+            if executor is not None:
+                executor.submit(ONNX_util_invalidate_execution_providers)
+
         return UpdateUserPreferencesResponse(
             success=True,
             message="Successfully updated user preferences",
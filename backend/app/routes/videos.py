@@ -169,10 +169,7 @@ def semantic_search_videos(
             get_siglip2_tokenizer_key,
             get_model_path,
         )
-        from app.utils.SigLIP import (
-            siglip_util_tokenize_query,
-            siglip_util_get_text_model,
-        )
+        from app.utils.SigLIP import siglip_util_embed_query
 
         _, text_key = get_siglip2_registry_keys(SIGLIP2_ACTIVE_CHECKPOINT)
         tokenizer_key = get_siglip2_tokenizer_key(SIGLIP2_ACTIVE_CHECKPOINT)
@@ -205,13 +202,9 @@ def semantic_search_videos(
                 data=SemanticSearchData(videos=[], total=0),
             )
 
-        text_model = siglip_util_get_text_model(text_model_path, text_key)
-        input_ids, attention_mask = siglip_util_tokenize_query(
-            SIGLIP2_QUERY_TEMPLATE.format(query=query)
+        query_vector = siglip_util_embed_query(
+            SIGLIP2_QUERY_TEMPLATE.format(query=query), text_model_path, text_key
         )
-        query_vector = np.asarray(
-            text_model.get_embedding(input_ids, attention_mask), dtype=np.float32
-        ).flatten()
 
         logits = (
             frame_matrix @ query_vector * np.exp(metadata["logit_scale"])
@@ -29,7 +29,7 @@ class ErrorResponse(BaseModel):
 class ClusterMetadata(BaseModel):
     cluster_id: str
     cluster_name: Optional[str]
-    face_image_base64: Optional[str]
+    face_image_path: Optional[str]
     face_count: int
 
 
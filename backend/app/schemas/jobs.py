@@ -0,0 +1,67 @@
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+JobStatus = Literal["queued", "running", "completed", "failed"]
+StageStatus = Literal["pending", "running", "completed", "failed"]
+
+
+class JobStageItem(BaseModel):
+    """One stage of a job. Times are epoch seconds."""
+
+    position: int
+    stage: str
+    status: StageStatus
+    items: Optional[int] = None
+    error: Optional[str] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+
+class JobItem(BaseModel):
+    job_id: int
+    kind: str
+    status: JobStatus
+    error: Optional[str] = None
+    created_at: float
+    finished_at: Optional[float] = None
+    stages: List[JobStageItem] = Field(default_factory=list)
+
+
+class StageThroughput(BaseModel):
+    """
+    A stage's totals over the jobs on record.
+
+    items_per_second covers only runs that count their work, so it is null
+    for stages like build_ann_index that have no items.
+    """
+
+    stage: str
+    pending: int = 0
+    running: int = 0
+    completed: int = 0
+    failed: int = 0
+    items: Optional[int] = None
+    seconds: float = 0.0
+    items_per_second: Optional[float] = None
+    last_finished_at: Optional[float] = None
+
+
+class JobStatusData(BaseModel):
+    stages: List[StageThroughput] = Field(default_factory=list)
+    # Unfinished jobs and the most recent finished ones, newest first
+    jobs: List[JobItem] = Field(default_factory=list)
+
+
+class JobStatusResponse(BaseModel):
+    success: bool
+    message: str
+    data: JobStatusData
+
+
+class ErrorResponse(BaseModel):
+    """Error response model"""
+
+    success: bool
+    error: str
+    message: str
@@ -17,6 +17,11 @@ def FaceNet_util_normalize_embedding(embedding):
     return embedding / np.linalg.norm(embedding)
 
 
+def FaceNet_util_normalize_embeddings(embeddings):
+    """Row-wise FaceNet_util_normalize_embedding for an [N, D] batch."""
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
 def FaceNet_util_cosine_similarity(embedding1, embedding2):
     return np.dot(embedding1, embedding2) / (
         np.linalg.norm(embedding1) * np.linalg.norm(embedding2)
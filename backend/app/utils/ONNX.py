@@ -1,10 +1,33 @@
+import threading
+
 import onnxruntime
 
+from app.logging.setup_logging import get_logger
+
+logger = get_logger(__name__)
+
+_GRAPH_OPTIMIZATION_LEVELS = {
+    "disabled": onnxruntime.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+# Providers for the current GPU_Acceleration preference, before `exclude`.
+# Resolved once per process; the preferences route invalidates it.
+_providers = None
+# The GPU_Acceleration preference _providers was resolved for
+_providers_gpu = None
+_providers_lock = threading.Lock()
+
 
 def ONNX_util_get_execution_providers(exclude: tuple[str, ...] = ()) -> list:
     """
     Get ONNX execution providers based on GPU acceleration setting from metadata.
 
+    The preference is read from the database once and cached until
+    ONNX_util_invalidate_execution_providers is called.
+
     Args:
         exclude: Provider names to filter out (e.g. providers known to be
                  incompatible with a specific model graph).
@@ -14,24 +37,101 @@ def ONNX_util_get_execution_providers(exclude: tuple[str, ...] = ()) -> list:
               - If GPU_Acceleration is False: ["CPUExecutionProvider"]
               - If GPU_Acceleration is True: All available providers minus `exclude`
     """
+    global _providers, _providers_gpu
+
+    with _providers_lock:
+        if _providers is None:
+            _providers_gpu = _gpu_acceleration_preference()
+            _providers = _resolve_execution_providers(_providers_gpu)
+        providers = _providers
+
+    providers = [p for p in providers if p not in exclude]
+    return providers or ["CPUExecutionProvider"]
+
+
+def _gpu_acceleration_preference() -> bool:
     from app.database.metadata import db_get_metadata
 
     # Get metadata from database
     metadata = db_get_metadata()
 
-    # Default to CPU if no preferences found
-    gpu_acceleration = True
-
-    # Extract GPU acceleration setting from user preferences
+    # Extract GPU acceleration setting from user preferences, on by default
     if metadata and "user_preferences" in metadata:
-        user_prefs = metadata["user_preferences"]
-        gpu_acceleration = user_prefs.get("GPU_Acceleration", True)
+        return metadata["user_preferences"].get("GPU_Acceleration", True)
+    return True
+
 
+def _resolve_execution_providers(gpu_acceleration: bool) -> list:
     # Return appropriate execution providers
     if gpu_acceleration:
-        providers = [
-            p for p in onnxruntime.get_available_providers() if p not in exclude
-        ]
-        return providers or ["CPUExecutionProvider"]
+        return list(onnxruntime.get_available_providers())
     else:
         return ["CPUExecutionProvider"]
+
+
+def ONNX_util_invalidate_execution_providers() -> None:
+    """
+    Forget the cached providers and close idle pooled models.
+
+    Call after GPU_Acceleration changes, in every process that creates
+    sessions: warm sessions in the model pool were created with the old
+    providers, so they are closed too and reload with the new ones.
+    """
+    global _providers, _providers_gpu
+    from app.models.session_pool import evict_model_sessions
+
+    with _providers_lock:
+        _providers = None
+        _providers_gpu = None
+    evict_model_sessions()
+
+
+def ONNX_util_refresh_execution_providers() -> bool:
+    """
+    Invalidate the cached providers if GPU_Acceleration has changed since
+    they were resolved.
+
+    For loops that run many passes in one executor task, like the job
+    runner: an invalidation the preferences route queues behind such a task
+    only runs once it ends. Checking between passes applies the change to
+    the next one instead.
+
+    Returns:
+        True if the cache was stale and has been invalidated
+    """
+    with _providers_lock:
+        resolved_for = _providers_gpu
+    if resolved_for is None or _gpu_acceleration_preference() == resolved_for:
+        return False
+    logger.info("GPU_Acceleration changed; reloading ONNX sessions")
+    ONNX_util_invalidate_execution_providers()
+    return True
+
+
+def ONNX_util_get_session_options() -> onnxruntime.SessionOptions:
+    """
+    SessionOptions from the ONNX_* settings.
+
+    ONNX_INTRA_OP_THREADS / ONNX_INTER_OP_THREADS set the thread pools
+    (0 keeps ONNX Runtime's default), and ONNX_GRAPH_OPTIMIZATION picks
+    the graph optimization level.
+    """
+    from app.config.settings import (
+        ONNX_GRAPH_OPTIMIZATION,
+        ONNX_INTER_OP_THREADS,
+        ONNX_INTRA_OP_THREADS,
+    )
+
+    options = onnxruntime.SessionOptions()
+    options.intra_op_num_threads = ONNX_INTRA_OP_THREADS
+    options.inter_op_num_threads = ONNX_INTER_OP_THREADS
+
+    level = _GRAPH_OPTIMIZATION_LEVELS.get(ONNX_GRAPH_OPTIMIZATION.lower())
+    if level is None:
+        logger.warning(
+            f"Unknown ONNX_GRAPH_OPTIMIZATION={ONNX_GRAPH_OPTIMIZATION!r}; "
+            f"expected one of {sorted(_GRAPH_OPTIMIZATION_LEVELS)}. Using 'all'."
+        )
+        level = _GRAPH_OPTIMIZATION_LEVELS["all"]
+    options.graph_optimization_level = level
+    return options
@@ -1,4 +1,5 @@
 import threading
+from collections import OrderedDict
 import numpy as np
 from PIL import Image
 from app.logging.setup_logging import get_logger
@@ -13,32 +14,39 @@ def siglip_util_preprocess_image(img_path: str, resolution: int) -> np.ndarray |
     Returns a [3, R, R] float32 array or None if the image is corrupt/unreadable.
     """
     try:
-        # PIL bicubic (antialiased, Pillow>=9.1). Measured vs HF
-        # SiglipImageProcessor on real 4032x3024 photos: embedding cosine
-        # ~0.984 (HF uses an internal resampler that plain PIL resize does
-        # not reproduce; exact parity would require shipping transformers).
-        # Production is self-consistent: SIGLIP2_MATCH_THRESHOLD was tuned
-        # against THIS pipeline. Any future threshold/calibration work must
-        # use this function, not AutoImageProcessor.
-        img = (
-            Image.open(img_path)
-            .convert("RGB")
-            .resize((resolution, resolution), Image.BICUBIC)
+        return siglip_util_preprocess_pil(
+            Image.open(img_path).convert("RGB"), resolution
         )
+    except Exception as e:
+        logger.error(f"Failed to load/preprocess image for SigLIP: {img_path} - {e}")
+        return None
+
+
+def siglip_util_preprocess_pil(img: Image.Image, resolution: int) -> np.ndarray:
+    """
+    siglip_util_preprocess_image for an image already decoded to RGB, for
+    callers that read the file once for several models. Same pixels in,
+    same array out.
+    """
+    # PIL bicubic (antialiased, Pillow>=9.1). Measured vs HF
+    # SiglipImageProcessor on real 4032x3024 photos: embedding cosine
+    # ~0.984 (HF uses an internal resampler that plain PIL resize does
+    # not reproduce; exact parity would require shipping transformers).
+    # Production is self-consistent: SIGLIP2_MATCH_THRESHOLD was tuned
+    # against THIS pipeline. Any future threshold/calibration work must
+    # use this function, not AutoImageProcessor.
+    img = img.resize((resolution, resolution), Image.BICUBIC)
 
-        # Convert to numpy array and normalize to [0, 1]
-        img_np = np.asarray(img).astype(np.float32) / 255.0
+    # Convert to numpy array and normalize to [0, 1]
+    img_np = np.asarray(img).astype(np.float32) / 255.0
 
-        # Normalize: (x - 0.5) / 0.5 (SigLIP mean=std=0.5 per channel)
-        img_np = (img_np - 0.5) / 0.5
+    # Normalize: (x - 0.5) / 0.5 (SigLIP mean=std=0.5 per channel)
+    img_np = (img_np - 0.5) / 0.5
 
-        # Transpose HWC -> CHW
-        img_np = np.transpose(img_np, (2, 0, 1))
+    # Transpose HWC -> CHW
+    img_np = np.transpose(img_np, (2, 0, 1))
 
-        return img_np
-    except Exception as e:
-        logger.error(f"Failed to load/preprocess image for SigLIP: {img_path} - {e}")
-        return None
+    return img_np
 
 
 _tokenizer = None
@@ -93,6 +101,36 @@ def siglip_util_tokenize_query(query: str) -> tuple[np.ndarray, np.ndarray]:
     return input_ids, attention_mask
 
 
+def siglip_util_rank_scores(
+    scores: np.ndarray,
+    threshold: float,
+    limit: int | None = None,
+    offset: int = 0,
+) -> tuple[np.ndarray, int]:
+    """Indices of the scores >= threshold, best first, for one page.
+
+    Returns (page_indices, total_matches). Only the offset + limit best
+    matches are partially selected and sorted, so a small page over a large
+    library never sorts the whole score vector. Ties keep their input order.
+    """
+    matched = np.flatnonzero(scores >= threshold)
+    total = len(matched)
+    if total == 0 or offset >= total:
+        return np.empty(0, dtype=np.intp), total
+
+    end = total if limit is None else min(offset + limit, total)
+    if end < total:
+        # Keep everything above the end-th best score, then the lowest-index
+        # rows tied with it, so every page cuts the same ranking.
+        candidates = scores[matched]
+        cutoff = -np.partition(-candidates, end - 1)[end - 1]
+        above = np.flatnonzero(candidates > cutoff)
+        tied = np.flatnonzero(candidates == cutoff)[: end - len(above)]
+        matched = matched[np.sort(np.concatenate((above, tied)))]
+    order = np.argsort(-scores[matched], kind="stable")
+    return matched[order[offset:end]], total
+
+
 _text_model = None
 _text_model_key = None
 _text_model_lock = threading.Lock()
@@ -123,7 +161,8 @@ def siglip_util_invalidate_text_model(model_key: str | None = None) -> None:
     holds a session registered with session_registry, so its active-session
     count would never reach zero (blocking the uninstall guard forever)
     unless this closes it first. If model_key is given, only invalidates
-    when it matches the currently cached model.
+    when it matches the currently cached model. Query embeddings cached
+    for that model (or all of them) are dropped as well.
     """
     global _text_model, _text_model_key
     with _text_model_lock:
@@ -133,3 +172,82 @@ def siglip_util_invalidate_text_model(model_key: str | None = None) -> None:
             _text_model.close()
             _text_model = None
             _text_model_key = None
+    siglip_util_clear_query_cache(model_key)
+
+
+# (text model key, templated query) -> read-only float32 embedding, in LRU
+# order. The text model key is per checkpoint, so switching checkpoints
+# never serves another tower's vectors.
+_query_cache: "OrderedDict[tuple[str, str], np.ndarray]" = OrderedDict()
+_query_cache_hits = 0
+_query_cache_misses = 0
+# Bumped by every clear, so a miss that embedded with a tower invalidated
+# meanwhile does not cache its vector after the clear.
+_query_cache_generation = 0
+_query_cache_lock = threading.Lock()
+
+
+def siglip_util_embed_query(templated: str, model_path: str, model_key: str):
+    """Text embedding (1D float32, read-only) for an already templated query.
+
+    Served from a bounded LRU cache of SIGLIP2_QUERY_CACHE_SIZE entries, so
+    repeated searches and later pages of the same search skip tokenizing
+    and the text tower. Misses run outside the lock; two threads missing on
+    the same query both embed it and the second result wins. A miss that
+    straddles a cache clear is returned but not cached.
+    """
+    global _query_cache_hits, _query_cache_misses
+    from app.config.settings import SIGLIP2_QUERY_CACHE_SIZE
+
+    key = (model_key, templated)
+    with _query_cache_lock:
+        vector = _query_cache.get(key)
+        if vector is not None:
+            _query_cache.move_to_end(key)
+            _query_cache_hits += 1
+            return vector
+        _query_cache_misses += 1
+        generation = _query_cache_generation
+
+    input_ids, attention_mask = siglip_util_tokenize_query(templated)
+    text_model = siglip_util_get_text_model(model_path, model_key)
+    vector = np.array(
+        text_model.get_embedding(input_ids, attention_mask), dtype=np.float32
+    ).flatten()
+    # Shared by every caller that hits the entry
+    vector.setflags(write=False)
+
+    if SIGLIP2_QUERY_CACHE_SIZE > 0:
+        with _query_cache_lock:
+            if generation != _query_cache_generation:
+                return vector
+            _query_cache[key] = vector
+            _query_cache.move_to_end(key)
+            while len(_query_cache) > SIGLIP2_QUERY_CACHE_SIZE:
+                _query_cache.popitem(last=False)
+    return vector
+
+
+def siglip_util_clear_query_cache(model_key: str | None = None) -> None:
+    """Drop cached query embeddings, only model_key's if given. Counters are kept."""
+    global _query_cache_generation
+    with _query_cache_lock:
+        _query_cache_generation += 1
+        if model_key is None:
+            _query_cache.clear()
+            return
+        for key in [key for key in _query_cache if key[0] == model_key]:
+            del _query_cache[key]
+
+
+def siglip_util_get_query_cache_stats() -> dict:
+    """Entries, capacity and hit/miss counters of the query embedding cache."""
+    from app.config.settings import SIGLIP2_QUERY_CACHE_SIZE
+
+    with _query_cache_lock:
+        return {
+            "entries": len(_query_cache),
+            "capacity": SIGLIP2_QUERY_CACHE_SIZE,
+            "hits": _query_cache_hits,
+            "misses": _query_cache_misses,
+        }
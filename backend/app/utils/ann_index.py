@@ -0,0 +1,226 @@
+"""
+Inverted-file (IVF) index for SigLIP2 image search, in plain NumPy.
+
+Stored embeddings are unit-norm, so spherical k-means splits them into
+`nlist` lists by nearest centroid (largest dot product). A query scores the
+centroids, probes the `nprobe` best lists and scores only their members
+exactly, instead of the whole library.
+
+The background worker trains the centroids and assigns every stored row
+(ann_util_build_index); the file it writes keys the assignments by image
+id. The server maps those onto the rows of its cached matrix and assigns
+rows embedded since the build itself, so new photos are searchable without
+a rebuild. Retraining waits until the library has grown by
+SIGLIP2_ANN_REBUILD_GROWTH since the last build.
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.logging.setup_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Training points per centroid; FAISS suggests 39-256
+_TRAINING_POINTS_PER_LIST = 64
+_ASSIGN_CHUNK = 65536
+
+
+def ann_util_index_path(model_version: str) -> str:
+    from app.database.embedding_store import _store_prefix
+
+    return _store_prefix(model_version) + ".ivf.npz"
+
+
+def ann_util_assign(matrix: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Nearest centroid (by dot product) for every row, in bounded chunks."""
+    lists = np.empty(len(matrix), dtype=np.int32)
+    for start in range(0, len(matrix), _ASSIGN_CHUNK):
+        chunk = np.asarray(matrix[start : start + _ASSIGN_CHUNK], dtype=np.float32)
+        lists[start : start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return lists
+
+
+def ann_util_train_centroids(
+    matrix: np.ndarray, nlist: int, iterations: int = 10, seed: int = 0
+) -> np.ndarray:
+    """Spherical k-means over a sample of `matrix`; returns unit-norm centroids."""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(matrix), nlist * _TRAINING_POINTS_PER_LIST)
+    # Sorted so a memory-mapped matrix is read front to back
+    rows = np.sort(rng.choice(len(matrix), size=sample_size, replace=False))
+    sample = np.asarray(matrix[rows], dtype=np.float32)
+    centroids = sample[rng.choice(sample_size, size=nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        lists = ann_util_assign(sample, centroids)
+        order = np.argsort(lists, kind="stable")
+        counts = np.bincount(lists, minlength=nlist)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        filled = counts > 0
+        sums = np.add.reduceat(sample[order], starts[filled], axis=0)
+        centroids[filled] = sums / np.linalg.norm(sums, axis=1, keepdims=True)
+        # An empty list restarts from a random point instead of dying out
+        empty = np.flatnonzero(~filled)
+        if len(empty):
+            centroids[empty] = sample[rng.choice(sample_size, size=len(empty))]
+    return centroids
+
+
+def ann_util_build_index() -> None:
+    """
+    Train and save the IVF index for the active checkpoint.
+
+    Self-gating: does nothing below SIGLIP2_ANN_MIN_IMAGES, or while the
+    library is within SIGLIP2_ANN_REBUILD_GROWTH of the last build.
+    """
+    import time
+    from app.config.settings import (
+        SIGLIP2_ACTIVE_CHECKPOINT,
+        SIGLIP2_ANN_MIN_IMAGES,
+        SIGLIP2_ANN_REBUILD_GROWTH,
+        SIGLIP2_SCORING_METADATA,
+    )
+    from app.database.embedding_store import db_open_embedding_store
+
+    try:
+        model_version = SIGLIP2_SCORING_METADATA[SIGLIP2_ACTIVE_CHECKPOINT][
+            "model_version"
+        ]
+        store = db_open_embedding_store(model_version)
+        count = 0 if store is None else len(store.ids)
+        if count < SIGLIP2_ANN_MIN_IMAGES:
+            return
+
+        path = ann_util_index_path(model_version)
+        if os.path.exists(path):
+            with np.load(path) as existing:
+                built_for = len(existing["lists"])
+            if count < built_for * (1 + SIGLIP2_ANN_REBUILD_GROWTH):
+                return
+
+        start_time = time.time()
+        nlist = max(1, int(np.sqrt(count)))
+        centroids = ann_util_train_centroids(store.matrix, nlist)
+        lists = ann_util_assign(store.matrix, centroids)
+        ids = np.array([image_id.encode() for image_id in store.ids.tolist()])
+
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(f, centroids=centroids, ids=ids, lists=lists)
+        os.replace(temp_path, path)
+        logger.info(
+            f"Built IVF index for {model_version}: {count} image(s), "
+            f"{nlist} lists, {time.time() - start_time:.2f}s"
+        )
+    except Exception as e:
+        logger.error(f"Error building ANN index: {e}")
+
+
+class _IndexState:
+    """An index file mapped onto the rows of the server's cached matrix."""
+
+    def __init__(self, mtime: int, centroids: np.ndarray, lists_by_id: Dict):
+        self.mtime = mtime
+        self.centroids = centroids
+        self.lists_by_id = lists_by_id
+        self.lists = np.empty(0, dtype=np.int32)
+        # Rows [0, covered) of the cache have a list; tail_id is the id of
+        # row covered - 1, which changes iff an earlier row was removed.
+        self.covered = 0
+        self.tail_id: Optional[str] = None
+        self.order = np.empty(0, dtype=np.intp)
+        self.offsets = np.zeros(len(centroids) + 1, dtype=np.intp)
+
+    def sync(self, image_ids: List[str], matrix: np.ndarray):
+        n = len(image_ids)
+        if self.covered and (
+            self.covered > n or image_ids[self.covered - 1] != self.tail_id
+        ):
+            # Rows were renumbered by a removal; map everything by id again
+            self.covered = 0
+        if n == self.covered:
+            return
+
+        if self.covered == 0:
+            lists = np.fromiter(
+                (self.lists_by_id.get(i, -1) for i in image_ids), np.int32, count=n
+            )
+            unindexed = np.flatnonzero(lists < 0)
+            if len(unindexed):
+                lists[unindexed] = ann_util_assign(matrix[unindexed], self.centroids)
+        else:
+            fresh = ann_util_assign(matrix[self.covered : n], self.centroids)
+            lists = np.concatenate([self.lists[: self.covered], fresh])
+
+        self.lists = lists
+        self.covered = n
+        self.tail_id = image_ids[n - 1]
+        self.order = np.argsort(lists, kind="stable")
+        counts = np.bincount(lists, minlength=len(self.centroids))
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    def probe(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        centroid_scores = self.centroids @ query
+        if nprobe < len(centroid_scores):
+            lists = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        else:
+            lists = np.arange(len(centroid_scores))
+        return np.concatenate(
+            [self.order[self.offsets[i] : self.offsets[i + 1]] for i in lists]
+        )
+
+
+_index_states: Dict[str, _IndexState] = {}
+_index_lock = threading.Lock()
+
+
+def _load_index_state(model_version: str) -> Optional[_IndexState]:
+    path = ann_util_index_path(model_version)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        _index_states.pop(path, None)
+        return None
+
+    state = _index_states.get(path)
+    if state is None or state.mtime != mtime:
+        with np.load(path) as index:
+            ids = [image_id.decode() for image_id in index["ids"].tolist()]
+            lists_by_id = dict(zip(ids, index["lists"].tolist()))
+            state = _IndexState(mtime, index["centroids"], lists_by_id)
+        _index_states[path] = state
+    return state
+
+
+def ann_util_search(
+    model_version: str,
+    image_ids: List[str],
+    matrix: np.ndarray,
+    query: np.ndarray,
+    nprobe: int,
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Candidate rows of `matrix` and their exact dot products with `query`.
+
+    Only members of the `nprobe` lists closest to the query are scored.
+    Returns None when there is no usable index, so the caller falls back
+    to scoring every row.
+    """
+    with _index_lock:
+        try:
+            state = _load_index_state(model_version)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Unreadable ANN index for {model_version}: {e}")
+            return None
+        if state is None or state.centroids.shape[1] != matrix.shape[1]:
+            return None
+        state.sync(image_ids, matrix)
+        rows = state.probe(query, nprobe)
+
+    # Ascending rows read the matrix front to back
+    rows.sort()
+    return rows, matrix[rows] @ query
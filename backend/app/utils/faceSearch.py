@@ -1,11 +1,12 @@
 import uuid
 from typing import Optional, List, Dict, Any
+import numpy as np
 from pydantic import BaseModel
-from app.config.settings import CONFIDENCE_PERCENT, DEFAULT_FACENET_MODEL
-from app.database.faces import get_all_face_embeddings
+from app.config.settings import CONFIDENCE_PERCENT
+from app.database.faces import db_get_face_bboxes, db_get_face_embedding_matrix
+from app.database.images import db_get_images_by_ids
 from app.models.FaceDetector import FaceDetector
-from app.models.FaceNet import FaceNet
-from app.utils.FaceNet import FaceNet_util_cosine_similarity
+from app.utils.images import image_util_parse_metadata
 
 
 class BoundingBox(BaseModel):
@@ -24,6 +25,7 @@ class ImageData(BaseModel):
     isTagged: bool
     tags: Optional[List[str]] = None
     bboxes: BoundingBox
+    score: float
 
 
 class GetAllImagesResponse(BaseModel):
@@ -32,21 +34,43 @@ class GetAllImagesResponse(BaseModel):
     data: List[ImageData]
 
 
-def perform_face_search(image_path: str) -> GetAllImagesResponse:
+def _rank_face_matches(
+    scores: np.ndarray, image_ids: List[str], limit: Optional[int]
+) -> Dict[str, int]:
+    """
+    Best-scoring row per image among scores >= CONFIDENCE_PERCENT, in
+    descending score order, stopping after `limit` images.
+    """
+    hits = np.flatnonzero(scores >= CONFIDENCE_PERCENT)
+    hits = hits[np.argsort(-scores[hits], kind="stable")]
+    best: Dict[str, int] = {}
+    for row in hits.tolist():
+        # An image with several matching faces ranks by its best one
+        best.setdefault(image_ids[row], row)
+        if limit is not None and len(best) >= limit:
+            break
+    return best
+
+
+def perform_face_search(
+    image_path: str, limit: Optional[int] = None
+) -> GetAllImagesResponse:
     """
     Performs face detection, embedding generation, and similarity search.
 
+    The first detected face is scored against every stored face in one
+    matrix product; only the matching images are read from the database.
+
     Args:
         image_path (str): Path to the image file to process.
+        limit (int, optional): Return at most this many images, best first.
 
     Returns:
         GetAllImagesResponse: Search result containing matched images.
     """
     fd = FaceDetector()
-    fn = FaceNet(DEFAULT_FACENET_MODEL)
 
     try:
-        matches = []
         image_id = str(uuid.uuid4())
 
         try:
@@ -64,34 +88,41 @@ def perform_face_search(image_path: str) -> GetAllImagesResponse:
                 data=[],
             )
 
-        process_face = result["processed_faces"][0]
-        new_embedding = fn.get_embedding(process_face)
-
-        images = get_all_face_embeddings()
-        if not images:
+        face_ids, image_ids, matrix = db_get_face_embedding_matrix()
+        if not len(face_ids):
             return GetAllImagesResponse(
                 success=True,
                 message="No face embeddings available for comparison.",
                 data=[],
             )
 
-        for image in images:
-            similarity = FaceNet_util_cosine_similarity(
-                new_embedding, image["embeddings"]
-            )
-            if similarity >= CONFIDENCE_PERCENT:
-                matches.append(
-                    ImageData(
-                        id=image["id"],
-                        path=image["path"],
-                        folder_id=image["folder_id"],
-                        thumbnailPath=image["thumbnailPath"],
-                        metadata=image["metadata"],
-                        isTagged=image["isTagged"],
-                        tags=image["tags"],
-                        bboxes=image["bbox"],
-                    )
+        # detect_faces already ran FaceNet on the crop; reuse its embedding
+        query = np.asarray(result["embeddings"][0], dtype=np.float32).ravel()
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        scores = matrix @ query
+
+        best = _rank_face_matches(scores, image_ids, limit)
+        bboxes = db_get_face_bboxes([int(face_ids[row]) for row in best.values()])
+
+        matches = []
+        for image in db_get_images_by_ids(list(best)):
+            row = best[image["id"]]
+            bbox = bboxes.get(int(face_ids[row]))
+            if bbox is None:
+                continue
+            matches.append(
+                ImageData(
+                    id=image["id"],
+                    path=image["path"],
+                    folder_id=image["folder_id"],
+                    thumbnailPath=image["thumbnailPath"],
+                    metadata=image_util_parse_metadata(image["metadata"]),
+                    isTagged=image["isTagged"],
+                    tags=image["tags"],
+                    bboxes=bbox,
+                    score=round(float(scores[row]), 4),
                 )
+            )
 
         return GetAllImagesResponse(
             success=True,
@@ -100,7 +131,4 @@ def perform_face_search(image_path: str) -> GetAllImagesResponse:
         )
 
     finally:
-        if "fd" in locals() and fd is not None:
-            fd.close()
-        if "fn" in locals() and fn is not None:
-            fn.close()
+        fd.close()
@@ -1,23 +1,25 @@
 import numpy as np
 import uuid
 import json
-import base64
+import hashlib
+import os
 import cv2
 import sqlite3
 from datetime import datetime
+from scipy import sparse
 from sklearn.cluster import DBSCAN
-from sklearn.neighbors import NearestNeighbors
+from sklearn.neighbors import NearestNeighbors, sort_graph_by_row_values
 from sklearn.metrics.pairwise import cosine_distances
-from sklearn.metrics.pairwise import cosine_similarity
 
 
 from collections import defaultdict, Counter
-from typing import List, Dict, Optional, Union, Tuple
+from typing import List, Dict, Optional, Set, Union, Tuple
 from numpy.typing import NDArray
-from app.database.connection import get_db_connection
+from app.database.connection import db_connect, get_db_connection
 
 from app.database.faces import (
     db_get_all_faces_with_cluster_names,
+    db_get_faces_by_cluster_ids,
     db_update_face_cluster_ids_batch,
     db_get_faces_unassigned_clusters,
     db_get_cluster_mean_embeddings,
@@ -25,14 +27,19 @@ from app.database.faces import (
 )
 from app.database.face_clusters import (
     db_delete_all_clusters,
+    db_get_all_clusters,
+    db_get_cluster_cover_paths,
+    db_get_cluster_sizes,
     db_insert_clusters_batch,
     db_get_clusters_count,
+    db_merge_clusters,
 )
 from app.database.metadata import (
     db_get_metadata,
     db_update_metadata,
 )
 from app.config.settings import (
+    CLUSTER_COVERS_PATH,
     DATABASE_PATH,
     PICTO_CLUSTERING_EPS,
     PICTO_CLUSTERING_MIN_SAMPLES,
@@ -72,10 +79,12 @@ class ClusterResult:
 
 def cluster_util_is_reclustering_needed(metadata) -> bool:
     """
-    Check if reclustering is needed based on:
-    1. Time since last clustering (24 hours)
-    2. Number of faces without cluster ID (> 100)
-    3. No clusters existing yet while faces are waiting to be assigned
+    Check if a full reclustering is needed based on:
+    1. Time since last clustering (PICTO_CLUSTERING_FULL_REBUILD_HOURS, off by default)
+    2. No clusters existing yet while faces are waiting to be assigned
+
+    Otherwise the incremental pass handles new faces, including ones that
+    match no existing cluster.
 
     Returns:
         bool: True if reclustering is needed, False otherwise
@@ -83,27 +92,29 @@ def cluster_util_is_reclustering_needed(metadata) -> bool:
     if not metadata:
         return True  # No metadata means we need to recluster
 
+    from app.config.settings import PICTO_CLUSTERING_FULL_REBUILD_HOURS
+
     last_reclustering_time = metadata.get("reclustering_time")
 
-    # Check if more than 24 hours have passed since last reclustering
-    if last_reclustering_time:
+    # Check if the rebuild interval has passed since last reclustering
+    if last_reclustering_time and PICTO_CLUSTERING_FULL_REBUILD_HOURS > 0:
         try:
             last_time = datetime.fromtimestamp(float(last_reclustering_time))
             time_since_last_reclustering = (datetime.now() - last_time).total_seconds()
-            if time_since_last_reclustering > 86400:  # 24 hours in seconds
+            if (
+                time_since_last_reclustering
+                > PICTO_CLUSTERING_FULL_REBUILD_HOURS * 3600
+            ):
                 return True
         except (ValueError, TypeError):
             # If we can't parse the time, assume we need to recluster
             return True
 
-    # Check if number of faces without cluster ID is greater than 100
-    unassigned_faces = db_get_faces_unassigned_clusters()
-    if len(unassigned_faces) > 100:
-        return True
+    unassigned_face_ids, _, _ = db_get_faces_unassigned_clusters()
 
     # Incremental assignment matches faces against the means of existing clusters, so
     # it can never create the first one. Bootstrap that case with a full pass.
-    if unassigned_faces and db_get_clusters_count() == 0:
+    if unassigned_face_ids and db_get_clusters_count() == 0:
         return True
 
     return False
@@ -112,10 +123,11 @@ def cluster_util_is_reclustering_needed(metadata) -> bool:
 def cluster_util_face_clusters_sync(force_full_reclustering: bool = False):
     """
     Smart face clustering with transaction safety.
-    Decides between full reclustering or incremental assignment based on 24-hour rule and face count.
+    Decides between full reclustering and an incremental pass (see
+    cluster_util_is_reclustering_needed and cluster_util_recluster_incremental).
 
     Args:
-        force_full_reclustering: If True, forces full reclustering regardless of 24-hour rule
+        force_full_reclustering: If True, forces full reclustering regardless of the rebuild interval
     """
     metadata = db_get_metadata()
     if force_full_reclustering or cluster_util_is_reclustering_needed(metadata):
@@ -133,6 +145,7 @@ def cluster_util_face_clusters_sync(force_full_reclustering: bool = False):
                 current_metadata = metadata or {}
                 current_metadata["reclustering_time"] = datetime.now().timestamp()
                 db_update_metadata(current_metadata, cursor)
+            _prune_cluster_covers(set())
             return 0, total_faces_skipped
 
         results = [result.to_dict() for result in results]
@@ -146,13 +159,14 @@ def cluster_util_face_clusters_sync(force_full_reclustering: bool = False):
                 unique_clusters[cluster_id] = {
                     "cluster_id": cluster_id,
                     "cluster_name": cluster_name,
-                    "face_image_base64": None,  # Will be updated later
+                    "face_image_path": None,  # Will be updated later
                 }
 
         # Convert to list for batch insert
         cluster_list = list(unique_clusters.values())
 
         # Perform all database operations within a single transaction
+        cover_paths = set()
         with get_db_connection() as conn:
             cursor = conn.cursor()
             # Clear old clusters first
@@ -164,23 +178,26 @@ def cluster_util_face_clusters_sync(force_full_reclustering: bool = False):
             # Now update face cluster assignments (foreign keys will be valid)
             db_update_face_cluster_ids_batch(results, cursor)
 
-            # Finally, generate and update face images for each cluster
+            # Finally, point each cluster at its cover crop; crops of
+            # unchanged covers are reused from disk
             for cluster_id in unique_clusters.keys():
-                face_image_base64 = _generate_cluster_face_image(cluster_id, cursor)
-                if face_image_base64:
+                face_image_path = _generate_cluster_face_image(cluster_id, cursor)
+                if face_image_path:
                     # Update the cluster with the generated face image
                     success = _update_cluster_face_image(
-                        cluster_id, face_image_base64, cursor
+                        cluster_id, face_image_path, cursor
                     )
                     if not success:
                         raise RuntimeError(
                             f"Failed to update face image for cluster {cluster_id}"
                         )
+                    cover_paths.add(face_image_path)
 
             # Update metadata with new reclustering time, preserving other values
             current_metadata = metadata or {}
             current_metadata["reclustering_time"] = datetime.now().timestamp()
             db_update_metadata(current_metadata, cursor)
+        _prune_cluster_covers(cover_paths)
         return len(cluster_list), total_faces_skipped
     else:
         face_cluster_mappings, total_faces_skipped = (
@@ -189,7 +206,14 @@ def cluster_util_face_clusters_sync(force_full_reclustering: bool = False):
         with get_db_connection() as conn:
             cursor = conn.cursor()
             db_update_face_cluster_ids_batch(face_cluster_mappings, cursor)
-        return len(face_cluster_mappings), total_faces_skipped
+        # Faces that matched no cluster, and the clusters that just changed
+        newly_clustered = cluster_util_recluster_incremental(
+            {mapping["cluster_id"] for mapping in face_cluster_mappings}
+        )
+        # Merges, splits and deleted faces drop clusters and move covers
+        # here too, not only in a full recluster
+        _prune_cluster_covers(db_get_cluster_cover_paths())
+        return len(face_cluster_mappings) + newly_clustered, total_faces_skipped
 
 
 def _validate_embedding(embedding: NDArray, min_norm: float = 1e-6) -> bool:
@@ -215,6 +239,15 @@ def _validate_embedding(embedding: NDArray, min_norm: float = 1e-6) -> bool:
     return True
 
 
+def _valid_embedding_rows(embeddings: NDArray, min_norm: float = 1e-6) -> NDArray:
+    """Row-wise _validate_embedding over an [N, D] matrix, as a boolean mask."""
+    if embeddings.size == 0:
+        return np.zeros(len(embeddings), dtype=bool)
+    finite = np.isfinite(embeddings).all(axis=1)
+    norms = np.linalg.norm(np.where(finite[:, None], embeddings, 0), axis=1)
+    return finite & (norms >= min_norm)
+
+
 def estimate_eps(embeddings: np.ndarray, k: int) -> Optional[float]:
     if len(embeddings) <= k:
         return None
@@ -229,6 +262,172 @@ def estimate_eps(embeddings: np.ndarray, k: int) -> Optional[float]:
     return float(estimated_eps)
 
 
+def _clamp_eps(
+    estimated_eps: Optional[float],
+    eps: float,
+    max_distance: float,
+    similarity_threshold: float,
+) -> float:
+    """The adaptive eps, capped at max_distance; `eps` when there is no estimate."""
+    if estimated_eps is None:
+        logger.warning(
+            f"Too few embeddings for eps estimation, using config default: {eps}"
+        )
+        return eps
+
+    clamped_eps = min(estimated_eps, max_distance)
+    # DBSCAN requires eps to be strictly positive
+    clamped_eps = max(clamped_eps, 1e-6)
+    if clamped_eps < estimated_eps:
+        logger.warning(
+            f"Adaptive eps {estimated_eps:.4f} exceeded max_distance "
+            f"{max_distance:.4f} (similarity_threshold={similarity_threshold}); "
+            f"clamping to {clamped_eps:.4f}"
+        )
+    else:
+        logger.info(f"Adaptive eps estimated: {clamped_eps:.4f}")
+    return clamped_eps
+
+
+def _dbscan_labels_dense(
+    embeddings_array: NDArray,
+    eps: float,
+    min_samples: int,
+    similarity_threshold: float,
+) -> NDArray:
+    """DBSCAN over the full N x N cosine distance matrix. O(N^2) memory."""
+    # Calculate pairwise distances with similarity threshold
+    distances = cosine_distances(embeddings_array)
+
+    # Guard against NaN distances (shouldn't happen after validation, but double-check)
+    if not np.isfinite(distances).all():
+        logger.error(
+            "NaN or infinite values detected in distance matrix after validation"
+        )
+        # Replace NaN/inf with max distance (1.0)
+        distances = np.nan_to_num(distances, nan=1.0, posinf=1.0, neginf=1.0)
+
+    # Apply similarity threshold - mark dissimilar faces as completely different
+    max_distance = 1 - similarity_threshold  # Convert similarity to distance
+    distances[distances > max_distance] = 1.0  # Mark as completely different
+    logger.info(
+        f"Applied similarity threshold: {similarity_threshold} (max_distance: {max_distance:.3f})"
+    )
+
+    estimated_eps = estimate_eps(embeddings_array, k=min_samples)
+    eps = _clamp_eps(estimated_eps, eps, max_distance, similarity_threshold)
+
+    # Perform DBSCAN clustering with precomputed distances
+    dbscan = DBSCAN(
+        eps=eps,
+        min_samples=min_samples,
+        metric="precomputed",
+        n_jobs=-1,  # Use all available CPU cores
+    )
+    return dbscan.fit_predict(distances)
+
+
+# Distance entries computed per block when building the sparse graph (64 MB)
+_GRAPH_BLOCK_ELEMENTS = 1 << 24
+
+
+def cluster_util_radius_neighbors_graph(
+    embeddings: NDArray, radius: float, k: int
+) -> Tuple[sparse.csr_matrix, Optional[NDArray]]:
+    """
+    Sparse cosine-distance graph keeping only pairs within `radius`.
+
+    Rows are scored in blocks of about _GRAPH_BLOCK_ELEMENTS distances, so
+    memory is the kept edges plus one block, never N x N. The same pass
+    records each row's distance to its k-th nearest neighbour (self
+    excluded), which is what estimate_eps reads, or None when N <= k.
+
+    Each row stores its own zero distance explicitly: DBSCAN treats only
+    stored entries of a sparse graph as neighbours.
+    """
+    n = len(embeddings)
+    unit = np.asarray(embeddings, dtype=np.float32)
+    unit = unit / np.maximum(np.linalg.norm(unit, axis=1, keepdims=True), 1e-12)
+    block_rows = max(1, _GRAPH_BLOCK_ELEMENTS // max(n, 1))
+
+    kth = np.empty(n, dtype=np.float32) if n > k else None
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    indices, data = [], []
+    for start in range(0, n, block_rows):
+        stop = min(start + block_rows, n)
+        block = 1.0 - unit[start:stop] @ unit.T
+        np.clip(block, 0.0, 2.0, out=block)
+        # Round-off can leave the self-distance just above zero
+        block[np.arange(stop - start), np.arange(start, stop)] = 0.0
+        if kth is not None:
+            kth[start:stop] = np.partition(block, k, axis=1)[:, k]
+
+        rows, cols = np.nonzero(block <= radius)
+        indices.append(cols.astype(np.int32))
+        data.append(block[rows, cols])
+        indptr[start + 1 : stop + 1] = np.bincount(rows, minlength=stop - start)
+
+    np.cumsum(indptr, out=indptr)
+    graph = sparse.csr_matrix(
+        (np.concatenate(data), np.concatenate(indices), indptr), shape=(n, n)
+    )
+    return graph, kth
+
+
+def _dbscan_labels_sparse(
+    embeddings_array: NDArray,
+    eps: float,
+    min_samples: int,
+    similarity_threshold: float,
+) -> NDArray:
+    """
+    DBSCAN over a radius-neighbour graph. O(N * neighbours) memory.
+
+    Same neighbourhoods as the dense path: there, pairs beyond max_distance
+    are pushed to 1.0 and eps never exceeds max_distance once estimated, so
+    only pairs within max_distance can ever be neighbours.
+    """
+    max_distance = 1 - similarity_threshold
+    graph, kth = cluster_util_radius_neighbors_graph(
+        embeddings_array, max_distance, k=min_samples
+    )
+    logger.info(
+        f"Sparse neighbour graph: {graph.nnz} edge(s) within {max_distance:.3f} "
+        f"for {graph.shape[0]} faces"
+    )
+
+    estimated_eps = None
+    if kth is not None:
+        estimated_eps = float(np.percentile(kth, 90))
+    eps = min(
+        _clamp_eps(estimated_eps, eps, max_distance, similarity_threshold),
+        max_distance,
+    )
+
+    # DBSCAN's neighbour lookup wants each row ordered by distance
+    graph = sort_graph_by_row_values(graph, copy=False, warn_when_not_sorted=False)
+    dbscan = DBSCAN(eps=eps, min_samples=min_samples, metric="precomputed", n_jobs=-1)
+    return dbscan.fit_predict(graph)
+
+
+def _dbscan_labels(
+    embeddings_array: NDArray,
+    eps: float,
+    min_samples: int,
+    similarity_threshold: float,
+) -> NDArray:
+    """DBSCAN labels, on the sparse graph for large inputs and dense otherwise."""
+    from app.config.settings import PICTO_CLUSTERING_SPARSE_MIN_FACES
+
+    if len(embeddings_array) >= PICTO_CLUSTERING_SPARSE_MIN_FACES:
+        return _dbscan_labels_sparse(
+            embeddings_array, eps, min_samples, similarity_threshold
+        )
+    return _dbscan_labels_dense(
+        embeddings_array, eps, min_samples, similarity_threshold
+    )
+
+
 def cluster_util_cluster_all_face_embeddings(
     eps: float = PICTO_CLUSTERING_EPS,
     min_samples: int = PICTO_CLUSTERING_MIN_SAMPLES,
@@ -248,93 +447,41 @@ def cluster_util_cluster_all_face_embeddings(
         List of ClusterResult objects containing face_id, embedding, cluster_uuid, and cluster_name
     """
     # Get all faces with their existing cluster names
-    faces_data = db_get_all_faces_with_cluster_names()
+    all_face_ids, all_image_ids, all_cluster_names, all_embeddings = (
+        db_get_all_faces_with_cluster_names()
+    )
 
-    if not faces_data:
+    if not all_face_ids:
         return [], 0
 
-    # Extract embeddings and face IDs with validation
-    embeddings = []
-    face_ids = []
-    image_ids = []
-    existing_cluster_names = []
-    invalid_count = 0
-
-    for face in faces_data:
-        embedding = face["embeddings"]
-
-        # Validate embedding before adding
-        if _validate_embedding(embedding):
-            face_ids.append(face["face_id"])
-            image_ids.append(face.get("image_id"))
-            embeddings.append(embedding)
-            existing_cluster_names.append(face["cluster_name"])
-        else:
-            invalid_count += 1
-            logger.warning(
-                f"Skipping invalid embedding for face_id {face['face_id']} (NaN or zero vector)"
-            )
+    # Validate every embedding at once; one bad row must not poison distances
+    valid = _valid_embedding_rows(all_embeddings)
+    for i in np.flatnonzero(~valid):
+        logger.warning(
+            f"Skipping invalid embedding for face_id {all_face_ids[i]} (NaN or zero vector)"
+        )
+    invalid_count = int(np.count_nonzero(~valid))
 
     if invalid_count > 0:
         logger.warning(f"Filtered out {invalid_count} invalid embeddings")
 
     total_faces_skipped = invalid_count
 
-    if not embeddings:
+    keep = np.flatnonzero(valid)
+    if not len(keep):
         logger.error("No valid embeddings found after validation")
         return [], total_faces_skipped
 
-    logger.info(f"Total valid faces to cluster: {len(face_ids)}")
-
-    # Convert to numpy array for DBSCAN
-    embeddings_array = np.array(embeddings)
-
-    # Calculate pairwise distances with similarity threshold
-    distances = cosine_distances(embeddings_array)
-
-    # Guard against NaN distances (shouldn't happen after validation, but double-check)
-    if not np.isfinite(distances).all():
-        logger.error(
-            "NaN or infinite values detected in distance matrix after validation"
-        )
-        # Replace NaN/inf with max distance (1.0)
-        distances = np.nan_to_num(distances, nan=1.0, posinf=1.0, neginf=1.0)
-
-    # Apply similarity threshold - mark dissimilar faces as completely different
-    max_distance = 1 - similarity_threshold  # Convert similarity to distance
-    distances[distances > max_distance] = 1.0  # Mark as completely different
-    logger.info(
-        f"Applied similarity threshold: {similarity_threshold} (max_distance: {max_distance:.3f})"
-    )
+    face_ids = [all_face_ids[i] for i in keep]
+    image_ids = [all_image_ids[i] for i in keep]
+    existing_cluster_names = [all_cluster_names[i] for i in keep]
+    embeddings_array = all_embeddings[keep] if invalid_count else all_embeddings
 
-    estimated_eps = estimate_eps(embeddings_array, k=min_samples)
-    if estimated_eps is not None:
-        clamped_eps = min(estimated_eps, max_distance)
-        # DBSCAN requires eps to be strictly positive
-        clamped_eps = max(clamped_eps, 1e-6)
-        if clamped_eps < estimated_eps:
-            logger.warning(
-                f"Adaptive eps {estimated_eps:.4f} exceeded max_distance "
-                f"{max_distance:.4f} (similarity_threshold={similarity_threshold}); "
-                f"clamping to {clamped_eps:.4f}"
-            )
-        else:
-            logger.info(f"Adaptive eps estimated: {clamped_eps:.4f}")
-        eps = clamped_eps
-    else:
-        logger.warning(
-            f"Too few embeddings for eps estimation, using config default: {eps}"
-        )
+    logger.info(f"Total valid faces to cluster: {len(face_ids)}")
 
-    # Perform DBSCAN clustering with precomputed distances
-    dbscan = DBSCAN(
-        eps=eps,
-        min_samples=min_samples,
-        metric="precomputed",
-        n_jobs=-1,  # Use all available CPU cores
+    cluster_labels = _dbscan_labels(
+        embeddings_array, eps, min_samples, similarity_threshold
     )
-
-    cluster_labels = dbscan.fit_predict(distances)
     logger.info(
         f"DBSCAN found {len(set(cluster_labels)) - (1 if -1 in cluster_labels else 0)} clusters"
     )
@@ -347,7 +494,7 @@ def cluster_util_cluster_all_face_embeddings(
             clusters[label].append(
                 {
                     "face_id": face_ids[i],
-                    "embedding": embeddings[i],
+                    "embedding": embeddings_array[i],
                     "existing_cluster_name": existing_cluster_names[i],
                 }
             )
@@ -403,6 +550,9 @@ def cluster_util_assign_cluster_to_faces_without_clusterId(
     4. Only assigns if similarity is above the threshold to prevent poor matches
     5. Returns the mappings without updating the database
 
+    Cluster means come from the centroids stored on face_clusters, so only
+    C rows are loaded rather than every clustered face.
+
     Args:
         similarity_threshold:
             Minimum cosine similarity required for assignment (0.0 to 1.0)
@@ -412,99 +562,316 @@ def cluster_util_assign_cluster_to_faces_without_clusterId(
         List of face-cluster mappings ready for batch update
     """
     # Get faces without cluster assignments
-    unassigned_faces = db_get_faces_unassigned_clusters()
-    if not unassigned_faces:
+    face_ids, image_ids, face_embeddings = db_get_faces_unassigned_clusters()
+    if not face_ids:
         return [], 0
 
     # Get cluster mean embeddings
-    cluster_means = db_get_cluster_mean_embeddings()
+    all_cluster_ids, all_means = db_get_cluster_mean_embeddings()
 
-    if not cluster_means:
+    if not all_cluster_ids:
         return [], 0
 
-    # Prepare data for nearest neighbor assignment with validation
-    cluster_ids = []
-    mean_embeddings = []
-    invalid_clusters = 0
-
-    for cluster_data in cluster_means:
-        mean_emb = cluster_data["mean_embedding"]
-
-        # Validate cluster mean embedding
-        if _validate_embedding(mean_emb):
-            cluster_ids.append(cluster_data["cluster_id"])
-            mean_embeddings.append(mean_emb)
-        else:
-            invalid_clusters += 1
-            logger.warning(
-                f"Skipping invalid cluster mean for cluster_id {cluster_data['cluster_id']}"
-            )
+    # Validate cluster means
+    valid_means = _valid_embedding_rows(all_means)
+    for i in np.flatnonzero(~valid_means):
+        logger.warning(
+            f"Skipping invalid cluster mean for cluster_id {all_cluster_ids[i]}"
+        )
+    invalid_clusters = int(np.count_nonzero(~valid_means))
 
     if invalid_clusters > 0:
         logger.warning(f"Filtered out {invalid_clusters} invalid cluster means")
 
-    if not mean_embeddings:
+    if not valid_means.any():
         logger.error("No valid cluster means found after validation")
         return [], 0
 
-    mean_embeddings_array = np.array(mean_embeddings)
+    cluster_ids = [all_cluster_ids[i] for i in np.flatnonzero(valid_means)]
+    mean_embeddings_array = all_means[valid_means]
 
     # (cluster_id, image_id) pairs already taken; a photo's faces are distinct people
     occupied_pairs = db_get_cluster_image_pairs()
 
+    # Nearest cluster mean for every face at once
+    valid_faces = _valid_embedding_rows(face_embeddings)
+    skipped_invalid = int(np.count_nonzero(~valid_faces))
+    for i in np.flatnonzero(~valid_faces):
+        logger.warning(f"Skipping face_id {face_ids[i]} with invalid embedding")
+    # Invalid rows only affect their own scores, which are ignored below
+    with np.errstate(invalid="ignore"):
+        nearest, similarities = _nearest_centroids(
+            face_embeddings, mean_embeddings_array
+        )
+
     # Prepare batch update data
     face_cluster_mappings = []
-    skipped_invalid = 0
-
-    for face in unassigned_faces:
-        face_id = face["face_id"]
-        face_embedding = face["embeddings"]
+    # Only assign if similarity is above threshold
+    for i in np.flatnonzero(valid_faces & (similarities >= similarity_threshold)):
+        image_id = image_ids[i]
+        nearest_cluster_id = cluster_ids[nearest[i]]
 
-        # Validate face embedding
-        if not _validate_embedding(face_embedding):
-            skipped_invalid += 1
-            logger.warning(f"Skipping face_id {face_id} with invalid embedding")
+        if image_id is not None and (nearest_cluster_id, image_id) in occupied_pairs:
             continue
 
-        # Calculate cosine distances to all cluster means
-        distances = _calculate_cosine_distances(face_embedding, mean_embeddings_array)
+        # The embedding lets the update fold the face into the
+        # cluster's stored centroid
+        face_cluster_mappings.append(
+            {
+                "face_id": face_ids[i],
+                "cluster_id": nearest_cluster_id,
+                "embedding": face_embeddings[i],
+            }
+        )
+        if image_id is not None:
+            occupied_pairs.add((nearest_cluster_id, image_id))
+
+    if skipped_invalid > 0:
+        logger.warning(
+            f"Skipped {skipped_invalid} faces with invalid embeddings during assignment"
+        )
+
+    total_faces_skipped = skipped_invalid
+
+    return face_cluster_mappings, total_faces_skipped
+
+
+def cluster_util_recluster_incremental(
+    affected_cluster_ids: Set[str],
+    eps: float = PICTO_CLUSTERING_EPS,
+    min_samples: int = PICTO_CLUSTERING_MIN_SAMPLES,
+    similarity_threshold: float = PICTO_CLUSTERING_SIMILARITY_THRESHOLD,
+    merge_threshold: Optional[float] = None,
+) -> int:
+    """
+    Update clusters around what changed instead of rebuilding all of them.
+
+    Runs after new faces were assigned to their nearest cluster:
+    1. Faces still unassigned are clustered among themselves with DBSCAN,
+       and each group becomes a new cluster
+    2. Unnamed clusters that gained faces are split when they fall apart
+       into groups the merge step would not reunite
+    3. Changed clusters merge into the most similar cluster, if any, within
+       the merge threshold
+
+    Clusters not involved keep their faces, and merges keep the id (and
+    name) of the named or, failing that, the larger cluster. Two clusters
+    with different user-given names, or with a photo in common, are never
+    merged.
+
+    Args:
+        affected_cluster_ids: Clusters that gained faces in this sync
+        eps: DBSCAN epsilon for the new faces (adaptive, as in the full pass)
+        min_samples: DBSCAN minimum samples parameter
+        similarity_threshold: Minimum similarity to consider same person
+        merge_threshold: Similarity for merging clusters (default: PICTO_CLUSTERING_MERGE_THRESHOLD)
+
+    Returns:
+        Number of previously unassigned faces placed in new clusters
+    """
+    if merge_threshold is None:
+        merge_threshold = PICTO_CLUSTERING_MERGE_THRESHOLD
+    affected = set(affected_cluster_ids)
 
-        # Guard against NaN distances
-        if not np.isfinite(distances).all():
-            logger.warning(f"NaN distances for face_id {face_id}, skipping")
-            skipped_invalid += 1
+    new_faces = _cluster_leftover_faces(eps, min_samples, similarity_threshold)
+    split_faces, split_sources = _split_disconnected_clusters(
+        affected, min_samples, similarity_threshold, merge_threshold
+    )
+    moved = new_faces + split_faces
+    if moved:
+        new_cluster_ids = list(dict.fromkeys(result.cluster_uuid for result in moved))
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            db_insert_clusters_batch(
+                [
+                    {"cluster_id": cluster_id, "cluster_name": None}
+                    for cluster_id in new_cluster_ids
+                ],
+                cursor,
+            )
+            db_update_face_cluster_ids_batch(
+                [result.to_dict() for result in moved], cursor
+            )
+        affected.update(new_cluster_ids)
+        logger.info(
+            f"Incremental clustering: {len(new_faces)} new face(s) and "
+            f"{len(split_faces)} split face(s) in {len(new_cluster_ids)} new cluster(s)"
+        )
+
+    merges = _merge_affected_clusters(affected, merge_threshold)
+
+    # Covers of clusters whose members changed; unchanged ones are cached
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        changed = affected | split_sources | set(merges.values())
+        for cluster_id in sorted(changed - set(merges)):
+            face_image_path = _generate_cluster_face_image(cluster_id, cursor)
+            if face_image_path:
+                _update_cluster_face_image(cluster_id, face_image_path, cursor)
+
+    return len(new_faces)
+
+
+def _cluster_leftover_faces(
+    eps: float, min_samples: int, similarity_threshold: float
+) -> List[ClusterResult]:
+    """DBSCAN over the faces no existing cluster took, as new clusters."""
+    face_ids, image_ids, embeddings = db_get_faces_unassigned_clusters()
+    keep = np.flatnonzero(_valid_embedding_rows(embeddings))
+    if len(keep) < min_samples:
+        return []
+
+    labels = _dbscan_labels(embeddings[keep], eps, min_samples, similarity_threshold)
+    cluster_uuids = {}
+    results = []
+    for row, label in zip(keep, labels):
+        if label == -1:
             continue
+        if label not in cluster_uuids:
+            cluster_uuids[label] = str(uuid.uuid4())
+        results.append(
+            ClusterResult(
+                face_id=face_ids[row],
+                embedding=embeddings[row],
+                cluster_uuid=cluster_uuids[label],
+                cluster_name=None,
+            )
+        )
+    return _enforce_one_face_per_image(results, dict(zip(face_ids, image_ids)))
 
-        # Find the best match
-        min_distance = np.min(distances)
-        max_similarity = 1 - min_distance
 
-        # Only assign if similarity is above threshold
-        if max_similarity >= similarity_threshold:
-            nearest_cluster_idx = np.argmin(distances)
-            nearest_cluster_id = cluster_ids[nearest_cluster_idx]
+def _split_disconnected_clusters(
+    cluster_ids: Set[str],
+    min_samples: int,
+    similarity_threshold: float,
+    merge_threshold: float,
+) -> Tuple[List[ClusterResult], Set[str]]:
+    """
+    Faces to move out of clusters that no longer hold together.
 
-            image_id = face.get("image_id")
-            if (
-                image_id is not None
-                and (nearest_cluster_id, image_id) in occupied_pairs
-            ):
-                continue
+    A cluster's faces are grouped by DBSCAN at eps = max_distance, which
+    only separates groups with no chain of similar faces between them.
+    Groups whose means are close enough for _merge_similar_clusters stay
+    together, so this never undoes a merge the full pass would make. The
+    largest group keeps the cluster; noise faces stay with it too. Named
+    clusters are left alone: the user has said who they are.
 
-            face_cluster_mappings.append(
-                {"face_id": face_id, "cluster_id": nearest_cluster_id}
+    Returns:
+        (faces moving to new clusters, ids of the clusters they leave)
+    """
+    names = {c["cluster_id"]: c["cluster_name"] for c in db_get_all_clusters()}
+    candidates = sorted(c for c in cluster_ids if c in names and not names[c])
+    face_ids, _, face_cluster_ids, embeddings = db_get_faces_by_cluster_ids(candidates)
+    max_distance = 1 - similarity_threshold
+
+    moved, sources = [], set()
+    starts = [0] + [
+        i
+        for i in range(1, len(face_cluster_ids))
+        if face_cluster_ids[i] != face_cluster_ids[i - 1]
+    ]
+    for start, stop in zip(starts, starts[1:] + [len(face_cluster_ids)]):
+        if stop - start < 2 * min_samples:
+            continue  # Too small to hold two groups
+        members = embeddings[start:stop]
+        graph, _ = cluster_util_radius_neighbors_graph(
+            members, max_distance, k=min_samples
+        )
+        graph = sort_graph_by_row_values(graph, copy=False, warn_when_not_sorted=False)
+        labels = DBSCAN(
+            eps=max_distance, min_samples=min_samples, metric="precomputed"
+        ).fit_predict(graph)
+        if len(set(labels.tolist()) - {-1}) < 2:
+            continue
+
+        groups = [
+            ClusterResult(
+                face_id=face_ids[start + i],
+                embedding=members[i],
+                cluster_uuid=f"group-{label}",
+                cluster_name=None,
             )
-            if image_id is not None:
-                occupied_pairs.add((nearest_cluster_id, image_id))
+            for i, label in enumerate(labels)
+            if label != -1
+        ]
+        groups = _merge_similar_clusters(groups, merge_threshold=merge_threshold)
+        sizes = Counter(result.cluster_uuid for result in groups)
+        if len(sizes) < 2:
+            continue
 
-    if skipped_invalid > 0:
-        logger.warning(
-            f"Skipped {skipped_invalid} faces with invalid embeddings during assignment"
+        largest = sizes.most_common(1)[0][0]
+        new_uuids = {label: str(uuid.uuid4()) for label in sizes if label != largest}
+        for result in groups:
+            if result.cluster_uuid != largest:
+                result.cluster_uuid = new_uuids[result.cluster_uuid]
+                moved.append(result)
+        sources.add(face_cluster_ids[start])
+        logger.info(
+            f"Splitting {len(new_uuids)} group(s) off cluster {face_cluster_ids[start]}"
         )
+    return moved, sources
 
-    total_faces_skipped = skipped_invalid
 
-    return face_cluster_mappings, total_faces_skipped
+def _merge_affected_clusters(
+    cluster_ids: Set[str], merge_threshold: float
+) -> Dict[str, str]:
+    """
+    Merge each changed cluster into its most similar cluster, if any is
+    within merge_threshold. Every cluster takes part in at most one merge
+    per pass, so no merge chains through another.
+
+    Returns:
+        Mapping of merged-away cluster id -> the cluster id it joined
+    """
+    all_cluster_ids, means = db_get_cluster_mean_embeddings()
+    if len(all_cluster_ids) < 2 or not cluster_ids:
+        return {}
+
+    sizes = db_get_cluster_sizes()
+    names = {c["cluster_id"]: c["cluster_name"] for c in db_get_all_clusters()}
+    images = defaultdict(set)
+    for cluster_id, image_id in db_get_cluster_image_pairs():
+        images[cluster_id].add(image_id)
+
+    unit = np.where(_valid_embedding_rows(means)[:, None], means, 0.0)
+    unit = unit / np.maximum(np.linalg.norm(unit, axis=1, keepdims=True), 1e-12)
+    position = {cluster_id: i for i, cluster_id in enumerate(all_cluster_ids)}
+
+    merges = {}
+    consumed = set()
+    for a in sorted(cluster_ids):
+        if a not in position or a in consumed:
+            continue
+        similarities = unit @ unit[position[a]]
+        for j in np.argsort(-similarities):
+            if similarities[j] < merge_threshold:
+                break
+            b = all_cluster_ids[j]
+            if b == a or b in consumed:
+                continue
+            if names.get(a) and names.get(b) and names[a] != names[b]:
+                continue
+            if images[a] & images[b]:
+                continue  # A photo's faces are different people
+
+            # Keep the id that carries a user name, else the larger cluster
+            rank_a = (bool(names.get(a)), sizes.get(a, 0))
+            rank_b = (bool(names.get(b)), sizes.get(b, 0))
+            target, source = (a, b) if rank_a >= rank_b else (b, a)
+            merges[source] = target
+            consumed.update((a, b))
+            logger.info(
+                f"Merging cluster {source} into {target} "
+                f"(similarity: {similarities[j]:.3f})"
+            )
+            break
+
+    if merges:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            for source, target in merges.items():
+                db_merge_clusters(source, target, cursor)
+    return merges
 
 
 def _enforce_one_face_per_image(
@@ -573,86 +940,66 @@ def _merge_similar_clusters(
     if not results:
         return results
 
-    # Group faces by cluster
-    cluster_map = defaultdict(list)
-    for result in results:
-        cluster_map[result.cluster_uuid].append(result)
-
-    if len(cluster_map) <= 1:
+    # Group faces by cluster, in order of first appearance
+    cluster_uuids = list(dict.fromkeys(result.cluster_uuid for result in results))
+    if len(cluster_uuids) <= 1:
         return results  # Nothing to merge
 
-    # Calculate mean embedding for each cluster with validation
-    cluster_means = {}
-    invalid_clusters = []
-
-    for cluster_uuid, cluster_faces in cluster_map.items():
-        embeddings = np.array([face.embedding for face in cluster_faces])
-        mean_embedding = np.mean(embeddings, axis=0)
-
-        # Validate cluster mean
-        if _validate_embedding(mean_embedding):
-            cluster_means[cluster_uuid] = mean_embedding
-        else:
-            invalid_clusters.append(cluster_uuid)
-            logger.warning(
-                f"Cluster {cluster_uuid} has invalid mean embedding, excluding from merge"
-            )
-
-    # Remove invalid clusters from consideration
-    for invalid_uuid in invalid_clusters:
-        cluster_map.pop(invalid_uuid, None)
-
-    if len(cluster_means) <= 1:
+    # Mean embedding of every cluster in one pass
+    position = {cluster_uuid: i for i, cluster_uuid in enumerate(cluster_uuids)}
+    labels = np.fromiter(
+        (position[result.cluster_uuid] for result in results), np.intp, len(results)
+    )
+    embeddings = np.stack([np.asarray(result.embedding) for result in results])
+    order = np.argsort(labels, kind="stable")
+    counts = np.bincount(labels, minlength=len(cluster_uuids))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    means = np.add.reduceat(embeddings[order], starts, axis=0) / counts[:, None]
+
+    valid = _valid_embedding_rows(means)
+    for i in np.flatnonzero(~valid):
+        logger.warning(
+            f"Cluster {cluster_uuids[i]} has invalid mean embedding, excluding from merge"
+        )
+    candidates = np.flatnonzero(valid)
+    if len(candidates) <= 1:
         return results  # Not enough valid clusters to merge
 
-    # Find clusters to merge based on similarity
-    cluster_uuids = list(cluster_means.keys())
-    merge_mapping = {}  # Maps old cluster_uuid -> new cluster_uuid
-
-    for i, uuid1 in enumerate(cluster_uuids):
-        if uuid1 in merge_mapping:
-            continue  # Already merged
-
-        for j in range(i + 1, len(cluster_uuids)):
-            uuid2 = cluster_uuids[j]
-            if uuid2 in merge_mapping:
-                continue  # Already merged
+    unit = means[candidates]
+    unit = unit / np.linalg.norm(unit, axis=1, keepdims=True)
 
-            # Calculate similarity between cluster means
-            emb1 = cluster_means[uuid1].reshape(1, -1)
-            emb2 = cluster_means[uuid2].reshape(1, -1)
-
-            similarity = cosine_similarity(emb1, emb2)[0][0]
-
-            # Guard against NaN similarity
-            if not np.isfinite(similarity):
-                logger.warning(
-                    f"NaN similarity between clusters {uuid1} and {uuid2}, skipping merge"
-                )
+    # Each cluster, in order, absorbs every later cluster not yet absorbed
+    # whose mean is within merge_threshold. Targets are never absorbed
+    # themselves, so every merge points straight at its final cluster.
+    # Similarities are computed a block of rows at a time.
+    absorbed = np.zeros(len(candidates), dtype=bool)
+    merge_mapping = {}  # Maps old cluster_uuid -> new cluster_uuid
+    block_rows = max(1, _GRAPH_BLOCK_ELEMENTS // len(candidates))
+    for block_start in range(0, len(candidates), block_rows):
+        similarities = unit[block_start : block_start + block_rows] @ unit.T
+        for offset, row in enumerate(similarities):
+            i = block_start + offset
+            if absorbed[i]:
                 continue
-
-            # If very similar, merge cluster2 into cluster1
-            if similarity >= merge_threshold:
-                merge_mapping[uuid2] = uuid1
+            later = np.flatnonzero(row[i + 1 :] >= merge_threshold) + i + 1
+            later = later[~absorbed[later]]
+            absorbed[later] = True
+            for j in later:
+                target, source = (
+                    cluster_uuids[candidates[i]],
+                    cluster_uuids[candidates[j]],
+                )
+                merge_mapping[source] = target
                 logger.info(
-                    f"Merging cluster {uuid2} into {uuid1} (similarity: {similarity:.3f})"
+                    f"Merging cluster {source} into {target} (similarity: {row[j]:.3f})"
                 )
 
     # Apply merges
     if merge_mapping:
-        # Resolve transitive merges (follow chain to ultimate target)
-        def resolve_final_cluster(uuid):
-            visited = set()
-            current = uuid
-            while current in merge_mapping and current not in visited:
-                visited.add(current)
-                current = merge_mapping[current]
-            return current
-
         # Build merged results with resolved cluster UUIDs
         merged_results = []
         for result in results:
-            final_cluster = resolve_final_cluster(result.cluster_uuid)
+            final_cluster = merge_mapping.get(result.cluster_uuid, result.cluster_uuid)
 
             # Create new result with updated cluster_uuid (name will be updated next)
             merged_result = ClusterResult(
@@ -692,55 +1039,53 @@ def _merge_similar_clusters(
     return results
 
 
-def _calculate_cosine_distances(
-    face_embedding: NDArray, cluster_means: NDArray
-) -> NDArray:
+def _nearest_centroids(
+    face_embeddings: NDArray, cluster_means: NDArray
+) -> Tuple[NDArray, NDArray]:
     """
-    Calculate cosine distances between a face embedding and cluster means.
-    Handles edge cases with zero vectors and ensures finite results.
+    Nearest cluster mean for every face by cosine similarity.
+
+    Means are normalized once; faces are normalized and scored a block at
+    a time, with one matrix product per block.
 
     Args:
-        face_embedding: Single face embedding vector
+        face_embeddings: Face embeddings (shape: [n_faces, embedding_dim])
         cluster_means: Array of cluster mean embeddings (shape: [n_clusters, embedding_dim])
 
     Returns:
-        Array of cosine distances to each cluster mean
+        (index of the nearest mean, its cosine similarity) for each face.
+        Zero-norm faces get similarity 0.
     """
-    # Normalize the face embedding with safe division
-    face_norm_value = np.linalg.norm(face_embedding)
-    if face_norm_value < 1e-6:
-        # Zero vector, return maximum distance to all clusters
-        return np.ones(len(cluster_means))
-    face_norm = face_embedding / face_norm_value
-
-    # Normalize cluster means with safe division
-    cluster_norm_values = np.linalg.norm(cluster_means, axis=1, keepdims=True)
-    cluster_norm_values = np.maximum(
-        cluster_norm_values, 1e-6
-    )  # Prevent division by zero
-    cluster_norms = cluster_means / cluster_norm_values
-
-    # Calculate cosine similarities (dot product of normalized vectors)
-    cosine_similarities = np.dot(cluster_norms, face_norm)
-
-    # Convert to cosine distances (1 - similarity)
-    cosine_distances = 1 - cosine_similarities
-
-    # Guard against numerical errors producing values outside [0, 2]
-    cosine_distances = np.clip(cosine_distances, 0.0, 2.0)
-
-    return cosine_distances
+    means = np.asarray(cluster_means, dtype=np.float32)
+    # Safe division: zero vectors stay zero and score 0 against everything
+    means = means / np.maximum(np.linalg.norm(means, axis=1, keepdims=True), 1e-6)
+
+    n = len(face_embeddings)
+    nearest = np.zeros(n, dtype=np.intp)
+    similarities = np.zeros(n, dtype=np.float32)
+    block_rows = max(1, _GRAPH_BLOCK_ELEMENTS // max(len(means), 1))
+    for start in range(0, n, block_rows):
+        faces = np.asarray(face_embeddings[start : start + block_rows], np.float32)
+        faces = faces / np.maximum(np.linalg.norm(faces, axis=1, keepdims=True), 1e-6)
+        block = faces @ means.T
+        best = np.argmax(block, axis=1)
+        nearest[start : start + len(block)] = best
+        similarities[start : start + len(block)] = block[np.arange(len(block)), best]
+
+    # Guard against rounding outside [-1, 1]
+    np.clip(similarities, -1.0, 1.0, out=similarities)
+    return nearest, similarities
 
 
 def _update_cluster_face_image(
-    cluster_id: str, face_image_base64: str, cursor: Optional[sqlite3.Cursor] = None
+    cluster_id: str, face_image_path: str, cursor: Optional[sqlite3.Cursor] = None
 ) -> bool:
     """
     Update the face image for a specific cluster.
 
     Args:
         cluster_id: The UUID of the cluster
-        face_image_base64: Base64 encoded face image string
+        face_image_path: Path of the cluster's cover crop
         cursor: Optional existing database cursor. If None, creates a new connection.
 
     Returns:
@@ -748,13 +1093,13 @@ def _update_cluster_face_image(
     """
     own_connection = cursor is None
     if own_connection:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = db_connect(DATABASE_PATH)
         cursor = conn.cursor()
 
     try:
         cursor.execute(
-            "UPDATE face_clusters SET face_image_base64 = ? WHERE cluster_id = ?",
-            (face_image_base64, cluster_id),
+            "UPDATE face_clusters SET face_image_path = ? WHERE cluster_id = ?",
+            (face_image_path, cluster_id),
         )
         success = cursor.rowcount > 0
         if own_connection:
@@ -776,22 +1121,24 @@ def _get_cluster_face_data(
     cluster_uuid: str, cursor: sqlite3.Cursor
 ) -> Optional[tuple]:
     """
-    Get the image path and bounding box for the first face in a cluster.
+    Get the face id, image path and bounding box for the first face in a cluster.
 
     Args:
         cluster_uuid: The UUID of the cluster
         cursor: SQLite cursor from an active transaction
 
     Returns:
-        Tuple of (image_path, bbox_dict) or None if not found
+        Tuple of (face_id, image_path, bbox_dict) or None if not found
     """
     try:
+        # Lowest face_id, so a cluster keeps its cover across reclusters
         cursor.execute(
             """
-            SELECT i.path, f.bbox
+            SELECT f.face_id, i.path, f.bbox
             FROM faces f
             JOIN images i ON f.image_id = i.id
             WHERE f.cluster_id = ?
+            ORDER BY f.face_id
             LIMIT 1
             """,
             (cluster_uuid,),
@@ -801,14 +1148,14 @@ def _get_cluster_face_data(
         if not face_data:
             return None
 
-        image_path, bbox_json = face_data
+        face_id, image_path, bbox_json = face_data
 
         if not bbox_json or not image_path:
             return None
 
         try:
             bbox = json.loads(bbox_json)
-            return (image_path, bbox)
+            return (face_id, image_path, bbox)
         except json.JSONDecodeError:
             return None
 
@@ -915,37 +1262,27 @@ def _crop_and_resize_face(
         return None
 
 
-def _encode_image_to_base64(img: np.ndarray, format: str = ".jpg") -> Optional[str]:
-    """
-    Encode an image to base64 string.
-
-    Args:
-        img: Image as numpy array
-        format: Image format for encoding (e.g., ".jpg", ".png")
-
-    Returns:
-        Base64 encoded string or None if encoding fails
-    """
-    try:
-        _, buffer = cv2.imencode(format, img)
-        return base64.b64encode(buffer).decode("utf-8")
-    except Exception as e:
-        logger.error(f"Error encoding image to base64: {e}")
-        return None
+def _cluster_cover_path(face_id: int, bbox: Dict) -> str:
+    """Cover crop file for a face; the name changes with the bounding box."""
+    key = hashlib.sha1(json.dumps(bbox, sort_keys=True).encode()).hexdigest()[:12]
+    return os.path.join(CLUSTER_COVERS_PATH, f"face_{face_id}_{key}.jpg")
 
 
 def _generate_cluster_face_image(
     cluster_uuid: str, cursor: sqlite3.Cursor
 ) -> Optional[str]:
     """
-    Generate a base64 encoded face image for a cluster.
+    Get the cover crop file for a cluster, writing it if needed.
+
+    Crops are cached on disk by (face_id, bbox): a cluster whose cover face
+    is unchanged reuses its file without decoding the original photo.
 
     Args:
         cluster_uuid: The UUID of the cluster
         cursor: SQLite cursor from an active transaction
 
     Returns:
-        Base64 encoded face image string, or None if generation fails
+        Path of the JPEG cover crop, or None if generation fails
     """
     try:
         # Get face data from database
@@ -953,7 +1290,10 @@ def _generate_cluster_face_image(
         if not face_data:
             return None
 
-        image_path, bbox = face_data
+        face_id, image_path, bbox = face_data
+        cover_path = _cluster_cover_path(face_id, bbox)
+        if os.path.exists(cover_path):
+            return cover_path
 
         # Load the image
         img = cv2.imread(image_path)
@@ -968,14 +1308,35 @@ def _generate_cluster_face_image(
         if face_crop is None:
             return None
 
-        # Encode to base64
-        return _encode_image_to_base64(face_crop)
+        # Write to a temporary name first so a reader never sees half a file
+        os.makedirs(CLUSTER_COVERS_PATH, exist_ok=True)
+        temp_path = f"{cover_path}.{os.getpid()}.tmp.jpg"
+        if not cv2.imwrite(temp_path, face_crop):
+            return None
+        os.replace(temp_path, cover_path)
+        return cover_path
 
     except Exception as e:
         logger.error(f"Error generating face image for cluster {cluster_uuid}: {e}")
         return None
 
 
+def _prune_cluster_covers(keep: set) -> None:
+    """Delete cover crops no cluster points at. Run after every clustering
+    pass, full or incremental, with the paths the clusters now use."""
+    try:
+        names = os.listdir(CLUSTER_COVERS_PATH)
+    except OSError:
+        return
+    for name in names:
+        path = os.path.join(CLUSTER_COVERS_PATH, name)
+        if path not in keep:
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Could not remove stale cluster cover {path}: {e}")
+
+
 def _determine_cluster_name(faces_in_cluster: List[Dict]) -> Optional[str]:
     """
     Determine cluster name using majority voting from existing cluster names.
@@ -5,7 +5,15 @@ import uuid
 import datetime
 import json
 import logging
-from typing import List, Optional, Tuple, Dict, Any, Mapping
+import multiprocessing
+import queue
+import threading
+import time
+from typing import List, Optional, Tuple, Dict, Any, Iterator, Mapping, NamedTuple
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+import cv2
+import numpy as np
 from PIL import Image, ExifTags
 from pathlib import Path
 
@@ -17,6 +25,8 @@ from app.database.images import (
     db_insert_image_classes_batch,
     db_get_images_by_folder_ids,
     db_delete_images_by_ids,
+    db_get_pending_images,
+    PendingImageRecord,
 )
 from app.models.FaceDetector import FaceDetector
 from app.models.ObjectClassifier import ObjectClassifier
@@ -39,56 +49,116 @@ GPS_INFO_TAG = 34853
 logger = logging.getLogger(__name__)
 
 
+# One ingest pool per process, shared by every folder pass running in it:
+# the job runner indexes several folders at once on its threads, and each
+# starting a pool of its own would multiply the worker processes.
+_ingest_pool: Optional[ProcessPoolExecutor] = None
+_ingest_pool_users = 0
+_ingest_pool_lock = threading.Lock()
+
+
+@contextmanager
+def _shared_ingest_pool(workers: int) -> Iterator[Optional[Executor]]:
+    """
+    The process pool for folder ingest, or None to ingest in-process.
+
+    Started by the first pass that needs it and shut down when the last one
+    is done. Workers are spawned rather than forked: the caller is one thread
+    among several running ONNX sessions and holding locks, and a forked
+    child inherits those locks held, with no thread left to release them.
+    """
+    global _ingest_pool, _ingest_pool_users
+
+    if workers <= 1:
+        yield None
+        return
+
+    with _ingest_pool_lock:
+        if _ingest_pool is None:
+            _ingest_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        _ingest_pool_users += 1
+        pool = _ingest_pool
+    try:
+        yield pool
+    finally:
+        with _ingest_pool_lock:
+            _ingest_pool_users -= 1
+            last = _ingest_pool_users == 0
+            if last:
+                _ingest_pool = None
+        if last:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
 def image_util_process_folder_images(folder_data: List[Tuple[str, int, bool]]) -> bool:
     """Main function to process images in multiple folders based on provided folder data.
 
+    Thumbnail and metadata work runs on a pool of IMAGE_INDEXING_WORKERS
+    processes, IMAGE_INDEXING_BATCH_SIZE files at a time; each batch of
+    records is committed with db_bulk_insert_images, in walk order, as soon
+    as it is ready, so an interrupted pass keeps what it had indexed.
+
     Args:
         folder_data: List of tuples containing (folder_path, folder_id, recursive)
 
     Returns:
         bool: True if all folders processed successfully, False otherwise
     """
+    from app.config.settings import IMAGE_INDEXING_WORKERS, IMAGE_INDEXING_BATCH_SIZE
+
     try:
         # Ensure thumbnail directory exists
         os.makedirs(THUMBNAIL_IMAGES_PATH, exist_ok=True)
 
-        all_image_records = []
-        all_folder_ids = []
-
-        # Process each folder in the provided data
-        for folder_path, folder_id, recursive in folder_data:
-            try:
-                # Add folder ID to list for obsolete image cleanup
-                all_folder_ids.append(folder_id)
-
-                # Step 1: Get all image files from current folder
-                image_files = image_util_get_images_from_folder(folder_path, recursive)
-
-                if not image_files:
-                    continue  # No images in this folder, continue to next
+        all_folder_ids = [folder_id for _, folder_id, _ in folder_data]
 
-                # Step 2: Create folder path mapping for this folder
-                folder_path_to_id = {os.path.abspath(folder_path): folder_id}
-
-                # Step 3: Prepare image records for this folder
-                folder_image_records = image_util_prepare_image_records(
-                    image_files, folder_path_to_id
-                )
-                all_image_records.extend(folder_image_records)
-
-            except Exception as e:
-                logger.error(f"Error processing folder {folder_path}: {e}")
-                continue  # Continue with other folders even if one fails
-
-        # Step 4: Remove obsolete images that no longer exist in filesystem
+        # Step 1: Remove obsolete images that no longer exist in filesystem.
+        # Independent of the new records, so it runs before the walk.
         if all_folder_ids:
             image_util_remove_obsolete_images(all_folder_ids)
 
-        # Step 5: Bulk insert all new records if any exist
-        if all_image_records:
-            return db_bulk_insert_images(all_image_records)
+        all_inserted = True
+        with _shared_ingest_pool(IMAGE_INDEXING_WORKERS) as pool:
+            # Process each folder in the provided data
+            for folder_path, folder_id, recursive in folder_data:
+                try:
+                    # Step 2: Get all image files from current folder
+                    image_files = image_util_get_images_from_folder(
+                        folder_path, recursive
+                    )
+
+                    if not image_files:
+                        continue  # No images in this folder, continue to next
+
+                    # Step 3: Create folder path mapping for this folder
+                    folder_path_to_id = {os.path.abspath(folder_path): folder_id}
 
-        return True  # No images to process is not an error
+                    # Step 4: Ingest this folder's files and bulk insert the
+                    # records, in walk order, as each batch comes back
+                    records = image_util_iter_image_records(
+                        image_files,
+                        folder_path_to_id,
+                        executor=pool,
+                        batch_size=IMAGE_INDEXING_BATCH_SIZE,
+                    )
+                    batch = []
+                    for record in records:
+                        batch.append(record)
+                        if len(batch) == IMAGE_INDEXING_BATCH_SIZE:
+                            if not db_bulk_insert_images(batch):
+                                all_inserted = False
+                            batch = []
+                    if batch and not db_bulk_insert_images(batch):
+                        all_inserted = False
+
+                except Exception as e:
+                    logger.error(f"Error processing folder {folder_path}: {e}")
+                    continue  # Continue with other folders even if one fails
+
+        # No images to process is not an error
+        return all_inserted
     except Exception as e:
         logger.error(f"Error processing folders: {e}")
         return False
@@ -120,7 +190,9 @@ def image_util_process_unembedded_images() -> None:
     from app.models.model_registry import get_siglip2_registry_keys, get_model_path
     from app.database.images import db_get_unembedded_images, db_mark_images_embedded
     from app.database.image_embeddings import db_upsert_image_embeddings
+    from app.database.embedding_store import db_open_embedding_store
     from app.models.SigLIP2Vision import SigLIP2Vision
+    from app.models.session_pool import acquire_model, release_model
     from app.utils.SigLIP import siglip_util_preprocess_image
     import os
     import time
@@ -141,7 +213,7 @@ def image_util_process_unembedded_images() -> None:
         resolution = metadata["input_resolution"]
         model_version = metadata["model_version"]
 
-        vision_model = SigLIP2Vision(vision_model_path)
+        vision_model = acquire_model(SigLIP2Vision, vision_model_path)
         try:
             total_images = len(unembedded_images)
             embedded_count = 0
@@ -192,45 +264,509 @@ def image_util_process_unembedded_images() -> None:
                 f"SigLIP2 embedding pass complete. Total: {total_images}, Embedded: {embedded_count}, Corrupt: {corrupt_count}, Elapsed: {elapsed:.2f}s"
             )
 
+            if embedded_count:
+                # Rebuild the mapped store once here, in the worker, rather
+                # than in whichever reader next finds the table changed.
+                db_open_embedding_store(model_version)
+
         finally:
-            vision_model.close()
+            release_model(vision_model)
 
     except Exception as e:
         logger.error(f"Error processing unembedded images: {e}")
 
 
+# EXIF orientation -> the transpose that makes the image upright, the way
+# cv2.imread loads it. YOLO face boxes are stored in those coordinates.
+_EXIF_ORIENTATION_TAG = 0x0112
+_EXIF_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+# Marks the end of a pipeline queue
+_DONE = object()
+
+
+class _DecodedImage(NamedTuple):
+    id: str
+    # As stored, for SigLIP2; None when the image is already embedded
+    rgb: Optional[Image.Image]
+    # Upright BGR, for YOLO; None when the image is already tagged
+    bgr: Optional[np.ndarray]
+
+
+def _decode_for_analysis(
+    image: PendingImageRecord, tag: bool, embed: bool
+) -> Optional[_DecodedImage]:
+    """Read and decode one image for every model that still needs it."""
+    try:
+        with Image.open(image["path"]) as img:
+            orientation = img.getexif().get(_EXIF_ORIENTATION_TAG)
+            rgb = img.convert("RGB")
+    except Exception as e:
+        logger.error(f"Failed to load image: {image['path']} - {e}")
+        return None
+
+    bgr = None
+    if tag:
+        upright = (
+            rgb.transpose(_EXIF_TRANSPOSE[orientation])
+            if orientation in _EXIF_TRANSPOSE
+            else rgb
+        )
+        bgr = cv2.cvtColor(np.asarray(upright), cv2.COLOR_RGB2BGR)
+    return _DecodedImage(image["id"], rgb if embed else None, bgr)
+
+
+class _Embedder(NamedTuple):
+    model: Any
+    resolution: int
+    model_version: str
+
+
+def _acquire_embedder() -> Optional[_Embedder]:
+    """The pooled SigLIP2 vision model, or None if it is not installed."""
+    from app.config.settings import SIGLIP2_ACTIVE_CHECKPOINT, SIGLIP2_SCORING_METADATA
+    from app.models.model_registry import get_siglip2_registry_keys, get_model_path
+    from app.models.SigLIP2Vision import SigLIP2Vision
+    from app.models.session_pool import acquire_model
+
+    vision_key, _ = get_siglip2_registry_keys(SIGLIP2_ACTIVE_CHECKPOINT)
+    vision_model_path = get_model_path(vision_key)
+    if not os.path.exists(vision_model_path):
+        logger.info("SigLIP2 vision model not installed; skipping embedding")
+        return None
+
+    metadata = SIGLIP2_SCORING_METADATA[SIGLIP2_ACTIVE_CHECKPOINT]
+    return _Embedder(
+        acquire_model(SigLIP2Vision, vision_model_path),
+        metadata["input_resolution"],
+        metadata["model_version"],
+    )
+
+
+class _AnalysisPipeline:
+    """
+    decode -> detect objects -> detect faces (person images only)
+           -> preprocess and embed
+    -> one writer, the calling thread.
+
+    Every stage is a thread joined to the next by a bounded queue, so a slow
+    model holds back decoding rather than filling memory with images. The
+    first stage to fail stops the others; whatever reached the writer by
+    then is still written.
+    """
+
+    # Seconds between checks of the stop flag while waiting on a queue
+    POLL = 0.1
+
+    def __init__(
+        self,
+        object_classifier: Optional[ObjectClassifier],
+        face_detector: Optional[FaceDetector],
+        embedder: Optional[_Embedder],
+    ):
+        from app.config.settings import (
+            IMAGE_PIPELINE_DECODE_WORKERS,
+            IMAGE_PIPELINE_QUEUE_SIZE,
+            IMAGE_PIPELINE_WRITE_BATCH,
+            SIGLIP2_EMBED_BATCH_SIZE,
+            YOLO_DETECT_BATCH_SIZE,
+        )
+
+        self.object_classifier = object_classifier
+        self.face_detector = face_detector
+        self.embedder = embedder
+        self.decode_workers = IMAGE_PIPELINE_DECODE_WORKERS
+        self.detect_batch = YOLO_DETECT_BATCH_SIZE
+        self.embed_batch = SIGLIP2_EMBED_BATCH_SIZE
+        self.write_batch = IMAGE_PIPELINE_WRITE_BATCH
+
+        self.inputs: queue.Queue = queue.Queue()
+        self.detect_q: queue.Queue = queue.Queue(maxsize=IMAGE_PIPELINE_QUEUE_SIZE)
+        self.face_q: queue.Queue = queue.Queue(maxsize=IMAGE_PIPELINE_QUEUE_SIZE)
+        self.embed_q: queue.Queue = queue.Queue(maxsize=IMAGE_PIPELINE_QUEUE_SIZE)
+        # Results are small (ids, classes, embeddings), so this one is unbounded
+        self.results: queue.Queue = queue.Queue()
+
+        self.stop = threading.Event()
+        self.error: Optional[BaseException] = None
+        self.decoders_left = 0
+        self.lock = threading.Lock()
+
+        self.unreadable = 0
+        self.faces_skipped = 0
+
+    # Queue plumbing
+
+    def _put(self, q: queue.Queue, item: Any) -> bool:
+        while not self.stop.is_set():
+            try:
+                q.put(item, timeout=self.POLL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue) -> Any:
+        """The next item, or _DONE once the queue ends or the pipeline stops."""
+        while not self.stop.is_set():
+            try:
+                return q.get(timeout=self.POLL)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _batches(self, q: queue.Queue, size: int) -> Iterator[List[Any]]:
+        batch: List[Any] = []
+        while True:
+            item = self._get(q)
+            if item is _DONE:
+                break
+            batch.append(item)
+            if len(batch) == size:
+                yield batch
+                batch = []
+        if batch and not self.stop.is_set():
+            yield batch
+
+    def _start(self, target, name: str) -> threading.Thread:
+        def run() -> None:
+            try:
+                target()
+            except BaseException as e:
+                with self.lock:
+                    if self.error is None:
+                        self.error = e
+                logger.error(f"Image analysis {name} stage failed: {e}")
+                self.stop.set()
+
+        thread = threading.Thread(target=run, name=f"analysis-{name}", daemon=True)
+        thread.start()
+        return thread
+
+    # Stages
+
+    def _decode(self) -> None:
+        while not self.stop.is_set():
+            work = self.inputs.get()
+            if work is _DONE:
+                break
+            image, tag, embed = work
+            decoded = _decode_for_analysis(image, tag, embed)
+            if decoded is None:
+                self.results.put(("unreadable", image["id"], tag))
+                continue
+            if decoded.bgr is not None and not self._put(
+                self.detect_q, (decoded.id, decoded.bgr)
+            ):
+                break
+            if decoded.rgb is not None and not self._put(
+                self.embed_q, (decoded.id, decoded.rgb)
+            ):
+                break
+
+        with self.lock:
+            self.decoders_left -= 1
+            last = self.decoders_left == 0
+        if last:
+            if self.object_classifier is not None:
+                self._put(self.detect_q, _DONE)
+            if self.embedder is not None:
+                self._put(self.embed_q, _DONE)
+
+    def _detect(self) -> None:
+        for batch in self._batches(self.detect_q, self.detect_batch):
+            batch_classes = self.object_classifier.get_classes_batch(
+                [img for _, img in batch]
+            )
+            for (image_id, img), classes in zip(batch, batch_classes):
+                if 0 in classes:
+                    if not self._put(self.face_q, (image_id, img, classes)):
+                        return
+                else:
+                    self.results.put(("tagged", image_id, classes, []))
+        self._put(self.face_q, _DONE)
+
+    def _detect_faces(self) -> None:
+        for batch in self._batches(self.face_q, self.detect_batch):
+            detections = self.face_detector.detect_faces_batch(
+                [(image_id, img) for image_id, img, _ in batch], store=False
+            )
+            for (image_id, _, classes), result in zip(batch, detections):
+                faces = []
+                if result:
+                    self.faces_skipped += result.get("faces_skipped", 0)
+                    faces = [
+                        (image_id, embedding, confidence, bbox)
+                        for embedding, confidence, bbox in zip(
+                            result["embeddings"],
+                            result["confidences"],
+                            result["bboxes"],
+                        )
+                    ]
+                self.results.put(("tagged", image_id, classes, faces))
+        self.results.put(_DONE)
+
+    def _embed(self) -> None:
+        from app.utils.SigLIP import siglip_util_preprocess_pil
+
+        for batch in self._batches(self.embed_q, self.embed_batch):
+            good_arrays, good_ids = [], []
+            for image_id, rgb in batch:
+                try:
+                    good_arrays.append(
+                        siglip_util_preprocess_pil(rgb, self.embedder.resolution)
+                    )
+                    good_ids.append(image_id)
+                except Exception as e:
+                    logger.error(f"Failed to preprocess image {image_id}: {e}")
+                    self.results.put(("unreadable", image_id, False))
+            if good_arrays:
+                embeddings = self.embedder.model.get_embedding(np.stack(good_arrays))
+                for image_id, embedding in zip(good_ids, embeddings):
+                    self.results.put(("embedded", image_id, embedding))
+        self.results.put(_DONE)
+
+    # Writer
+
+    def run(self, work: List[Tuple[PendingImageRecord, bool, bool]]) -> Dict[str, int]:
+        """
+        Analyse (image, tag, embed) work items and write the results.
+
+        Returns:
+            Counts of tagged, embedded and unreadable images, and of faces
+            stored and skipped by the quality gate
+        """
+        from app.database.image_embeddings import db_upsert_image_embeddings
+        from app.database.faces import db_insert_faces_batch
+        from app.database.connection import get_db_connection
+        from app.database.images import db_mark_images_embedded, db_mark_images_tagged
+
+        threads = []
+        ends = 0
+        if self.object_classifier is not None:
+            threads.append(self._start(self._detect, "detect"))
+            threads.append(self._start(self._detect_faces, "faces"))
+            ends += 1
+        if self.embedder is not None:
+            threads.append(self._start(self._embed, "embed"))
+            ends += 1
+
+        for item in work:
+            self.inputs.put(item)
+        self.decoders_left = self.decode_workers
+        for i in range(self.decode_workers):
+            self.inputs.put(_DONE)
+            threads.append(self._start(self._decode, f"decode-{i}"))
+
+        counts = {"tagged": 0, "embedded": 0, "unreadable": 0, "faces": 0}
+        class_pairs: List[Tuple[str, int]] = []
+        faces: List[Tuple[Any, ...]] = []
+        tagged: List[str] = []
+        embeddings: List[Tuple[str, str, Any]] = []
+
+        def flush() -> None:
+            # One transaction: faces have no natural key, so a batch whose
+            # faces were committed without its isTagged flags would insert
+            # them again when an interrupted pass resumes
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                db_insert_image_classes_batch(class_pairs, cursor)
+                inserted_faces = db_insert_faces_batch(faces, cursor)
+                db_mark_images_tagged(tagged, cursor)
+                db_upsert_image_embeddings(embeddings, cursor)
+                db_mark_images_embedded(
+                    [image_id for image_id, _, _ in embeddings], cursor
+                )
+            counts["faces"] += inserted_faces
+            counts["tagged"] += len(tagged)
+            counts["embedded"] += len(embeddings)
+            for pending in (class_pairs, faces, tagged, embeddings):
+                pending.clear()
+
+        try:
+            while ends:
+                item = self._get(self.results)
+                if item is _DONE:
+                    ends -= 1
+                    continue
+                kind, image_id, *rest = item
+                if kind == "tagged":
+                    classes, image_faces = rest
+                    class_pairs.extend((image_id, class_id) for class_id in classes)
+                    faces.extend(image_faces)
+                    tagged.append(image_id)
+                elif kind == "embedded":
+                    embeddings.append((image_id, self.embedder.model_version, rest[0]))
+                else:
+                    counts["unreadable"] += 1
+                    # Marked tagged anyway, as the tagging pass always has,
+                    # so every sync doesn't retry an unreadable file forever.
+                    # Left unembedded so the embedding retry still happens.
+                    if rest[0]:
+                        tagged.append(image_id)
+                if len(tagged) + len(embeddings) >= self.write_batch:
+                    flush()
+            flush()
+        finally:
+            self.stop.set()
+            for thread in threads:
+                thread.join()
+
+        if self.error is not None:
+            raise self.error
+        counts["faces_skipped"] = self.faces_skipped
+        return counts
+
+
+def image_util_process_pending_images() -> int:
+    """
+    Tag and embed, in one pass, every image in an AI-tagging folder that
+    still needs either.
+
+    Each file is read and decoded once, on IMAGE_PIPELINE_DECODE_WORKERS
+    threads, and handed through bounded queues to the object detector (and
+    from it, for images with a person, the face detector) and to the SigLIP2
+    embedder, which run side by side. Results are written
+    IMAGE_PIPELINE_WRITE_BATCH images per transaction.
+
+    Returns:
+        The number of images analysed, unreadable ones included
+    """
+    from app.database.embedding_store import db_open_embedding_store
+    from app.models.session_pool import release_model
+
+    try:
+        pending = db_get_pending_images()
+        if not pending:
+            return 0
+
+        start_time = time.time()
+        embedder = None
+        if any(not image["isEmbedded"] for image in pending):
+            try:
+                embedder = _acquire_embedder()
+            except Exception as e:
+                # Tagging still goes ahead; embedding retries next pass
+                logger.error(f"Could not load the SigLIP2 vision model: {e}")
+
+        object_classifier = face_detector = None
+        try:
+            if any(not image["isTagged"] for image in pending):
+                try:
+                    object_classifier = ObjectClassifier()
+                    face_detector = FaceDetector()
+                except Exception as e:
+                    # Embedding still goes ahead; tagging retries next pass
+                    logger.error(f"Could not load the tagging models: {e}")
+                    if object_classifier is not None:
+                        object_classifier.close()
+                    object_classifier = None
+
+            work = []
+            for image in pending:
+                tag = not image["isTagged"] and object_classifier is not None
+                embed = not image["isEmbedded"] and embedder is not None
+                if tag or embed:
+                    work.append((image, tag, embed))
+            if not work:
+                return 0
+
+            counts = _AnalysisPipeline(
+                object_classifier,
+                face_detector if object_classifier is not None else None,
+                embedder,
+            ).run(work)
+        finally:
+            if object_classifier is not None:
+                object_classifier.close()
+            if face_detector is not None:
+                face_detector.close()
+            if embedder is not None:
+                release_model(embedder.model)
+
+        logger.info(
+            f"Image analysis pass complete. Total: {len(work)}, "
+            f"Tagged: {counts['tagged']}, Embedded: {counts['embedded']}, "
+            f"Faces: {counts['faces']}, Faces skipped: {counts['faces_skipped']}, "
+            f"Unreadable: {counts['unreadable']}, "
+            f"Elapsed: {time.time() - start_time:.2f}s"
+        )
+        if counts["embedded"]:
+            # Rebuild the mapped store once here, in the worker, rather
+            # than in whichever reader next finds the table changed.
+            db_open_embedding_store(embedder.model_version)
+        return len(work)
+    except Exception as e:
+        logger.error(f"Error analysing pending images: {e}")
+        return 0
+
+
 def image_util_classify_and_face_detect_images(
     untagged_images: List[Dict[str, str]],
 ) -> int:
-    """Classify untagged images and detect faces if applicable."""
+    """Classify untagged images and detect faces if applicable.
+
+    Images are decoded once and fed to YOLO YOLO_DETECT_BATCH_SIZE at a
+    time, for object classes and then for faces on the ones with a person.
+    """
+    from app.config.settings import YOLO_DETECT_BATCH_SIZE
+
     object_classifier = ObjectClassifier()
     face_detector = FaceDetector()
     total_faces_skipped = 0
     try:
-        for image in untagged_images:
-            image_path = image["path"]
-            image_id = image["id"]
+        for i in range(0, len(untagged_images), YOLO_DETECT_BATCH_SIZE):
+            batch = untagged_images[i : i + YOLO_DETECT_BATCH_SIZE]
+
+            loaded = []
+            for image in batch:
+                img = cv2.imread(image["path"])
+                if img is None:
+                    logger.error(f"Failed to load image: {image['path']}")
+                    # Marked tagged anyway, like the video pass does, so
+                    # every sync doesn't retry an unreadable file forever.
+                    db_update_image_tagged_status(image["id"], True)
+                    continue
+                loaded.append((image["id"], img))
+
+            if not loaded:
+                continue
 
             # Step 1: Get classes
-            classes = object_classifier.get_classes(image_path)
+            batch_classes = object_classifier.get_classes_batch(
+                [img for _, img in loaded]
+            )
+
+            person_images = []
+            for (image_id, img), classes in zip(loaded, batch_classes):
+                # Step 2: Insert class-image pairs if classes were detected
+                if len(classes) > 0:
+                    # Create image-class pairs
+                    image_class_pairs = [(image_id, class_id) for class_id in classes]
+                    logger.debug(f"Image-class pairs: {image_class_pairs}")
 
-            # Step 2: Insert class-image pairs if classes were detected
-            if len(classes) > 0:
-                # Create image-class pairs
-                image_class_pairs = [(image_id, class_id) for class_id in classes]
-                logger.debug(f"Image-class pairs: {image_class_pairs}")
+                    # Insert the pairs into the database
+                    db_insert_image_classes_batch(image_class_pairs)
 
-                # Insert the pairs into the database
-                db_insert_image_classes_batch(image_class_pairs)
+                # Step 3: Detect faces if "person" class is present
+                if 0 in classes:
+                    person_images.append((image_id, img))
 
-            # Step 3: Detect faces if "person" class is present
-            if classes and 0 in classes:
-                result = face_detector.detect_faces(image_id, image_path)
+            for result in face_detector.detect_faces_batch(person_images):
                 if result:
                     total_faces_skipped += result.get("faces_skipped", 0)
 
             # Step 4: Update the image status in the database
-            db_update_image_tagged_status(image_id, True)
+            for image_id, _ in loaded:
+                db_update_image_tagged_status(image_id, True)
     finally:
         # Ensure resources are cleaned up
         object_classifier.close()
@@ -239,23 +775,135 @@ def image_util_classify_and_face_detect_images(
     return total_faces_skipped
 
 
-def image_util_prepare_image_records(
-    image_files: List[str], folder_path_to_id: Dict[str, int]
-) -> List[Dict]:
+# Per-stage wall time of the ingest pass, in seconds. "open" is reading the
+# file header, "metadata" is EXIF/GPS/sidecar parsing, "thumbnail" is the
+# pixel decode plus the JPEG write.
+INGEST_STAGES = ("open", "metadata", "thumbnail")
+
+
+def image_util_ingest_image(
+    image_path: str,
+    thumbnail_path: str,
+    size: Tuple[int, int] = (600, 600),
+    timings: Optional[Dict[str, float]] = None,
+) -> Optional[dict]:
+    """
+    Open an image once: read its metadata and write its thumbnail.
+
+    Validation, metadata extraction and thumbnailing used to open the file
+    three separate times. Here the header is parsed once, metadata is read
+    from it, and the thumbnail decode doubles as the validity check: a
+    truncated or corrupt file fails there and the image is skipped.
+
+    Args:
+        image_path: Path to the source image
+        thumbnail_path: Where to write the JPEG thumbnail
+        size: Bounding box for the thumbnail
+        timings: Optional dict that per-stage seconds are added into
+
+    Returns:
+        The metadata dict, or None if the image could not be decoded
+    """
+    if timings is None:
+        timings = {}
+
+    try:
+        started = time.perf_counter()
+        stats = os.stat(image_path)
+        with Image.open(image_path) as img:
+            opened = time.perf_counter()
+            timings["open"] = timings.get("open", 0.0) + opened - started
+
+            metadata = _metadata_from_open_image(img, image_path, stats)
+            extracted = time.perf_counter()
+            timings["metadata"] = timings.get("metadata", 0.0) + extracted - opened
+
+            # thumbnail() lets the JPEG decoder downscale while decoding
+            # (draft mode), so the full-resolution frame is never built.
+            img.thumbnail(size)
+            thumb = img
+            # Convert to RGB if the image has an alpha channel or is not RGB
+            if thumb.mode in ("RGBA", "P"):
+                thumb = thumb.convert("RGB")
+            thumb.save(thumbnail_path, "JPEG")  # Always save thumbnails as JPEG
+            timings["thumbnail"] = (
+                timings.get("thumbnail", 0.0) + time.perf_counter() - extracted
+            )
+        return metadata
+    except Exception as e:
+        logger.error(f"Error ingesting image {image_path}: {e}")
+        return None
+
+
+def _ingest_image_worker(
+    job: Tuple[str, str]
+) -> Tuple[Optional[dict], Dict[str, float]]:
+    """Pool entry point for image_util_ingest_image. Module-level so it
+    pickles; returns the worker's stage timings for the parent to merge."""
+    image_path, thumbnail_path = job
+    timings: Dict[str, float] = {}
+    return image_util_ingest_image(image_path, thumbnail_path, timings=timings), timings
+
+
+def _ingest_images(
+    jobs: List[Tuple[str, str]],
+    timings: Dict[str, float],
+    executor: Optional[Executor],
+    batch_size: int,
+) -> Iterator[Optional[dict]]:
+    """Yield ingest results in job order, at most batch_size in flight."""
+    if executor is None:
+        for image_path, thumbnail_path in jobs:
+            yield image_util_ingest_image(image_path, thumbnail_path, timings=timings)
+        return
+
+    # A few chunks per worker per window: large enough to amortize pickling,
+    # small enough that one slow file doesn't idle the other workers.
+    chunksize = max(1, batch_size // 32)
+    for start in range(0, len(jobs), batch_size):
+        window = jobs[start : start + batch_size]
+        # map() returns in submission order, so records keep the walk order
+        for metadata, worker_timings in executor.map(
+            _ingest_image_worker, window, chunksize=chunksize
+        ):
+            for stage, seconds in worker_timings.items():
+                timings[stage] = timings.get(stage, 0.0) + seconds
+            yield metadata
+
+
+def image_util_iter_image_records(
+    image_files: List[str],
+    folder_path_to_id: Dict[str, int],
+    timings: Optional[Dict[str, float]] = None,
+    executor: Optional[Executor] = None,
+    batch_size: int = 500,
+) -> Iterator[Dict]:
     """
-    Prepare image records with thumbnails for database insertion.
+    Prepare image records with thumbnails for database insertion, yielding
+    each one as soon as its file is ingested. At most batch_size files are
+    in flight, so a caller inserting as it goes commits a large folder
+    window by window instead of holding every record until the end.
     Automatically extracts GPS coordinates and capture datetime from metadata.
 
     Args:
         image_files: List of image file paths
         folder_path_to_id: Dictionary mapping folder paths to IDs
-
-    Returns:
-        List of image record dictionaries ready for database insertion
+        timings: Optional dict that per-stage ingest seconds are added into
+        executor: Optional pool to run the per-file ingest on; None runs it
+            in this process
+        batch_size: Files handed to the executor per round
+
+    Yields:
+        Image record dictionaries ready for database insertion, in the order
+        of image_files
     """
-    image_records = []
+    ingested_count = 0
     extractor = MetadataExtractor()
+    if timings is None:
+        timings = {}
+    skipped = 0
 
+    jobs = []
     for image_path in image_files:
         folder_id = image_util_find_folder_id_for_image(image_path, folder_path_to_id)
 
@@ -267,58 +915,99 @@ def image_util_prepare_image_records(
         thumbnail_path = os.path.abspath(
             os.path.join(THUMBNAIL_IMAGES_PATH, thumbnail_name)
         )
+        jobs.append((image_path, thumbnail_path, folder_id, image_id))
+
+    # One open per file: metadata and thumbnail come off the same handle
+    ingested = _ingest_images(
+        [(image_path, thumbnail_path) for image_path, thumbnail_path, _, _ in jobs],
+        timings,
+        executor,
+        batch_size,
+    )
+    for (image_path, thumbnail_path, folder_id, image_id), metadata in zip(
+        jobs, ingested
+    ):
+        if metadata is None:
+            skipped += 1
+            continue
 
-        # Generate thumbnail
-        if image_util_generate_thumbnail(image_path, thumbnail_path):
-            metadata = image_util_extract_metadata(image_path)
-            logger.debug(f"Extracted metadata for {image_path}: {metadata}")
+        logger.debug(f"Extracted metadata for {image_path}: {metadata}")
 
-            # Automatically extract GPS coordinates and datetime from metadata
-            # Don't fail upload if extraction fails
-            metadata_json = json.dumps(metadata)
-            latitude, longitude, captured_at = None, None, None
+        # Automatically extract GPS coordinates and datetime from metadata
+        # Don't fail upload if extraction fails
+        metadata_json = json.dumps(metadata)
+        latitude, longitude, captured_at = None, None, None
 
-            try:
-                latitude, longitude, captured_at = extractor.extract_all(metadata_json)
+        try:
+            latitude, longitude, captured_at = extractor.extract_all(metadata_json)
 
-                # Log GPS extraction results
-                if latitude and longitude:
-                    logger.info(
-                        f"GPS extracted for {os.path.basename(image_path)}: ({latitude}, {longitude})"
-                    )
-                if captured_at:
-                    logger.debug(
-                        f"Date extracted for {os.path.basename(image_path)}: {captured_at}"
-                    )
-            except Exception as e:
-                logger.warning(
-                    f"GPS extraction failed for {os.path.basename(image_path)}: {e}"
+            # Log GPS extraction results
+            if latitude and longitude:
+                logger.info(
+                    f"GPS extracted for {os.path.basename(image_path)}: ({latitude}, {longitude})"
                 )
-                # Continue without GPS - don't fail the upload
-
-            # Build image record with GPS data
-            # ALWAYS include latitude, longitude, captured_at (even if None)
-            # to satisfy SQL INSERT statement named parameters
-            image_record = {
-                "id": image_id,
-                "path": image_path,
-                "folder_id": folder_id,
-                "thumbnailPath": thumbnail_path,
-                "metadata": metadata_json,
-                "isTagged": False,
-                "isEmbedded": False,
-                "latitude": latitude,  # Can be None
-                "longitude": longitude,  # Can be None
-                "captured_at": (
-                    captured_at.isoformat()
-                    if isinstance(captured_at, datetime.datetime) and captured_at
-                    else captured_at
-                ),  # Can be None
-            }
+            if captured_at:
+                logger.debug(
+                    f"Date extracted for {os.path.basename(image_path)}: {captured_at}"
+                )
+        except Exception as e:
+            logger.warning(
+                f"GPS extraction failed for {os.path.basename(image_path)}: {e}"
+            )
+            # Continue without GPS - don't fail the upload
+
+        # Build image record with GPS data
+        # ALWAYS include latitude, longitude, captured_at (even if None)
+        # to satisfy SQL INSERT statement named parameters
+        image_record = {
+            "id": image_id,
+            "path": image_path,
+            "folder_id": folder_id,
+            "thumbnailPath": thumbnail_path,
+            "metadata": metadata_json,
+            "isTagged": False,
+            "isEmbedded": False,
+            "latitude": latitude,  # Can be None
+            "longitude": longitude,  # Can be None
+            "captured_at": (
+                captured_at.isoformat()
+                if isinstance(captured_at, datetime.datetime) and captured_at
+                else captured_at
+            ),  # Can be None
+        }
+
+        ingested_count += 1
+        yield image_record
+
+    if image_files:
+        stage_summary = ", ".join(
+            f"{stage}={timings.get(stage, 0.0):.2f}s" for stage in INGEST_STAGES
+        )
+        logger.info(
+            f"Ingested {ingested_count} image(s), skipped {skipped} unreadable. Stage time: {stage_summary}"
+        )
+
 
-            image_records.append(image_record)
+def image_util_prepare_image_records(
+    image_files: List[str],
+    folder_path_to_id: Dict[str, int],
+    timings: Optional[Dict[str, float]] = None,
+    executor: Optional[Executor] = None,
+    batch_size: int = 500,
+) -> List[Dict]:
+    """
+    Prepare image records with thumbnails for database insertion, all at
+    once. See image_util_iter_image_records for the arguments.
 
-    return image_records
+    Returns:
+        List of image record dictionaries ready for database insertion, in
+        the order of image_files
+    """
+    return list(
+        image_util_iter_image_records(
+            image_files, folder_path_to_id, timings, executor, batch_size
+        )
+    )
 
 
 def image_util_get_images_from_folder(
@@ -326,6 +1015,9 @@ def image_util_get_images_from_folder(
 ) -> List[str]:
     """Get all image files from a folder.
 
+    Only the extension is checked here; decoding is left to the ingest stage
+    so each file is opened once (see image_util_ingest_image).
+
     Args:
         folder_path: Path to the folder to scan
         recursive: If True, scan subfolders recursively. If False, only scan direct children.
@@ -340,14 +1032,16 @@ def image_util_get_images_from_folder(
         for root, _, files in os.walk(folder_path):
             for file in files:
                 file_path = os.path.join(root, file)
-                if image_util_is_valid_image(file_path):
+                if image_util_has_image_extension(file_path):
                     image_files.append(file_path)
     else:
         # Non-recursive scan, only direct children
         try:
             for file in os.listdir(folder_path):
                 file_path = os.path.join(folder_path, file)
-                if os.path.isfile(file_path) and image_util_is_valid_image(file_path):
+                if os.path.isfile(file_path) and image_util_has_image_extension(
+                    file_path
+                ):
                     image_files.append(file_path)
         except OSError as e:
             logger.error(f"Error reading folder {folder_path}: {e}")
@@ -448,13 +1142,18 @@ def image_util_find_folder_id_for_image(
     return None
 
 
+IMAGE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png"})
+
+
+def image_util_has_image_extension(file_path: str) -> bool:
+    """Check if the file has one of the allowed image extensions."""
+    return Path(file_path).suffix.lower() in IMAGE_EXTENSIONS
+
+
 def image_util_is_valid_image(file_path: str) -> bool:
     """Check if the file is a valid image with allowed extensions."""
     # Check file extension first
-    allowed_extensions = {".jpg", ".jpeg", ".png"}
-    file_extension = Path(file_path).suffix.lower()
-
-    if file_extension not in allowed_extensions:
+    if not image_util_has_image_extension(file_path):
         return False
 
     # Then verify it's a valid image
@@ -584,6 +1283,75 @@ def _extract_capture_datetime(exif_data: Any) -> Optional[str]:
     return None
 
 
+def _metadata_from_open_image(
+    img: Image.Image, image_path: str, stats: os.stat_result
+) -> dict:
+    """
+    Build the metadata dict from an image Pillow has already opened.
+
+    Reads only what the header carries (size, format, EXIF), so it runs
+    before any pixel decode and the same handle can go on to the thumbnail.
+    """
+    date_source = DATE_SOURCE_EXIF
+    width, height = img.size
+    mime_type = Image.MIME.get(img.format, "unknown")
+    logger.debug(f"Pillow opened image: {width}x{height}, type={mime_type}")
+
+    # Robust EXIF extraction with safe fallback
+    try:
+        exif_data = (
+            img.getexif()
+            if hasattr(img, "getexif")
+            else getattr(img, "_getexif", lambda: None)()
+        )
+    except Exception:
+        exif_data = None
+
+    dt_original = _extract_capture_datetime(exif_data)
+    latitude, longitude = _extract_gps_coordinates(exif_data)
+
+    # A Google Takeout export drops EXIF from part of its own
+    # library and keeps the real values in a sibling JSON file.
+    if not dt_original or latitude is None:
+        sidecar_dt, sidecar_lat, sidecar_lon = takeout_sidecar_read(image_path)
+        if not dt_original and sidecar_dt:
+            dt_original = sidecar_dt
+            date_source = DATE_SOURCE_SIDECAR
+        if latitude is None and sidecar_lat is not None:
+            latitude, longitude = sidecar_lat, sidecar_lon
+
+    # Safe parse; fall back to mtime without losing width/height
+    if dt_original:
+        try:
+            date_created = datetime.datetime.strptime(
+                dt_original.strip().split("\x00", 1)[0],
+                "%Y:%m:%d %H:%M:%S",
+            ).isoformat()
+        except ValueError:
+            date_created = datetime.datetime.fromtimestamp(stats.st_mtime).isoformat()
+            date_source = DATE_SOURCE_FILESYSTEM
+    else:
+        date_created = datetime.datetime.fromtimestamp(stats.st_mtime).isoformat()
+        date_source = DATE_SOURCE_FILESYSTEM
+
+    metadata_dict = {
+        "name": os.path.basename(image_path),
+        "date_created": date_created,
+        "date_source": date_source,
+        "width": width,
+        "height": height,
+        "file_location": image_path,
+        "file_size": stats.st_size,
+        "item_type": mime_type,
+    }
+
+    if latitude is not None and longitude is not None:
+        metadata_dict["latitude"] = latitude
+        metadata_dict["longitude"] = longitude
+
+    return metadata_dict
+
+
 def image_util_extract_metadata(image_path: str) -> dict:
     """Extract metadata for a given image file with detailed debug logging."""
     logger.debug(f"image_util_extract_metadata called for: {image_path}")
@@ -603,73 +1371,10 @@ def image_util_extract_metadata(image_path: str) -> dict:
     try:
         stats = os.stat(image_path)
         logger.debug(f"File exists. Size = {stats.st_size} bytes")
-        date_source = DATE_SOURCE_EXIF
 
         try:
             with Image.open(image_path) as img:
-                width, height = img.size
-                mime_type = Image.MIME.get(img.format, "unknown")
-                logger.debug(f"Pillow opened image: {width}x{height}, type={mime_type}")
-
-                # Robust EXIF extraction with safe fallback
-                try:
-                    exif_data = (
-                        img.getexif()
-                        if hasattr(img, "getexif")
-                        else getattr(img, "_getexif", lambda: None)()
-                    )
-                except Exception:
-                    exif_data = None
-
-                dt_original = _extract_capture_datetime(exif_data)
-                latitude, longitude = _extract_gps_coordinates(exif_data)
-
-                # A Google Takeout export drops EXIF from part of its own
-                # library and keeps the real values in a sibling JSON file.
-                if not dt_original or latitude is None:
-                    sidecar_dt, sidecar_lat, sidecar_lon = takeout_sidecar_read(
-                        image_path
-                    )
-                    if not dt_original and sidecar_dt:
-                        dt_original = sidecar_dt
-                        date_source = DATE_SOURCE_SIDECAR
-                    if latitude is None and sidecar_lat is not None:
-                        latitude, longitude = sidecar_lat, sidecar_lon
-
-                # Safe parse; fall back to mtime without losing width/height
-                if dt_original:
-                    try:
-                        date_created = datetime.datetime.strptime(
-                            dt_original.strip().split("\x00", 1)[0],
-                            "%Y:%m:%d %H:%M:%S",
-                        ).isoformat()
-                    except ValueError:
-                        date_created = datetime.datetime.fromtimestamp(
-                            stats.st_mtime
-                        ).isoformat()
-                        date_source = DATE_SOURCE_FILESYSTEM
-                else:
-                    date_created = datetime.datetime.fromtimestamp(
-                        stats.st_mtime
-                    ).isoformat()
-                    date_source = DATE_SOURCE_FILESYSTEM
-
-            metadata_dict = {
-                "name": os.path.basename(image_path),
-                "date_created": date_created,
-                "date_source": date_source,
-                "width": width,
-                "height": height,
-                "file_location": image_path,
-                "file_size": stats.st_size,
-                "item_type": mime_type,
-            }
-
-            if latitude is not None and longitude is not None:
-                metadata_dict["latitude"] = latitude
-                metadata_dict["longitude"] = longitude
-
-            return metadata_dict
+                return _metadata_from_open_image(img, image_path, stats)
 
         except Exception as e:
             logger.error(f"Pillow could not open image {image_path}: {e}")
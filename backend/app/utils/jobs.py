@@ -0,0 +1,321 @@
+"""
+Background indexing and tagging as a persistent queue of staged jobs.
+
+A job is a kind (e.g. 'sync_folder') plus the stages PIPELINES lists for it,
+stored in the jobs tables (app/database/jobs.py). The runner claims the next
+stage of each job as the one before it completes, and checkpoints it when it
+finishes. A backend restarted mid-job requeues the interrupted stage and
+carries on from there. Every stage works through whatever is still left to
+do (untagged images, unembedded frames, files not yet indexed), so running
+one again after an interruption is safe.
+
+Stages of different jobs overlap on a small thread pool in the worker
+process: one job can index a folder while another tags. The library-wide
+stages run for one job at a time; running two would do the same work twice.
+"""
+
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from app.database.folders import db_set_tagging_completed
+from app.database.jobs import (
+    JobId,
+    JobStage,
+    db_claim_next_stage,
+    db_complete_stage,
+    db_count_library_items,
+    db_count_unfinished_jobs,
+    db_enqueue_job,
+    db_fail_stage,
+    db_prune_finished_jobs,
+    db_requeue_interrupted_stages,
+    db_requeue_stage,
+)
+from app.logging.setup_logging import get_logger
+from app.utils.API import API_util_restart_sync_microservice_watcher
+from app.utils.ann_index import ann_util_build_index
+from app.utils.face_clusters import cluster_util_face_clusters_sync
+from app.utils.images import (
+    image_util_process_folder_images,
+    image_util_process_pending_images,
+)
+from app.utils.model_bootstrap import ensure_ai_tagging_models
+from app.utils.ONNX import ONNX_util_refresh_execution_providers
+from app.utils.semantic_labels import (
+    semantic_util_score_images,
+    semantic_util_score_videos,
+)
+from app.utils.videos import (
+    video_util_process_folder_videos,
+    video_util_process_unembedded_frames,
+    video_util_process_untagged_videos,
+)
+
+logger = get_logger(__name__)
+
+
+def job_util_curate_memories(trigger: str) -> None:
+    """
+    Refresh memories after the library changed.
+
+    Imported late to keep the curator out of the module import graph, and
+    swallowed on failure: a curation problem must never fail an import.
+
+    Never forced: force is what overrides the user's memories preference, and
+    a background import is not the user asking for memories.
+    """
+    try:
+        from app.utils.memory_curator import memory_curator_run
+
+        memory_curator_run(trigger=trigger)
+    except Exception as e:
+        logger.error(f"Memory curation failed after {trigger}: {e}")
+
+
+def _folder_data(job: JobStage) -> List[Tuple[str, Any, bool]]:
+    """The job's folders as (folder_path, folder_id, recursive) tuples."""
+    return [
+        (folder_path, folder_id, False)
+        for folder_id, folder_path in job["params"]["folders"]
+    ]
+
+
+class Stage(NamedTuple):
+    run: Callable[[JobStage], Any]
+    # Key of db_count_library_items whose growth is the stage's item count
+    counter: Optional[str] = None
+    # Works only on its job's folders, so several jobs may run it at once
+    folder_scoped: bool = False
+
+
+# The module-level names are looked up when a stage runs, not here
+STAGES: Dict[str, Stage] = {
+    "ensure_models": Stage(lambda job: ensure_ai_tagging_models()),
+    "index_images": Stage(
+        lambda job: image_util_process_folder_images(_folder_data(job)),
+        counter="images",
+        folder_scoped=True,
+    ),
+    "index_videos": Stage(
+        lambda job: video_util_process_folder_videos(_folder_data(job)),
+        counter="videos",
+        folder_scoped=True,
+    ),
+    # Tags and embeds in one read of each file; returns its own item count
+    "analyze_images": Stage(lambda job: image_util_process_pending_images()),
+    "cluster_faces": Stage(lambda job: cluster_util_face_clusters_sync()),
+    "score_images": Stage(lambda job: semantic_util_score_images()),
+    "curate_memories": Stage(lambda job: job_util_curate_memories(job["kind"])),
+    "build_ann_index": Stage(lambda job: ann_util_build_index()),
+    "tag_videos": Stage(
+        lambda job: video_util_process_untagged_videos(), counter="tagged_videos"
+    ),
+    "embed_video_frames": Stage(
+        lambda job: video_util_process_unembedded_frames(), counter="embedded_frames"
+    ),
+    "score_videos": Stage(lambda job: semantic_util_score_videos()),
+    "restart_watcher": Stage(lambda job: API_util_restart_sync_microservice_watcher()),
+}
+
+_TAGGING_STAGES = (
+    "analyze_images",
+    "cluster_faces",
+    "score_images",
+    # Curate before the video stages: semantic labels are written by now,
+    # and the video stages can run for minutes.
+    "curate_memories",
+    "build_ann_index",
+    # Videos last: photos are the primary surface, so they finish first.
+    "tag_videos",
+    "embed_video_frames",
+    "score_videos",
+)
+
+PIPELINES: Dict[str, Tuple[str, ...]] = {
+    "ai_tagging": ("ensure_models", *_TAGGING_STAGES),
+    "sync_folder": (
+        "index_images",
+        "index_videos",
+        *_TAGGING_STAGES,
+        "restart_watcher",
+    ),
+}
+
+
+def job_util_enqueue(kind: str, params: Dict[str, Any]) -> JobId:
+    """Queue a job of the given kind. It runs on the next job_util_run_pending."""
+    if kind not in PIPELINES:
+        raise ValueError(f"Unknown job kind: {kind}")
+    return db_enqueue_job(kind, params, PIPELINES[kind])
+
+
+def job_util_enqueue_sync_folder(
+    folder_path: str, folder_id: str, added_folders: List[Tuple[str, str]]
+) -> JobId:
+    """Queue the post-sync job for a folder and the (id, path) folders it gained."""
+    folders = [(folder_id, folder_path), *added_folders]
+    logger.info(f"Sync folder: {folders}")
+    return job_util_enqueue("sync_folder", {"folders": folders})
+
+
+def job_util_resume() -> int:
+    """
+    Prepare the queue left by a previous session. Call once at startup,
+    before any runner.
+
+    Returns:
+        The number of unfinished jobs, which a runner should pick up
+    """
+    requeued = db_requeue_interrupted_stages()
+    if requeued:
+        logger.info(f"Requeued {requeued} interrupted job stage(s)")
+    return db_count_unfinished_jobs()
+
+
+def _stage_limits() -> Dict[str, int]:
+    from app.config.settings import JOB_INDEX_CONCURRENCY
+
+    return {
+        name: JOB_INDEX_CONCURRENCY if stage.folder_scoped else 1
+        for name, stage in STAGES.items()
+    }
+
+
+def _count(counter: Optional[str]) -> Optional[int]:
+    if counter is None:
+        return None
+    try:
+        return db_count_library_items()[counter]
+    except sqlite3.Error as e:
+        logger.warning(f"Could not count {counter}: {e}")
+        return None
+
+
+def _run_stage(job: JobStage) -> None:
+    """Run one claimed stage and checkpoint the outcome."""
+    label = f"Job {job['job_id']} ({job['kind']}) stage {job['stage']}"
+    stage = STAGES.get(job["stage"])
+    if stage is None:
+        # A job queued by a version with different stages
+        logger.error(f"{label}: unknown stage")
+        db_fail_stage(job["job_id"], job["position"], "Unknown stage")
+        return
+
+    logger.info(f"{label} started")
+    before = _count(stage.counter)
+    try:
+        result = stage.run(job)
+    except Exception as e:
+        logger.error(f"{label} failed: {e}")
+        db_fail_stage(job["job_id"], job["position"], str(e))
+        return
+    after = _count(stage.counter)
+
+    if isinstance(result, int) and not isinstance(result, bool):
+        items = result
+    elif before is None or after is None:
+        items = None
+    else:
+        items = max(0, after - before)
+    db_complete_stage(job["job_id"], job["position"], items)
+    logger.info(f"{label} completed")
+
+
+# A checkpoint write that fails, e.g. on a database still locked after the
+# busy timeout, is retried this many times, backing off a little more each time
+_CHECKPOINT_ATTEMPTS = 5
+_CHECKPOINT_RETRY_SECONDS = 0.5
+
+
+def _retry_checkpoint(write: Callable[..., Any], *args: Any) -> bool:
+    for attempt in range(1, _CHECKPOINT_ATTEMPTS + 1):
+        try:
+            write(*args)
+            return True
+        except sqlite3.Error as e:
+            logger.warning(f"Job checkpoint write failed (attempt {attempt}): {e}")
+            if attempt < _CHECKPOINT_ATTEMPTS:
+                time.sleep(_CHECKPOINT_RETRY_SECONDS * attempt)
+    return False
+
+
+def _recover_lost_checkpoint(
+    job: JobStage, error: BaseException, lost: Set[Tuple[JobId, int]]
+) -> None:
+    """
+    Settle a stage whose outcome _run_stage could not record. Left
+    'running', it would hold its stage's limit against every later job
+    until a restart.
+
+    The first time, the stage goes back in the queue: running it again is
+    safe. If its checkpoint is lost again, it fails instead, so a write that
+    keeps failing cannot rerun the stage forever.
+    """
+    key = (job["job_id"], job["position"])
+    label = f"Job {job['job_id']} ({job['kind']}) stage {job['stage']}"
+    if key in lost:
+        logger.error(f"{label}: checkpoint lost again, failing the stage: {error}")
+        settled = _retry_checkpoint(
+            db_fail_stage, job["job_id"], job["position"], f"Checkpoint failed: {error}"
+        )
+    else:
+        logger.error(f"{label}: checkpoint lost, requeueing the stage: {error}")
+        lost.add(key)
+        settled = _retry_checkpoint(db_requeue_stage, job["job_id"], job["position"])
+    if not settled:
+        logger.error(f"{label} is stuck running until the next restart")
+
+
+def job_util_run_pending() -> int:
+    """
+    Run queued stages until none are left. Submitted to the background
+    executor after each enqueue; a runner already going picks the new job
+    up itself, and the one submitted behind it finds nothing to do.
+
+    Returns:
+        The number of stages run
+    """
+    from app.config.settings import JOB_HISTORY_SIZE, JOB_WORKERS
+
+    if not db_count_unfinished_jobs():
+        return 0
+
+    limits = _stage_limits()
+    ran = 0
+    # Every job kind tags, so folders read as mid-tagging until the queue
+    # drains. Set again even on failure: a folder that failed to tag is not
+    # still tagging, and leaving the flag clear would block memories forever.
+    db_set_tagging_completed(False)
+    try:
+        with ThreadPoolExecutor(
+            max_workers=JOB_WORKERS, thread_name_prefix="job"
+        ) as pool:
+            running: Dict[Future, JobStage] = {}
+            lost: Set[Tuple[JobId, int]] = set()
+            while True:
+                while len(running) < JOB_WORKERS:
+                    # A GPU toggle made while this runner holds the worker
+                    # applies from the next stage on
+                    ONNX_util_refresh_execution_providers()
+                    job = db_claim_next_stage(limits)
+                    if job is None:
+                        break
+                    running[pool.submit(_run_stage, job)] = job
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = running.pop(future)
+                    # A stage's own failure is recorded by _run_stage; this
+                    # is the checkpoint write itself failing
+                    if future.exception() is not None:
+                        _recover_lost_checkpoint(job, future.exception(), lost)
+                ran += len(done)
+    except Exception as e:
+        logger.error(f"Job runner stopped: {e}")
+    finally:
+        db_set_tagging_completed(True)
+        db_prune_finished_jobs(JOB_HISTORY_SIZE)
+    return ran
@@ -697,6 +697,7 @@ def video_util_process_unembedded_frames() -> None:
     )
     from app.models.model_registry import get_siglip2_registry_keys, get_model_path
     from app.models.SigLIP2Vision import SigLIP2Vision
+    from app.models.session_pool import acquire_model, release_model
     from app.utils.SigLIP import siglip_util_preprocess_image
 
     try:
@@ -716,7 +717,7 @@ def video_util_process_unembedded_frames() -> None:
         resolution = metadata["input_resolution"]
         model_version = metadata["model_version"]
 
-        vision_model = SigLIP2Vision(vision_model_path)
+        vision_model = acquire_model(SigLIP2Vision, vision_model_path)
         try:
             total_frames = len(unembedded_frames)
             embedded_count = 0
@@ -765,7 +766,7 @@ def video_util_process_unembedded_frames() -> None:
                 f"Elapsed: {elapsed:.2f}s"
             )
         finally:
-            vision_model.close()
+            release_model(vision_model)
 
     except Exception as e:
         logger.error(f"Error embedding video frames: {e}")
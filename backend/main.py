@@ -29,6 +29,9 @@ from app.database.semantic_labels import db_create_semantic_labels_table
 from app.database.image_embeddings import db_create_image_embeddings_table
 from app.database.video_frames import db_create_video_frames_tables
 from app.database.memories import db_create_memories_table
+from app.database.migrations import db_migrate_schema
+from app.database.jobs import db_create_jobs_tables
+from app.utils.jobs import job_util_resume, job_util_run_pending
 from app.utils.semantic_labels import (
     semantic_util_sync_vocabulary,
     semantic_util_build_label_embeddings,
@@ -43,6 +46,7 @@ from app.routes.videos import router as videos_router
 from app.routes.face_clusters import router as face_clusters_router
 from app.routes.user_preferences import router as user_preferences_router
 from app.routes.memories import router as memories_router
+from app.routes.jobs import router as jobs_router
 from app.routes.shutdown import router as shutdown_router
 from app.routes.share import router as share_router
 from app.routes.models import router as models_router, _cleanup_stale_tasks
@@ -83,6 +87,9 @@ async def lifespan(app: FastAPI):
     db_create_album_images_table()
     db_create_metadata_table()
     db_create_memories_table()  # References images(id) and videos(id)
+    db_create_jobs_tables()
+    # Indexes and other changes to existing databases; needs every table
+    db_migrate_schema()
     # Nothing is indexing or tagging yet, so anything still flagged busy is
     # left over from a previous session and would block memory generation.
     db_clear_stale_processing_flags()
@@ -97,6 +104,9 @@ async def lifespan(app: FastAPI):
     app.state.executor.submit(semantic_util_build_label_embeddings)
     app.state.executor.submit(semantic_util_score_images)
     app.state.executor.submit(semantic_util_score_videos)
+    # Jobs cut off by the last shutdown carry on from the interrupted stage
+    if job_util_resume():
+        app.state.executor.submit(job_util_run_pending)
 
     # Start the SSE model download cleanup task
     cleanup_task = asyncio.create_task(_cleanup_stale_tasks())
@@ -184,6 +194,7 @@ app.include_router(
     user_preferences_router, prefix="/user-preferences", tags=["User Preferences"]
 )
 app.include_router(memories_router, prefix="/memories", tags=["Memories"])
+app.include_router(jobs_router, prefix="/jobs", tags=["Jobs"])
 app.include_router(shutdown_router, tags=["Shutdown"])
 app.include_router(share_router, prefix="/share", tags=["Share"])
 app.include_router(models_router, prefix="/models", tags=["Models"])
@@ -0,0 +1,130 @@
+"""Quality/memory benchmark: sparse-graph vs dense DBSCAN face clustering (offline dev script).
+
+Runs cluster_util_cluster_all_face_embeddings on the same synthetic library
+once per path, each in a fresh process, and reports:
+  - adjusted Rand index against the true identities, and between the paths
+  - clusters found and wall time
+  - peak RSS growth over the process's footprint before clustering
+
+The library is N unit vectors (D=512, like FaceNet): identities of varying
+size plus unrelated one-off faces. The dense path needs ~4*N^2 bytes for
+the distance matrix alone; use --skip-dense for large N.
+Run from the backend directory:
+    python scripts/benchmark_face_clustering.py --faces 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+
+def _library(n: int, dim: int, seed: int):
+    """Unit vectors and their identity labels (-1 for one-off faces)."""
+    rng = np.random.default_rng(seed)
+    labels = []
+    identity = 0
+    clustered = int(n * 0.8)
+    while len(labels) < clustered:
+        size = min(int(rng.pareto(1.2) * 5) + 2, clustered - len(labels))
+        labels.extend([identity] * size)
+        identity += 1
+    labels.extend([-1] * (n - len(labels)))
+    labels = np.array(labels)
+
+    centres = rng.standard_normal((identity, dim)).astype(np.float32)
+    centres /= np.linalg.norm(centres, axis=1, keepdims=True)
+    matrix = np.where(
+        (labels >= 0)[:, None], centres[np.maximum(labels, 0)], 0
+    ) + rng.standard_normal((n, dim)).astype(np.float32) * np.where(
+        labels >= 0, 0.03, 1.0
+    )[
+        :, None
+    ].astype(
+        np.float32
+    )
+    # One-off faces get their own random direction
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix.astype(np.float32), labels
+
+
+def _run(mode: str, n: int, dim: int, seed: int):
+    from app.utils.face_clusters import cluster_util_cluster_all_face_embeddings
+
+    matrix, _ = _library(n, dim, seed)
+    faces = (list(range(n)), [None] * n, [None] * n, matrix)
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    threshold = 1 if mode == "sparse" else 10**12
+
+    start = time.perf_counter()
+    with patch(
+        "app.utils.face_clusters.db_get_all_faces_with_cluster_names",
+        return_value=faces,
+    ), patch("app.config.settings.PICTO_CLUSTERING_SPARSE_MIN_FACES", threshold):
+        results, _ = cluster_util_cluster_all_face_embeddings()
+    seconds = time.perf_counter() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    predicted = np.full(n, -1)
+    cluster_index = {}
+    for r in results:
+        predicted[r.face_id] = cluster_index.setdefault(
+            r.cluster_uuid, len(cluster_index)
+        )
+    # ru_maxrss is KiB on Linux
+    return predicted, seconds, (peak - before) / 1024
+
+
+def _ari(a: np.ndarray, b: np.ndarray) -> float:
+    from sklearn.metrics import adjusted_rand_score
+
+    # Unclustered faces are singletons, not one big "noise" cluster
+    def singletons(labels):
+        out = labels.copy()
+        noise = out < 0
+        out[noise] = out.max() + 1 + np.arange(noise.sum())
+        return out
+
+    return adjusted_rand_score(singletons(a), singletons(b))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--faces", type=int, default=20_000)
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-dense", action="store_true")
+    args = parser.parse_args()
+
+    _, truth = _library(args.faces, args.dim, args.seed)
+    modes = ["sparse"] if args.skip_dense else ["dense", "sparse"]
+    labels = {}
+    print(f"faces={args.faces} dim={args.dim} identities={truth.max() + 1}")
+    for mode in modes:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            predicted, seconds, peak_mib = executor.submit(
+                _run, mode, args.faces, args.dim, args.seed
+            ).result()
+        labels[mode] = predicted
+        clusters = len(set(predicted.tolist()) - {-1})
+        print(
+            f"{mode:>6}: ARI vs truth {_ari(predicted, truth):.4f}, "
+            f"{clusters} clusters, {seconds:.1f}s, peak RSS +{peak_mib:.0f} MiB"
+        )
+    if len(labels) == 2:
+        print(f"ARI dense vs sparse: {_ari(labels['dense'], labels['sparse']):.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Recall/latency benchmark: IVF index vs exact semantic search (offline dev script).
+
+Builds an index over N embeddings, then for a set of queries compares the
+top-K rows of ann_util_search against exact `matrix @ query` ranking:
+  - recall@K (share of the exact top-K the index also returns)
+  - median and p95 latency of both paths
+  - the share of the library the index actually scored
+
+By default the library is synthetic (clustered unit vectors, D=768). With
+--from-db it uses the active checkpoint's embeddings from the local
+database, and queries are drawn from the library itself.
+Run from the backend directory:
+    python scripts/benchmark_semantic_ann.py --images 200000 --nprobe 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from app.utils.ann_index import (  # noqa: E402
+    ann_util_assign,
+    ann_util_search,
+    ann_util_train_centroids,
+)
+
+
+def _synthetic(n: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    matrix = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, 65536):
+        size = min(65536, n - start)
+        block = centres[rng.integers(clusters, size=size)]
+        block += 0.6 * rng.standard_normal((size, dim)).astype(np.float32)
+        matrix[start : start + size] = block
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix
+
+
+def _from_db() -> np.ndarray:
+    from app.config.settings import SIGLIP2_ACTIVE_CHECKPOINT, SIGLIP2_SCORING_METADATA
+    from app.database.embedding_store import db_open_embedding_store
+
+    model_version = SIGLIP2_SCORING_METADATA[SIGLIP2_ACTIVE_CHECKPOINT]["model_version"]
+    store = db_open_embedding_store(model_version)
+    if store is None:
+        sys.exit(f"No embeddings stored for {model_version}")
+    return np.asarray(store.matrix)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=32)
+    parser.add_argument("--nlist", type=int, default=0, help="0 = sqrt(N)")
+    parser.add_argument("--from-db", action="store_true")
+    args = parser.parse_args()
+
+    matrix = (
+        _from_db()
+        if args.from_db
+        else _synthetic(args.images, args.dim, args.clusters, seed=0)
+    )
+    n = len(matrix)
+    nlist = args.nlist or max(1, int(np.sqrt(n)))
+    ids = [f"img{i}" for i in range(n)]
+
+    start = time.perf_counter()
+    centroids = ann_util_train_centroids(matrix, nlist)
+    lists = ann_util_assign(matrix, centroids)
+    build_seconds = time.perf_counter() - start
+
+    # Queries near library points, the way text queries land near photos
+    rng = np.random.default_rng(1)
+    queries = matrix[rng.choice(n, size=args.queries, replace=False)].copy()
+    queries += 0.3 * rng.standard_normal(queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.ivf.npz")
+        np.savez(
+            path,
+            centroids=centroids,
+            ids=np.array([i.encode() for i in ids]),
+            lists=lists,
+        )
+        with patch("app.utils.ann_index.ann_util_index_path", return_value=path):
+            # First call maps the index onto the rows; not part of a query
+            ann_util_search("bench", ids, matrix, queries[0], args.nprobe)
+
+            exact_times, ann_times, recalls, scanned = [], [], [], []
+            k = args.top_k
+            for query in queries:
+                start = time.perf_counter()
+                scores = matrix @ query
+                exact = np.argpartition(-scores, k)[:k]
+                exact_times.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                rows, dots = ann_util_search("bench", ids, matrix, query, args.nprobe)
+                approx = rows[np.argpartition(-dots, min(k, len(dots) - 1))[:k]]
+                ann_times.append(time.perf_counter() - start)
+
+                recalls.append(len(set(exact) & set(approx)) / k)
+                scanned.append(len(rows) / n)
+
+    def ms(values, q):
+        return 1000 * float(np.percentile(values, q))
+
+    print(f"images={n} dim={matrix.shape[1]} nlist={nlist} nprobe={args.nprobe}")
+    print(f"index build: {build_seconds:.2f}s")
+    print(f"recall@{k}: {np.mean(recalls):.3f} (min {np.min(recalls):.2f})")
+    print(f"scored per query: {100 * np.mean(scanned):.2f}% of the library")
+    print(
+        f"exact latency: p50 {ms(exact_times, 50):.2f}ms p95 {ms(exact_times, 95):.2f}ms"
+    )
+    print(f"ann latency:   p50 {ms(ann_times, 50):.2f}ms p95 {ms(ann_times, 95):.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
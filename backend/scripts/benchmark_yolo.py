@@ -0,0 +1,116 @@
+"""Per-image YOLO preprocessing and inference timings (offline dev script).
+
+Compares, over the same random photos:
+  - preprocessing: the old allocating chain (cvtColor, gray canvas, float64
+    divide, transpose, float32 cast) vs letterboxing into the instance's
+    float32 CHW buffer
+  - inference, when the model is installed: session.run with a fresh input
+    vs the pre-bound IOBinding path
+
+Run from the backend directory:
+    python scripts/benchmark_yolo.py --images 200 --model-path path/to/model.onnx
+
+Without --model-path the small object model from settings is used.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.models.YOLO import YOLO  # noqa: E402
+
+
+def _old_preprocess(image: np.ndarray, width: int, height: int) -> np.ndarray:
+    img_height, img_width = image.shape[:2]
+    input_img = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    scale = min(width / img_width, height / img_height)
+    new_w, new_h = round(img_width * scale), round(img_height * scale)
+    pad_x, pad_y = (width - new_w) // 2, (height - new_h) // 2
+    padded = np.full((height, width, 3), 114, dtype=input_img.dtype)
+    padded[pad_y : pad_y + new_h, pad_x : pad_x + new_w] = cv2.resize(
+        input_img, (new_w, new_h)
+    )
+    input_img = padded / 255.0
+    return input_img.transpose(2, 0, 1).astype(np.float32)[np.newaxis]
+
+
+def _time_per_image(fn, images) -> tuple[float, float]:
+    times = []
+    for image in images:
+        start = time.perf_counter()
+        fn(image)
+        times.append(time.perf_counter() - start)
+    return 1000 * float(np.median(times)), 1000 * float(np.percentile(times, 95))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=200)
+    parser.add_argument("--width", type=int, default=4032)
+    parser.add_argument("--height", type=int, default=3024)
+    parser.add_argument("--input-size", type=int, default=640)
+    parser.add_argument("--model-path", default=settings.SMALL_OBJ_DETECTION_MODEL)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # A few distinct frames, cycled, so generation does not dominate memory
+    frames = [
+        rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+        for _ in range(4)
+    ]
+    images = [frames[i % len(frames)] for i in range(args.images)]
+
+    model_path = args.model_path
+    yolo = YOLO(model_path)
+    if os.path.exists(model_path):
+        yolo.get_session()
+    else:
+        print(f"{model_path} not installed; timing preprocessing only")
+        yolo.input_width = yolo.input_height = args.input_size
+
+    def report(label, timings):
+        print(f"{label:<28} p50 {timings[0]:7.2f}ms  p95 {timings[1]:7.2f}ms")
+
+    print(f"images={args.images} frame={args.width}x{args.height}")
+    report(
+        "preprocess (allocating)",
+        _time_per_image(
+            lambda image: _old_preprocess(image, yolo.input_width, yolo.input_height),
+            images,
+        ),
+    )
+    report("preprocess (buffer)", _time_per_image(yolo.prepare_input, images))
+
+    if yolo._session is None:
+        return
+    session = yolo._session
+    report(
+        "inference (session.run)",
+        _time_per_image(
+            lambda image: session.run(
+                yolo.output_names,
+                {yolo.input_names[0]: yolo.prepare_input(image).copy()},
+            ),
+            images,
+        ),
+    )
+    report(
+        "inference (IOBinding)",
+        _time_per_image(
+            lambda image: yolo.inference(yolo.prepare_input(image), session), images
+        ),
+    )
+    yolo.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,29 @@ from app.database.semantic_labels import db_create_semantic_labels_table
 from app.database.image_embeddings import db_create_image_embeddings_table
 from app.database.video_frames import db_create_video_frames_tables
 from app.database.memories import db_create_memories_table
+from app.database.migrations import db_migrate_schema
+from app.database.jobs import db_create_jobs_tables
+
+
+@pytest.fixture(autouse=True)
+def reset_model_caches():
+    """Providers resolved and models pooled by one test must not leak into
+    the next."""
+    yield
+    from app.utils.ONNX import ONNX_util_invalidate_execution_providers
+
+    # Also closes idle pooled models
+    ONNX_util_invalidate_execution_providers()
+
+
+@pytest.fixture(autouse=True)
+def close_pooled_connections():
+    """Each test points the database modules at its own file; pooled
+    connections to it must not outlive the test."""
+    yield
+    from app.database.connection import db_close_idle_connections
+
+    db_close_idle_connections()
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -39,6 +62,8 @@ def setup_before_all_tests():
         db_create_video_frames_tables()
         db_create_metadata_table()
         db_create_memories_table()  # References images(id) and videos(id)
+        db_create_jobs_tables()
+        db_migrate_schema()
         print("All database tables created successfully")
     except Exception as e:
         print(f"Error creating database tables: {e}")
@@ -7,6 +7,7 @@ from unittest.mock import MagicMock, patch
 import bcrypt
 import pytest
 
+from app.database.connection import db_close_idle_connections
 from app.database.albums import (
     db_album_contains_image,
     db_count_album_images,
@@ -53,6 +54,7 @@ def test_db(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
 
     yield db_path
 
+    db_close_idle_connections(db_path)
     os.unlink(db_path)
 
 
@@ -168,7 +170,7 @@ class TestAlbumTables:
         Mocked deliberately: a real CREATE can't be made to fail while leaving
         the connection observable.
         """
-        with patch("app.database.albums.sqlite3.connect") as mock_connect:
+        with patch("app.database.albums.db_connect") as mock_connect:
             conn = MagicMock()
             conn.cursor.return_value.execute.side_effect = sqlite3.Error("fail")
             mock_connect.return_value = conn
@@ -0,0 +1,155 @@
+import os
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+import app.utils.ann_index as ann_module
+from app.utils.ann_index import (
+    ann_util_assign,
+    ann_util_build_index,
+    ann_util_index_path,
+    ann_util_search,
+    ann_util_train_centroids,
+)
+
+DIM = 32
+BASE = "siglip2-base-patch16-224"
+
+
+def _clustered(n: int, clusters: int = 50, seed: int = 0) -> np.ndarray:
+    """Unit vectors around random centres, like a library of photo themes."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, DIM))
+    points = centres[rng.integers(clusters, size=n)] + 0.35 * rng.standard_normal(
+        (n, DIM)
+    )
+    points /= np.linalg.norm(points, axis=1, keepdims=True)
+    return points.astype(np.float32)
+
+
+def _write_index(path, ids, matrix, nlist=16):
+    centroids = ann_util_train_centroids(matrix, nlist)
+    np.savez(
+        path,
+        centroids=centroids,
+        ids=np.array([i.encode() for i in ids]),
+        lists=ann_util_assign(matrix, centroids),
+    )
+
+
+@pytest.fixture
+def index_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "index.ivf.npz")
+    monkeypatch.setattr(ann_module, "ann_util_index_path", lambda version: path)
+    monkeypatch.setattr(ann_module, "_index_states", {})
+    return path
+
+
+class TestTraining:
+    def test_centroids_are_unit_length(self):
+        centroids = ann_util_train_centroids(_clustered(2000), nlist=20)
+
+        assert centroids.shape == (20, DIM)
+        np.testing.assert_allclose(np.linalg.norm(centroids, axis=1), 1.0, rtol=1e-5)
+
+    def test_assignment_is_the_nearest_centroid(self):
+        matrix = _clustered(500)
+        centroids = ann_util_train_centroids(matrix, nlist=8)
+
+        lists = ann_util_assign(matrix, centroids)
+
+        assert lists.tolist() == np.argmax(matrix @ centroids.T, axis=1).tolist()
+
+
+class TestSearch:
+    def test_recall_against_exact_search(self, index_path):
+        matrix = _clustered(5000)
+        ids = [f"img{i}" for i in range(len(matrix))]
+        _write_index(index_path, ids, matrix, nlist=70)
+        queries = _clustered(20, seed=1)
+
+        hits = 0
+        for query in queries:
+            exact = set(np.argsort(-(matrix @ query))[:10].tolist())
+            rows, dots = ann_util_search(BASE, ids, matrix, query, nprobe=8)
+            approx = set(rows[np.argsort(-dots)[:10]].tolist())
+            hits += len(exact & approx)
+            # Candidates are scored exactly, not approximated
+            np.testing.assert_allclose(dots, matrix[rows] @ query, rtol=1e-6)
+
+        assert hits / (10 * len(queries)) >= 0.9
+
+    def test_rows_added_after_the_build_are_searchable(self, index_path):
+        matrix = _clustered(1000)
+        ids = [f"img{i}" for i in range(len(matrix))]
+        _write_index(index_path, ids[:800], matrix[:800])
+
+        query = matrix[950]
+        rows, _ = ann_util_search(BASE, ids, matrix, query, nprobe=4)
+
+        assert 950 in rows.tolist()
+
+    def test_removed_rows_are_remapped_by_id(self, index_path):
+        matrix = _clustered(1000)
+        ids = [f"img{i}" for i in range(len(matrix))]
+        _write_index(index_path, ids, matrix)
+        ann_util_search(BASE, ids, matrix, matrix[0], nprobe=4)
+
+        # The cache drops img10, shifting every later row down by one
+        keep = np.ones(len(ids), dtype=bool)
+        keep[10] = False
+        ids2 = [i for i, k in zip(ids, keep) if k]
+        matrix2 = matrix[keep]
+        rows, _ = ann_util_search(BASE, ids2, matrix2, matrix[500], nprobe=4)
+
+        assert ids2.index("img500") in rows.tolist()
+
+    def test_no_index_file_falls_back(self, index_path):
+        matrix = _clustered(10)
+
+        assert ann_util_search(BASE, ["a"] * 10, matrix, matrix[0], 4) is None
+
+
+class TestBuild:
+    def _store(self, n):
+        matrix = _clustered(n)
+        return type(
+            "Store",
+            (),
+            {"ids": np.array([f"img{i}" for i in range(n)]), "matrix": matrix},
+        )()
+
+    def _build(self, store, min_images=100, growth=0.5):
+        with patch(
+            "app.database.embedding_store.db_open_embedding_store",
+            return_value=store,
+        ), patch("app.config.settings.SIGLIP2_ANN_MIN_IMAGES", min_images), patch(
+            "app.config.settings.SIGLIP2_ANN_REBUILD_GROWTH", growth
+        ):
+            ann_util_build_index()
+
+    def test_small_libraries_get_no_index(self, index_path):
+        self._build(self._store(50))
+
+        assert not os.path.exists(index_path)
+
+    def test_builds_and_waits_for_growth_before_retraining(self, index_path):
+        self._build(self._store(400))
+        with np.load(index_path) as index:
+            assert len(index["lists"]) == 400
+            assert len(index["centroids"]) == 20
+
+        self._build(self._store(500))
+        with np.load(index_path) as index:
+            assert len(index["lists"]) == 400
+
+        self._build(self._store(600))
+        with np.load(index_path) as index:
+            assert len(index["lists"]) == 600
+
+    def test_index_lives_next_to_the_embedding_store(self):
+        with patch("app.database.images.DATABASE_PATH", "/data/db/PictoPy.db"):
+            path = ann_util_index_path(BASE)
+
+        assert path == os.path.join("/data/db/embeddings", f"{BASE}.ivf.npz")
@@ -5,7 +5,11 @@ from typing import Iterator, List, Tuple
 
 import pytest
 
-from app.database.connection import get_db_connection
+from app.database.connection import (
+    db_close_idle_connections,
+    db_connect,
+    get_db_connection,
+)
 
 # ##############################
 # Pytest Fixtures
@@ -23,6 +27,7 @@ def test_db(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
 
         yield db_path
     finally:
+        db_close_idle_connections(db_path)
         os.unlink(db_path)
 
 
@@ -87,3 +92,135 @@ class TestConnectionPragmas:
     def test_enforcement_pragmas_are_set(self, test_db, pragma, expected):
         with get_db_connection() as conn:
             assert conn.execute(f"PRAGMA {pragma}").fetchone()[0] == expected
+
+
+# ##############################
+# Pooled connections
+# ##############################
+
+
+def has_temp_marker(conn) -> bool:
+    """TEMP tables belong to one connection, so they identify it."""
+    return (
+        conn.execute(
+            "SELECT COUNT(*) FROM sqlite_temp_master WHERE name = 'marker'"
+        ).fetchone()[0]
+        == 1
+    )
+
+
+def mark(conn) -> None:
+    conn.execute("CREATE TEMP TABLE marker (x)")
+
+
+class TestDbConnect:
+    def test_connections_use_wal_and_tuned_pragmas(self, test_db):
+        conn = db_connect(test_db)
+        try:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            # NORMAL
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+            assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 0
+        finally:
+            conn.close()
+
+    def test_foreign_keys_connections_enforce_them(self, test_db):
+        conn = db_connect(test_db, foreign_keys=True)
+        try:
+            assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+        finally:
+            conn.close()
+
+    def test_closed_connections_are_reused(self, test_db):
+        conn = db_connect(test_db)
+        mark(conn)
+        conn.close()
+
+        conn = db_connect(test_db)
+        try:
+            assert has_temp_marker(conn)
+        finally:
+            conn.close()
+
+    def test_pragma_sets_never_share_a_connection(self, test_db):
+        conn = db_connect(test_db)
+        mark(conn)
+        conn.close()
+
+        conn = db_connect(test_db, foreign_keys=True)
+        try:
+            assert not has_temp_marker(conn)
+        finally:
+            conn.close()
+
+        with get_db_connection() as conn:
+            assert not has_temp_marker(conn)
+
+    def test_connections_on_loan_are_not_shared(self, test_db):
+        first = db_connect(test_db)
+        mark(first)
+        second = db_connect(test_db)
+        try:
+            assert not has_temp_marker(second)
+        finally:
+            first.close()
+            second.close()
+
+    def test_uncommitted_writes_are_rolled_back_on_close(self, test_db):
+        with get_db_connection() as conn:
+            conn.execute("CREATE TABLE test (id INTEGER PRIMARY KEY, name TEXT)")
+
+        conn = db_connect(test_db)
+        conn.execute("INSERT INTO test (name) VALUES ('Alice')")
+        conn.close()
+
+        assert read_names(test_db) == []
+        conn = db_connect(test_db)
+        try:
+            assert not conn.in_transaction
+        finally:
+            conn.close()
+
+    def test_row_factory_is_reset_on_close(self, test_db):
+        conn = db_connect(test_db)
+        conn.row_factory = sqlite3.Row
+        conn.close()
+
+        conn = db_connect(test_db)
+        try:
+            assert conn.row_factory is None
+            assert conn.execute("SELECT 1").fetchone() == (1,)
+        finally:
+            conn.close()
+
+    def test_open_cursors_are_closed_on_close(self, test_db):
+        conn = db_connect(test_db)
+        cursor = conn.execute("SELECT 1 UNION ALL SELECT 2")
+        cursor.fetchone()
+        conn.close()
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            cursor.fetchone()
+
+    def test_replaced_database_file_gets_a_fresh_connection(self, test_db):
+        conn = db_connect(test_db)
+        mark(conn)
+        conn.close()
+
+        os.unlink(test_db)
+        open(test_db, "wb").close()
+
+        conn = db_connect(test_db)
+        try:
+            assert not has_temp_marker(conn)
+        finally:
+            conn.close()
+
+    def test_idle_connections_are_capped(self, test_db, monkeypatch):
+        monkeypatch.setattr("app.config.settings.DATABASE_POOL_SIZE", 1)
+        leases = [db_connect(test_db) for _ in range(3)]
+        for conn in leases:
+            conn.close()
+
+        assert db_close_idle_connections(test_db) == 1
+        assert db_close_idle_connections(test_db) == 0
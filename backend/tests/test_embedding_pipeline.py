@@ -2,6 +2,7 @@ from unittest.mock import patch, MagicMock
 
 import numpy as np
 
+from app.models import session_pool
 from app.utils.images import image_util_process_unembedded_images
 
 BASE_METADATA = {
@@ -98,7 +99,9 @@ class TestProcessUnembeddedImages:
 
         with patch("app.config.settings.SIGLIP2_EMBED_BATCH_SIZE", 8), patch(
             "app.config.settings.SIGLIP2_SCORING_METADATA", BASE_METADATA
-        ), patch("app.config.settings.SIGLIP2_ACTIVE_CHECKPOINT", "base"):
+        ), patch("app.config.settings.SIGLIP2_ACTIVE_CHECKPOINT", "base"), patch(
+            "app.models.session_pool.release_model", wraps=session_pool.release_model
+        ) as mock_release:
             image_util_process_unembedded_images()
 
         # Only the two successfully-preprocessed images get an embedding row.
@@ -114,7 +117,9 @@ class TestProcessUnembeddedImages:
         mock_mark_embedded.assert_called_once()
         assert set(mock_mark_embedded.call_args[0][0]) == {"img0", "img2"}
 
-        mock_vision_instance.close.assert_called_once()
+        # The session goes back to the pool, warm for the next pass
+        mock_release.assert_called_once_with(mock_vision_instance)
+        mock_vision_instance.close.assert_not_called()
 
     @patch("app.database.images.db_mark_images_embedded")
     @patch("app.database.image_embeddings.db_upsert_image_embeddings")
@@ -193,10 +198,12 @@ class TestProcessUnembeddedImages:
             "app.config.settings.SIGLIP2_SCORING_METADATA", BASE_METADATA
         ), patch(
             "app.config.settings.SIGLIP2_ACTIVE_CHECKPOINT", "base"
-        ):
+        ), patch(
+            "app.models.session_pool.release_model", wraps=session_pool.release_model
+        ) as mock_release:
             # The function catches and logs internally -- it must not raise,
             # and must still release the vision model session.
             image_util_process_unembedded_images()
 
-        mock_vision_instance.close.assert_called_once()
+        mock_release.assert_called_once_with(mock_vision_instance)
         mock_upsert.assert_not_called()
@@ -0,0 +1,154 @@
+import os
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+import app.database.embedding_store as store_module
+import app.database.folders as folders_module
+import app.database.images as images_module
+import app.database.yolo_mapping as yolo_mapping_module
+from app.database.embedding_store import db_open_embedding_store
+from app.database.folders import db_create_folders_table
+from app.database.image_embeddings import (
+    db_create_image_embeddings_table,
+    db_get_embeddings_for_image_ids,
+    db_get_embeddings_needing_scoring,
+    db_upsert_image_embeddings,
+)
+from app.database.images import _connect, db_create_images_table
+from app.database.yolo_mapping import db_create_YOLO_classes_table
+
+BASE = "siglip2-base-patch16-224"
+
+
+@pytest.fixture(autouse=True)
+def _isolated_db(tmp_path, monkeypatch):
+    """Per-test database; the store lives next to it, so it is per-test too."""
+    db_path = str(tmp_path / "db" / "test_embedding_store.sqlite3")
+    os.makedirs(os.path.dirname(db_path))
+    monkeypatch.setattr(images_module, "DATABASE_PATH", db_path)
+    monkeypatch.setattr(folders_module, "DATABASE_PATH", db_path)
+    monkeypatch.setattr(yolo_mapping_module, "DATABASE_PATH", db_path)
+    monkeypatch.setattr(store_module, "_open_stores", {})
+    db_create_YOLO_classes_table()
+    db_create_folders_table()
+    db_create_images_table()
+    db_create_image_embeddings_table()
+    yield os.path.join(os.path.dirname(db_path), "embeddings")
+
+
+def _embed(image_ids, dim=4, model_version=BASE):
+    conn = _connect()
+    for image_id in image_ids:
+        conn.execute(
+            "INSERT OR IGNORE INTO images (id, path, folder_id, thumbnailPath, "
+            "metadata, isTagged, isEmbedded) VALUES (?, ?, NULL, ?, '{}', 0, 0)",
+            (image_id, f"/tmp/{image_id}.jpg", f"/tmp/{image_id}_thumb.jpg"),
+        )
+    conn.commit()
+    conn.close()
+    db_upsert_image_embeddings(
+        [
+            (image_id, model_version, np.full(dim, float(i), dtype=np.float32))
+            for i, image_id in enumerate(image_ids)
+        ]
+    )
+
+
+def _store_files(directory):
+    return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+
+class TestEmbeddingStore:
+    def test_builds_a_read_only_map_of_the_table(self, _isolated_db):
+        _embed(["a", "b", "c"])
+
+        store = db_open_embedding_store(BASE)
+
+        assert store.ids.tolist() == ["a", "b", "c"]
+        assert store.matrix.shape == (3, 4)
+        assert not store.matrix.flags.writeable
+        assert store.matrix[store.rows["c"]].tolist() == [2.0] * 4
+        assert len(_store_files(_isolated_db)) == 2
+
+    def test_unchanged_table_reuses_the_store(self):
+        _embed(["a", "b"])
+        first = db_open_embedding_store(BASE)
+
+        # Even a fresh process (empty handle cache) finds the files on disk
+        store_module._open_stores.clear()
+        with patch.object(store_module, "_build_store") as build:
+            second = db_open_embedding_store(BASE)
+
+        build.assert_not_called()
+        assert second.signature == first.signature
+
+    def test_table_changes_rebuild_and_drop_the_old_files(self, _isolated_db):
+        _embed(["a", "b"])
+        db_open_embedding_store(BASE)
+
+        _embed(["a", "b", "c"])
+        store = db_open_embedding_store(BASE)
+
+        assert store.ids.tolist() == ["a", "b", "c"]
+        assert len(_store_files(_isolated_db)) == 2
+
+    def test_a_recreated_database_does_not_reuse_old_files(self):
+        _embed(["a", "b"])
+        db_open_embedding_store(BASE)
+
+        # Same count and rowids, different images
+        conn = _connect()
+        conn.execute("DELETE FROM images")
+        conn.commit()
+        conn.close()
+        _embed(["x", "y"])
+
+        store = db_open_embedding_store(BASE)
+        assert store.ids.tolist() == ["x", "y"]
+
+    def test_an_unreadable_store_is_rebuilt(self, _isolated_db):
+        _embed(["a", "b"])
+        db_open_embedding_store(BASE)
+        store_module._open_stores.clear()
+        for name in _store_files(_isolated_db):
+            with open(os.path.join(_isolated_db, name), "wb") as f:
+                f.write(b"truncated")
+
+        store = db_open_embedding_store(BASE)
+
+        assert store.matrix[store.rows["b"]].tolist() == [1.0] * 4
+
+    def test_no_embeddings_means_no_store(self, _isolated_db):
+        assert db_open_embedding_store(BASE) is None
+        assert _store_files(_isolated_db) == []
+
+
+class TestStoreBackedReads:
+    def test_id_lookups_are_views_into_the_store(self):
+        _embed(["a", "b", "c"])
+
+        found = db_get_embeddings_for_image_ids(["c", "a", "missing"], BASE)
+
+        assert set(found) == {"a", "c"}
+        assert found["c"].tolist() == [2.0] * 4
+        assert not found["c"].flags.writeable
+
+    def test_rows_the_store_lacks_fall_back_to_sqlite(self):
+        _embed(["a"])
+        with patch(
+            "app.database.embedding_store.db_open_embedding_store",
+            return_value=None,
+        ):
+            found = db_get_embeddings_for_image_ids(["a"], BASE)
+
+        assert found["a"].tolist() == [0.0] * 4
+
+    def test_scoring_reads_pending_rows_from_the_store(self):
+        _embed(["a", "b"])
+
+        image_ids, matrix = db_get_embeddings_needing_scoring(BASE, "sig", 10)
+
+        assert image_ids == ["a", "b"]
+        assert matrix.tolist() == [[0.0] * 4, [1.0] * 4]
@@ -1,3 +1,7 @@
+import json
+import os
+from datetime import datetime
+import sqlite3
 import pytest
 import numpy as np
 from unittest.mock import patch
@@ -8,11 +12,20 @@ import app.database.images as images_db
 import app.database.folders as folders_db
 import app.database.yolo_mapping as yolo_db
 from app.utils.face_clusters import (
+    ClusterResult,
+    _generate_cluster_face_image,
+    _merge_similar_clusters,
+    _prune_cluster_covers,
+    _update_cluster_face_image,
+    cluster_util_assign_cluster_to_faces_without_clusterId,
     cluster_util_cluster_all_face_embeddings,
     cluster_util_face_clusters_sync,
     cluster_util_is_reclustering_needed,
+    cluster_util_recluster_incremental,
+    cluster_util_radius_neighbors_graph,
     estimate_eps,
 )
+from sklearn.metrics.pairwise import cosine_distances
 from app.utils.face_quality import face_passes_quality_gate
 from fastapi.testclient import TestClient
 from app.routes.face_clusters import router as face_clusters_router
@@ -51,19 +64,19 @@ def sample_clusters_with_counts():
             "cluster_id": "cluster_1",
             "cluster_name": "John Doe",
             "face_count": 15,
-            "face_image_base64": "base64_string_1",
+            "face_image_path": "/thumbs/faces/face_1.jpg",
         },
         {
             "cluster_id": "cluster_2",
             "cluster_name": "Jane Smith",
             "face_count": 8,
-            "face_image_base64": "base64_string_2",
+            "face_image_path": "/thumbs/faces/face_2.jpg",
         },
         {
             "cluster_id": "cluster_3",
             "cluster_name": "Unknown Person",
             "face_count": 3,
-            "face_image_base64": "base64_string_3",
+            "face_image_path": "/thumbs/faces/face_3.jpg",
         },
     ]
 
@@ -253,7 +266,7 @@ class TestFaceClustersAPI:
         assert first_cluster["cluster_id"] == "cluster_1"
         assert first_cluster["cluster_name"] == "John Doe"
         assert first_cluster["face_count"] == 15
-        assert first_cluster["face_image_base64"] == "base64_string_1"
+        assert first_cluster["face_image_path"] == "/thumbs/faces/face_1.jpg"
 
         mock_get_clusters.assert_called_once()
 
@@ -466,10 +479,8 @@ def generate_noise_embeddings(num_points=80, dim=512):
 
 def mock_faces_data(embeddings):
     """Format embeddings into the expected database return format."""
-    return [
-        {"face_id": i, "embeddings": emb, "cluster_name": None}
-        for i, emb in enumerate(embeddings)
-    ]
+    n = len(embeddings)
+    return list(range(n)), [None] * n, [None] * n, np.asarray(embeddings)
 
 
 class TestFaceClusteringAlgo:
@@ -597,10 +608,7 @@ class TestFaceClusteringAlgo:
         all_embeddings = [pt_a1, pt_a2, pt_b1, pt_b2] + singletons
 
         # Mock database call
-        mock_db_get.return_value = [
-            {"face_id": i, "embeddings": emb, "cluster_name": None}
-            for i, emb in enumerate(all_embeddings)
-        ]
+        mock_db_get.return_value = mock_faces_data(all_embeddings)
 
         # Run clustering with similarity_threshold=0.85 -> max_distance = 0.15
         results, _ = cluster_util_cluster_all_face_embeddings(
@@ -731,6 +739,11 @@ def isolated_cluster_db(tmp_path, monkeypatch):
     monkeypatch.setattr(images_db, "DATABASE_PATH", db_path)
     monkeypatch.setattr(folders_db, "DATABASE_PATH", db_path)
     monkeypatch.setattr(yolo_db, "DATABASE_PATH", db_path)
+    monkeypatch.setattr("app.database.connection.DATABASE_PATH", db_path)
+    # Full reclusters write and prune cover crops
+    covers = str(tmp_path / "covers")
+    monkeypatch.setattr(face_clusters_db, "CLUSTER_COVERS_PATH", covers)
+    monkeypatch.setattr("app.utils.face_clusters.CLUSTER_COVERS_PATH", covers)
 
     yolo_db.db_create_YOLO_classes_table()
     face_clusters_db.db_create_clusters_table()
@@ -740,6 +753,254 @@ def isolated_cluster_db(tmp_path, monkeypatch):
     yield db_path
 
 
+def _partition(results):
+    """Clusters as a set of frozensets of face ids, ignoring uuids."""
+    by_cluster = {}
+    for r in results:
+        by_cluster.setdefault(r.cluster_uuid, set()).add(r.face_id)
+    return {frozenset(faces) for faces in by_cluster.values()}
+
+
+class TestSparseClustering:
+    def _library(self):
+        identity_embs, _ = generate_synthetic_embeddings(
+            num_identities=4, points_per_identity=15, noise_std=0.01
+        )
+        return np.vstack([identity_embs, generate_noise_embeddings(60)])
+
+    def test_graph_keeps_exactly_the_pairs_within_radius(self):
+        embeddings = self._library()
+
+        # A few rows per block, so the blockwise assembly is exercised
+        with patch("app.utils.face_clusters._GRAPH_BLOCK_ELEMENTS", 500):
+            graph, _ = cluster_util_radius_neighbors_graph(embeddings, radius=0.3, k=2)
+
+        dense = cosine_distances(embeddings)
+        np.fill_diagonal(dense, 0.0)
+        rows, cols = graph.nonzero()
+        expected = np.argwhere(dense <= 0.3)
+        # Self-distances are stored as explicit zeros
+        assert graph.nnz == len(expected)
+        assert graph.diagonal().tolist() == [0.0] * len(embeddings)
+        np.testing.assert_allclose(
+            graph.toarray()[dense <= 0.3], dense[dense <= 0.3], atol=1e-5
+        )
+        assert set(zip(rows.tolist(), cols.tolist())) <= set(map(tuple, expected))
+
+    def test_kth_distances_match_estimate_eps(self):
+        embeddings = self._library()
+
+        _, kth = cluster_util_radius_neighbors_graph(embeddings, radius=0.3, k=2)
+
+        assert np.percentile(kth, 90) == pytest.approx(
+            estimate_eps(embeddings, k=2), abs=1e-5
+        )
+
+    def test_too_few_faces_for_a_kth_neighbour(self):
+        _, kth = cluster_util_radius_neighbors_graph(np.eye(2, 8), radius=0.3, k=2)
+
+        assert kth is None
+
+    @patch("app.utils.face_clusters.db_get_all_faces_with_cluster_names")
+    def test_sparse_and_dense_paths_agree(self, mock_db_get):
+        mock_db_get.return_value = mock_faces_data(self._library())
+
+        with patch("app.config.settings.PICTO_CLUSTERING_SPARSE_MIN_FACES", 10**9):
+            dense, _ = cluster_util_cluster_all_face_embeddings(
+                min_samples=2, similarity_threshold=0.85
+            )
+        with patch("app.config.settings.PICTO_CLUSTERING_SPARSE_MIN_FACES", 1):
+            sparse, _ = cluster_util_cluster_all_face_embeddings(
+                min_samples=2, similarity_threshold=0.85
+            )
+
+        assert len(_partition(dense)) == 4
+        assert _partition(sparse) == _partition(dense)
+
+
+def _pairwise_merge_reference(results, merge_threshold):
+    """The original one-pair-at-a-time merge, as the oracle for the fast one."""
+    means = {}
+    for r in results:
+        means.setdefault(r.cluster_uuid, []).append(r.embedding)
+    means = {uuid: np.mean(embs, axis=0) for uuid, embs in means.items()}
+    uuids = list(means)
+    merge_mapping = {}
+    for i, uuid1 in enumerate(uuids):
+        if uuid1 in merge_mapping:
+            continue
+        for uuid2 in uuids[i + 1 :]:
+            if uuid2 in merge_mapping:
+                continue
+            similarity = 1 - cosine_distances([means[uuid1]], [means[uuid2]])[0][0]
+            if similarity >= merge_threshold:
+                merge_mapping[uuid2] = uuid1
+    return {
+        r.face_id: merge_mapping.get(r.cluster_uuid, r.cluster_uuid) for r in results
+    }
+
+
+def _cluster_results(centres, faces_per_cluster, noise, seed=0):
+    rng = np.random.default_rng(seed)
+    results = []
+    for c, centre in enumerate(centres):
+        for f in range(faces_per_cluster):
+            results.append(
+                ClusterResult(
+                    face_id=f"face_{c}_{f}",
+                    embedding=centre + noise * rng.standard_normal(len(centre)),
+                    cluster_uuid=f"cluster_{c}",
+                    cluster_name=None,
+                )
+            )
+    return results
+
+
+class TestMergeSimilarClusters:
+    def test_matches_the_pairwise_merge(self):
+        rng = np.random.default_rng(3)
+        # Groups of near-duplicate clusters, so merges actually happen
+        bases = rng.standard_normal((20, 64))
+        centres = np.repeat(bases, 4, axis=0) + 0.35 * rng.standard_normal((80, 64))
+        results = _cluster_results(centres, faces_per_cluster=3, noise=0.05)
+
+        with patch("app.utils.face_clusters._GRAPH_BLOCK_ELEMENTS", 1000):
+            merged = _merge_similar_clusters(results, merge_threshold=0.9)
+
+        expected = _pairwise_merge_reference(results, merge_threshold=0.9)
+        assert {r.face_id: r.cluster_uuid for r in merged} == expected
+        assert len(set(expected.values())) < 80
+
+    def test_merges_are_not_chained(self):
+        # A~B and B~C, but A and C are too far apart: B joins A, C stays
+        a = np.array([1.0, 0.0])
+        b = np.array([np.cos(0.4), np.sin(0.4)])
+        c = np.array([np.cos(0.8), np.sin(0.8)])
+        results = _cluster_results([a, b, c], faces_per_cluster=2, noise=0.0)
+
+        merged = _merge_similar_clusters(results, merge_threshold=0.9)
+
+        assert _partition(merged) == {
+            frozenset({"face_0_0", "face_0_1", "face_1_0", "face_1_1"}),
+            frozenset({"face_2_0", "face_2_1"}),
+        }
+
+    def test_invalid_cluster_means_are_left_alone(self):
+        a = np.array([1.0, 0.0])
+        results = _cluster_results([a, a, np.zeros(2)], faces_per_cluster=2, noise=0)
+
+        merged = _merge_similar_clusters(results, merge_threshold=0.9)
+
+        assert {r.face_id: r.cluster_uuid for r in merged} == {
+            "face_0_0": "cluster_0",
+            "face_0_1": "cluster_0",
+            "face_1_0": "cluster_0",
+            "face_1_1": "cluster_0",
+            "face_2_0": "cluster_2",
+            "face_2_1": "cluster_2",
+        }
+
+    def test_names_are_decided_by_majority_after_merging(self):
+        a = np.array([1.0, 0.0])
+        results = _cluster_results([a, a, a], faces_per_cluster=1, noise=0)
+        for r, name in zip(results, ["Ann", "Bob", "Ann"]):
+            r.cluster_name = name
+
+        merged = _merge_similar_clusters(results, merge_threshold=0.9)
+
+        assert {r.cluster_name for r in merged} == {"Ann"}
+
+    def test_merging_5000_clusters_is_fast(self):
+        import time
+
+        rng = np.random.default_rng(0)
+        results = _cluster_results(
+            rng.standard_normal((5000, 128)), faces_per_cluster=2, noise=0.01
+        )
+
+        start = time.perf_counter()
+        _merge_similar_clusters(results, merge_threshold=0.85)
+
+        # The pairwise loop took minutes here
+        assert time.perf_counter() - start < 10
+
+
+@pytest.fixture
+def unassigned_library():
+    """Patch the assignment inputs: (faces, image_ids, means, occupied pairs)."""
+    from contextlib import ExitStack
+
+    with ExitStack() as stack:
+
+        def install(faces, image_ids, means, occupied=()):
+            face_ids = list(range(100, 100 + len(faces)))
+            cluster_ids = [f"c{i}" for i in range(len(means))]
+            for name, value in [
+                ("db_get_faces_unassigned_clusters", (face_ids, image_ids, faces)),
+                ("db_get_cluster_mean_embeddings", (cluster_ids, means)),
+                ("db_get_cluster_image_pairs", set(occupied)),
+            ]:
+                stack.enter_context(
+                    patch(f"app.utils.face_clusters.{name}", return_value=value)
+                )
+
+        yield install
+
+
+class TestAssignUnclusteredFaces:
+    def test_matches_the_per_face_nearest_mean(self, unassigned_library):
+        rng = np.random.default_rng(5)
+        means = rng.standard_normal((40, 32))
+        nearest = rng.integers(40, size=300)
+        faces = means[nearest] + 0.4 * rng.standard_normal((300, 32))
+        faces[7] = np.nan
+        faces[8] = 0.0
+        unassigned_library(faces, [f"img{i}" for i in range(300)], means)
+
+        with patch("app.utils.face_clusters._GRAPH_BLOCK_ELEMENTS", 400):
+            mappings, skipped = cluster_util_assign_cluster_to_faces_without_clusterId(
+                similarity_threshold=0.8
+            )
+
+        similarity = 1 - cosine_distances(np.nan_to_num(faces), means)
+        expected = {
+            100 + i: f"c{np.argmax(row)}"
+            for i, row in enumerate(similarity)
+            if i not in (7, 8) and row.max() >= 0.8
+        }
+        assert {m["face_id"]: m["cluster_id"] for m in mappings} == expected
+        assert 0 < len(expected) < 298
+        assert skipped == 2
+
+    def test_one_face_per_image_and_cluster(self, unassigned_library):
+        means = np.eye(2, 4)
+        faces = np.array([[1.0, 0, 0, 0], [0.9, 0.1, 0, 0], [1.0, 0, 0, 0]])
+        unassigned_library(faces, ["a", "a", "b"], means, occupied={("c0", "b")})
+
+        mappings, _ = cluster_util_assign_cluster_to_faces_without_clusterId()
+
+        # The second face in "a" and the face in "b" would duplicate a person
+        assert [(m["face_id"], m["cluster_id"]) for m in mappings] == [(100, "c0")]
+        np.testing.assert_array_equal(mappings[0]["embedding"], faces[0])
+
+    def test_50k_faces_against_2k_clusters(self, unassigned_library):
+        import time
+
+        rng = np.random.default_rng(0)
+        means = rng.standard_normal((2000, 512)).astype(np.float32)
+        faces = means[rng.integers(2000, size=50_000)]
+        faces += 0.3 * rng.standard_normal(faces.shape).astype(np.float32)
+        unassigned_library(faces, [f"img{i}" for i in range(50_000)], means)
+
+        start = time.perf_counter()
+        mappings, _ = cluster_util_assign_cluster_to_faces_without_clusterId()
+        elapsed = time.perf_counter() - start
+
+        assert len(mappings) == 50_000
+        # One face at a time took minutes; the batched pass takes seconds
+        assert elapsed < 30
+
+
 class TestEmptyClusterCleanup:
     """Removing a folder cascades away its faces, but the clusters those faces
     built are left behind. They must not keep surfacing in the UI."""
@@ -751,12 +1012,12 @@ class TestEmptyClusterCleanup:
                 {
                     "cluster_id": "populated",
                     "cluster_name": "Has Faces",
-                    "face_image_base64": "b64",
+                    "face_image_path": "/thumbs/faces/cover.jpg",
                 },
                 {
                     "cluster_id": "orphaned",
                     "cluster_name": "Folder Deleted",
-                    "face_image_base64": "b64",
+                    "face_image_path": "/thumbs/faces/cover.jpg",
                 },
             ]
         )
@@ -778,7 +1039,7 @@ class TestEmptyClusterCleanup:
         assert face_clusters_db.db_get_clusters_count() == 0
 
         face_clusters_db.db_insert_clusters_batch(
-            [{"cluster_id": "c1", "cluster_name": None, "face_image_base64": None}]
+            [{"cluster_id": "c1", "cluster_name": None, "face_image_path": None}]
         )
 
         # Still zero -- the row exists but has no faces behind it.
@@ -795,6 +1056,121 @@ class TestEmptyClusterCleanup:
         assert face_clusters_db.db_get_clusters_count() == 1
 
 
+class TestClusterCovers:
+    BBOX = {"x": 40, "y": 30, "width": 60, "height": 60}
+
+    def _cluster_with_face(self, db_path, tmp_path, bbox=None):
+        import cv2
+
+        photo = str(tmp_path / "photo.jpg")
+        cv2.imwrite(photo, np.full((200, 200, 3), 128, dtype=np.uint8))
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO images (id, path) VALUES ('img-1', ?)", (photo,))
+        conn.commit()
+        conn.close()
+        face_clusters_db.db_insert_clusters_batch(
+            [{"cluster_id": "c1", "cluster_name": None}]
+        )
+        faces_db.db_insert_face_embeddings(
+            "img-1", np.ones(8), bbox=bbox or self.BBOX, cluster_id="c1"
+        )
+
+    def _cover(self, db_path):
+        conn = sqlite3.connect(db_path)
+        try:
+            return _generate_cluster_face_image("c1", conn.cursor())
+        finally:
+            conn.close()
+
+    def test_cover_is_a_jpeg_file_next_to_the_thumbnails(
+        self, isolated_cluster_db, tmp_path
+    ):
+        import cv2
+
+        self._cluster_with_face(isolated_cluster_db, tmp_path)
+
+        path = self._cover(isolated_cluster_db)
+
+        assert os.path.dirname(path) == str(tmp_path / "covers")
+        assert cv2.imread(path).shape == (300, 300, 3)
+
+    def test_unchanged_covers_are_not_cropped_again(
+        self, isolated_cluster_db, tmp_path
+    ):
+        self._cluster_with_face(isolated_cluster_db, tmp_path)
+        first = self._cover(isolated_cluster_db)
+
+        with patch("app.utils.face_clusters.cv2.imread") as imread:
+            second = self._cover(isolated_cluster_db)
+
+        assert second == first
+        imread.assert_not_called()
+
+    def test_a_new_bounding_box_gets_a_new_crop(self, isolated_cluster_db, tmp_path):
+        self._cluster_with_face(isolated_cluster_db, tmp_path)
+        first = self._cover(isolated_cluster_db)
+        conn = sqlite3.connect(isolated_cluster_db)
+        conn.execute("UPDATE faces SET bbox = ?", (json.dumps({**self.BBOX, "x": 10}),))
+        conn.commit()
+        conn.close()
+
+        second = self._cover(isolated_cluster_db)
+
+        assert second != first and os.path.exists(second)
+
+    def test_pruning_keeps_only_referenced_covers(self, isolated_cluster_db, tmp_path):
+        covers = tmp_path / "covers"
+        covers.mkdir()
+        for name in ("keep.jpg", "stale.jpg"):
+            (covers / name).write_bytes(b"jpeg")
+
+        _prune_cluster_covers({str(covers / "keep.jpg")})
+
+        assert os.listdir(covers) == ["keep.jpg"]
+
+    def test_listing_returns_paths_not_image_data(self, isolated_cluster_db, tmp_path):
+        self._cluster_with_face(isolated_cluster_db, tmp_path)
+        path = self._cover(isolated_cluster_db)
+        conn = sqlite3.connect(isolated_cluster_db)
+        _update_cluster_face_image("c1", path, conn.cursor())
+        conn.commit()
+        conn.close()
+
+        response = client.get("/face_clusters/")
+
+        (cluster,) = response.json()["data"]["clusters"]
+        assert cluster["face_image_path"] == path
+        assert "face_image_base64" not in cluster
+
+    def test_inline_base64_covers_are_moved_to_files(
+        self, isolated_cluster_db, tmp_path
+    ):
+        import base64
+
+        conn = sqlite3.connect(isolated_cluster_db)
+        conn.execute("DROP TABLE face_clusters")
+        conn.execute(
+            "CREATE TABLE face_clusters (cluster_id TEXT PRIMARY KEY, "
+            "cluster_name TEXT, face_image_base64 TEXT)"
+        )
+        conn.execute(
+            "INSERT INTO face_clusters VALUES ('old', NULL, ?)",
+            (base64.b64encode(b"jpeg bytes").decode(),),
+        )
+        conn.commit()
+        conn.close()
+
+        face_clusters_db.db_create_clusters_table()
+
+        (cluster,) = face_clusters_db.db_get_all_clusters()
+        with open(cluster["face_image_path"], "rb") as f:
+            assert f.read() == b"jpeg bytes"
+        conn = sqlite3.connect(isolated_cluster_db)
+        inline = conn.execute("SELECT face_image_base64 FROM face_clusters").fetchone()
+        conn.close()
+        assert inline == (None,)
+
+
 class TestReclusterWithNoFaces:
     """A forced recluster of an emptied library must clear stale clusters
     instead of raising and leaving them in place."""
@@ -803,26 +1179,38 @@ class TestReclusterWithNoFaces:
     def test_cluster_all_embeddings_returns_pair_when_no_faces(self, mock_faces):
         """The no-faces path must return the same (results, skipped) shape as
         every other path -- callers unpack it into two names."""
-        mock_faces.return_value = []
+        mock_faces.return_value = ([], [], [], np.empty((0, 0)))
 
         assert cluster_util_cluster_all_face_embeddings() == ([], 0)
 
+    @patch("app.utils.face_clusters._prune_cluster_covers")
     @patch("app.utils.face_clusters.db_update_metadata")
     @patch("app.utils.face_clusters.db_delete_all_clusters")
     @patch("app.utils.face_clusters.get_db_connection")
     @patch("app.utils.face_clusters.db_get_all_faces_with_cluster_names")
     @patch("app.utils.face_clusters.db_get_metadata")
     def test_forced_recluster_clears_clusters_when_no_faces_remain(
-        self, mock_metadata, mock_faces, mock_conn, mock_delete, mock_update_metadata
+        self,
+        mock_metadata,
+        mock_faces,
+        mock_conn,
+        mock_delete,
+        mock_update_metadata,
+        mock_prune,
     ):
         mock_metadata.return_value = {"user_preferences": {}}
-        mock_faces.return_value = []
+        mock_faces.return_value = ([], [], [], np.empty((0, 0)))
 
         created, skipped = cluster_util_face_clusters_sync(force_full_reclustering=True)
 
         assert (created, skipped) == (0, 0)
         mock_delete.assert_called_once()
+        # Their cover crops go with them
+        mock_prune.assert_called_once_with(set())
 
+    @patch("app.utils.face_clusters._prune_cluster_covers")
+    @patch("app.utils.face_clusters.db_get_cluster_cover_paths")
+    @patch("app.utils.face_clusters.cluster_util_recluster_incremental")
     @patch("app.utils.face_clusters.db_delete_all_clusters")
     @patch("app.utils.face_clusters.get_db_connection")
     @patch("app.utils.face_clusters.db_update_face_cluster_ids_batch")
@@ -839,16 +1227,23 @@ class TestReclusterWithNoFaces:
         mock_update_batch,
         mock_conn,
         mock_delete,
+        mock_incremental,
+        mock_cover_paths,
+        mock_prune,
     ):
         """Only a full recluster rebuilds from scratch; the incremental path
         must leave existing clusters alone."""
         mock_metadata.return_value = {"user_preferences": {}}
         mock_needed.return_value = False
         mock_assign.return_value = ([{"face_id": 1, "cluster_id": "c1"}], 0)
+        mock_incremental.return_value = 0
 
         cluster_util_face_clusters_sync()
 
         mock_delete.assert_not_called()
+        mock_incremental.assert_called_once_with({"c1"})
+        # Covers are still pruned to the clusters that remain
+        mock_prune.assert_called_once_with(mock_cover_paths.return_value)
 
 
 class TestReclusteringNeededBootstrap:
@@ -860,7 +1255,11 @@ class TestReclusteringNeededBootstrap:
     def test_full_pass_forced_when_no_clusters_exist_yet(
         self, mock_unassigned, mock_count
     ):
-        mock_unassigned.return_value = [{"face_id": i} for i in range(50)]
+        mock_unassigned.return_value = (
+            list(range(50)),
+            ["img"] * 50,
+            np.ones((50, 4)),
+        )
         mock_count.return_value = 0
 
         assert cluster_util_is_reclustering_needed({"user_preferences": {}}) is True
@@ -871,7 +1270,11 @@ class TestReclusteringNeededBootstrap:
         self, mock_unassigned, mock_count
     ):
         """Guard against over-correcting into a full recluster every sync."""
-        mock_unassigned.return_value = [{"face_id": i} for i in range(50)]
+        mock_unassigned.return_value = (
+            list(range(50)),
+            ["img"] * 50,
+            np.ones((50, 4)),
+        )
         mock_count.return_value = 3
 
         assert cluster_util_is_reclustering_needed({"user_preferences": {}}) is False
@@ -882,7 +1285,7 @@ class TestReclusteringNeededBootstrap:
         self, mock_unassigned, mock_count
     ):
         """An empty library has nothing to bootstrap from."""
-        mock_unassigned.return_value = []
+        mock_unassigned.return_value = ([], [], np.empty((0, 0)))
         mock_count.return_value = 0
 
         assert cluster_util_is_reclustering_needed({"user_preferences": {}}) is False
@@ -901,7 +1304,7 @@ class TestReclusteringNeededBootstrap:
                 {
                     "cluster_id": "orphaned",
                     "cluster_name": "Folder Deleted",
-                    "face_image_base64": "b64",
+                    "face_image_path": "/thumbs/faces/cover.jpg",
                 }
             ]
         )
@@ -923,7 +1326,7 @@ class TestReclusteringNeededBootstrap:
                 {
                     "cluster_id": "populated",
                     "cluster_name": "Still Here",
-                    "face_image_base64": "b64",
+                    "face_image_path": "/thumbs/faces/cover.jpg",
                 }
             ]
         )
@@ -943,3 +1346,172 @@ class TestReclusteringNeededBootstrap:
         )
 
         assert cluster_util_is_reclustering_needed({"user_preferences": {}}) is False
+
+
+def _identity(seed, count, dim=64, noise=0.05):
+    """Unit embeddings scattered around one random centre."""
+    rng = np.random.default_rng(seed)
+    centre = rng.standard_normal(dim)
+    points = centre / np.linalg.norm(centre) + noise * rng.standard_normal((count, dim))
+    return points / np.linalg.norm(points, axis=1, keepdims=True)
+
+
+class TestIncrementalReclustering:
+    """Syncs after the first full pass keep ids and names of clusters."""
+
+    @pytest.fixture
+    def library(self, isolated_cluster_db):
+        conn = sqlite3.connect(isolated_cluster_db)
+        self.conn = conn
+        self.images = 0
+        yield isolated_cluster_db
+        conn.close()
+
+    def _add_faces(self, embeddings, cluster_id=None):
+        for embedding in embeddings:
+            image_id = f"img-{self.images}"
+            self.images += 1
+            self.conn.execute(
+                "INSERT INTO images (id, path) VALUES (?, ?)",
+                (image_id, f"/missing/{image_id}.jpg"),
+            )
+            self.conn.commit()
+            faces_db.db_insert_face_embeddings(
+                image_id, embedding, confidence=0.9, cluster_id=cluster_id
+            )
+
+    def _add_cluster(self, cluster_id, name, embeddings):
+        face_clusters_db.db_insert_clusters_batch(
+            [{"cluster_id": cluster_id, "cluster_name": name}]
+        )
+        self._add_faces(embeddings, cluster_id)
+
+    def _clusters(self):
+        """cluster_id -> (name, sorted face ids)."""
+        rows = self.conn.execute(
+            "SELECT fc.cluster_id, fc.cluster_name, f.face_id FROM face_clusters fc "
+            "JOIN faces f ON f.cluster_id = fc.cluster_id"
+        ).fetchall()
+        clusters = {}
+        for cluster_id, name, face_id in rows:
+            clusters.setdefault(cluster_id, (name, []))[1].append(face_id)
+        return {c: (name, sorted(faces)) for c, (name, faces) in clusters.items()}
+
+    def _sync(self):
+        with patch(
+            "app.utils.face_clusters.db_get_metadata",
+            return_value={"reclustering_time": datetime.now().timestamp()},
+        ):
+            return cluster_util_face_clusters_sync()
+
+    def test_faces_matching_no_cluster_form_a_new_one(self, library):
+        self._add_cluster("alice", "Alice", _identity(1, 4))
+        self._add_faces(_identity(2, 3))
+
+        assert self._sync() == (3, 0)
+
+        clusters = self._clusters()
+        assert clusters["alice"] == ("Alice", [1, 2, 3, 4])
+        new = [c for c in clusters if c != "alice"]
+        assert len(new) == 1
+        assert clusters[new[0]] == (None, [5, 6, 7])
+
+    def test_existing_clusters_keep_their_ids_and_names(self, library):
+        alice, bob = _identity(1, 6), _identity(2, 6)
+        self._add_cluster("alice", "Alice", alice[:4])
+        self._add_cluster("bob", None, bob[:4])
+        self._add_faces(np.vstack([alice[4:], bob[4:]]))
+
+        self._sync()
+
+        assert self._clusters() == {
+            "alice": ("Alice", [1, 2, 3, 4, 9, 10]),
+            "bob": (None, [5, 6, 7, 8, 11, 12]),
+        }
+
+    def test_a_new_group_merges_into_the_named_cluster(self, library):
+        # The faces are kept from matching Alice one by one; as a group
+        # they still join her cluster
+        alice = _identity(1, 8)
+        self._add_cluster("alice", "Alice", alice[:2])
+        self._add_faces(alice[2:])
+
+        with patch("app.utils.face_clusters._nearest_centroids") as nearest:
+            nearest.side_effect = lambda faces, means: (
+                np.zeros(len(faces), dtype=np.intp),
+                np.zeros(len(faces)),
+            )
+            self._sync()
+
+        assert self._clusters() == {"alice": ("Alice", list(range(1, 9)))}
+
+    def test_incremental_sync_prunes_covers_of_dropped_clusters(
+        self, library, tmp_path
+    ):
+        covers = tmp_path / "covers"
+        covers.mkdir()
+        kept, merged_away = covers / "alice.jpg", covers / "merged.jpg"
+        for cover in (kept, merged_away):
+            cover.write_bytes(b"jpeg")
+        self._add_cluster("alice", "Alice", _identity(1, 4))
+        self.conn.execute("UPDATE face_clusters SET face_image_path = ?", (str(kept),))
+        self.conn.commit()
+        self._add_faces(_identity(1, 2))
+
+        self._sync()
+
+        assert os.listdir(covers) == ["alice.jpg"]
+
+    def test_default_settings_never_rebuild_but_still_prune_covers(
+        self, library, tmp_path, monkeypatch
+    ):
+        """With PICTO_CLUSTERING_FULL_REBUILD_HOURS at its default of 0, a
+        library may never see another full recluster; its covers must not
+        depend on one."""
+        monkeypatch.setattr(
+            "app.config.settings.PICTO_CLUSTERING_FULL_REBUILD_HOURS", 0.0
+        )
+        covers = tmp_path / "covers"
+        covers.mkdir()
+        (covers / "stale.jpg").write_bytes(b"jpeg")
+        self._add_cluster("alice", "Alice", _identity(1, 4))
+        self._add_faces(_identity(1, 2))
+        a_year_ago = datetime.now().timestamp() - 365 * 24 * 3600
+
+        with patch(
+            "app.utils.face_clusters.db_get_metadata",
+            return_value={"reclustering_time": a_year_ago},
+        ):
+            cluster_util_face_clusters_sync()
+
+        assert list(self._clusters()) == ["alice"]
+        assert os.listdir(covers) == []
+
+    def test_named_clusters_are_not_merged_into_each_other(self, library):
+        face = _identity(1, 4)
+        self._add_cluster("alice", "Alice", face[:2])
+        self._add_cluster("twin", "Twin", face[2:])
+
+        cluster_util_recluster_incremental({"alice", "twin"})
+
+        assert set(self._clusters()) == {"alice", "twin"}
+
+    def test_disconnected_unnamed_cluster_is_split(self, library):
+        self._add_cluster("mixed", None, np.vstack([_identity(1, 6), _identity(2, 3)]))
+
+        cluster_util_recluster_incremental({"mixed"})
+
+        clusters = self._clusters()
+        assert clusters["mixed"] == (None, [1, 2, 3, 4, 5, 6])
+        assert sorted(faces for c, (_, faces) in clusters.items() if c != "mixed") == [
+            [7, 8, 9]
+        ]
+
+    def test_named_cluster_is_never_split(self, library):
+        self._add_cluster(
+            "mixed", "Alice", np.vstack([_identity(1, 6), _identity(2, 3)])
+        )
+
+        cluster_util_recluster_incremental({"mixed"})
+
+        assert list(self._clusters()) == ["mixed"]
@@ -0,0 +1,136 @@
+import json
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app.utils.faceSearch import GetAllImagesResponse, perform_face_search
+
+BBOX = {"x": 1, "y": 2, "width": 3, "height": 4}
+
+
+def _image_row(image_id: str) -> dict:
+    return {
+        "id": image_id,
+        "path": f"/photos/{image_id}.jpg",
+        "folder_id": "1",
+        "thumbnailPath": f"/thumbs/{image_id}.jpg",
+        "metadata": json.dumps({"name": image_id}),
+        "isTagged": True,
+        "tags": None,
+    }
+
+
+@pytest.fixture
+def detector():
+    with patch("app.utils.faceSearch.FaceDetector") as detector_class:
+        instance = detector_class.return_value
+        instance.detect_faces.return_value = {
+            "num_faces": 1,
+            "embeddings": [np.array([2.0, 0.0], dtype=np.float32)],
+        }
+        yield instance
+
+
+@pytest.fixture
+def library():
+    """Four faces in three images; img-b has two faces."""
+    face_ids = np.array([10, 11, 12, 13])
+    image_ids = ["img-a", "img-b", "img-b", "img-c"]
+    matrix = np.array([[0.8, 0.6], [0.7, 0.71], [0.99, 0.14], [0.0, 1.0]])
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    with patch(
+        "app.utils.faceSearch.db_get_face_embedding_matrix",
+        return_value=(face_ids, image_ids, matrix.astype(np.float32)),
+    ), patch(
+        "app.utils.faceSearch.db_get_face_bboxes",
+        side_effect=lambda ids: {face_id: BBOX for face_id in ids},
+    ) as bboxes, patch(
+        "app.utils.faceSearch.db_get_images_by_ids",
+        side_effect=lambda ids: [_image_row(i) for i in ids],
+    ) as images:
+        yield bboxes, images
+
+
+class TestPerformFaceSearch:
+    def test_matches_are_ranked_by_best_face_per_image(self, detector, library):
+        bboxes, images = library
+
+        response = perform_face_search("/query.jpg")
+
+        assert response.success
+        # img-c scores 0 and is below CONFIDENCE_PERCENT
+        assert [image.id for image in response.data] == ["img-b", "img-a"]
+        assert response.data[0].score == pytest.approx(0.99, abs=1e-3)
+        # Only the hits are hydrated, with the face that matched
+        images.assert_called_once_with(["img-b", "img-a"])
+        bboxes.assert_called_once_with([12, 10])
+
+    def test_limit_returns_the_top_images(self, detector, library):
+        _, images = library
+
+        response = perform_face_search("/query.jpg", limit=1)
+
+        assert [image.id for image in response.data] == ["img-b"]
+        images.assert_called_once_with(["img-b"])
+
+    def test_reuses_the_detector_embedding(self, detector, library):
+        with patch("app.models.FaceNet.FaceNet") as facenet:
+            perform_face_search("/query.jpg")
+
+        facenet.assert_not_called()
+        detector.detect_faces.assert_called_once()
+        assert detector.detect_faces.call_args.kwargs["forSearch"] is True
+        detector.close.assert_called_once()
+
+    def test_no_faces_in_query(self, detector, library):
+        detector.detect_faces.return_value = {"num_faces": 0, "embeddings": []}
+
+        response = perform_face_search("/query.jpg")
+
+        assert response.success and response.data == []
+        assert response.message == "No faces detected in the image."
+
+    def test_empty_library(self, detector):
+        with patch(
+            "app.utils.faceSearch.db_get_face_embedding_matrix",
+            return_value=(np.empty(0), [], np.empty((0, 0), dtype=np.float32)),
+        ):
+            response = perform_face_search("/query.jpg")
+
+        assert response.data == []
+        assert response.message == "No face embeddings available for comparison."
+
+    def test_detection_failure_is_reported(self, detector):
+        detector.detect_faces.side_effect = RuntimeError("unreadable")
+
+        response = perform_face_search("/query.jpg")
+
+        assert not response.success
+        assert "unreadable" in response.message
+        detector.close.assert_called_once()
+
+
+class TestFaceSearchRoute:
+    def test_limit_is_passed_through(self, tmp_path):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+
+        from app.routes.face_clusters import router
+
+        app = FastAPI()
+        app.include_router(router, prefix="/face-clusters")
+        image = tmp_path / "query.jpg"
+        image.write_bytes(b"jpeg")
+
+        with patch("app.routes.face_clusters.perform_face_search") as search:
+            search.return_value = GetAllImagesResponse(
+                success=True, message="", data=[]
+            )
+            response = TestClient(app).post(
+                "/face-clusters/face-search?input_type=path&limit=5",
+                json={"path": str(image)},
+            )
+
+        assert response.status_code == 200
+        search.assert_called_once_with(str(image), limit=5)
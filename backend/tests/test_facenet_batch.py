@@ -0,0 +1,70 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from app.models.FaceNet import FaceNet
+
+EMBEDDING_DIM = 128
+
+
+def _fake_embeddings(crops: np.ndarray) -> np.ndarray:
+    """Unnormalized output that differs per crop, derived from its pixels."""
+    base = crops.reshape(len(crops), -1)[:, :EMBEDDING_DIM].astype(np.float32)
+    return base * 3.0 + 1.0
+
+
+def _facenet(supports_batching: bool) -> FaceNet:
+    """A FaceNet wired to a stand-in session, so no model file is needed."""
+    facenet = FaceNet("/models/FaceNet_128D.onnx")
+    session = MagicMock()
+    session.run.side_effect = lambda names, feeds: [
+        _fake_embeddings(next(iter(feeds.values())))
+    ]
+    facenet._session = session
+    facenet.input_tensor_name = "input"
+    facenet.output_tensor_name = "embedding"
+    facenet.supports_batching = supports_batching
+    return facenet
+
+
+def _crops(count: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return rng.standard_normal((count, 3, 160, 160)).astype(np.float32)
+
+
+class TestGetEmbeddings:
+    def test_dynamic_batch_runs_once(self):
+        facenet = _facenet(supports_batching=True)
+
+        embeddings = facenet.get_embeddings(_crops(4))
+
+        assert facenet._session.run.call_count == 1
+        assert embeddings.shape == (4, EMBEDDING_DIM)
+
+    def test_fixed_batch_export_falls_back_to_one_run_per_face(self):
+        facenet = _facenet(supports_batching=False)
+
+        embeddings = facenet.get_embeddings(_crops(3))
+
+        assert facenet._session.run.call_count == 3
+        assert embeddings.shape == (3, EMBEDDING_DIM)
+
+    def test_rows_are_unit_length_and_match_single_embedding(self):
+        facenet = _facenet(supports_batching=True)
+        crops = _crops(3)
+
+        embeddings = facenet.get_embeddings(crops)
+
+        np.testing.assert_allclose(np.linalg.norm(embeddings, axis=1), 1.0, rtol=1e-5)
+        for i in range(len(crops)):
+            single = facenet.get_embedding(crops[i : i + 1])
+            assert embeddings[i] == pytest.approx(single, rel=1e-5)
+
+    def test_empty_input_skips_the_session(self):
+        facenet = _facenet(supports_batching=True)
+
+        embeddings = facenet.get_embeddings(np.empty((0, 3, 160, 160), np.float32))
+
+        facenet._session.run.assert_not_called()
+        assert len(embeddings) == 0
@@ -8,15 +8,22 @@ from unittest.mock import MagicMock, patch
 import numpy as np
 import pytest
 
+import app.database.faces as faces_module
+from app.database.connection import db_close_idle_connections
 from app.database.faces import (
     db_create_faces_table,
+    db_get_face_bboxes,
+    db_get_face_embedding_matrix,
     db_insert_face_embeddings,
     db_get_faces_unassigned_clusters,
     db_get_all_faces_with_cluster_names,
     db_update_face_cluster_ids_batch,
     db_get_cluster_mean_embeddings,
 )
-from app.database.face_clusters import db_create_clusters_table
+from app.database.face_clusters import (
+    db_create_clusters_table,
+    db_insert_clusters_batch,
+)
 
 # ##############################
 # Pytest Fixtures
@@ -39,6 +46,7 @@ def test_db(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
 
     yield db_path
 
+    db_close_idle_connections(db_path)
     os.unlink(db_path)
 
 
@@ -93,7 +101,7 @@ class TestFacesTable:
         Mocked deliberately: a real CREATE can't be made to fail while leaving
         the connection observable.
         """
-        with patch("app.database.faces.sqlite3.connect") as mock_connect:
+        with patch("app.database.faces.db_connect") as mock_connect:
             conn = MagicMock()
             conn.cursor.return_value.execute.side_effect = sqlite3.Error("fail")
             mock_connect.return_value = conn
@@ -149,14 +157,16 @@ class TestUnassignedFaces:
         unassigned = add_face("img-1", np.array([0.1, 0.2]))
         add_face("img-2", np.array([0.3, 0.4]), cluster_id=cluster)
 
-        faces = db_get_faces_unassigned_clusters()
-        assert [face["face_id"] for face in faces] == [unassigned]
-        assert np.allclose(faces[0]["embeddings"], [0.1, 0.2])
+        face_ids, image_ids, embeddings = db_get_faces_unassigned_clusters()
+        assert face_ids == [unassigned]
+        assert image_ids == ["img-1"]
+        assert embeddings.dtype == np.float32
+        assert np.allclose(embeddings, [[0.1, 0.2]])
 
     def test_returns_empty_when_all_assigned(self, test_db):
         cluster = add_cluster(test_db, "cluster-1", "Alice")
         add_face("img-1", cluster_id=cluster)
-        assert db_get_faces_unassigned_clusters() == []
+        assert db_get_faces_unassigned_clusters()[0] == []
 
 
 class TestFacesWithClusterNames:
@@ -164,17 +174,31 @@ class TestFacesWithClusterNames:
         cluster = add_cluster(test_db, "cluster-1", "Alice")
         add_face("img-1", np.array([0.1, 0.2]), cluster_id=cluster)
 
-        faces = db_get_all_faces_with_cluster_names()
-        assert len(faces) == 1
-        assert faces[0]["cluster_name"] == "Alice"
-        assert np.allclose(faces[0]["embeddings"], [0.1, 0.2])
+        face_ids, _, cluster_names, embeddings = db_get_all_faces_with_cluster_names()
+        assert len(face_ids) == 1
+        assert cluster_names == ["Alice"]
+        assert np.allclose(embeddings, [[0.1, 0.2]])
+
+    def test_embeddings_are_one_contiguous_matrix(self, test_db):
+        for i in range(5):
+            add_face(f"img-{i}", np.full(8, i, dtype=np.float32))
+
+        face_ids, _, _, embeddings = db_get_all_faces_with_cluster_names()
+
+        assert embeddings.shape == (5, 8)
+        assert embeddings.flags.c_contiguous
+        assert embeddings[:, 0].tolist() == [0, 1, 2, 3, 4]
 
     def test_cluster_name_is_none_when_unassigned(self, test_db):
         add_face("img-1")
-        assert db_get_all_faces_with_cluster_names()[0]["cluster_name"] is None
+        assert db_get_all_faces_with_cluster_names()[2] == [None]
 
     def test_returns_empty_without_faces(self, test_db):
-        assert db_get_all_faces_with_cluster_names() == []
+        face_ids, image_ids, cluster_names, embeddings = (
+            db_get_all_faces_with_cluster_names()
+        )
+        assert face_ids == image_ids == cluster_names == []
+        assert embeddings.size == 0
 
 
 # ##############################
@@ -194,12 +218,12 @@ class TestUpdateClusterIdsBatch:
             ]
         )
 
-        assert db_get_faces_unassigned_clusters() == []
+        assert db_get_faces_unassigned_clusters()[0] == []
 
     def test_empty_mapping_is_a_noop(self, test_db):
         add_face("img-1")
         db_update_face_cluster_ids_batch([])
-        assert len(db_get_faces_unassigned_clusters()) == 1
+        assert len(db_get_faces_unassigned_clusters()[0]) == 1
 
     def test_none_cluster_unassigns_a_face(self, test_db):
         cluster = add_cluster(test_db, "cluster-1", "Alice")
@@ -207,7 +231,7 @@ class TestUpdateClusterIdsBatch:
 
         db_update_face_cluster_ids_batch([{"face_id": face_id, "cluster_id": None}])
 
-        assert [f["face_id"] for f in db_get_faces_unassigned_clusters()] == [face_id]
+        assert db_get_faces_unassigned_clusters()[0] == [face_id]
 
     def test_caller_supplied_cursor_is_left_uncommitted(self, test_db):
         """With a caller's cursor the helper must not commit or close it --
@@ -230,7 +254,7 @@ class TestUpdateClusterIdsBatch:
         # Nothing was committed, so rolling back discards the update
         conn.rollback()
         conn.close()
-        assert [f["face_id"] for f in db_get_faces_unassigned_clusters()] == [face_id]
+        assert db_get_faces_unassigned_clusters()[0] == [face_id]
 
 
 # ##############################
@@ -244,10 +268,9 @@ class TestClusterMeanEmbeddings:
         add_face("img-1", np.array([0.2, 0.4]), cluster_id=cluster)
         add_face("img-2", np.array([0.6, 0.8]), cluster_id=cluster)
 
-        means = db_get_cluster_mean_embeddings()
-        assert len(means) == 1
-        assert means[0]["cluster_id"] == cluster
-        assert np.allclose(means[0]["mean_embedding"], [0.4, 0.6])
+        cluster_ids, means = db_get_cluster_mean_embeddings()
+        assert cluster_ids == [cluster]
+        assert np.allclose(means, [[0.4, 0.6]])
 
     def test_keeps_clusters_separate(self, test_db):
         first = add_cluster(test_db, "cluster-1", "Alice")
@@ -255,13 +278,302 @@ class TestClusterMeanEmbeddings:
         add_face("img-1", np.array([0.2, 0.4]), cluster_id=first)
         add_face("img-2", np.array([1.0, 1.0]), cluster_id=second)
 
-        means = {
-            row["cluster_id"]: row["mean_embedding"]
-            for row in db_get_cluster_mean_embeddings()
-        }
+        means = dict(zip(*db_get_cluster_mean_embeddings()))
         assert np.allclose(means[first], [0.2, 0.4])
         assert np.allclose(means[second], [1.0, 1.0])
 
     def test_returns_empty_without_assigned_faces(self, test_db):
         add_face("img-1")  # unassigned faces are excluded
-        assert db_get_cluster_mean_embeddings() == []
+        assert db_get_cluster_mean_embeddings()[0] == []
+
+
+def stored_centroid(db_path: str, cluster_id: str):
+    conn = sqlite3.connect(db_path)
+    row = conn.execute(
+        "SELECT centroid, face_count FROM face_clusters WHERE cluster_id = ?",
+        (cluster_id,),
+    ).fetchone()
+    conn.close()
+    centroid = None if row[0] is None else np.frombuffer(row[0], dtype=np.float32)
+    return centroid, row[1]
+
+
+def new_cluster(cluster_id: str = "cluster-1") -> str:
+    db_insert_clusters_batch([{"cluster_id": cluster_id, "cluster_name": None}])
+    return cluster_id
+
+
+def join(face_id: int, cluster_id: str, embedding: np.ndarray) -> None:
+    db_update_face_cluster_ids_batch(
+        [{"face_id": face_id, "cluster_id": cluster_id, "embedding": embedding}]
+    )
+
+
+class TestStoredCentroids:
+    def test_assignments_fold_into_the_running_mean(self, test_db):
+        cluster = new_cluster()
+        first = add_face("img-1", np.array([0.2, 0.4]))
+        second = add_face("img-2", np.array([0.6, 0.8]))
+
+        join(first, cluster, np.array([0.2, 0.4]))
+        assert np.allclose(stored_centroid(test_db, cluster)[0], [0.2, 0.4])
+        join(second, cluster, np.array([0.6, 0.8]))
+
+        centroid, count = stored_centroid(test_db, cluster)
+        assert count == 2
+        assert np.allclose(centroid, [0.4, 0.6])
+
+    def test_means_are_read_without_loading_faces(self, test_db):
+        cluster = new_cluster()
+        join(add_face("img-1", np.array([0.2, 0.4])), cluster, np.array([0.2, 0.4]))
+
+        with patch.object(
+            faces_module, "_embedding_matrix", wraps=faces_module._embedding_matrix
+        ) as matrix:
+            cluster_ids, means = db_get_cluster_mean_embeddings()
+
+        assert cluster_ids == [cluster]
+        assert np.allclose(means, [[0.2, 0.4]])
+        # One call, over the C stored centroids
+        assert len(matrix.call_args.args[0]) == 1
+
+    def test_reassigning_to_the_same_cluster_is_not_counted_twice(self, test_db):
+        cluster = new_cluster()
+        face_id = add_face("img-1", np.array([0.2, 0.4]))
+
+        join(face_id, cluster, np.array([0.2, 0.4]))
+        join(face_id, cluster, np.array([0.2, 0.4]))
+
+        assert stored_centroid(test_db, cluster)[1] == 1
+
+    def test_assignment_without_an_embedding_marks_the_centroid_stale(self, test_db):
+        cluster = new_cluster()
+        face_id = add_face("img-1", np.array([0.2, 0.4]))
+
+        db_update_face_cluster_ids_batch([{"face_id": face_id, "cluster_id": cluster}])
+
+        assert stored_centroid(test_db, cluster)[0] is None
+        assert np.allclose(db_get_cluster_mean_embeddings()[1], [[0.2, 0.4]])
+        assert stored_centroid(test_db, cluster)[0] is not None
+
+    @pytest.mark.parametrize("change", ["delete", "unassign", "insert"])
+    def test_membership_changes_elsewhere_trigger_a_recompute(self, test_db, change):
+        cluster = new_cluster()
+        keep = add_face("img-1", np.array([0.2, 0.4]))
+        other = add_face("img-2", np.array([0.6, 0.8]))
+        db_update_face_cluster_ids_batch(
+            [
+                {"face_id": keep, "cluster_id": cluster, "embedding": [0.2, 0.4]},
+                {"face_id": other, "cluster_id": cluster, "embedding": [0.6, 0.8]},
+            ]
+        )
+
+        conn = sqlite3.connect(test_db)
+        if change == "delete":
+            conn.execute("DELETE FROM faces WHERE face_id = ?", (other,))
+            expected = [0.2, 0.4]
+        elif change == "unassign":
+            conn.execute(
+                "UPDATE faces SET cluster_id = NULL WHERE face_id = ?", (other,)
+            )
+            expected = [0.2, 0.4]
+        conn.commit()
+        conn.close()
+        if change == "insert":
+            add_face("img-3", np.array([1.0, 1.0]), cluster_id=cluster)
+            expected = [0.6, 0.7333333]
+
+        assert stored_centroid(test_db, cluster)[0] is None
+        cluster_ids, means = db_get_cluster_mean_embeddings()
+        assert cluster_ids == [cluster]
+        assert np.allclose(means[0], expected)
+        assert stored_centroid(test_db, cluster)[0] is not None
+
+    def test_empty_clusters_are_left_out(self, test_db):
+        new_cluster()
+
+        assert db_get_cluster_mean_embeddings()[0] == []
+
+    def test_older_databases_gain_the_columns(self, test_db):
+        add_face("img-1", np.array([0.2, 0.4]), cluster_id="old")
+        conn = sqlite3.connect(test_db)
+        conn.execute("DROP TABLE face_clusters")
+        conn.execute(
+            "CREATE TABLE face_clusters (cluster_id TEXT PRIMARY KEY, "
+            "cluster_name TEXT, face_image_base64 TEXT)"
+        )
+        conn.execute("INSERT INTO face_clusters (cluster_id) VALUES ('old')")
+        conn.commit()
+        conn.close()
+
+        db_create_clusters_table()
+
+        assert stored_centroid(test_db, "old") == (None, 0)
+        assert db_get_cluster_mean_embeddings()[0] == ["old"]
+
+
+# ##############################
+# JSON -> BLOB migration
+# ##############################
+
+
+def add_json_face(db_path: str, embeddings_json: str) -> int:
+    """Insert a face the way databases from before the BLOB format stored it."""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.execute(
+        "INSERT INTO faces (image_id, embeddings) VALUES ('img-old', ?)",
+        (embeddings_json,),
+    )
+    conn.commit()
+    conn.close()
+    return cursor.lastrowid
+
+
+def stored_types(db_path: str) -> list:
+    conn = sqlite3.connect(db_path)
+    types = [
+        row[0]
+        for row in conn.execute("SELECT typeof(embeddings) FROM faces ORDER BY face_id")
+    ]
+    conn.close()
+    return types
+
+
+class TestEmbeddingMigration:
+    def test_new_faces_are_stored_as_float32_blobs(self, test_db):
+        add_face("img-1", np.array([0.1, 0.2]))
+
+        assert stored_types(test_db) == ["blob"]
+
+    def test_json_rows_are_converted_in_place(self, test_db):
+        flat = add_json_face(test_db, json.dumps([0.5, 0.25]))
+        # Older FaceNet output was stored with a leading batch dimension
+        nested = add_json_face(test_db, json.dumps([[1.0, 2.0]]))
+
+        db_create_faces_table()
+
+        assert stored_types(test_db) == ["blob", "blob"]
+        face_ids, _, embeddings = db_get_faces_unassigned_clusters()
+        assert face_ids == [flat, nested]
+        assert np.allclose(embeddings, [[0.5, 0.25], [1.0, 2.0]])
+
+    def test_interrupted_migration_resumes(self, test_db, monkeypatch):
+        for i in range(5):
+            add_json_face(test_db, json.dumps([float(i), 1.0]))
+        monkeypatch.setattr("app.database.faces._MIGRATION_BATCH_SIZE", 2)
+
+        real_connect = sqlite3.connect
+
+        class StopAfterFirstBatch(sqlite3.Connection):
+            commits = 0
+
+            def commit(self):
+                super().commit()
+                StopAfterFirstBatch.commits += 1
+                # The first commit is the CREATE TABLE, the second a batch
+                if StopAfterFirstBatch.commits == 2:
+                    raise KeyboardInterrupt
+
+        with patch(
+            "app.database.faces.db_connect",
+            lambda path, **kwargs: real_connect(path, factory=StopAfterFirstBatch),
+        ):
+            with pytest.raises(KeyboardInterrupt):
+                db_create_faces_table()
+
+        assert stored_types(test_db) == ["blob"] * 2 + ["text"] * 3
+
+        db_create_faces_table()
+
+        assert stored_types(test_db) == ["blob"] * 5
+        _, _, embeddings = db_get_faces_unassigned_clusters()
+        assert embeddings[:, 0].tolist() == [0, 1, 2, 3, 4]
+
+    def test_unreadable_json_is_cleared_instead_of_retried(self, test_db):
+        add_json_face(test_db, "not json")
+        good = add_json_face(test_db, json.dumps([1.0, 0.0]))
+
+        db_create_faces_table()
+
+        assert stored_types(test_db) == ["null", "blob"]
+        assert db_get_faces_unassigned_clusters()[0] == [good]
+
+    def test_loaders_read_rows_the_migration_has_not_reached(self, test_db):
+        add_face("img-1", np.array([0.1, 0.2]))
+        add_json_face(test_db, json.dumps([0.3, 0.4]))
+
+        _, _, embeddings = db_get_faces_unassigned_clusters()
+
+        assert np.allclose(embeddings, [[0.1, 0.2], [0.3, 0.4]])
+
+
+# ##############################
+# Face search matrix cache
+# ##############################
+
+
+@pytest.fixture
+def fresh_face_matrix(monkeypatch):
+    monkeypatch.setattr("app.database.faces._face_matrix", None)
+
+
+class TestFaceEmbeddingMatrix:
+    def test_rows_are_unit_length(self, test_db, fresh_face_matrix):
+        first = add_face("img-1", np.array([3.0, 4.0]))
+        second = add_face("img-2", np.array([0.0, 2.0]))
+
+        face_ids, image_ids, matrix = db_get_face_embedding_matrix()
+
+        assert face_ids.tolist() == [first, second]
+        assert image_ids == ["img-1", "img-2"]
+        assert np.allclose(matrix, [[0.6, 0.8], [0.0, 1.0]])
+        assert not matrix.flags.writeable
+
+    def test_appended_faces_are_read_incrementally(self, test_db, fresh_face_matrix):
+        add_face("img-1", np.array([1.0, 0.0]))
+        _, _, before = db_get_face_embedding_matrix()
+        new = add_face("img-2", np.array([0.0, 1.0]))
+
+        with patch(
+            "app.database.faces._embedding_matrix", wraps=faces_module._embedding_matrix
+        ) as decode:
+            face_ids, _, matrix = db_get_face_embedding_matrix()
+
+        # Only the new face was decoded, and the earlier snapshot is untouched
+        assert len(decode.call_args[0][0]) == 1
+        assert face_ids.tolist()[-1] == new
+        assert matrix.shape == (2, 2)
+        assert before.shape == (1, 2)
+
+    def test_unchanged_table_reuses_the_matrix(self, test_db, fresh_face_matrix):
+        add_face("img-1", np.array([1.0, 0.0]))
+
+        _, _, first = db_get_face_embedding_matrix()
+        _, _, second = db_get_face_embedding_matrix()
+
+        assert second is first
+
+    def test_deleted_faces_are_dropped(self, test_db, fresh_face_matrix):
+        gone = add_face("img-1", np.array([1.0, 0.0]))
+        kept = add_face("img-2", np.array([0.0, 1.0]))
+        db_get_face_embedding_matrix()
+
+        conn = sqlite3.connect(test_db)
+        conn.execute("DELETE FROM faces WHERE face_id = ?", (gone,))
+        conn.commit()
+        conn.close()
+        # Same row count as before the delete, but a higher MAX(face_id)
+        newest = add_face("img-3", np.array([1.0, 1.0]))
+
+        face_ids, image_ids, matrix = db_get_face_embedding_matrix()
+
+        assert face_ids.tolist() == [kept, newest]
+        assert image_ids == ["img-2", "img-3"]
+        assert matrix.shape == (2, 2)
+
+    def test_bboxes_for_hits_only(self, test_db):
+        bbox = {"x": 1, "y": 2, "width": 3, "height": 4}
+        face_id = add_face("img-1", bbox=bbox)
+        add_face("img-2", bbox=bbox)
+
+        assert db_get_face_bboxes([face_id]) == {face_id: bbox}
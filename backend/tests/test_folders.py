@@ -12,7 +12,9 @@ import shutil
 from concurrent.futures import ProcessPoolExecutor
 
 
+from app.database.connection import db_close_idle_connections
 from app.routes.folders import router as folders_router
+from app.utils.jobs import job_util_run_pending
 
 from app.database.folders import (
     db_create_folders_table,
@@ -37,6 +39,7 @@ from app.database.folders import (
 )
 from app.database.images import db_create_images_table
 from app.database.videos import db_create_videos_table
+from app.database.jobs import db_create_jobs_tables, db_get_recent_jobs
 from app.database.yolo_mapping import db_create_YOLO_classes_table
 
 # ##############################
@@ -55,6 +58,7 @@ def test_db(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
         monkeypatch.setattr("app.database.images.DATABASE_PATH", db_path)
         monkeypatch.setattr("app.database.videos.DATABASE_PATH", db_path)
         monkeypatch.setattr("app.database.yolo_mapping.DATABASE_PATH", db_path)
+        monkeypatch.setattr("app.database.jobs.DATABASE_PATH", db_path)
 
         # Build the real schema rather than a hand-written copy: a divergent
         # CREATE silently reorders columns and drops the ON DELETE CASCADE.
@@ -64,9 +68,11 @@ def test_db(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
         db_create_folders_table()
         db_create_images_table()  # db_get_all_folder_details LEFT JOINs it
         db_create_videos_table()  # db_get_all_folder_details LEFT JOINs it too
+        db_create_jobs_tables()  # Tagging and sync queue their work there
 
         yield db_path
     finally:
+        db_close_idle_connections(db_path)
         os.unlink(db_path)
 
 
@@ -449,9 +455,12 @@ class TestFoldersAPI:
 
         assert response.status_code == 200
 
-        # Verify background processing was triggered
+        # Verify background processing was queued and triggered
+        (job,) = db_get_recent_jobs(10)
+        assert job["kind"] == "ai_tagging"
+        assert job["status"] == "queued"
         app_state = client.app.state
-        app_state.executor.submit.assert_called_once()
+        app_state.executor.submit.assert_called_once_with(job_util_run_pending)
 
     # ============================================================================
     # POST /folders/disable-ai-tagging - Disable AI Tagging Tests
@@ -757,7 +766,7 @@ class TestFoldersUnit:
 
         assert rows == [("folder-id-1",), ("folder-id-2",)]
 
-    @patch("app.database.folders.sqlite3.connect")
+    @patch("app.database.folders.db_connect")
     def test_db_insert_folders_batch_error(self, mock_connect, test_db):
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
@@ -862,7 +871,7 @@ class TestFoldersUnit:
 
         assert set(result) == {"folder-id-1", "folder-id-2"}
 
-    @patch("app.database.folders.sqlite3.connect")
+    @patch("app.database.folders.db_connect")
     def test_db_delete_folders_batch_error(self, mock_connect, test_db):
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
@@ -1019,7 +1028,7 @@ class TestFoldersUnit:
     def test_db_update_ai_tagging_batch_empty_list(self, test_db):
         assert db_update_ai_tagging_batch([], True) == 0
 
-    @patch("app.database.folders.sqlite3.connect")
+    @patch("app.database.folders.db_connect")
     def test_db_update_ai_tagging_batch_sqlite_error(self, mock_connect, test_db):
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
@@ -12,7 +12,11 @@ from app.database.image_embeddings import (
     db_upsert_image_embeddings,
     db_get_all_embeddings,
     db_count_embeddings,
+    db_get_cached_embeddings,
+    db_clear_embedding_cache,
+    db_get_embedding_cache_stats,
 )
+from app.database.images import db_delete_images_by_ids
 
 
 @pytest.fixture(autouse=True)
@@ -44,7 +48,9 @@ def _isolated_db(tmp_path, monkeypatch):
     db_create_folders_table()
     db_create_images_table()
     db_create_image_embeddings_table()
+    db_clear_embedding_cache()
     yield
+    db_clear_embedding_cache()
 
 
 def _insert_dummy_image(image_id: str):
@@ -169,3 +175,118 @@ class TestImageEmbeddingsDB:
 
         ids, _ = db_get_all_embeddings("siglip2-base-patch16-224")
         assert "img7" not in ids
+
+
+BASE = "siglip2-base-patch16-224"
+
+
+def _raw_upsert(image_id: str, vector, model_version: str = BASE):
+    """Write a row without going through db_upsert_image_embeddings, the
+    way the indexing worker process looks to the server's cache."""
+    conn = _connect()
+    conn.execute(
+        """
+        INSERT INTO image_embeddings (image_id, model_version, embedding)
+        VALUES (?, ?, ?)
+        ON CONFLICT(image_id) DO UPDATE SET
+            model_version = excluded.model_version,
+            embedding = excluded.embedding
+        """,
+        (image_id, model_version, np.asarray(vector, dtype=np.float32).tobytes()),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _as_dict(ids, matrix):
+    return {image_id: matrix[row].tolist() for row, image_id in enumerate(ids)}
+
+
+class TestEmbeddingCache:
+    def test_matches_uncached_read(self):
+        for i in range(3):
+            _insert_dummy_image(f"img{i}")
+        db_upsert_image_embeddings(
+            [(f"img{i}", BASE, np.full(4, i, dtype=np.float32)) for i in range(3)]
+        )
+
+        cached = _as_dict(*db_get_cached_embeddings(BASE))
+
+        assert cached == _as_dict(*db_get_all_embeddings(BASE))
+        assert db_get_embedding_cache_stats()[BASE]["rows"] == 3
+
+    def test_upserts_in_this_process_update_the_cache(self):
+        _insert_dummy_image("img1")
+        _insert_dummy_image("img2")
+        db_upsert_image_embeddings([("img1", BASE, np.ones(4, dtype=np.float32))])
+        db_get_cached_embeddings(BASE)
+
+        db_upsert_image_embeddings([("img2", BASE, np.full(4, 2.0, np.float32))])
+
+        stats = db_get_embedding_cache_stats()[BASE]
+        assert stats["rows"] == 2
+        assert stats["bytes"] == stats["capacity"] * 4 * 4
+        assert _as_dict(*db_get_cached_embeddings(BASE))["img2"] == [2.0] * 4
+
+    def test_rows_written_by_another_process_are_picked_up(self):
+        _insert_dummy_image("img1")
+        _insert_dummy_image("img2")
+        _raw_upsert("img1", np.ones(4))
+        db_get_cached_embeddings(BASE)
+
+        _raw_upsert("img2", np.full(4, 2.0))
+
+        ids, _ = db_get_cached_embeddings(BASE)
+        assert sorted(ids) == ["img1", "img2"]
+
+    def test_deletes_are_dropped_from_the_cache(self):
+        for i in range(3):
+            _insert_dummy_image(f"img{i}")
+            _raw_upsert(f"img{i}", np.full(4, float(i)))
+        db_get_cached_embeddings(BASE)
+
+        # One through the app's delete, one as a cascade it never sees
+        db_delete_images_by_ids(["img0"])
+        assert db_get_embedding_cache_stats()[BASE]["rows"] == 2
+        conn = _connect()
+        conn.execute("DELETE FROM images WHERE id = ?", ("img2",))
+        conn.commit()
+        conn.close()
+
+        cached = _as_dict(*db_get_cached_embeddings(BASE))
+        assert cached == {"img1": [1.0] * 4}
+
+    def test_a_snapshot_is_not_changed_by_later_removals(self):
+        for i in range(3):
+            _insert_dummy_image(f"img{i}")
+            _raw_upsert(f"img{i}", np.full(4, float(i)))
+        ids, matrix = db_get_cached_embeddings(BASE)
+        before = _as_dict(ids, matrix)
+
+        db_delete_images_by_ids(["img0"])
+
+        assert _as_dict(ids, matrix) == before
+
+    def test_switching_checkpoint_frees_the_old_matrix(self):
+        _insert_dummy_image("img1")
+        _insert_dummy_image("img2")
+        _raw_upsert("img1", np.ones(4))
+        _raw_upsert("img2", np.ones(8), model_version="siglip2-large-patch16-384")
+        db_get_cached_embeddings(BASE)
+
+        ids, matrix = db_get_cached_embeddings("siglip2-large-patch16-384")
+
+        assert ids == ["img2"] and matrix.shape == (1, 8)
+        assert list(db_get_embedding_cache_stats()) == ["siglip2-large-patch16-384"]
+
+    def test_reembedding_under_another_checkpoint_leaves_the_cache(self):
+        _insert_dummy_image("img1")
+        db_upsert_image_embeddings([("img1", BASE, np.ones(4, dtype=np.float32))])
+        db_get_cached_embeddings(BASE)
+
+        db_upsert_image_embeddings(
+            [("img1", "siglip2-large-patch16-384", np.ones(8, dtype=np.float32))]
+        )
+
+        ids, matrix = db_get_cached_embeddings(BASE)
+        assert ids == [] and matrix.shape == (0, 0)
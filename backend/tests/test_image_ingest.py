@@ -0,0 +1,218 @@
+import json
+from unittest.mock import patch
+
+from PIL import Image
+
+import app.utils.images as images_module
+from app.utils.images import (
+    EXIF_IFD_POINTER,
+    INGEST_STAGES,
+    image_util_get_images_from_folder,
+    image_util_ingest_image,
+    image_util_prepare_image_records,
+)
+
+DATE_TIME_ORIGINAL = 36867
+
+
+def _write_jpeg(path, size=(1200, 800), exif_date=None):
+    image = Image.new("RGB", size, "white")
+    if exif_date:
+        exif = image.getexif()
+        exif[EXIF_IFD_POINTER] = {DATE_TIME_ORIGINAL: exif_date}
+        image.save(path, exif=exif)
+    else:
+        image.save(path)
+    return str(path)
+
+
+class TestIngestImage:
+    def test_reads_metadata_and_writes_thumbnail(self, tmp_path):
+        source = _write_jpeg(tmp_path / "a.jpg", exif_date="2024:02:06 10:36:24")
+        thumbnail = tmp_path / "thumb.jpg"
+
+        metadata = image_util_ingest_image(source, str(thumbnail))
+
+        assert metadata["width"] == 1200
+        assert metadata["height"] == 800
+        assert metadata["date_source"] == "exif"
+        assert metadata["date_created"] == "2024-02-06T10:36:24"
+        with Image.open(thumbnail) as thumb:
+            assert max(thumb.size) <= 600
+
+    def test_opens_the_file_once(self, tmp_path):
+        source = _write_jpeg(tmp_path / "a.jpg")
+        real_open = Image.open
+
+        with patch.object(
+            images_module.Image, "open", side_effect=real_open
+        ) as spy_open:
+            image_util_ingest_image(source, str(tmp_path / "thumb.jpg"))
+
+        assert spy_open.call_count == 1
+
+    def test_a_corrupt_file_is_skipped(self, tmp_path):
+        broken = tmp_path / "broken.jpg"
+        broken.write_bytes(b"not really a jpeg")
+
+        assert image_util_ingest_image(str(broken), str(tmp_path / "t.jpg")) is None
+
+    def test_accumulates_stage_timings(self, tmp_path):
+        timings = {}
+        for name in ("a.jpg", "b.jpg"):
+            source = _write_jpeg(tmp_path / name)
+            image_util_ingest_image(
+                source, str(tmp_path / f"t_{name}"), timings=timings
+            )
+
+        assert set(timings) == set(INGEST_STAGES)
+        assert all(seconds >= 0 for seconds in timings.values())
+
+
+class TestPrepareImageRecords:
+    def test_skips_unreadable_files_and_keeps_the_rest(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(images_module, "THUMBNAIL_IMAGES_PATH", str(tmp_path))
+        photos = tmp_path / "photos"
+        photos.mkdir()
+        good = _write_jpeg(photos / "good.jpg")
+        (photos / "bad.jpg").write_bytes(b"garbage")
+
+        # The folder walk only filters by extension; decoding happens at ingest.
+        files = sorted(image_util_get_images_from_folder(str(photos), recursive=False))
+        assert len(files) == 2
+
+        timings = {}
+        records = image_util_prepare_image_records(
+            files, {str(photos): 7}, timings=timings
+        )
+
+        assert [record["path"] for record in records] == [good]
+        assert records[0]["folder_id"] == 7
+        assert json.loads(records[0]["metadata"])["width"] == 1200
+        assert set(timings) == set(INGEST_STAGES)
+
+
+class TestProcessFolderImages:
+    def _run(self, tmp_path, monkeypatch, workers, batch_size):
+        monkeypatch.setattr(images_module, "THUMBNAIL_IMAGES_PATH", str(tmp_path))
+        monkeypatch.setattr("app.config.settings.IMAGE_INDEXING_WORKERS", workers)
+        monkeypatch.setattr("app.config.settings.IMAGE_INDEXING_BATCH_SIZE", batch_size)
+        photos = tmp_path / "photos"
+        photos.mkdir()
+        for i in range(5):
+            _write_jpeg(photos / f"{i}.jpg", size=(64, 48))
+        (photos / "bad.jpg").write_bytes(b"garbage")
+
+        batches = []
+        with patch.object(
+            images_module,
+            "db_bulk_insert_images",
+            side_effect=lambda records: batches.append(records) or True,
+        ), patch.object(images_module, "image_util_remove_obsolete_images"):
+            ok = images_module.image_util_process_folder_images(
+                [(str(photos), 3, False)]
+            )
+        return ok, batches
+
+    def test_pool_commits_in_ordered_batches(self, tmp_path, monkeypatch):
+        ok, batches = self._run(tmp_path, monkeypatch, workers=2, batch_size=2)
+
+        assert ok is True
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        paths = [record["path"] for batch in batches for record in batch]
+        # Same order the walk produced, whatever order the workers finished in
+        walked = [
+            path
+            for path in image_util_get_images_from_folder(
+                str(tmp_path / "photos"), False
+            )
+            if not path.endswith("bad.jpg")
+        ]
+        assert paths == walked
+
+    def test_single_worker_runs_in_process(self, tmp_path, monkeypatch):
+        with patch.object(images_module, "ProcessPoolExecutor") as pool_cls:
+            ok, batches = self._run(tmp_path, monkeypatch, workers=1, batch_size=10)
+
+        pool_cls.assert_not_called()
+        assert ok is True
+        assert len(batches) == 1 and len(batches[0]) == 5
+
+    def test_batches_are_committed_as_the_walk_goes(self, tmp_path, monkeypatch):
+        """An interrupted pass keeps the rows, and thumbnails, it had done."""
+        monkeypatch.setattr(images_module, "THUMBNAIL_IMAGES_PATH", str(tmp_path))
+        monkeypatch.setattr("app.config.settings.IMAGE_INDEXING_WORKERS", 1)
+        monkeypatch.setattr("app.config.settings.IMAGE_INDEXING_BATCH_SIZE", 2)
+        photos = tmp_path / "photos"
+        photos.mkdir()
+        for i in range(5):
+            _write_jpeg(photos / f"{i}.jpg", size=(64, 48))
+
+        events = []
+        real_ingest = images_module.image_util_ingest_image
+
+        def ingest(image_path, thumbnail_path, timings=None):
+            events.append("ingest")
+            return real_ingest(image_path, thumbnail_path, timings=timings)
+
+        with patch.object(
+            images_module, "image_util_ingest_image", side_effect=ingest
+        ), patch.object(
+            images_module,
+            "db_bulk_insert_images",
+            side_effect=lambda records: events.append(len(records)) or True,
+        ), patch.object(
+            images_module, "image_util_remove_obsolete_images"
+        ):
+            images_module.image_util_process_folder_images([(str(photos), 3, False)])
+
+        assert events == ["ingest", "ingest", 2, "ingest", "ingest", 2, "ingest", 1]
+
+    def test_a_failing_folder_does_not_stop_the_others(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(images_module, "THUMBNAIL_IMAGES_PATH", str(tmp_path))
+        monkeypatch.setattr("app.config.settings.IMAGE_INDEXING_WORKERS", 1)
+        good = tmp_path / "good"
+        good.mkdir()
+        _write_jpeg(good / "a.jpg", size=(32, 32))
+
+        real_walk = images_module.image_util_get_images_from_folder
+
+        def walk(folder_path, recursive):
+            if folder_path.endswith("broken"):
+                raise OSError("permission denied")
+            return real_walk(folder_path, recursive)
+
+        batches = []
+        with patch.object(
+            images_module, "image_util_get_images_from_folder", side_effect=walk
+        ), patch.object(
+            images_module,
+            "db_bulk_insert_images",
+            side_effect=lambda records: batches.append(records) or True,
+        ), patch.object(
+            images_module, "image_util_remove_obsolete_images"
+        ):
+            ok = images_module.image_util_process_folder_images(
+                [(str(tmp_path / "broken"), 1, False), (str(good), 2, False)]
+            )
+
+        assert ok is True
+        assert [record["folder_id"] for record in batches[0]] == [2]
+
+
+class TestSharedIngestPool:
+    def test_concurrent_passes_share_one_spawned_pool(self):
+        with images_module._shared_ingest_pool(2) as first:
+            with images_module._shared_ingest_pool(2) as second:
+                assert second is first
+            # Still open for the pass that started it
+            assert first.submit(abs, -1).result() == 1
+            assert first._mp_context.get_start_method() == "spawn"
+
+        assert images_module._ingest_pool is None
+        with images_module._shared_ingest_pool(2) as third:
+            assert third is not first
+
+    def test_single_worker_has_no_pool(self):
+        with images_module._shared_ingest_pool(1) as pool:
+            assert pool is None
@@ -0,0 +1,320 @@
+import os
+import sqlite3
+import tempfile
+from typing import Iterator, List
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.database.connection import db_close_idle_connections
+from app.database.face_clusters import db_create_clusters_table
+from app.database.faces import db_create_faces_table
+from app.database.folders import db_create_folders_table
+from app.database.image_embeddings import (
+    db_create_image_embeddings_table,
+    db_get_embeddings_for_image_ids,
+)
+from app.database.images import (
+    db_bulk_insert_images,
+    db_create_images_table,
+    db_get_pending_images,
+)
+from app.database.yolo_mapping import db_create_YOLO_classes_table
+from app.utils import images
+from app.utils.images import _Embedder, image_util_process_pending_images
+
+MODEL_VERSION = "siglip2-test"
+PERSON, DOG = 0, 16
+
+# ##############################
+# Pytest Fixtures
+# ##############################
+
+
+@pytest.fixture(scope="function")
+def test_db(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
+    """Images, faces and embeddings in a fresh tempfile database."""
+    db_fd, db_path = tempfile.mkstemp()
+    os.close(db_fd)
+
+    monkeypatch.setattr("app.config.settings.DATABASE_PATH", db_path)
+    monkeypatch.setattr("app.database.connection.DATABASE_PATH", db_path)
+    for module in ["images", "folders", "yolo_mapping", "faces", "face_clusters"]:
+        monkeypatch.setattr(f"app.database.{module}.DATABASE_PATH", db_path)
+
+    db_create_YOLO_classes_table()
+    db_create_folders_table()
+    db_create_images_table()
+    db_create_clusters_table()
+    db_create_faces_table()
+    db_create_image_embeddings_table()
+
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "INSERT INTO folders (folder_id, folder_path, last_modified_time, AI_Tagging) "
+        "VALUES ('folder-1', '/photos', 0, 1)"
+    )
+    conn.commit()
+    conn.close()
+
+    yield db_path
+
+    db_close_idle_connections(db_path)
+    os.unlink(db_path)
+
+
+@pytest.fixture
+def photos(tmp_path) -> str:
+    """A directory to write test photos into."""
+    return str(tmp_path)
+
+
+def add_photo(directory: str, image_id: str, color: str = "red", **overrides) -> str:
+    path = os.path.join(directory, f"{image_id}.jpg")
+    Image.new("RGB", (40, 30), color).save(path)
+    add_image_row(image_id, path, **overrides)
+    return path
+
+
+def add_image_row(image_id: str, path: str, **overrides) -> None:
+    db_bulk_insert_images(
+        [
+            {
+                "id": image_id,
+                "path": path,
+                "folder_id": "folder-1",
+                "thumbnailPath": f"/thumbs/{image_id}.jpg",
+                "metadata": "{}",
+                "isTagged": False,
+                "isEmbedded": False,
+                "latitude": None,
+                "longitude": None,
+                "captured_at": None,
+                **overrides,
+            }
+        ]
+    )
+
+
+class FakeClassifier:
+    """Finds a person in red images and a dog in all others."""
+
+    def __init__(self):
+        self.batches: List[int] = []
+
+    def get_classes_batch(self, imgs):
+        self.batches.append(len(imgs))
+        # BGR: red is the last channel
+        return [[PERSON] if img[0, 0, 2] > 200 else [DOG] for img in imgs]
+
+    def close(self):
+        pass
+
+
+class FakeFaceDetector:
+    """One face per image."""
+
+    def __init__(self):
+        self.stored: List[bool] = []
+
+    def detect_faces_batch(self, imgs, store=True):
+        self.stored.append(store)
+        return [
+            {
+                "embeddings": [np.full(512, 0.5, dtype=np.float32)],
+                "confidences": [0.9],
+                "bboxes": [{"x": 1, "y": 2, "width": 3, "height": 4}],
+                "faces_skipped": 0,
+            }
+            for _ in imgs
+        ]
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def models(monkeypatch: pytest.MonkeyPatch):
+    """Fake detectors and SigLIP2 model, counting the files they are fed."""
+    classifier = FakeClassifier()
+    face_detector = FakeFaceDetector()
+    vision = MagicMock()
+    vision.get_embedding.side_effect = lambda batch: np.ones(
+        (len(batch), 8), dtype=np.float32
+    )
+    opened: List[str] = []
+    real_open = Image.open
+
+    def counting_open(path, *args, **kwargs):
+        opened.append(path)
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr(images, "ObjectClassifier", lambda: classifier)
+    monkeypatch.setattr(images, "FaceDetector", lambda: face_detector)
+    monkeypatch.setattr(
+        images, "_acquire_embedder", lambda: _Embedder(vision, 16, MODEL_VERSION)
+    )
+    monkeypatch.setattr("app.models.session_pool.release_model", MagicMock())
+    monkeypatch.setattr(
+        "app.database.embedding_store.db_open_embedding_store", MagicMock()
+    )
+    monkeypatch.setattr("app.utils.images.Image.open", counting_open)
+    # Small batches, so even a handful of photos crosses batch boundaries
+    monkeypatch.setattr("app.config.settings.YOLO_DETECT_BATCH_SIZE", 2)
+    monkeypatch.setattr("app.config.settings.SIGLIP2_EMBED_BATCH_SIZE", 2)
+    monkeypatch.setattr("app.config.settings.IMAGE_PIPELINE_WRITE_BATCH", 2)
+    monkeypatch.setattr("app.config.settings.IMAGE_PIPELINE_QUEUE_SIZE", 1)
+
+    return {
+        "classifier": classifier,
+        "face_detector": face_detector,
+        "vision": vision,
+        "opened": opened,
+    }
+
+
+def rows(db_path: str, sql: str) -> list:
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+# ##############################
+# Pending images
+# ##############################
+
+
+class TestGetPendingImages:
+    def test_lists_images_needing_either_pass_once(self, test_db):
+        add_image_row("both", "/photos/both.jpg")
+        add_image_row("tag", "/photos/tag.jpg", isEmbedded=True)
+        add_image_row("embed", "/photos/embed.jpg", isTagged=True)
+        add_image_row("done", "/photos/done.jpg", isTagged=True, isEmbedded=True)
+
+        pending = {image["id"]: image for image in db_get_pending_images()}
+
+        assert sorted(pending) == ["both", "embed", "tag"]
+        assert pending["tag"]["isEmbedded"] is True
+        assert pending["embed"]["isTagged"] is True
+
+
+# ##############################
+# Analysis pass
+# ##############################
+
+
+class TestProcessPendingImages:
+    def test_reads_each_file_once_for_every_model(self, test_db, photos, models):
+        paths = [add_photo(photos, f"img{i}") for i in range(5)]
+
+        assert image_util_process_pending_images() == 5
+
+        assert sorted(models["opened"]) == sorted(paths)
+        assert sum(models["classifier"].batches) == 5
+        assert max(models["classifier"].batches) <= 2
+
+    def test_writes_tags_faces_and_embeddings(self, test_db, photos, models):
+        add_photo(photos, "person", color="red")
+        add_photo(photos, "dog", color="blue")
+
+        image_util_process_pending_images()
+
+        assert sorted(
+            rows(test_db, "SELECT image_id, class_id FROM image_classes")
+        ) == [
+            ("dog", DOG),
+            ("person", PERSON),
+        ]
+        assert rows(test_db, "SELECT image_id, confidence FROM faces") == [
+            ("person", pytest.approx(0.9))
+        ]
+        # The pass batches its own face writes
+        assert models["face_detector"].stored == [False]
+        assert sorted(
+            db_get_embeddings_for_image_ids(["person", "dog"], MODEL_VERSION)
+        ) == ["dog", "person"]
+        assert rows(test_db, "SELECT isTagged, isEmbedded FROM images") == [
+            (1, 1),
+            (1, 1),
+        ]
+        assert db_get_pending_images() == []
+
+    def test_an_interrupted_write_leaves_nothing_to_duplicate(
+        self, test_db, photos, models
+    ):
+        """Faces have no natural key: a resumed pass must not find some of
+        a batch's faces committed without the flags that say so."""
+        add_photo(photos, "person", color="red")
+
+        with patch(
+            "app.database.images.db_mark_images_tagged",
+            side_effect=sqlite3.OperationalError("database is locked"),
+        ):
+            assert image_util_process_pending_images() == 0
+        assert rows(test_db, "SELECT COUNT(*) FROM faces") == [(0,)]
+
+        image_util_process_pending_images()
+
+        assert rows(test_db, "SELECT COUNT(*) FROM faces") == [(1,)]
+        assert db_get_pending_images() == []
+
+    def test_only_runs_the_models_an_image_still_needs(self, test_db, photos, models):
+        add_photo(photos, "tagged", isTagged=True)
+        add_photo(photos, "embedded", isEmbedded=True)
+
+        image_util_process_pending_images()
+
+        assert sum(models["classifier"].batches) == 1
+        assert (
+            sum(len(c.args[0]) for c in models["vision"].get_embedding.mock_calls) == 1
+        )
+        assert rows(test_db, "SELECT image_id FROM image_classes") == [("embedded",)]
+
+    def test_unreadable_image_is_tagged_but_left_for_embedding(
+        self, test_db, photos, models
+    ):
+        add_photo(photos, "good")
+        broken = os.path.join(photos, "broken.jpg")
+        with open(broken, "wb") as f:
+            f.write(b"not an image")
+        add_image_row("broken", broken)
+
+        assert image_util_process_pending_images() == 2
+
+        assert [image["id"] for image in db_get_pending_images()] == ["broken"]
+        assert db_get_pending_images()[0]["isTagged"] is True
+
+    def test_still_tags_without_the_vision_model(
+        self, test_db, photos, models, monkeypatch
+    ):
+        monkeypatch.setattr(images, "_acquire_embedder", lambda: None)
+        add_photo(photos, "img0")
+
+        image_util_process_pending_images()
+
+        assert rows(test_db, "SELECT isTagged, isEmbedded FROM images") == [(1, 0)]
+        models["vision"].get_embedding.assert_not_called()
+
+    def test_a_failing_model_stops_the_pass_without_raising(
+        self, test_db, photos, models
+    ):
+        for i in range(6):
+            add_photo(photos, f"img{i}")
+        models["vision"].get_embedding.side_effect = RuntimeError("session lost")
+
+        assert image_util_process_pending_images() == 0
+
+        # Nothing was embedded; the images are picked up again next pass
+        assert all(not image["isEmbedded"] for image in db_get_pending_images())
+
+    def test_nothing_pending_loads_no_models(self, test_db, monkeypatch):
+        classifier = MagicMock()
+        monkeypatch.setattr(images, "ObjectClassifier", classifier)
+
+        assert image_util_process_pending_images() == 0
+
+        classifier.assert_not_called()
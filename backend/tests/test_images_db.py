@@ -5,6 +5,7 @@ from typing import Any, Dict, Iterator
 
 import pytest
 
+from app.database.connection import db_close_idle_connections
 from app.database.images import (
     db_create_images_table,
     db_bulk_insert_images,
@@ -50,6 +51,7 @@ def test_db(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
 
     yield db_path
 
+    db_close_idle_connections(db_path)
     os.unlink(db_path)
 
 
@@ -0,0 +1,259 @@
+import json
+import os
+import sqlite3
+import tempfile
+from typing import Any, Dict, Iterator, List, Optional
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.database.connection import db_close_idle_connections
+from app.database.folders import db_create_folders_table
+from app.database.images import (
+    db_bulk_insert_images,
+    db_create_images_table,
+    db_get_images_page,
+)
+from app.database.semantic_labels import db_create_semantic_labels_table
+from app.database.yolo_mapping import db_create_YOLO_classes_table
+from app.routes.images import router as images_router
+
+app = FastAPI()
+app.include_router(images_router, prefix="/images")
+client = TestClient(app)
+
+METADATA = json.dumps(
+    {
+        "name": "photo.jpg",
+        "date_created": None,
+        "width": 100,
+        "height": 100,
+        "file_location": "/photos/photo.jpg",
+        "file_size": 1,
+        "item_type": "image/jpeg",
+    }
+)
+
+# ##############################
+# Pytest Fixtures
+# ##############################
+
+
+@pytest.fixture(scope="function")
+def test_db(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
+    """Images, folders and tags in a fresh tempfile database."""
+    db_fd, db_path = tempfile.mkstemp()
+    os.close(db_fd)
+
+    monkeypatch.setattr("app.config.settings.DATABASE_PATH", db_path)
+    monkeypatch.setattr("app.database.images.DATABASE_PATH", db_path)
+    monkeypatch.setattr("app.database.folders.DATABASE_PATH", db_path)
+    monkeypatch.setattr("app.database.yolo_mapping.DATABASE_PATH", db_path)
+
+    db_create_YOLO_classes_table()
+    db_create_folders_table()
+    db_create_images_table()
+    db_create_semantic_labels_table()
+
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "INSERT INTO folders (folder_id, folder_path, last_modified_time, AI_Tagging) "
+        "VALUES ('folder-1', '/photos', 0, 1)"
+    )
+    conn.commit()
+    conn.close()
+
+    yield db_path
+
+    db_close_idle_connections(db_path)
+    os.unlink(db_path)
+
+
+def add_images(captured: Dict[str, Optional[str]], **overrides: Any) -> None:
+    db_bulk_insert_images(
+        [
+            {
+                "id": image_id,
+                "path": f"/photos/{image_id}.jpg",
+                "folder_id": "folder-1",
+                "thumbnailPath": f"/thumbs/{image_id}.jpg",
+                "metadata": METADATA,
+                "isTagged": False,
+                "isEmbedded": False,
+                "latitude": None,
+                "longitude": None,
+                "captured_at": captured_at,
+                **overrides,
+            }
+            for image_id, captured_at in captured.items()
+        ]
+    )
+
+
+def add_tag(db_path: str, image_id: str, class_id: int, name: str) -> None:
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "INSERT OR REPLACE INTO mappings (class_id, name) VALUES (?, ?)",
+        (class_id, name),
+    )
+    conn.execute(
+        "INSERT INTO image_classes (image_id, class_id) VALUES (?, ?)",
+        (image_id, class_id),
+    )
+    conn.commit()
+    conn.close()
+
+
+LIBRARY = {
+    "a": "2024-01-01 10:00:00",
+    "b": "2024-03-01 10:00:00",
+    "c": "2024-03-01 10:00:00",
+    "d": None,
+    "e": "2023-06-01 10:00:00",
+    "f": None,
+}
+# Newest first, ties and undated images by id descending
+NEWEST_FIRST = ["c", "b", "a", "e", "f", "d"]
+
+
+def ids(images: List[dict]) -> List[str]:
+    return [image["id"] for image in images]
+
+
+def walk_pages(limit: int, **params: Any) -> List[List[str]]:
+    pages = []
+    cursor = None
+    while True:
+        query = {"limit": limit, **params}
+        if cursor:
+            query["cursor"] = cursor
+        body = client.get("/images/", params=query).json()
+        pages.append([image["id"] for image in body["data"]])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+# ##############################
+# Keyset pages
+# ##############################
+
+
+class TestGetImagesPage:
+    def test_orders_newest_first_with_undated_images_last(self, test_db):
+        add_images(LIBRARY)
+
+        assert ids(db_get_images_page(10)) == NEWEST_FIRST
+
+    def test_pages_continue_after_the_given_key(self, test_db):
+        add_images(LIBRARY)
+
+        assert ids(db_get_images_page(2, after=("2024-03-01 10:00:00", "c"))) == [
+            "b",
+            "a",
+        ]
+        # From the last dated image into the undated ones
+        assert ids(db_get_images_page(3, after=("2023-06-01 10:00:00", "e"))) == [
+            "f",
+            "d",
+        ]
+        assert ids(db_get_images_page(3, after=(None, "f"))) == ["d"]
+
+    def test_tags_are_attached_without_breaking_the_limit(self, test_db):
+        add_images(LIBRARY)
+        add_tag(test_db, "c", 1, "dog")
+        add_tag(test_db, "c", 2, "cat")
+
+        page = db_get_images_page(2)
+
+        assert ids(page) == ["c", "b"]
+        assert page[0]["tags"] == ["cat", "dog"]
+        assert page[1]["tags"] is None
+
+    def test_tagged_filter(self, test_db):
+        add_images({"a": "2024-01-01", "b": "2024-02-01"}, isTagged=True)
+        add_images({"c": "2024-03-01"})
+
+        assert ids(db_get_images_page(10, tagged=True)) == ["b", "a"]
+
+
+# ##############################
+# GET /images/
+# ##############################
+
+
+class TestGetAllImagesRoute:
+    def test_without_paging_returns_everything_by_path(self, test_db):
+        add_images(LIBRARY)
+
+        body = client.get("/images/").json()
+
+        assert [image["id"] for image in body["data"]] == sorted(LIBRARY)
+        assert body["next_cursor"] is None
+
+    def test_cursors_walk_every_image_once(self, test_db):
+        add_images(LIBRARY)
+
+        pages = walk_pages(limit=4)
+
+        assert pages == [NEWEST_FIRST[:4], NEWEST_FIRST[4:]]
+
+    @pytest.mark.parametrize("limit", [1, 2, 5])
+    def test_every_page_size_covers_the_library(self, test_db, limit):
+        add_images(LIBRARY)
+
+        pages = walk_pages(limit=limit)
+
+        assert [image for page in pages for image in page] == NEWEST_FIRST
+
+    def test_invalid_cursor_is_a_bad_request(self, test_db):
+        response = client.get("/images/", params={"cursor": "not-a-cursor"})
+
+        assert response.status_code == 400
+        assert response.json()["detail"]["error"] == "Invalid cursor"
+
+    def test_limit_is_bounded(self, test_db):
+        assert client.get("/images/", params={"limit": 0}).status_code == 422
+        assert client.get("/images/", params={"limit": 100_000}).status_code == 422
+
+
+class TestStreamImages:
+    def lines(self, response) -> List[dict]:
+        return [json.loads(line) for line in response.text.splitlines()]
+
+    def test_streams_every_image_as_ndjson(self, test_db, monkeypatch):
+        # Several database reads for one response
+        monkeypatch.setattr("app.config.settings.IMAGES_PAGE_SIZE", 4)
+        add_images(LIBRARY)
+        add_tag(test_db, "a", 1, "dog")
+
+        response = client.get("/images/", params={"stream": True})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = self.lines(response)
+        assert [line["id"] for line in lines] == NEWEST_FIRST
+        assert lines[2]["tags"] == ["dog"]
+        assert lines[0]["metadata"]["width"] == 100
+
+    def test_limited_stream_ends_with_the_next_cursor(self, test_db):
+        add_images(LIBRARY)
+
+        lines = self.lines(client.get("/images/", params={"stream": True, "limit": 2}))
+
+        assert [line.get("id") for line in lines[:2]] == NEWEST_FIRST[:2]
+        rest = client.get(
+            "/images/", params={"cursor": lines[2]["next_cursor"], "limit": 10}
+        ).json()
+        assert [image["id"] for image in rest["data"]] == NEWEST_FIRST[2:]
+
+    def test_stream_starts_at_the_cursor(self, test_db):
+        add_images(LIBRARY)
+        cursor = client.get("/images/", params={"limit": 3}).json()["next_cursor"]
+
+        lines = self.lines(
+            client.get("/images/", params={"stream": True, "cursor": cursor})
+        )
+
+        assert [line["id"] for line in lines] == NEWEST_FIRST[3:]
@@ -0,0 +1,448 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, Iterator, List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.database.connection import db_close_idle_connections
+from app.database.folders import db_create_folders_table
+from app.database.jobs import (
+    db_claim_next_stage,
+    db_complete_stage,
+    db_create_jobs_tables,
+    db_enqueue_job,
+    db_fail_stage,
+    db_get_job,
+    db_get_recent_jobs,
+    db_get_stage_throughput,
+    db_prune_finished_jobs,
+    db_requeue_interrupted_stages,
+)
+from app.routes.jobs import router as jobs_router
+from app.utils import jobs
+from app.utils.jobs import Stage, job_util_resume, job_util_run_pending
+
+app = FastAPI()
+app.include_router(jobs_router, prefix="/jobs")
+client = TestClient(app)
+
+# ##############################
+# Pytest Fixtures
+# ##############################
+
+
+@pytest.fixture(scope="function")
+def test_db(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
+    """The jobs tables, and folders for the tagging flag, in a tempfile."""
+    db_fd, db_path = tempfile.mkstemp()
+    os.close(db_fd)
+
+    monkeypatch.setattr("app.config.settings.DATABASE_PATH", db_path)
+    monkeypatch.setattr("app.database.jobs.DATABASE_PATH", db_path)
+    monkeypatch.setattr("app.database.folders.DATABASE_PATH", db_path)
+
+    db_create_folders_table()
+    db_create_jobs_tables()
+
+    yield db_path
+
+    db_close_idle_connections(db_path)
+    os.unlink(db_path)
+
+
+@pytest.fixture
+def fake_stages(monkeypatch: pytest.MonkeyPatch) -> List[str]:
+    """Replace the stages with recorders; returns the (job_id, stage) log."""
+    ran: List[str] = []
+    lock = threading.Lock()
+
+    def record(name: str):
+        def run(job):
+            with lock:
+                ran.append(f"{job['job_id']}:{name}")
+
+        return run
+
+    stages = {
+        "index": Stage(record("index"), folder_scoped=True),
+        "tag": Stage(record("tag")),
+        "embed": Stage(record("embed")),
+    }
+    monkeypatch.setattr(jobs, "STAGES", stages)
+    monkeypatch.setattr(jobs, "PIPELINES", {"test": ("index", "tag", "embed")})
+    return ran
+
+
+def stage_statuses(job_id: int) -> List[str]:
+    return [stage["status"] for stage in db_get_job(job_id)["stages"]]
+
+
+# ##############################
+# Queue
+# ##############################
+
+
+class TestQueue:
+    def test_enqueue_stores_the_stages_in_order(self, test_db):
+        job_id = db_enqueue_job("test", {"folders": [["f-1", "/a"]]}, ["a", "b"])
+
+        job = db_get_job(job_id)
+        assert job["status"] == "queued"
+        assert job["params"] == {"folders": [["f-1", "/a"]]}
+        assert [s["stage"] for s in job["stages"]] == ["a", "b"]
+        assert stage_statuses(job_id) == ["pending", "pending"]
+
+    def test_a_job_needs_stages(self, test_db):
+        with pytest.raises(ValueError):
+            db_enqueue_job("test", {}, [])
+
+    def test_a_stage_waits_for_the_one_before_it(self, test_db):
+        job_id = db_enqueue_job("test", {}, ["a", "b"])
+
+        claimed = db_claim_next_stage({})
+        assert (claimed["job_id"], claimed["stage"]) == (job_id, "a")
+        assert db_claim_next_stage({}) is None
+
+        db_complete_stage(job_id, 0, None)
+        assert db_claim_next_stage({})["stage"] == "b"
+
+    def test_stage_limit_spans_jobs(self, test_db):
+        first = db_enqueue_job("test", {}, ["a"])
+        second = db_enqueue_job("test", {}, ["a"])
+
+        assert db_claim_next_stage({"a": 1})["job_id"] == first
+        assert db_claim_next_stage({"a": 1}) is None
+        assert db_claim_next_stage({"a": 2})["job_id"] == second
+
+    def test_a_job_at_its_limit_does_not_hold_back_later_jobs(self, test_db):
+        first = db_enqueue_job("test", {}, ["a", "b"])
+        db_complete_stage(first, 0, None)
+        db_claim_next_stage({})  # first job is now running b
+        blocked = db_enqueue_job("test", {}, ["b"])
+        other = db_enqueue_job("test", {}, ["a"])
+
+        claimed = db_claim_next_stage({})
+
+        assert claimed["job_id"] == other
+        assert stage_statuses(blocked) == ["pending"]
+
+    def test_the_last_checkpoint_completes_the_job(self, test_db):
+        job_id = db_enqueue_job("test", {}, ["a", "b"])
+        db_claim_next_stage({})
+        db_complete_stage(job_id, 0, 3)
+        assert db_get_job(job_id)["status"] == "running"
+
+        db_claim_next_stage({})
+        db_complete_stage(job_id, 1, None)
+
+        job = db_get_job(job_id)
+        assert job["status"] == "completed"
+        assert job["finished_at"] is not None
+        assert [s["items"] for s in job["stages"]] == [3, None]
+
+    def test_a_failed_stage_fails_the_job(self, test_db):
+        job_id = db_enqueue_job("test", {}, ["a", "b"])
+        db_claim_next_stage({})
+
+        db_fail_stage(job_id, 0, "boom")
+
+        assert db_get_job(job_id)["status"] == "failed"
+        assert db_get_job(job_id)["error"] == "boom"
+        assert db_claim_next_stage({}) is None
+
+    def test_requeue_keeps_checkpoints(self, test_db):
+        job_id = db_enqueue_job("test", {}, ["a", "b", "c"])
+        db_claim_next_stage({})
+        db_complete_stage(job_id, 0, None)
+        db_claim_next_stage({})  # b was running when the backend stopped
+
+        assert db_requeue_interrupted_stages() == 1
+
+        assert stage_statuses(job_id) == ["completed", "pending", "pending"]
+        assert db_claim_next_stage({})["stage"] == "b"
+
+    def test_prune_keeps_unfinished_and_recent_jobs(self, test_db):
+        finished = []
+        for _ in range(3):
+            job_id = db_enqueue_job("test", {}, ["a"])
+            db_claim_next_stage({})
+            db_complete_stage(job_id, 0, None)
+            finished.append(job_id)
+        queued = db_enqueue_job("test", {}, ["a"])
+
+        assert db_prune_finished_jobs(keep=1) == 2
+
+        assert {job["job_id"] for job in db_get_recent_jobs(10)} == {
+            finished[-1],
+            queued,
+        }
+        # The stages went with their jobs
+        conn = sqlite3.connect(test_db)
+        count = conn.execute("SELECT COUNT(*) FROM job_stages").fetchone()[0]
+        conn.close()
+        assert count == 2
+
+    def test_throughput_sums_completed_runs(self, test_db):
+        for items in (10, 30):
+            job_id = db_enqueue_job("test", {}, ["a", "b"])
+            db_complete_stage(job_id, 0, items)
+        db_enqueue_job("test", {}, ["a"])
+
+        conn = sqlite3.connect(test_db)
+        conn.execute("UPDATE job_stages SET started_at = 100, finished_at = 110")
+        conn.commit()
+        conn.close()
+
+        rows = {row["stage"]: row for row in db_get_stage_throughput()}
+        assert rows["a"]["items"] == 40
+        assert rows["a"]["counted_seconds"] == pytest.approx(20)
+        assert rows["a"]["completed"] == 2
+        assert rows["a"]["pending"] == 1
+        assert rows["b"]["pending"] == 2
+        assert rows["b"]["items"] is None
+
+
+# ##############################
+# Runner
+# ##############################
+
+
+class TestRunPending:
+    def test_runs_every_stage_in_order(self, test_db, fake_stages):
+        job_id = jobs.job_util_enqueue("test", {})
+
+        assert job_util_run_pending() == 3
+
+        assert fake_stages == [f"{job_id}:index", f"{job_id}:tag", f"{job_id}:embed"]
+        assert db_get_job(job_id)["status"] == "completed"
+
+    def test_an_empty_queue_is_a_noop(self, test_db, fake_stages):
+        assert job_util_run_pending() == 0
+
+    def test_unknown_kind_is_refused(self, test_db, fake_stages):
+        with pytest.raises(ValueError):
+            jobs.job_util_enqueue("nope", {})
+
+    def test_resumes_at_the_interrupted_stage(self, test_db, fake_stages):
+        job_id = jobs.job_util_enqueue("test", {})
+        db_claim_next_stage({})
+        db_complete_stage(job_id, 0, None)
+        db_claim_next_stage({})  # the backend stopped during tag
+
+        assert job_util_resume() == 1
+        job_util_run_pending()
+
+        assert fake_stages == [f"{job_id}:tag", f"{job_id}:embed"]
+        assert db_get_job(job_id)["status"] == "completed"
+
+    def test_a_failure_stops_its_job_only(self, test_db, fake_stages, monkeypatch):
+        def tag(job):
+            if job["job_id"] == failing:
+                raise RuntimeError("model missing")
+            fake_stages.append(f"{job['job_id']}:tag")
+
+        monkeypatch.setitem(jobs.STAGES, "tag", Stage(tag))
+        failing = jobs.job_util_enqueue("test", {})
+        healthy = jobs.job_util_enqueue("test", {})
+
+        job_util_run_pending()
+
+        assert db_get_job(failing)["status"] == "failed"
+        assert db_get_job(failing)["error"] == "model missing"
+        assert stage_statuses(failing) == ["completed", "failed", "pending"]
+        assert f"{failing}:embed" not in fake_stages
+        assert db_get_job(healthy)["status"] == "completed"
+
+    def test_stages_of_different_jobs_overlap(self, test_db, fake_stages, monkeypatch):
+        """One job's tagging runs while another is still indexing."""
+        tagging = threading.Event()
+
+        def index(job):
+            if job["job_id"] == second:
+                # Only returns once the first job's tag stage is running
+                assert tagging.wait(timeout=5)
+
+        def tag(job):
+            tagging.set()
+
+        monkeypatch.setattr("app.config.settings.JOB_WORKERS", 2)
+        monkeypatch.setitem(jobs.STAGES, "index", Stage(index, folder_scoped=True))
+        monkeypatch.setitem(jobs.STAGES, "tag", Stage(tag))
+        first = jobs.job_util_enqueue("test", {})
+        db_claim_next_stage({})
+        db_complete_stage(first, 0, None)
+        second = jobs.job_util_enqueue("test", {})
+
+        job_util_run_pending()
+
+        assert db_get_job(first)["status"] == "completed"
+        assert db_get_job(second)["status"] == "completed"
+
+    def test_stage_limits_hold(self, test_db, fake_stages, monkeypatch):
+        active: Dict[str, int] = {"now": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def tag(job):
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.05)
+            with lock:
+                active["now"] -= 1
+
+        monkeypatch.setattr("app.config.settings.JOB_WORKERS", 4)
+        monkeypatch.setitem(jobs.STAGES, "tag", Stage(tag))
+        for _ in range(3):
+            jobs.job_util_enqueue("test", {})
+
+        job_util_run_pending()
+
+        assert active["peak"] == 1
+        assert all(job["status"] == "completed" for job in db_get_recent_jobs(10))
+
+    def test_counts_items_by_the_stage_counter(self, test_db, fake_stages, monkeypatch):
+        counts = iter([5, 12])
+        monkeypatch.setattr(
+            jobs, "db_count_library_items", lambda: {"images": next(counts)}
+        )
+        monkeypatch.setitem(
+            jobs.STAGES, "index", Stage(lambda job: None, counter="images")
+        )
+        job_id = jobs.job_util_enqueue("test", {})
+
+        job_util_run_pending()
+
+        assert [s["items"] for s in db_get_job(job_id)["stages"]] == [7, None, None]
+
+    def test_a_stage_can_return_its_own_item_count(
+        self, test_db, fake_stages, monkeypatch
+    ):
+        monkeypatch.setitem(jobs.STAGES, "tag", Stage(lambda job: 9))
+        # A bool is a success flag, not a count
+        monkeypatch.setitem(jobs.STAGES, "embed", Stage(lambda job: True))
+        job_id = jobs.job_util_enqueue("test", {})
+
+        job_util_run_pending()
+
+        assert [s["items"] for s in db_get_job(job_id)["stages"]] == [None, 9, None]
+
+    def test_a_lost_checkpoint_requeues_the_stage(
+        self, test_db, fake_stages, monkeypatch
+    ):
+        """A stage left 'running' would block its stage for every later job."""
+        real_complete = jobs.db_complete_stage
+        locked = []
+
+        def flaky_complete(job_id, position, items):
+            # The first job's tag checkpoint hits a locked database once
+            if (job_id, position) == (first, 1) and not locked:
+                locked.append(True)
+                raise sqlite3.OperationalError("database is locked")
+            real_complete(job_id, position, items)
+
+        monkeypatch.setattr(jobs, "_CHECKPOINT_RETRY_SECONDS", 0)
+        monkeypatch.setattr(jobs, "db_complete_stage", flaky_complete)
+        first = jobs.job_util_enqueue("test", {})
+        second = jobs.job_util_enqueue("test", {})
+
+        job_util_run_pending()
+
+        # The tag stage ran again after its checkpoint was lost
+        assert fake_stages.count(f"{first}:tag") == 2
+        assert db_get_job(first)["status"] == "completed"
+        assert db_get_job(second)["status"] == "completed"
+
+    def test_a_checkpoint_lost_twice_fails_the_stage(
+        self, test_db, fake_stages, monkeypatch
+    ):
+        def broken_complete(job_id, position, items):
+            raise sqlite3.OperationalError("disk I/O error")
+
+        monkeypatch.setattr(jobs, "_CHECKPOINT_RETRY_SECONDS", 0)
+        monkeypatch.setattr(jobs, "db_complete_stage", broken_complete)
+        job_id = jobs.job_util_enqueue("test", {})
+
+        job_util_run_pending()
+
+        assert fake_stages == [f"{job_id}:index", f"{job_id}:index"]
+        assert stage_statuses(job_id) == ["failed", "pending", "pending"]
+        assert "disk I/O error" in db_get_job(job_id)["error"]
+
+    def test_provider_changes_are_checked_before_every_stage(
+        self, test_db, fake_stages, monkeypatch
+    ):
+        """The runner holds the worker, so an invalidation queued behind it
+        would only run once the whole queue is done."""
+        monkeypatch.setattr(
+            jobs,
+            "ONNX_util_refresh_execution_providers",
+            lambda: fake_stages.append("refresh"),
+        )
+        monkeypatch.setattr("app.config.settings.JOB_WORKERS", 1)
+        job_id = jobs.job_util_enqueue("test", {})
+
+        job_util_run_pending()
+
+        stages = [f"{job_id}:{name}" for name in ("index", "tag", "embed")]
+        assert fake_stages == [
+            entry for stage in stages for entry in ("refresh", stage)
+        ] + ["refresh"]
+
+    def test_sync_folder_indexes_the_root_and_added_folders(self, test_db, monkeypatch):
+        seen = []
+        monkeypatch.setitem(
+            jobs.STAGES,
+            "index_images",
+            Stage(lambda job: seen.extend(jobs._folder_data(job))),
+        )
+        monkeypatch.setitem(jobs.PIPELINES, "sync_folder", ("index_images",))
+
+        jobs.job_util_enqueue_sync_folder("/root", "f-root", [("f-new", "/root/new")])
+        job_util_run_pending()
+
+        assert seen == [("/root", "f-root", False), ("/root/new", "f-new", False)]
+
+
+# ##############################
+# GET /jobs/status
+# ##############################
+
+
+class TestJobStatusRoute:
+    def test_reports_jobs_and_stage_throughput(self, test_db):
+        done = db_enqueue_job("sync_folder", {}, ["index_images", "build_ann_index"])
+        db_claim_next_stage({})
+        db_complete_stage(done, 0, 50)
+        db_claim_next_stage({})
+        db_complete_stage(done, 1, None)
+        queued = db_enqueue_job("ai_tagging", {}, ["analyze_images"])
+        conn = sqlite3.connect(test_db)
+        conn.execute("UPDATE job_stages SET started_at = 100, finished_at = 110")
+        conn.commit()
+        conn.close()
+
+        response = client.get("/jobs/status")
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        stages = {row["stage"]: row for row in data["stages"]}
+        assert stages["index_images"]["items_per_second"] == pytest.approx(5.0)
+        assert stages["build_ann_index"]["items_per_second"] is None
+        assert stages["build_ann_index"]["seconds"] == pytest.approx(10.0)
+        assert stages["analyze_images"]["pending"] == 1
+        assert [job["job_id"] for job in data["jobs"]] == [queued, done]
+        assert data["jobs"][1]["stages"][0]["items"] == 50
+
+    def test_limit_bounds_finished_jobs(self, test_db):
+        job_id = db_enqueue_job("ai_tagging", {}, ["analyze_images"])
+        db_claim_next_stage({})
+        db_complete_stage(job_id, 0, None)
+
+        data = client.get("/jobs/status", params={"limit": 0}).json()["data"]
+
+        assert data["jobs"] == []
@@ -6,6 +6,7 @@ from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
 import pytest
 
+from app.database.connection import db_close_idle_connections
 from app.database.folders import db_create_folders_table
 from app.database.videos import db_create_videos_table
 from app.database.images import db_create_images_table, db_delete_images_by_ids
@@ -57,6 +58,7 @@ def test_db(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
 
     yield db_path
 
+    db_close_idle_connections(db_path)
     os.unlink(db_path)
 
 
@@ -10,7 +10,9 @@ from unittest.mock import MagicMock, patch
 import numpy as np
 import pytest
 
+from app.database.connection import db_close_idle_connections
 from app.routes import folders
+from app.utils import jobs
 
 from app.database.albums import db_create_album_images_table, db_create_albums_table
 from app.database.face_clusters import db_create_clusters_table
@@ -21,6 +23,7 @@ from app.database.folders import (
     db_create_folders_table,
     db_set_tagging_completed,
 )
+from app.database.jobs import db_create_jobs_tables, db_get_job
 from app.database.image_embeddings import (
     db_create_image_embeddings_table,
     db_get_embeddings_for_image_ids,
@@ -79,6 +82,7 @@ def test_db(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
         "app.database.faces",
         "app.database.face_clusters",
         "app.database.videos",
+        "app.database.jobs",
     ):
         monkeypatch.setattr(f"{module}.DATABASE_PATH", db_path)
 
@@ -93,9 +97,11 @@ def test_db(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
     db_create_image_embeddings_table()
     db_create_videos_table()
     db_create_memories_table()
+    db_create_jobs_tables()
 
     yield db_path
 
+    db_close_idle_connections(db_path)
     os.unlink(db_path)
 
 
@@ -534,6 +540,12 @@ def ai_folder(test_db: str) -> str:
     return "f-ai"
 
 
+def run_job(job_id: int) -> str:
+    """Run the queue and return the job's final status."""
+    jobs.job_util_run_pending()
+    return db_get_job(job_id)["status"]
+
+
 class TestTaggingCompletedLifecycle:
     """
     The indexing gate reads folders.taggingCompleted. Nothing wrote that
@@ -568,7 +580,7 @@ class TestTaggingCompletedLifecycle:
             for step in AI_PIPELINE_STEPS:
                 stack.enter_context(
                     patch.object(
-                        folders,
+                        jobs,
                         step,
                         side_effect=(
                             Exception("boom")
@@ -577,22 +589,22 @@ class TestTaggingCompletedLifecycle:
                         ),
                     )
                 )
-            stack.enter_context(patch.object(folders, "_curate_memories"))
-            self.result = folders.post_AI_tagging_enabled_sequence()
+            stack.enter_context(patch.object(jobs, "job_util_curate_memories"))
+            self.result = run_job(jobs.job_util_enqueue("ai_tagging", {}))
         return observed
 
     def test_gate_is_busy_during_tagging_and_clears_after(self, ai_folder: str):
         observed = self._run_tagging()
 
         assert observed and all(observed), "gate must stay busy while tagging runs"
-        assert self.result is True
+        assert self.result == "completed"
         assert db_is_indexing_busy() is False
 
     def test_a_failed_run_still_clears_the_gate(self, ai_folder: str):
         """A folder that failed to tag is not still tagging."""
-        self._run_tagging(fail_at="image_util_process_untagged_images")
+        self._run_tagging(fail_at="image_util_process_pending_images")
 
-        assert self.result is False
+        assert self.result == "failed"
         assert db_is_indexing_busy() is False
 
     def test_startup_clears_flags_left_by_an_earlier_session(self, ai_folder: str):
@@ -682,11 +694,12 @@ class TestTaggingCompletedLifecycle:
                 "image_util_process_folder_images",
                 "video_util_process_folder_videos",
                 "API_util_restart_sync_microservice_watcher",
-                "_curate_memories",
+                "job_util_curate_memories",
                 *AI_PIPELINE_STEPS[1:],
             ):
-                stack.enter_context(patch.object(folders, step))
-            assert folders.post_sync_folder_sequence("/ai", 1, []) is True
+                stack.enter_context(patch.object(jobs, step))
+            job_id = jobs.job_util_enqueue_sync_folder("/ai", "f-ai", [])
+            assert run_job(job_id) == "completed"
 
         assert db_is_indexing_busy() is False
 
@@ -927,10 +940,10 @@ class TestPeriodAndEmbeddings:
 
 AI_PIPELINE_STEPS = (
     "ensure_ai_tagging_models",
-    "image_util_process_untagged_images",
+    "image_util_process_pending_images",
     "cluster_util_face_clusters_sync",
-    "image_util_process_unembedded_images",
     "semantic_util_score_images",
+    "ann_util_build_index",
     "video_util_process_untagged_videos",
     "video_util_process_unembedded_frames",
     "semantic_util_score_videos",
@@ -944,19 +957,21 @@ class TestCurationHook:
             "app.utils.memory_curator.memory_curator_run",
             side_effect=Exception("boom"),
         ):
-            folders._curate_memories("test")  # must not raise
+            folders.job_util_curate_memories("test")  # must not raise
 
     def test_curates_without_forcing(self):
         with patch(
             "app.utils.memory_curator.memory_curator_run", return_value=2
         ) as run:
-            folders._curate_memories("ai_tagging")
+            folders.job_util_curate_memories("ai_tagging")
 
         # force is what overrides the user's memories preference, so an
         # import hook must not pass it: a disabled user gets no memories.
         run.assert_called_once_with(trigger="ai_tagging")
 
-    def test_ai_tagging_pipeline_curates_after_scoring_before_videos(self):
+    def test_ai_tagging_pipeline_curates_after_scoring_before_videos(
+        self, test_db: str
+    ):
         """
         Curation needs semantic labels written, and the video pass can run for
         minutes, so it belongs between the two.
@@ -966,19 +981,19 @@ class TestCurationHook:
             for step in AI_PIPELINE_STEPS:
                 stack.enter_context(
                     patch.object(
-                        folders,
+                        jobs,
                         step,
                         side_effect=lambda *_, _s=step: order.append(_s),
                     )
                 )
             stack.enter_context(
                 patch.object(
-                    folders,
-                    "_curate_memories",
+                    jobs,
+                    "job_util_curate_memories",
                     side_effect=lambda trigger: order.append(f"curate:{trigger}"),
                 )
             )
-            assert folders.post_AI_tagging_enabled_sequence() is True
+            assert run_job(jobs.job_util_enqueue("ai_tagging", {})) == "completed"
 
         assert order.index("semantic_util_score_images") < order.index(
             "curate:ai_tagging"
@@ -1017,7 +1032,7 @@ class TestCurationHook:
             stack.enter_context(
                 patch.object(
                     folders,
-                    "_curate_memories",
+                    "job_util_curate_memories",
                     side_effect=lambda trigger: order.append(f"curate:{trigger}"),
                 )
             )
@@ -1025,7 +1040,7 @@ class TestCurationHook:
 
         assert order.index("status:completed") < order.index("curate:folder_add")
 
-    def test_sync_pipeline_curates_after_scoring(self):
+    def test_sync_pipeline_curates_after_scoring(self, test_db: str):
         order: List[str] = []
         with ExitStack() as stack:
             for step in (
@@ -1036,19 +1051,20 @@ class TestCurationHook:
             ):
                 stack.enter_context(
                     patch.object(
-                        folders,
+                        jobs,
                         step,
                         side_effect=lambda *_, _s=step: order.append(_s),
                     )
                 )
             stack.enter_context(
                 patch.object(
-                    folders,
-                    "_curate_memories",
+                    jobs,
+                    "job_util_curate_memories",
                     side_effect=lambda trigger: order.append(f"curate:{trigger}"),
                 )
             )
-            assert folders.post_sync_folder_sequence("/photos", 1, []) is True
+            job_id = jobs.job_util_enqueue_sync_folder("/photos", "f-1", [])
+            assert run_job(job_id) == "completed"
 
         assert order.index("semantic_util_score_images") < order.index(
             "curate:sync_folder"
@@ -7,6 +7,7 @@ from unittest.mock import patch
 
 import pytest
 
+from app.database.connection import db_close_idle_connections
 from app.database.metadata import (
     db_create_metadata_table,
     db_get_metadata,
@@ -32,6 +33,7 @@ def test_db(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
         yield db_path
     finally:
         # finally, not post-yield: a setup failure would otherwise leak the file
+        db_close_idle_connections(db_path)
         os.unlink(db_path)
 
 
@@ -92,7 +94,7 @@ class TestCreateMetadataTable:
     def test_survives_a_connection_failure(self):
         """connect() failing leaves conn as None, so the finally must no-op."""
         with patch(
-            "app.database.metadata.sqlite3.connect", side_effect=sqlite3.Error("fail")
+            "app.database.metadata.db_connect", side_effect=sqlite3.Error("fail")
         ):
             with pytest.raises(sqlite3.Error):
                 db_create_metadata_table()
@@ -167,12 +169,11 @@ class TestUpdateMetadata:
         assert db_update_metadata({"safe": True}) is True
 
         spies: List[RollbackSpy] = []
-        # Bind the real connect first: patching the attribute below rebinds it
-        # on the shared sqlite3 module, so calling it here would recurse.
-        real_connect = sqlite3.connect
 
-        def spied_connect(*args: Any, **kwargs: Any) -> RollbackSpy:
-            spy = RollbackSpy(real_connect(*args, **kwargs))
+        # A plain connection rather than a pooled one, so the spy sees every
+        # call the module makes on it.
+        def spied_connect(path: str, **kwargs: Any) -> RollbackSpy:
+            spy = RollbackSpy(sqlite3.connect(path))
             spies.append(spy)
             return spy
 
@@ -182,7 +183,7 @@ class TestUpdateMetadata:
             "BEGIN SELECT RAISE(ABORT, 'blocked'); END",
         )
         try:
-            with patch("app.database.metadata.sqlite3.connect", spied_connect):
+            with patch("app.database.metadata.db_connect", spied_connect):
                 with pytest.raises(sqlite3.IntegrityError):
                     db_update_metadata({"replacement": True})
         finally:
@@ -0,0 +1,225 @@
+import os
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator, List
+from unittest.mock import patch
+
+import pytest
+
+from app.database.connection import db_close_idle_connections
+from app.database.face_clusters import (
+    db_create_clusters_table,
+    db_get_images_by_cluster_id,
+)
+from app.database.faces import (
+    db_create_faces_table,
+    db_get_faces_by_cluster_ids,
+    db_get_faces_unassigned_clusters,
+)
+from app.database.folders import db_create_folders_table
+from app.database.images import (
+    db_create_images_table,
+    db_get_images_by_folder_ids,
+    db_get_images_page,
+    db_get_pending_images,
+    db_get_unembedded_images,
+    db_get_untagged_images,
+    db_search_images_by_tag,
+)
+from app.database.migrations import (
+    MIGRATIONS,
+    Migration,
+    db_get_schema_version,
+    db_migrate_schema,
+)
+from app.database.semantic_labels import db_create_semantic_labels_table
+from app.database.yolo_mapping import db_create_YOLO_classes_table
+
+# ##############################
+# Pytest Fixtures
+# ##############################
+
+MODULES = ["images", "folders", "yolo_mapping", "faces", "face_clusters"]
+
+
+@pytest.fixture(scope="function")
+def test_db(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
+    """The library tables in a fresh tempfile database, not yet migrated."""
+    db_fd, db_path = tempfile.mkstemp()
+    os.close(db_fd)
+
+    monkeypatch.setattr("app.config.settings.DATABASE_PATH", db_path)
+    monkeypatch.setattr("app.database.migrations.DATABASE_PATH", db_path)
+    for module in MODULES:
+        monkeypatch.setattr(f"app.database.{module}.DATABASE_PATH", db_path)
+
+    db_create_YOLO_classes_table()
+    db_create_folders_table()
+    db_create_images_table()
+    db_create_semantic_labels_table()
+    db_create_clusters_table()
+    db_create_faces_table()
+
+    yield db_path
+
+    db_close_idle_connections(db_path)
+    os.unlink(db_path)
+
+
+def index_names(db_path: str) -> List[str]:
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'ix_%'"
+        ).fetchall()
+    finally:
+        conn.close()
+    return sorted(name for (name,) in rows)
+
+
+# ##############################
+# Migrations
+# ##############################
+
+
+class TestMigrateSchema:
+    def test_fresh_database_reaches_the_latest_version(self, test_db):
+        assert db_get_schema_version() == 0
+
+        assert db_migrate_schema() == MIGRATIONS[-1].version
+        assert db_get_schema_version() == MIGRATIONS[-1].version
+        assert "ix_images_untagged" in index_names(test_db)
+
+    def test_applied_migrations_are_skipped(self, test_db):
+        db_migrate_schema()
+        conn = sqlite3.connect(test_db)
+        conn.execute("DROP INDEX ix_images_untagged")
+        conn.commit()
+        conn.close()
+
+        db_migrate_schema()
+
+        assert "ix_images_untagged" not in index_names(test_db)
+
+    def test_failed_migration_rolls_back_and_keeps_the_version(self, test_db):
+        broken = MIGRATIONS + [
+            Migration(
+                MIGRATIONS[-1].version + 1,
+                "broken",
+                (
+                    "CREATE INDEX ix_never_kept ON images(path)",
+                    "CREATE INDEX ix_missing ON no_such_table(x)",
+                ),
+            )
+        ]
+        with patch("app.database.migrations.MIGRATIONS", broken):
+            with pytest.raises(sqlite3.OperationalError):
+                db_migrate_schema()
+
+        # Earlier migrations stay applied; the failed one left nothing behind
+        assert db_get_schema_version() == MIGRATIONS[-1].version
+        assert "ix_never_kept" not in index_names(test_db)
+
+
+# ##############################
+# Query plans
+# ##############################
+
+
+@contextmanager
+def traced_statements(db_path: str) -> Iterator[List[str]]:
+    """Capture the SQL the database modules run, with parameters inlined."""
+    statements: List[str] = []
+
+    def connect(path: str, **kwargs) -> sqlite3.Connection:
+        conn = sqlite3.connect(path)
+        if kwargs.get("foreign_keys"):
+            conn.execute("PRAGMA foreign_keys = ON")
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    patches = [patch(f"app.database.{m}.db_connect", connect) for m in MODULES]
+    for p in patches:
+        p.start()
+    try:
+        yield statements
+    finally:
+        for p in patches:
+            p.stop()
+
+
+def full_scans(db_path: str, statements: List[str]) -> List[str]:
+    """The tables (by alias) that the SELECTs read in full. Scans of
+    subquery results, e.g. inside a view, are not table scans."""
+    conn = sqlite3.connect(db_path)
+    try:
+        scans = []
+        for sql in statements:
+            if not sql.lstrip().upper().startswith("SELECT"):
+                continue
+            for *_, detail in conn.execute(f"EXPLAIN QUERY PLAN {sql}"):
+                if detail.startswith("SCAN ") and not detail.startswith("SCAN ("):
+                    scans.append(detail.split()[1])
+        return scans
+    finally:
+        conn.close()
+
+
+class TestHotQueryPlans:
+    """Regression guard: these run per indexing pass or per library view and
+    must reach images, faces and image_classes through an index. Only the
+    small folders table may be scanned."""
+
+    @pytest.mark.parametrize(
+        "query, allowed_scans",
+        [
+            (db_get_untagged_images, {"f"}),
+            (db_get_unembedded_images, {"f"}),
+            (db_get_pending_images, {"f"}),
+            (lambda: db_get_images_by_folder_ids(["folder-1", "folder-2"]), set()),
+            (db_get_faces_unassigned_clusters, set()),
+            (lambda: db_get_faces_by_cluster_ids(["c1", "c2"]), set()),
+            (lambda: db_get_images_by_cluster_id("c1"), set()),
+            (lambda: db_get_images_page(50), set()),
+            (lambda: db_get_images_page(50, after=("2024-01-01", "img")), set()),
+            (lambda: db_get_images_page(50, after=(None, "img"), tagged=True), set()),
+        ],
+    )
+    def test_no_table_scans(self, test_db, query, allowed_scans):
+        db_migrate_schema()
+
+        with traced_statements(test_db) as statements:
+            query()
+
+        assert statements
+        assert set(full_scans(test_db, statements)) <= allowed_scans
+
+    def test_tag_search_reads_image_classes_by_class(self, test_db):
+        db_migrate_schema()
+
+        with traced_statements(test_db) as statements:
+            db_search_images_by_tag("dog")
+
+        conn = sqlite3.connect(test_db)
+        try:
+            plan = [
+                row[-1]
+                for sql in statements
+                if sql.lstrip().upper().startswith("SELECT")
+                for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")
+            ]
+        finally:
+            conn.close()
+
+        assert any(
+            "ic2 USING COVERING INDEX ix_image_classes_class" in detail
+            for detail in plan
+        )
+
+    def test_unmigrated_database_would_scan(self, test_db):
+        """Sanity check that the guard above can fail."""
+        with traced_statements(test_db) as statements:
+            db_get_images_by_folder_ids(["folder-1"])
+
+        assert "images" in full_scans(test_db, statements)
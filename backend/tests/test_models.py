@@ -16,6 +16,7 @@ from app.routes.models import (
     submit_embedding_backfill_if_semantic,
 )
 import app.routes.models as models_module
+from app.utils.ann_index import ann_util_build_index
 from app.utils.images import image_util_process_unembedded_images
 from app.utils.semantic_labels import (
     semantic_util_build_label_embeddings,
@@ -926,6 +927,7 @@ class TestEmbeddingBackfillTrigger:
                 call(semantic_util_build_label_embeddings),
                 call(image_util_process_unembedded_images),
                 call(semantic_util_score_images),
+                call(ann_util_build_index),
             ]
         )
 
@@ -967,6 +969,7 @@ class TestEmbeddingBackfillTrigger:
                 call(semantic_util_build_label_embeddings),
                 call(image_util_process_unembedded_images),
                 call(semantic_util_score_images),
+                call(ann_util_build_index),
             ]
         )
 
@@ -988,5 +991,6 @@ class TestEmbeddingBackfillTrigger:
                 call(semantic_util_build_label_embeddings),
                 call(image_util_process_unembedded_images),
                 call(semantic_util_score_images),
+                call(ann_util_build_index),
             ]
         )
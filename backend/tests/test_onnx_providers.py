@@ -1,6 +1,15 @@
 from unittest.mock import MagicMock, patch
 
-from app.utils.ONNX import ONNX_util_get_execution_providers
+import onnxruntime
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.utils.ONNX import (
+    ONNX_util_get_execution_providers,
+    ONNX_util_get_session_options,
+    ONNX_util_invalidate_execution_providers,
+    ONNX_util_refresh_execution_providers,
+)
 from app.models.SigLIP2Text import SigLIP2Text
 
 MACOS_PROVIDERS = ["CoreMLExecutionProvider", "CPUExecutionProvider"]
@@ -65,3 +74,144 @@ class TestSigLIP2SessionExcludesCoreML:
         providers = mock_session_cls.call_args.kwargs["providers"]
         assert "CoreMLExecutionProvider" not in providers
         assert providers == ["CPUExecutionProvider"]
+
+
+class TestProviderCache:
+    @patch("onnxruntime.get_available_providers", return_value=MACOS_PROVIDERS)
+    @patch("app.database.metadata.db_get_metadata", return_value=_metadata(True))
+    def test_preference_is_read_once(self, mock_meta, mock_providers):
+        ONNX_util_get_execution_providers()
+        ONNX_util_get_execution_providers(exclude=("CoreMLExecutionProvider",))
+
+        mock_meta.assert_called_once()
+        mock_providers.assert_called_once()
+
+    @patch("onnxruntime.get_available_providers", return_value=MACOS_PROVIDERS)
+    @patch("app.database.metadata.db_get_metadata", return_value=_metadata(True))
+    def test_invalidation_rereads_the_preference(self, mock_meta, mock_providers):
+        assert ONNX_util_get_execution_providers() == MACOS_PROVIDERS
+
+        mock_meta.return_value = _metadata(False)
+        assert ONNX_util_get_execution_providers() == MACOS_PROVIDERS
+        ONNX_util_invalidate_execution_providers()
+
+        assert ONNX_util_get_execution_providers() == ["CPUExecutionProvider"]
+
+    @patch("onnxruntime.get_available_providers", return_value=MACOS_PROVIDERS)
+    @patch("app.database.metadata.db_get_metadata", return_value=_metadata(True))
+    def test_refresh_invalidates_only_a_stale_cache(self, mock_meta, mock_providers):
+        # Nothing resolved yet: nothing to refresh, and no database read
+        assert ONNX_util_refresh_execution_providers() is False
+        mock_meta.assert_not_called()
+
+        ONNX_util_get_execution_providers()
+        assert ONNX_util_refresh_execution_providers() is False
+
+        mock_meta.return_value = _metadata(False)
+        with patch("app.models.session_pool.evict_model_sessions") as evict:
+            assert ONNX_util_refresh_execution_providers() is True
+
+        evict.assert_called_once_with()
+        assert ONNX_util_get_execution_providers() == ["CPUExecutionProvider"]
+
+    def test_invalidation_closes_idle_pooled_models(self):
+        with patch("app.models.session_pool.evict_model_sessions") as evict:
+            ONNX_util_invalidate_execution_providers()
+
+        evict.assert_called_once_with()
+
+
+class TestPreferencesRouteInvalidates:
+    def _put(self, stored, update, executor=None):
+        from app.routes.user_preferences import router
+
+        app = FastAPI()
+        app.include_router(router, prefix="/user-preferences")
+        if executor is not None:
+            app.state.executor = executor
+        with patch(
+            "app.routes.user_preferences.db_get_metadata",
+            return_value={"user_preferences": stored},
+        ), patch(
+            "app.routes.user_preferences.db_update_metadata", return_value=True
+        ), patch(
+            "app.routes.user_preferences.ONNX_util_invalidate_execution_providers"
+        ) as invalidate:
+            response = TestClient(app).put("/user-preferences/", json=update)
+        assert response.status_code == 200
+        return invalidate
+
+    def test_gpu_toggle_invalidates_here_and_in_the_worker(self):
+        executor = MagicMock()
+
+        invalidate = self._put(
+            {"GPU_Acceleration": True}, {"GPU_Acceleration": False}, executor
+        )
+
+        invalidate.assert_called_once_with()
+        executor.submit.assert_called_once_with(invalidate)
+
+    def test_other_preferences_keep_the_cache(self):
+        executor = MagicMock()
+
+        invalidate = self._put(
+            {"GPU_Acceleration": True},
+            {"GPU_Acceleration": True, "YOLO_model_size": "nano"},
+            executor,
+        )
+
+        invalidate.assert_not_called()
+        executor.submit.assert_not_called()
+
+
+class TestSessionOptions:
+    def test_defaults_keep_runtime_thread_pools(self):
+        options = ONNX_util_get_session_options()
+
+        assert options.intra_op_num_threads == 0
+        assert options.inter_op_num_threads == 0
+        assert (
+            options.graph_optimization_level
+            == onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        )
+
+    def test_settings_are_applied(self):
+        with patch.multiple(
+            "app.config.settings",
+            ONNX_INTRA_OP_THREADS=2,
+            ONNX_INTER_OP_THREADS=1,
+            ONNX_GRAPH_OPTIMIZATION="Basic",
+        ):
+            options = ONNX_util_get_session_options()
+
+        assert (options.intra_op_num_threads, options.inter_op_num_threads) == (2, 1)
+        assert (
+            options.graph_optimization_level
+            == onnxruntime.GraphOptimizationLevel.ORT_ENABLE_BASIC
+        )
+
+    def test_unknown_level_falls_back_to_all(self):
+        with patch("app.config.settings.ONNX_GRAPH_OPTIMIZATION", "fastest"):
+            options = ONNX_util_get_session_options()
+
+        assert (
+            options.graph_optimization_level
+            == onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        )
+
+    @patch("onnxruntime.get_available_providers", return_value=MACOS_PROVIDERS)
+    @patch("app.database.metadata.db_get_metadata", return_value=_metadata(True))
+    @patch("onnxruntime.InferenceSession")
+    @patch("os.path.exists", return_value=True)
+    def test_sessions_are_created_with_the_options(
+        self, mock_exists, mock_session_cls, mock_meta, mock_providers
+    ):
+        from app.models.FaceNet import FaceNet
+
+        model = FaceNet("app/models/ONNX_Exports/FaceNet_128D.onnx")
+        with patch("app.config.settings.ONNX_INTRA_OP_THREADS", 3):
+            model.get_session()
+        model.close()
+
+        options = mock_session_cls.call_args.kwargs["sess_options"]
+        assert options.intra_op_num_threads == 3
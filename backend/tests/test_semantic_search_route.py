@@ -2,10 +2,19 @@ import json
 from unittest.mock import patch, MagicMock
 
 import numpy as np
+import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from app.routes.images import router as images_router
+import app.utils.SigLIP as siglip_module
+from app.utils.SigLIP import (
+    siglip_util_clear_query_cache,
+    siglip_util_embed_query,
+    siglip_util_get_query_cache_stats,
+    siglip_util_invalidate_text_model,
+    siglip_util_rank_scores,
+)
 
 app = FastAPI()
 app.include_router(images_router, prefix="/images")
@@ -44,6 +53,14 @@ def _image_row(image_id: str, path: str) -> dict:
     }
 
 
+@pytest.fixture(autouse=True)
+def _empty_query_cache():
+    # Each test mocks its own text vector; never serve another test's
+    siglip_util_clear_query_cache()
+    yield
+    siglip_util_clear_query_cache()
+
+
 class TestSemanticSearchEndpoint:
     @patch("app.models.model_registry.get_model_path")
     @patch("app.models.model_registry.get_siglip2_tokenizer_key")
@@ -84,7 +101,7 @@ class TestSemanticSearchEndpoint:
         assert response.status_code == 404
         assert "tokenizer" in response.json()["detail"]["message"].lower()
 
-    @patch("app.database.image_embeddings.db_get_all_embeddings")
+    @patch("app.database.image_embeddings.db_get_cached_embeddings")
     @patch("app.models.model_registry.get_model_path")
     @patch("app.models.model_registry.get_siglip2_tokenizer_key")
     @patch("app.models.model_registry.get_siglip2_registry_keys")
@@ -95,13 +112,16 @@ class TestSemanticSearchEndpoint:
         mock_registry_keys,
         mock_tok_key,
         mock_get_path,
-        mock_get_all_embeddings,
+        mock_get_cached_embeddings,
     ):
         mock_registry_keys.return_value = ("siglip2_base_vision", "siglip2_base_text")
         mock_tok_key.return_value = "siglip2_base_tokenizer"
         mock_get_path.return_value = "/models/text.onnx"
         mock_exists.return_value = True
-        mock_get_all_embeddings.return_value = ([], np.empty((0, 0), dtype=np.float32))
+        mock_get_cached_embeddings.return_value = (
+            [],
+            np.empty((0, 0), dtype=np.float32),
+        )
 
         response = client.get("/images/semantic-search", params={"query": "beach"})
 
@@ -114,7 +134,7 @@ class TestSemanticSearchEndpoint:
     @patch("app.database.images.db_get_images_by_ids")
     @patch("app.utils.SigLIP.siglip_util_get_text_model")
     @patch("app.utils.SigLIP.siglip_util_tokenize_query")
-    @patch("app.database.image_embeddings.db_get_all_embeddings")
+    @patch("app.database.image_embeddings.db_get_cached_embeddings")
     @patch("app.models.model_registry.get_model_path")
     @patch("app.models.model_registry.get_siglip2_tokenizer_key")
     @patch("app.models.model_registry.get_siglip2_registry_keys")
@@ -125,7 +145,7 @@ class TestSemanticSearchEndpoint:
         mock_registry_keys,
         mock_tok_key,
         mock_get_path,
-        mock_get_all_embeddings,
+        mock_get_cached_embeddings,
         mock_tokenize,
         mock_get_text_model,
         mock_get_images_by_ids,
@@ -142,7 +162,7 @@ class TestSemanticSearchEndpoint:
         # from naive orthogonal/aligned toy vectors). img_high has the
         # *lower* score despite being listed first in db_get_all_embeddings,
         # so a broken sort would put it first in the response too.
-        mock_get_all_embeddings.return_value = (
+        mock_get_cached_embeddings.return_value = (
             ["img_high", "img_highest"],
             np.array([[0.13, 0.0], [0.16, 0.0]], dtype=np.float32),
         )
@@ -194,7 +214,7 @@ class TestSemanticSearchEndpoint:
         # descending-score order by the time it reaches this call.
         mock_get_images_by_ids.assert_called_once_with(["img_highest", "img_high"])
 
-    @patch("app.database.image_embeddings.db_get_all_embeddings")
+    @patch("app.database.image_embeddings.db_get_cached_embeddings")
     @patch("app.models.model_registry.get_model_path")
     @patch("app.models.model_registry.get_siglip2_tokenizer_key")
     @patch("app.models.model_registry.get_siglip2_registry_keys")
@@ -205,7 +225,7 @@ class TestSemanticSearchEndpoint:
         mock_registry_keys,
         mock_tok_key,
         mock_get_path,
-        mock_get_all_embeddings,
+        mock_get_cached_embeddings,
     ):
         # min_length=1 on the FastAPI Query param only checks raw string
         # length, so a whitespace-only query slips past it -- the route's
@@ -214,7 +234,7 @@ class TestSemanticSearchEndpoint:
         mock_tok_key.return_value = "siglip2_base_tokenizer"
         mock_get_path.return_value = "/models/text.onnx"
         mock_exists.return_value = True
-        mock_get_all_embeddings.return_value = (
+        mock_get_cached_embeddings.return_value = (
             ["img1"],
             np.array([[1.0, 0.0]], dtype=np.float32),
         )
@@ -226,7 +246,7 @@ class TestSemanticSearchEndpoint:
     @patch("app.database.images.db_get_images_by_ids")
     @patch("app.utils.SigLIP.siglip_util_get_text_model")
     @patch("app.utils.SigLIP.siglip_util_tokenize_query")
-    @patch("app.database.image_embeddings.db_get_all_embeddings")
+    @patch("app.database.image_embeddings.db_get_cached_embeddings")
     @patch("app.models.model_registry.get_model_path")
     @patch("app.models.model_registry.get_siglip2_tokenizer_key")
     @patch("app.models.model_registry.get_siglip2_registry_keys")
@@ -237,7 +257,7 @@ class TestSemanticSearchEndpoint:
         mock_registry_keys,
         mock_tok_key,
         mock_get_path,
-        mock_get_all_embeddings,
+        mock_get_cached_embeddings,
         mock_tokenize,
         mock_get_text_model,
         mock_get_images_by_ids,
@@ -249,7 +269,7 @@ class TestSemanticSearchEndpoint:
 
         # Orthogonal query vector -> dot product 0 for every stored
         # embedding -> every score sinks well below SIGLIP2_MATCH_THRESHOLD.
-        mock_get_all_embeddings.return_value = (
+        mock_get_cached_embeddings.return_value = (
             ["img_a"],
             np.array([[1.0, 0.0]], dtype=np.float32),
         )
@@ -280,3 +300,350 @@ class TestSemanticSearchEndpoint:
         assert data["data"]["total"] == 0
         assert data["data"]["images"] == []
         mock_get_images_by_ids.assert_not_called()
+
+    @patch("app.database.images.db_get_images_by_ids")
+    @patch("app.utils.SigLIP.siglip_util_get_text_model")
+    @patch("app.utils.SigLIP.siglip_util_tokenize_query")
+    @patch("app.database.image_embeddings.db_get_cached_embeddings")
+    @patch("app.models.model_registry.get_model_path")
+    @patch("app.models.model_registry.get_siglip2_tokenizer_key")
+    @patch("app.models.model_registry.get_siglip2_registry_keys")
+    @patch("os.path.exists")
+    def test_limit_and_offset_hydrate_only_the_requested_page(
+        self,
+        mock_exists,
+        mock_registry_keys,
+        mock_tok_key,
+        mock_get_path,
+        mock_get_cached_embeddings,
+        mock_tokenize,
+        mock_get_text_model,
+        mock_get_images_by_ids,
+    ):
+        mock_registry_keys.return_value = ("siglip2_base_vision", "siglip2_base_text")
+        mock_tok_key.return_value = "siglip2_base_tokenizer"
+        mock_get_path.return_value = "/models/text.onnx"
+        mock_exists.return_value = True
+
+        # img0..img4 all clear the threshold; img4 scores highest.
+        mock_get_cached_embeddings.return_value = (
+            [f"img{i}" for i in range(5)],
+            np.array([[0.12 + 0.01 * i, 0.0] for i in range(5)], dtype=np.float32),
+        )
+        mock_tokenize.return_value = (
+            np.zeros((1, 64), dtype=np.int64),
+            np.ones((1, 64), dtype=np.int64),
+        )
+        mock_text_model = MagicMock()
+        mock_text_model.get_embedding.return_value = np.array(
+            [1.0, 0.0], dtype=np.float32
+        )
+        mock_get_text_model.return_value = mock_text_model
+        mock_get_images_by_ids.side_effect = lambda ids: [
+            _image_row(img_id, f"/p/{img_id}.jpg") for img_id in ids
+        ]
+
+        with patch(
+            "app.config.settings.SIGLIP2_SCORING_METADATA", BASE_METADATA
+        ), patch("app.config.settings.SIGLIP2_ACTIVE_CHECKPOINT", "base"), patch(
+            "app.config.settings.SIGLIP2_MATCH_THRESHOLD", 0.01
+        ):
+            response = client.get(
+                "/images/semantic-search",
+                params={"query": "beach", "limit": 2, "offset": 1},
+            )
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["total"] == 5
+        assert [image["id"] for image in data["images"]] == ["img3", "img2"]
+        mock_get_images_by_ids.assert_called_once_with(["img3", "img2"])
+
+    @patch("app.database.images.db_get_images_by_ids")
+    @patch("app.utils.SigLIP.siglip_util_get_text_model")
+    @patch("app.utils.SigLIP.siglip_util_tokenize_query")
+    @patch("app.database.image_embeddings.db_get_cached_embeddings")
+    @patch("app.models.model_registry.get_model_path")
+    @patch("app.models.model_registry.get_siglip2_tokenizer_key")
+    @patch("app.models.model_registry.get_siglip2_registry_keys")
+    @patch("os.path.exists")
+    def test_paging_through_tied_scores_returns_each_match_once(
+        self,
+        mock_exists,
+        mock_registry_keys,
+        mock_tok_key,
+        mock_get_path,
+        mock_get_cached_embeddings,
+        mock_tokenize,
+        mock_get_text_model,
+        mock_get_images_by_ids,
+    ):
+        mock_registry_keys.return_value = ("siglip2_base_vision", "siglip2_base_text")
+        mock_tok_key.return_value = "siglip2_base_tokenizer"
+        mock_get_path.return_value = "/models/text.onnx"
+        mock_exists.return_value = True
+
+        # Duplicate photos share an embedding: 60 images, only 4 distinct scores
+        mock_get_cached_embeddings.return_value = (
+            [f"img{i}" for i in range(60)],
+            np.array(
+                [[0.12 + 0.01 * (i % 4), 0.0] for i in range(60)], dtype=np.float32
+            ),
+        )
+        mock_tokenize.return_value = (
+            np.zeros((1, 64), dtype=np.int64),
+            np.ones((1, 64), dtype=np.int64),
+        )
+        mock_text_model = MagicMock()
+        mock_text_model.get_embedding.return_value = np.array(
+            [1.0, 0.0], dtype=np.float32
+        )
+        mock_get_text_model.return_value = mock_text_model
+        mock_get_images_by_ids.side_effect = lambda ids: [
+            _image_row(img_id, f"/p/{img_id}.jpg") for img_id in ids
+        ]
+
+        pages = []
+        with patch(
+            "app.config.settings.SIGLIP2_SCORING_METADATA", BASE_METADATA
+        ), patch("app.config.settings.SIGLIP2_ACTIVE_CHECKPOINT", "base"), patch(
+            "app.config.settings.SIGLIP2_MATCH_THRESHOLD", 0.01
+        ):
+            for offset in range(0, 60, 7):
+                response = client.get(
+                    "/images/semantic-search",
+                    params={"query": "beach", "limit": 7, "offset": offset},
+                )
+                assert response.status_code == 200
+                pages.extend(response.json()["data"]["images"])
+
+        ids = [image["id"] for image in pages]
+        assert sorted(ids) == sorted(f"img{i}" for i in range(60))
+        scores = [image["score"] for image in pages]
+        assert scores == sorted(scores, reverse=True)
+
+    @patch("app.utils.ann_index.ann_util_search")
+    @patch("app.database.images.db_get_images_by_ids")
+    @patch("app.utils.SigLIP.siglip_util_get_text_model")
+    @patch("app.utils.SigLIP.siglip_util_tokenize_query")
+    @patch("app.database.image_embeddings.db_get_cached_embeddings")
+    @patch("app.models.model_registry.get_model_path")
+    @patch("app.models.model_registry.get_siglip2_tokenizer_key")
+    @patch("app.models.model_registry.get_siglip2_registry_keys")
+    @patch("os.path.exists")
+    def test_large_library_scores_only_ann_candidates(
+        self,
+        mock_exists,
+        mock_registry_keys,
+        mock_tok_key,
+        mock_get_path,
+        mock_get_cached_embeddings,
+        mock_tokenize,
+        mock_get_text_model,
+        mock_get_images_by_ids,
+        mock_ann_search,
+    ):
+        mock_registry_keys.return_value = ("siglip2_base_vision", "siglip2_base_text")
+        mock_tok_key.return_value = "siglip2_base_tokenizer"
+        mock_get_path.return_value = "/models/text.onnx"
+        mock_exists.return_value = True
+        mock_get_cached_embeddings.return_value = (
+            [f"img{i}" for i in range(4)],
+            np.array([[0.16, 0.0]] * 4, dtype=np.float32),
+        )
+        mock_tokenize.return_value = (
+            np.zeros((1, 64), dtype=np.int64),
+            np.ones((1, 64), dtype=np.int64),
+        )
+        mock_text_model = MagicMock()
+        mock_text_model.get_embedding.return_value = np.array(
+            [1.0, 0.0], dtype=np.float32
+        )
+        mock_get_text_model.return_value = mock_text_model
+        # The index offers rows 1 and 3; row 3 scores higher
+        mock_ann_search.return_value = (
+            np.array([1, 3]),
+            np.array([0.13, 0.16], dtype=np.float32),
+        )
+        mock_get_images_by_ids.side_effect = lambda ids: [
+            _image_row(img_id, f"/p/{img_id}.jpg") for img_id in ids
+        ]
+
+        with patch(
+            "app.config.settings.SIGLIP2_SCORING_METADATA", BASE_METADATA
+        ), patch("app.config.settings.SIGLIP2_ACTIVE_CHECKPOINT", "base"), patch(
+            "app.config.settings.SIGLIP2_MATCH_THRESHOLD", 0.01
+        ), patch(
+            "app.config.settings.SIGLIP2_ANN_MIN_IMAGES", 4
+        ):
+            response = client.get("/images/semantic-search", params={"query": "x"})
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["total"] == 2
+        assert [image["id"] for image in data["images"]] == ["img3", "img1"]
+        assert data["images"][0]["score"] > data["images"][1]["score"]
+
+    def test_rejects_non_positive_limit(self):
+        response = client.get(
+            "/images/semantic-search", params={"query": "beach", "limit": 0}
+        )
+
+        assert response.status_code == 422
+
+
+class TestRankScores:
+    def test_unbounded_matches_full_sort(self):
+        scores = np.array([0.2, 0.9, 0.005, 0.5, 0.9])
+
+        page, total = siglip_util_rank_scores(scores, 0.01)
+
+        assert total == 4
+        # Ties keep input order, like the stable sort this replaced.
+        assert page.tolist() == [1, 4, 3, 0]
+
+    def test_page_matches_slice_of_full_ranking(self):
+        rng = np.random.default_rng(0)
+        scores = rng.random(10_000)
+        full, total = siglip_util_rank_scores(scores, 0.3)
+
+        page, page_total = siglip_util_rank_scores(scores, 0.3, limit=25, offset=40)
+
+        assert page_total == total
+        assert page.tolist() == full[40:65].tolist()
+
+    def test_pages_cut_ties_the_same_way(self):
+        rng = np.random.default_rng(0)
+        scores = rng.choice([0.2, 0.4, 0.6, 0.8], size=200)
+        full, _ = siglip_util_rank_scores(scores, 0.1)
+
+        pages = [
+            siglip_util_rank_scores(scores, 0.1, limit=20, offset=offset)[0]
+            for offset in range(0, 200, 20)
+        ]
+
+        assert np.concatenate(pages).tolist() == full.tolist()
+
+    def test_offset_past_the_end_is_empty(self):
+        page, total = siglip_util_rank_scores(np.array([0.5, 0.6]), 0.1, offset=5)
+
+        assert total == 2
+        assert len(page) == 0
+
+
+class TestEmbeddingCacheStats:
+    @patch("app.database.image_embeddings.db_get_embedding_cache_stats")
+    def test_reports_bytes_per_model_version(self, mock_stats):
+        mock_stats.return_value = {
+            "siglip2-base-patch16-224": {
+                "rows": 3,
+                "dim": 768,
+                "capacity": 4,
+                "bytes": 4 * 768 * 4,
+                "mapped": 0,
+            }
+        }
+
+        response = client.get("/images/semantic-search/cache")
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["total_bytes"] == 4 * 768 * 4
+        assert data["versions"]["siglip2-base-patch16-224"]["rows"] == 3
+        assert set(data["queries"]) == {"entries", "capacity", "hits", "misses"}
+
+
+@patch("app.utils.SigLIP.siglip_util_get_text_model")
+@patch("app.utils.SigLIP.siglip_util_tokenize_query")
+class TestQueryCache:
+    def _model(self, mock_get_text_model, mock_tokenize):
+        mock_tokenize.return_value = (np.zeros((1, 64)), np.ones((1, 64)))
+        model = MagicMock()
+        model.get_embedding.side_effect = lambda ids, mask: np.array(
+            [[0.6, 0.8]], dtype=np.float32
+        )
+        mock_get_text_model.return_value = model
+        return model
+
+    def test_repeated_query_skips_the_text_model(
+        self, mock_tokenize, mock_get_text_model
+    ):
+        model = self._model(mock_get_text_model, mock_tokenize)
+        before = siglip_util_get_query_cache_stats()
+
+        first = siglip_util_embed_query("a photo of dogs.", "/m/text.onnx", "text")
+        second = siglip_util_embed_query("a photo of dogs.", "/m/text.onnx", "text")
+
+        assert second is first
+        assert first.dtype == np.float32 and first.shape == (2,)
+        assert not first.flags.writeable
+        assert model.get_embedding.call_count == 1
+        after = siglip_util_get_query_cache_stats()
+        assert after["hits"] - before["hits"] == 1
+        assert after["misses"] - before["misses"] == 1
+        assert after["entries"] == 1
+
+    def test_keyed_by_text_model(self, mock_tokenize, mock_get_text_model):
+        model = self._model(mock_get_text_model, mock_tokenize)
+
+        siglip_util_embed_query("a photo of dogs.", "/m/base.onnx", "base_text")
+        siglip_util_embed_query("a photo of dogs.", "/m/large.onnx", "large_text")
+
+        assert model.get_embedding.call_count == 2
+
+    def test_least_recently_used_entry_is_evicted(
+        self, mock_tokenize, mock_get_text_model
+    ):
+        model = self._model(mock_get_text_model, mock_tokenize)
+
+        with patch("app.config.settings.SIGLIP2_QUERY_CACHE_SIZE", 2):
+            siglip_util_embed_query("a", "/m", "text")
+            siglip_util_embed_query("b", "/m", "text")
+            siglip_util_embed_query("a", "/m", "text")
+            siglip_util_embed_query("c", "/m", "text")
+            assert model.get_embedding.call_count == 3
+
+            siglip_util_embed_query("a", "/m", "text")
+            assert model.get_embedding.call_count == 3
+            siglip_util_embed_query("b", "/m", "text")
+            assert model.get_embedding.call_count == 4
+
+    def test_zero_size_disables_caching(self, mock_tokenize, mock_get_text_model):
+        model = self._model(mock_get_text_model, mock_tokenize)
+
+        with patch("app.config.settings.SIGLIP2_QUERY_CACHE_SIZE", 0):
+            siglip_util_embed_query("a", "/m", "text")
+            siglip_util_embed_query("a", "/m", "text")
+
+        assert model.get_embedding.call_count == 2
+        assert siglip_util_get_query_cache_stats()["entries"] == 0
+
+    def test_invalidating_the_text_model_drops_its_queries(
+        self, mock_tokenize, mock_get_text_model
+    ):
+        model = self._model(mock_get_text_model, mock_tokenize)
+        siglip_util_embed_query("a", "/m/base", "base_text")
+        siglip_util_embed_query("a", "/m/large", "large_text")
+
+        siglip_util_invalidate_text_model("base_text")
+        siglip_util_embed_query("a", "/m/base", "base_text")
+        siglip_util_embed_query("a", "/m/large", "large_text")
+
+        assert model.get_embedding.call_count == 3
+        assert ("large_text", "a") in siglip_module._query_cache
+
+    def test_a_miss_straddling_invalidation_is_not_cached(
+        self, mock_tokenize, mock_get_text_model
+    ):
+        model = self._model(mock_get_text_model, mock_tokenize)
+
+        def embed_while_uninstalling(ids, mask):
+            # The old tower is dropped while this query is being embedded
+            siglip_util_invalidate_text_model("base_text")
+            return np.array([[0.6, 0.8]], dtype=np.float32)
+
+        model.get_embedding.side_effect = embed_while_uninstalling
+        vector = siglip_util_embed_query("a", "/m/base", "base_text")
+
+        assert vector.shape == (2,)
+        assert ("base_text", "a") not in siglip_module._query_cache
@@ -0,0 +1,225 @@
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.models.session_pool import (
+    acquire_model,
+    evict_model_sessions,
+    get_model_pool_stats,
+    release_model,
+)
+from app.models.session_registry import (
+    get_active_session_count,
+    mark_model_session_active,
+    mark_model_session_inactive,
+)
+
+
+class FakeModel:
+    """Registers its session on load and releases it on close, like FaceNet."""
+
+    loads = 0
+
+    def __init__(self, model_path, threshold=0.5, model_key=None):
+        self.model_path = model_path
+        self.threshold = threshold
+        self._model_key = model_key or os.path.basename(model_path)
+        self.closed = False
+        FakeModel.loads += 1
+        mark_model_session_active(self._model_key)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            mark_model_session_inactive(self._model_key)
+
+
+@pytest.fixture
+def model_file(tmp_path):
+    def make(name="model.onnx", size=1024):
+        path = tmp_path / name
+        path.write_bytes(b"\0" * size)
+        return str(path)
+
+    FakeModel.loads = 0
+    return make
+
+
+@pytest.fixture
+def pool_settings():
+    def configure(idle_seconds=300, max_mb=2048):
+        return patch.multiple(
+            "app.config.settings",
+            MODEL_POOL_IDLE_SECONDS=idle_seconds,
+            MODEL_POOL_MAX_MB=max_mb,
+        )
+
+    return configure
+
+
+class TestAcquireRelease:
+    def test_released_models_are_reused_warm(self, model_file, pool_settings):
+        path = model_file()
+        with pool_settings():
+            first = acquire_model(FakeModel, path)
+            release_model(first)
+            second = acquire_model(FakeModel, path)
+            release_model(second)
+
+        assert second is first
+        assert FakeModel.loads == 1
+        assert not first.closed
+
+    def test_concurrent_users_share_one_instance(self, model_file, pool_settings):
+        path = model_file()
+        with pool_settings():
+            a = acquire_model(FakeModel, path)
+            b = acquire_model(FakeModel, path)
+            assert a is b
+            assert get_model_pool_stats()["models"][0]["users"] == 2
+            release_model(a)
+            release_model(b)
+
+    def test_options_are_part_of_the_key(self, model_file, pool_settings):
+        path = model_file()
+        with pool_settings():
+            a = acquire_model(FakeModel, path, threshold=0.4)
+            b = acquire_model(FakeModel, path, threshold=0.7)
+            release_model(a)
+            release_model(b)
+
+        assert a is not b
+        assert (a.threshold, b.threshold) == (0.4, 0.7)
+
+    def test_zero_idle_timeout_closes_on_release(self, model_file, pool_settings):
+        with pool_settings(idle_seconds=0):
+            model = acquire_model(FakeModel, model_file())
+            release_model(model)
+
+        assert model.closed
+        assert get_model_pool_stats()["models"] == []
+
+    def test_idle_models_are_closed_after_the_timeout(self, model_file, pool_settings):
+        with pool_settings(idle_seconds=60):
+            model = acquire_model(FakeModel, model_file())
+            release_model(model)
+            assert not model.closed
+
+            with patch(
+                "app.models.session_pool.time.monotonic",
+                return_value=time.monotonic() + 61,
+            ):
+                other = acquire_model(FakeModel, model_file("other.onnx"))
+                release_model(other)
+
+        assert model.closed
+
+    def test_replaced_model_file_is_reloaded(self, model_file, pool_settings):
+        path = model_file()
+        with pool_settings():
+            old = acquire_model(FakeModel, path)
+            release_model(old)
+            model_file(size=2048)
+            new = acquire_model(FakeModel, path)
+            release_model(new)
+
+        assert new is not old
+        assert old.closed
+
+
+class TestMemoryAccounting:
+    def test_stats_count_model_file_bytes(self, model_file, pool_settings):
+        with pool_settings():
+            a = acquire_model(FakeModel, model_file("a.onnx", size=3000))
+            b = acquire_model(FakeModel, model_file("b.onnx", size=5000))
+
+            stats = get_model_pool_stats()
+            release_model(a)
+            release_model(b)
+
+        assert stats["total_bytes"] == 8000
+        assert sorted(m["bytes"] for m in stats["models"]) == [3000, 5000]
+
+    def test_least_recently_used_idle_model_goes_over_budget(
+        self, model_file, pool_settings
+    ):
+        mb = 1024 * 1024
+        with pool_settings(max_mb=1):
+            a = acquire_model(FakeModel, model_file("a.onnx", size=mb // 2))
+            release_model(a)
+            b = acquire_model(FakeModel, model_file("b.onnx", size=mb // 2))
+            release_model(b)
+            c = acquire_model(FakeModel, model_file("c.onnx", size=mb // 2))
+            release_model(c)
+
+        assert a.closed
+        assert not b.closed and not c.closed
+
+    def test_models_in_use_are_never_evicted(self, model_file, pool_settings):
+        with pool_settings(max_mb=0):
+            model = acquire_model(FakeModel, model_file())
+            other = acquire_model(FakeModel, model_file("other.onnx"))
+            release_model(other)
+
+            assert not model.closed
+            release_model(model)
+
+        assert model.closed
+
+
+class TestUninstall:
+    def test_idle_sessions_of_the_model_are_evicted(self, model_file, pool_settings):
+        with pool_settings():
+            model = acquire_model(FakeModel, model_file("face.onnx"))
+            keep = acquire_model(FakeModel, model_file("object.onnx"))
+            release_model(model)
+            release_model(keep)
+            assert get_active_session_count("face.onnx") == 1
+
+            assert evict_model_sessions("face.onnx") == 1
+
+        assert get_active_session_count("face.onnx") == 0
+        assert not keep.closed
+
+    def test_delete_route_closes_idle_pooled_sessions(self, model_file, pool_settings):
+        from app.routes.models import router
+
+        path = model_file("yolo_nano_face.onnx")
+        with pool_settings():
+            model = acquire_model(FakeModel, path, model_key="yolo_nano_face")
+            release_model(model)
+
+            app = FastAPI()
+            app.include_router(router, prefix="/models")
+            with patch(
+                "app.routes.models.db_get_metadata",
+                return_value={"user_preferences": {"YOLO_model_size": "small"}},
+            ), patch("app.routes.models.get_model_path", return_value=path):
+                response = TestClient(app).delete("/models/yolo_nano_face")
+
+        assert response.status_code == 200
+        assert model.closed
+        assert not os.path.exists(path)
+
+    def test_models_in_use_still_block_deletion(self, model_file, pool_settings):
+        from app.routes.models import router
+
+        path = model_file("yolo_nano_face.onnx")
+        with pool_settings():
+            model = acquire_model(FakeModel, path, model_key="yolo_nano_face")
+
+            app = FastAPI()
+            app.include_router(router, prefix="/models")
+            with patch(
+                "app.routes.models.db_get_metadata",
+                return_value={"user_preferences": {"YOLO_model_size": "small"}},
+            ):
+                response = TestClient(app).delete("/models/yolo_nano_face")
+            release_model(model)
+
+        assert response.status_code == 409
+        assert os.path.exists(path)
@@ -12,6 +12,7 @@ import bcrypt
 import pytest
 from pydantic import ValidationError
 
+from app.database.connection import db_close_idle_connections
 from app.database.albums import (
     db_create_album_images_table,
     db_create_albums_table,
@@ -51,6 +52,7 @@ def album_db(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
     yield
 
     share_registry_clear()
+    db_close_idle_connections(db_path)
     os.unlink(db_path)
 
 
@@ -9,6 +9,7 @@ import bcrypt
 import pytest
 from fastapi.testclient import TestClient
 
+from app.database.connection import db_close_idle_connections
 from app.database.albums import (
     db_create_album_images_table,
     db_create_albums_table,
@@ -101,6 +102,7 @@ def share_env(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Iterator[Share
         }
 
     share_registry_clear()
+    db_close_idle_connections(db_path)
     os.unlink(db_path)
 
 
@@ -10,6 +10,7 @@ import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
+from app.database.connection import db_close_idle_connections
 from app.database.video_frames import (
     db_bulk_insert_video_frames,
     db_clear_frame_paths,
@@ -65,6 +66,7 @@ def test_db(monkeypatch):
 
     yield db_path
 
+    db_close_idle_connections(db_path)
     os.unlink(db_path)
 
 
@@ -9,6 +9,7 @@ import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
+from app.database.connection import db_close_idle_connections
 from app.database.videos import (
     db_create_videos_table,
     db_bulk_insert_videos,
@@ -53,6 +54,7 @@ def test_db(monkeypatch):
 
     yield db_path
 
+    db_close_idle_connections(db_path)
     os.unlink(db_path)
 
 
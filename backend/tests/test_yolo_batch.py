@@ -0,0 +1,184 @@
+from unittest.mock import MagicMock
+
+import cv2
+import numpy as np
+import pytest
+
+from app.models.YOLO import YOLO
+
+INPUT_SIZE = 64
+NUM_CLASSES = 3
+
+
+def _fake_predictions(batch_size: int) -> np.ndarray:
+    """Raw YOLO output: one confident class-1 box centred in the input."""
+    predictions = np.zeros((batch_size, 4 + NUM_CLASSES, 10), dtype=np.float32)
+    predictions[:, 0:4, 0] = [INPUT_SIZE / 2, INPUT_SIZE / 2, 16, 16]
+    predictions[:, 4 + 1, 0] = 0.9
+    return predictions
+
+
+def _yolo(batch_dim) -> YOLO:
+    """A YOLO wired to a stand-in session, so no model file is needed."""
+    yolo = YOLO("/models/fake.onnx", conf_threshold=0.5, iou_threshold=0.5)
+    session = MagicMock()
+    session.run.side_effect = lambda names, feeds: [
+        _fake_predictions(next(iter(feeds.values())).shape[0])
+    ]
+    yolo._session = session
+    yolo.input_names = ["images"]
+    yolo.output_names = ["output0"]
+    yolo.input_shape = [batch_dim, 3, INPUT_SIZE, INPUT_SIZE]
+    yolo.input_height = INPUT_SIZE
+    yolo.input_width = INPUT_SIZE
+    yolo.supports_batching = not isinstance(batch_dim, int) or batch_dim < 1
+    return yolo
+
+
+IMAGES = [
+    np.zeros((120, 80, 3), dtype=np.uint8),
+    np.zeros((50, 200, 3), dtype=np.uint8),
+    np.zeros((64, 64, 3), dtype=np.uint8),
+]
+
+
+class TestDetectObjectsBatch:
+    def test_dynamic_batch_runs_once(self):
+        yolo = _yolo("batch")
+
+        results = yolo.detect_objects_batch(IMAGES)
+
+        assert yolo._session.run.call_count == 1
+        fed = yolo._session.run.call_args[0][1]["images"]
+        assert fed.shape == (3, 3, INPUT_SIZE, INPUT_SIZE)
+        assert fed.dtype == np.float32
+        assert len(results) == 3
+
+    def test_fixed_batch_export_falls_back_to_one_run_per_image(self):
+        yolo = _yolo(1)
+
+        results = yolo.detect_objects_batch(IMAGES)
+
+        assert yolo._session.run.call_count == 3
+        assert len(results) == 3
+
+    @pytest.mark.parametrize("batch_dim", ["batch", 1])
+    def test_matches_single_image_detection(self, batch_dim):
+        batched = _yolo(batch_dim).detect_objects_batch(IMAGES)
+
+        single = _yolo(1)
+        for image, (boxes, scores, class_ids) in zip(IMAGES, batched):
+            expected_boxes, expected_scores, expected_ids = single.detect_objects(image)
+            np.testing.assert_allclose(boxes, expected_boxes)
+            np.testing.assert_allclose(scores, expected_scores)
+            assert list(class_ids) == list(expected_ids) == [1]
+
+    def test_boxes_are_mapped_back_to_each_images_own_frame(self):
+        boxes = [result[0][0] for result in _yolo("batch").detect_objects_batch(IMAGES)]
+        for image, (x1, y1, x2, y2) in zip(IMAGES, boxes):
+            height, width = image.shape[:2]
+            # The box sits in the middle of the letterboxed input, so it must
+            # land in the middle of the original image too (give or take the
+            # padding rounding).
+            assert (x1 + x2) / 2 == pytest.approx(width / 2, abs=2)
+            assert (y1 + y2) / 2 == pytest.approx(height / 2, abs=2)
+
+    def test_empty_input(self):
+        yolo = _yolo("batch")
+        assert yolo.detect_objects_batch([]) == []
+        yolo._session.run.assert_not_called()
+
+
+def _reference_letterbox(image, size):
+    """The allocating preprocessing chain the input buffer replaced."""
+    img_height, img_width = image.shape[:2]
+    rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    scale = min(size / img_width, size / img_height)
+    new_w, new_h = round(img_width * scale), round(img_height * scale)
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+    padded = np.full((size, size, 3), 114, dtype=np.uint8)
+    padded[pad_y : pad_y + new_h, pad_x : pad_x + new_w] = cv2.resize(
+        rgb, (new_w, new_h)
+    )
+    return (padded / 255.0).transpose(2, 0, 1).astype(np.float32)
+
+
+def _bound_yolo(batch_dim):
+    """A stand-in session driven through IOBinding instead of session.run."""
+    yolo = _yolo(batch_dim)
+    yolo.output_shapes = [[batch_dim, 4 + NUM_CLASSES, 10]]
+    yolo._use_io_binding = True
+
+    def run_with_iobinding(binding):
+        buffers = next(b for b in yolo._batch_buffers.values() if b.binding is binding)
+        buffers.outputs[0][...] = _fake_predictions(len(buffers.inputs))
+
+    yolo._session.io_binding.side_effect = MagicMock
+    yolo._session.run_with_iobinding.side_effect = run_with_iobinding
+    return yolo
+
+
+class TestPreprocessing:
+    @pytest.mark.parametrize("image", IMAGES[:2] + [np.zeros((7, 300, 3))])
+    def test_letterbox_matches_the_reference_chain(self, image):
+        rng = np.random.default_rng(0)
+        image = rng.integers(0, 256, image.shape, dtype=np.uint8)
+
+        tensor, _ = _yolo(1)._letterbox(image)
+
+        np.testing.assert_array_equal(tensor, _reference_letterbox(image, INPUT_SIZE))
+
+    def test_input_buffer_is_reused(self):
+        yolo = _yolo(1)
+
+        yolo.detect_objects(IMAGES[0])
+        first = yolo._session.run.call_args[0][1]["images"]
+        yolo.detect_objects(IMAGES[1])
+        second = yolo._session.run.call_args[0][1]["images"]
+
+        assert first is second
+        # Padding from the first image's letterbox does not leak into the second
+        np.testing.assert_array_equal(
+            second[0], _reference_letterbox(IMAGES[1], INPUT_SIZE)
+        )
+
+    @pytest.mark.parametrize("batch_dim", ["batch", 1])
+    def test_io_binding_matches_session_run(self, batch_dim):
+        yolo = _bound_yolo(batch_dim)
+
+        bound = yolo.detect_objects_batch(IMAGES)
+        bound += [yolo.detect_objects(IMAGES[0])]
+
+        expected = _yolo(batch_dim).detect_objects_batch(IMAGES)
+        expected += [_yolo(batch_dim).detect_objects(IMAGES[0])]
+        for (boxes, scores, ids), (want_boxes, want_scores, want_ids) in zip(
+            bound, expected
+        ):
+            np.testing.assert_allclose(boxes, want_boxes)
+            np.testing.assert_allclose(scores, want_scores)
+            assert list(ids) == list(want_ids)
+        yolo._session.run.assert_not_called()
+
+    def test_bindings_are_made_once_per_batch_size(self):
+        yolo = _bound_yolo("batch")
+
+        yolo.detect_objects_batch(IMAGES)
+        yolo.detect_objects_batch(IMAGES)
+        yolo.detect_objects(IMAGES[0])
+
+        assert yolo._session.io_binding.call_count == 2
+        assert yolo._session.run_with_iobinding.call_count == 3
+
+    def test_dynamic_output_shape_is_copied_out(self):
+        yolo = _bound_yolo(1)
+        yolo.output_shapes = [[1, 4 + NUM_CLASSES, "anchors"]]
+        binding = MagicMock()
+        binding.copy_outputs_to_cpu.return_value = [_fake_predictions(1)]
+        yolo._session.io_binding.side_effect = None
+        yolo._session.io_binding.return_value = binding
+        yolo._session.run_with_iobinding.side_effect = None
+
+        boxes, _, class_ids = yolo.detect_objects(IMAGES[2])
+
+        binding.bind_output.assert_called_once_with("output0", "cpu")
+        assert len(boxes) == 1 and list(class_ids) == [1]
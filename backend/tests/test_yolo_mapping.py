@@ -6,6 +6,7 @@ from unittest.mock import patch
 
 import pytest
 
+from app.database.connection import db_close_idle_connections
 from app.database.yolo_mapping import db_create_YOLO_classes_table
 
 # ##############################
@@ -25,6 +26,7 @@ def test_db(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
         yield db_path
     finally:
         # finally, not post-yield: a setup failure would otherwise leak the file
+        db_close_idle_connections(db_path)
         os.unlink(db_path)
 
 
@@ -91,7 +93,7 @@ class TestCreateYOLOClassesTable:
     def test_survives_a_connection_failure(self):
         """connect() failing leaves conn as None, so the finally must no-op."""
         with patch(
-            "app.database.yolo_mapping.sqlite3.connect",
+            "app.database.yolo_mapping.db_connect",
             side_effect=sqlite3.Error("fail"),
         ):
             with pytest.raises(sqlite3.Error):
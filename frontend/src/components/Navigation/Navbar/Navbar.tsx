@@ -211,8 +211,8 @@ export function Navbar() {
                         <Avatar className="border-border h-10 w-10 border">
                           <AvatarImage
                             src={
-                              cluster.face_image_base64
-                                ? `data:image/jpeg;base64,${cluster.face_image_base64}`
+                              cluster.face_image_path
+                                ? convertFileSrc(cluster.face_image_path)
                                 : undefined
                             }
                             alt={cluster.cluster_name || 'Person'}
@@ -1,3 +1,4 @@
+import { convertFileSrc } from '@tauri-apps/api/core';
 import { Avatar, AvatarImage, AvatarFallback } from '@/components/ui/avatar';
 import { getPersonName } from '@/utils/personUtils';
 import type { Cluster } from '@/types/Media';
@@ -12,8 +13,8 @@ export function PersonAvatar({ cluster, className }: PersonAvatarProps) {
     <Avatar className={className}>
       <AvatarImage
         src={
-          cluster.face_image_base64
-            ? `data:image/jpeg;base64,${cluster.face_image_base64}`
+          cluster.face_image_path
+            ? convertFileSrc(cluster.face_image_path)
             : undefined
         }
         alt={getPersonName(cluster)}
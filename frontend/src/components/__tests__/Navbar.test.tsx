@@ -59,7 +59,7 @@ interface TestCluster {
   cluster_id: string;
   cluster_name: string;
   face_count: number;
-  face_image_base64?: string;
+  face_image_path?: string;
 }
 
 describe('Navbar Component', () => {
@@ -255,7 +255,7 @@ describe('Navbar Component', () => {
     expect(screen.queryByText(/Person/)).not.toBeInTheDocument();
   });
 
-  it('renders correct fallback initials and labels when face_image_base64 and cluster_name are absent', () => {
+  it('renders correct fallback initials and labels when face_image_path and cluster_name are absent', () => {
     const fallbackClusters: TestCluster[] = [
       {
         cluster_id: '1234abcd',
@@ -86,5 +86,5 @@ export interface Cluster {
   cluster_id: string;
   cluster_name: string;
   face_count: number;
-  face_image_base64?: string;
+  face_image_path?: string;
 }
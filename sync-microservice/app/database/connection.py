@@ -0,0 +1,48 @@
+import os
+import sqlite3
+import threading
+from typing import Optional, Tuple
+
+from app.config.settings import DATABASE_PATH
+from app.logging.setup_logging import get_sync_logger
+
+logger = get_sync_logger(__name__)
+
+# The backend owns the database and keeps it in WAL mode, so these
+# read-only connections never block its writer and can stay open.
+_BUSY_TIMEOUT_SECONDS = 5.0
+_CACHE_SIZE_KB = 16 * 1024
+
+_local = threading.local()
+
+
+def _file_id(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+def db_connect() -> sqlite3.Connection:
+    """
+    This thread's connection to the PictoPy database, opened on first use.
+
+    The connection is reused by later calls on the same thread, so callers
+    close their cursors but not the connection. It is reopened if the
+    database file was replaced.
+    """
+    conn = getattr(_local, "conn", None)
+    current = _file_id(DATABASE_PATH)
+    if conn is not None and (_local.path != DATABASE_PATH or _local.file_id != current):
+        conn.close()
+        conn = None
+
+    if conn is None:
+        conn = sqlite3.connect(DATABASE_PATH, timeout=_BUSY_TIMEOUT_SECONDS)
+        conn.execute(f"PRAGMA cache_size = -{_CACHE_SIZE_KB};")
+        conn.execute("PRAGMA query_only = ON;")
+        _local.conn = conn
+        _local.path = DATABASE_PATH
+        _local.file_id = _file_id(DATABASE_PATH)
+    return conn
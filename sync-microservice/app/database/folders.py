@@ -1,6 +1,5 @@
-import sqlite3
 from typing import List, Tuple, NamedTuple
-from app.config.settings import DATABASE_PATH
+from app.database.connection import db_connect
 from app.logging.setup_logging import get_sync_logger
 
 logger = get_sync_logger(__name__)
@@ -39,8 +38,7 @@ def db_get_all_folders_with_ids() -> List[FolderIdPath]:
     Returns:
         List of tuples containing (folder_id, folder_path)
     """
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
+    cursor = db_connect().cursor()
 
     try:
         cursor.execute(
@@ -54,7 +52,7 @@ def db_get_all_folders_with_ids() -> List[FolderIdPath]:
         logger.error(f"Error getting folders from database: {e}")
         return []
     finally:
-        conn.close()
+        cursor.close()
 
 
 def db_check_database_connection() -> bool:
@@ -64,10 +62,9 @@ def db_check_database_connection() -> bool:
     Returns:
         True if connection is successful and table exists, False otherwise
     """
-    conn = None
+    cursor = None
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
+        cursor = db_connect().cursor()
         # Check if folders table exists
         cursor.execute(
             """
@@ -81,8 +78,8 @@ def db_check_database_connection() -> bool:
         logger.error(f"Database connection error: {e}")
         return False
     finally:
-        if conn is not None:
-            conn.close()
+        if cursor is not None:
+            cursor.close()
 
 
 def db_get_tagging_progress() -> List[FolderTaggingInfo]:
@@ -95,8 +92,7 @@ def db_get_tagging_progress() -> List[FolderTaggingInfo]:
         List of FolderTaggingInfo with percentages, raw per-medium counts, and
         each folder's AI_Tagging flag
     """
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
+    cursor = db_connect().cursor()
 
     try:
         # Pre-aggregate each media table by folder before joining, so a folder
@@ -186,4 +182,4 @@ def db_get_tagging_progress() -> List[FolderTaggingInfo]:
         return folder_info_list
 
     finally:
-        conn.close()
+        cursor.close()